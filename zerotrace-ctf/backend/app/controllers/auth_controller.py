@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 from fastapi import HTTPException, status
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.models.user import User
+from app.observability.logger import log_event
 from app.schemas.auth import MessageResponse, UserResponse
 from app.schemas.token import AccessTokenResponse
 from app.services.auth_service import AuthService
@@ -48,7 +49,7 @@ def register_user(session: Session, email: str, password: str) -> MessageRespons
 def login_user(session: Session, email: str, password: str) -> AccessTokenResponse:
     try:
         user = _auth_service.authenticate_user(session, email=email, password=password)
-        return _auth_service.issue_token(user)
+        token = _auth_service.issue_token(user)
     except InvalidCredentialsError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -65,6 +66,21 @@ def login_user(session: Session, email: str, password: str) -> AccessTokenRespon
             detail="Authentication failed.",
         ) from None
 
+    if user in session.dirty:
+        _persist_password_rehash(session)
+    return token
+
+
+def _persist_password_rehash(session: Session) -> None:
+    # A failed rehash must not fail the login; the next login simply retries it.
+    try:
+        session.commit()
+    except SQLAlchemyError as exc:
+        session.rollback()
+        log_event("password_rehash_failed", outcome="error", error_type=type(exc).__name__)
+    else:
+        log_event("password_rehashed", outcome="success")
+
 
 def get_current_user_profile(user: User) -> UserResponse:
     return UserResponse(
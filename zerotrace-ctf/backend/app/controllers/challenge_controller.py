@@ -1,19 +1,27 @@
 from __future__ import annotations
 
+import asyncio
 from uuid import UUID
 
-from fastapi import HTTPException, status
+from fastapi import HTTPException, WebSocket, WebSocketDisconnect, status
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.core.settings import get_settings
+from app.dependencies.auth import get_current_principal
 from app.models.challenge import Challenge
 from app.models.user import User
+from app.observability.metrics import metrics
 from app.repositories import challenge_repository
+from app.security.principal_cache import Principal
 from app.schemas.challenge import (
     ChallengeActionMessageResponse,
+    ChallengeLabBatchRequest,
+    ChallengeLabBatchResponse,
     ChallengeLabCommandRequest,
     ChallengeLabCommandResponse,
+    ChallengeLabOutputRequest,
     ChallengeCreateResponse,
     ChallengeDetailResponse,
     ChallengeSummaryResponse,
@@ -34,12 +42,27 @@ from app.services.challenge_exceptions import (
     TrackNotFoundError,
 )
 from app.services.challenge_service import ChallengeService
-from app.services.challenge_lab_service import ChallengeLabService, ChallengeLabUnavailableError
-from app.services.in_memory_rate_limiter import lab_command_rate_limiter
+from app.services.challenge_lab_service import (
+    ChallengeLabOutputCursorError,
+    ChallengeLabService,
+    ChallengeLabUnavailableError,
+    LabTerminal,
+)
+from app.services.in_memory_rate_limiter import InMemoryRateLimitDecision, lab_command_rate_limiter
+from app.services.lab_output_pager import LabOutputReader
+from app.services.linux_shell_engine import ShellCommandStream
 
 
 _challenge_service = ChallengeService()
 _challenge_lab_service = ChallengeLabService()
+_LAB_TERMINAL_CHUNK_LINES = 200
+_WS_CLOSE_UNAUTHORIZED = 4401
+_WS_CLOSE_NOT_FOUND = 4404
+
+
+def get_challenge_lab_service() -> ChallengeLabService:
+    """The worker's lab service, for background tasks that maintain it outside a request."""
+    return _challenge_lab_service
 
 
 def create_challenge(session: Session, payload: CreateChallengeRequest) -> ChallengeCreateResponse:
@@ -330,6 +353,227 @@ def execute_lab_command(
     slug: str,
     payload: ChallengeLabCommandRequest,
 ) -> ChallengeLabCommandResponse:
+    _ensure_lab_challenge_visible(session, slug)
+    _consume_lab_command_permits(current_user, slug, permits=1)
+
+    try:
+        result = _challenge_lab_service.execute_command(
+            challenge_slug=slug,
+            command=payload.command,
+            cwd=payload.cwd,
+            session_key=_lab_session_key(current_user, slug),
+        )
+    except ChallengeLabUnavailableError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lab unavailable for this challenge.",
+        ) from None
+
+    return ChallengeLabCommandResponse(
+        output=result.output,
+        cwd=result.cwd,
+        exit_code=result.exit_code,
+        truncated=result.truncated,
+        next_cursor=result.next_cursor,
+    )
+
+
+def fetch_lab_output(
+    session: Session,
+    current_user: User,
+    slug: str,
+    payload: ChallengeLabOutputRequest,
+) -> ChallengeLabCommandResponse:
+    _ensure_lab_challenge_visible(session, slug)
+    _consume_lab_command_permits(current_user, slug, permits=1)
+
+    try:
+        result = _challenge_lab_service.fetch_output_page(
+            payload.cursor,
+            session_key=_lab_session_key(current_user, slug),
+        )
+    except ChallengeLabOutputCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Output cursor expired or not found.",
+        ) from None
+
+    return ChallengeLabCommandResponse(
+        output=result.output,
+        cwd=result.cwd,
+        exit_code=result.exit_code,
+        truncated=result.truncated,
+        next_cursor=result.next_cursor,
+    )
+
+
+def execute_lab_batch(
+    session: Session,
+    current_user: User,
+    slug: str,
+    payload: ChallengeLabBatchRequest,
+) -> ChallengeLabBatchResponse:
+    _ensure_lab_challenge_visible(session, slug)
+    _consume_lab_command_permits(current_user, slug, permits=len(payload.commands))
+
+    try:
+        result = _challenge_lab_service.execute_batch(
+            challenge_slug=slug,
+            commands=payload.commands,
+            cwd=payload.cwd,
+            session_key=_lab_session_key(current_user, slug),
+            max_output_bytes=get_settings().LAB_BATCH_MAX_OUTPUT_BYTES,
+        )
+    except ChallengeLabUnavailableError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lab unavailable for this challenge.",
+        ) from None
+
+    return ChallengeLabBatchResponse(
+        results=[
+            ChallengeLabCommandResponse(output=item.output, cwd=item.cwd, exit_code=item.exit_code)
+            for item in result.results
+        ],
+        cwd=result.cwd,
+        truncated=result.truncated,
+    )
+
+
+async def run_lab_terminal(websocket: WebSocket, session: Session, slug: str) -> None:
+    """Serve one lab terminal connection: authenticate once, then stream each command's output.
+
+    Client frames are ``{"type": "auth", "token": ...}`` (first, once) and
+    ``{"type": "command", "command": ...}``. Output is produced while it is
+    sent, as ``output`` frames of at most ``_LAB_TERMINAL_CHUNK_LINES`` lines
+    whose concatenation is the full output, followed by one ``exit`` frame.
+    """
+    settings = get_settings()
+    if not _lab_terminal_connections.try_acquire(settings.LAB_WS_MAX_CONNECTIONS):
+        metrics.increment("zerotrace_lab_terminal_connections_total", labels={"outcome": "rejected"})
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+
+    try:
+        await websocket.accept()
+        principal = await _authenticate_lab_terminal(websocket, session, slug)
+        # Release the pooled connection; the terminal itself never touches the DB.
+        session.close()
+        if principal is None:
+            return
+
+        try:
+            terminal = await run_in_threadpool(
+                _challenge_lab_service.open_terminal,
+                slug,
+                "/",
+                session_key=_lab_session_key_for(principal.id, slug),
+            )
+        except ChallengeLabUnavailableError:
+            await websocket.close(code=_WS_CLOSE_NOT_FOUND, reason="Lab unavailable for this challenge.")
+            return
+
+        metrics.increment("zerotrace_lab_terminal_connections_total", labels={"outcome": "accepted"})
+        await websocket.send_json({"type": "ready", "cwd": terminal.cwd})
+        while True:
+            try:
+                message = await asyncio.wait_for(websocket.receive_json(), timeout=settings.LAB_WS_IDLE_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                await websocket.close(code=status.WS_1000_NORMAL_CLOSURE, reason="Idle timeout.")
+                return
+            except ValueError:
+                await websocket.send_json({"type": "error", "detail": "Frames must be JSON objects."})
+                continue
+
+            command = message.get("command") if isinstance(message, dict) and message.get("type") == "command" else None
+            if not isinstance(command, str) or not command.strip() or len(command.strip()) > 256:
+                await websocket.send_json({"type": "error", "detail": "Expected a command frame."})
+                continue
+
+            decision = _check_lab_command_rate_limit(principal.id, slug, permits=1)
+            if decision is not None and not decision.allowed:
+                await websocket.send_json(
+                    {
+                        "type": "error",
+                        "detail": "Too many lab commands. Try again later.",
+                        "retry_after_seconds": decision.retry_after_seconds or 1,
+                    }
+                )
+                continue
+
+            stream = await run_in_threadpool(_start_terminal_command, terminal, command.strip())
+            reader = LabOutputReader(stream.lines)
+            while True:
+                chunk, finished = await run_in_threadpool(_read_output_chunk, reader)
+                if chunk:
+                    await websocket.send_json({"type": "output", "data": chunk})
+                if finished:
+                    break
+            await websocket.send_json({"type": "exit", "cwd": stream.cwd, "exit_code": stream.exit_code})
+    except WebSocketDisconnect:
+        return
+    finally:
+        _lab_terminal_connections.release()
+
+
+async def _authenticate_lab_terminal(websocket: WebSocket, session: Session, slug: str) -> Principal | None:
+    settings = get_settings()
+    try:
+        message = await asyncio.wait_for(websocket.receive_json(), timeout=settings.LAB_WS_AUTH_TIMEOUT_SECONDS)
+    except (asyncio.TimeoutError, ValueError):
+        await websocket.close(code=_WS_CLOSE_UNAUTHORIZED, reason="Authentication required.")
+        return None
+
+    token = message.get("token") if isinstance(message, dict) and message.get("type") == "auth" else None
+    if not isinstance(token, str) or not token.strip():
+        await websocket.close(code=_WS_CLOSE_UNAUTHORIZED, reason="Authentication required.")
+        return None
+
+    try:
+        principal = await run_in_threadpool(get_current_principal, session, f"Bearer {token.strip()}")
+    except HTTPException as exc:
+        await websocket.close(code=_WS_CLOSE_UNAUTHORIZED, reason=str(exc.detail))
+        return None
+
+    try:
+        await run_in_threadpool(_ensure_lab_challenge_visible, session, slug)
+    except HTTPException as exc:
+        await websocket.close(code=_WS_CLOSE_NOT_FOUND, reason=str(exc.detail))
+        return None
+    return principal
+
+
+def _start_terminal_command(terminal: LabTerminal, command: str) -> ShellCommandStream:
+    stream = terminal.stream(command)
+    terminal.save()
+    return stream
+
+
+def _read_output_chunk(reader: LabOutputReader) -> tuple[str, bool]:
+    chunk = reader.read(max_bytes=get_settings().LAB_OUTPUT_PAGE_MAX_BYTES, max_lines=_LAB_TERMINAL_CHUNK_LINES)
+    return chunk, reader.exhausted
+
+
+class _ConnectionSlots:
+    """Per-worker cap on open terminal connections; only touched from the event loop."""
+
+    def __init__(self) -> None:
+        self._active = 0
+
+    def try_acquire(self, limit: int) -> bool:
+        if self._active >= limit:
+            return False
+        self._active += 1
+        return True
+
+    def release(self) -> None:
+        self._active = max(0, self._active - 1)
+
+
+_lab_terminal_connections = _ConnectionSlots()
+
+
+def _ensure_lab_challenge_visible(session: Session, slug: str) -> None:
     try:
         _challenge_service.get_public_challenge(session, slug)
     except ChallengeNotFoundError:
@@ -348,38 +592,52 @@ def execute_lab_command(
             detail="Challenge retrieval failed.",
         ) from None
 
-    settings = get_settings()
-    if settings.LAB_COMMAND_RATE_LIMIT_ENABLED:
-        normalized_slug = slug.strip()
-        user_key = str(current_user.id) if current_user.id is not None else "unknown-user"
-        decision = lab_command_rate_limiter.check_and_consume(
-            key=f"lab:{user_key}:{normalized_slug}",
-            max_attempts=settings.LAB_COMMAND_RATE_LIMIT_MAX_ATTEMPTS,
-            window_seconds=settings.LAB_COMMAND_RATE_LIMIT_WINDOW_SECONDS,
-            lock_seconds=settings.LAB_COMMAND_RATE_LIMIT_LOCK_SECONDS,
-        )
-        if not decision.allowed:
-            retry_after = decision.retry_after_seconds or 1
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Too many lab commands. Try again later.",
-                headers={"Retry-After": str(retry_after)},
-            )
 
-    try:
-        result = _challenge_lab_service.execute_command(
-            challenge_slug=slug,
-            command=payload.command,
-            cwd=payload.cwd,
+def _consume_lab_command_permits(current_user: User, slug: str, *, permits: int) -> None:
+    settings = get_settings()
+    if settings.LAB_COMMAND_RATE_LIMIT_ENABLED and permits > settings.LAB_COMMAND_RATE_LIMIT_MAX_ATTEMPTS:
+        # Could never be admitted, so waiting would not help.
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Batch has more commands than the lab command rate limit allows.",
         )
-    except ChallengeLabUnavailableError:
+    decision = _check_lab_command_rate_limit(current_user.id, slug, permits=permits)
+    if decision is not None and not decision.allowed:
+        retry_after = decision.retry_after_seconds or 1
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Lab unavailable for this challenge.",
-        ) from None
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many lab commands. Try again later.",
+            headers={"Retry-After": str(retry_after)},
+        )
 
-    return ChallengeLabCommandResponse(
-        output=result.output,
-        cwd=result.cwd,
-        exit_code=result.exit_code,
+
+def _check_lab_command_rate_limit(
+    user_id: UUID | None,
+    slug: str,
+    *,
+    permits: int,
+) -> InMemoryRateLimitDecision | None:
+    settings = get_settings()
+    if not settings.LAB_COMMAND_RATE_LIMIT_ENABLED:
+        return None
+
+    normalized_slug = slug.strip()
+    user_key = str(user_id) if user_id is not None else "unknown-user"
+    # A batch takes all of its permits in one check, so it is admitted or refused as a whole.
+    return lab_command_rate_limiter.check_and_consume(
+        key=f"lab:{user_key}:{normalized_slug}",
+        max_attempts=settings.LAB_COMMAND_RATE_LIMIT_MAX_ATTEMPTS,
+        window_seconds=settings.LAB_COMMAND_RATE_LIMIT_WINDOW_SECONDS,
+        lock_seconds=settings.LAB_COMMAND_RATE_LIMIT_LOCK_SECONDS,
+        permits=permits,
     )
+
+
+def _lab_session_key(current_user: User, slug: str) -> str | None:
+    return _lab_session_key_for(current_user.id, slug)
+
+
+def _lab_session_key_for(user_id: UUID | None, slug: str) -> str | None:
+    if user_id is None:
+        return None
+    return f"{user_id}:{slug.strip()}"
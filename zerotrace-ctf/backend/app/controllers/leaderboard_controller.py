@@ -2,28 +2,67 @@ from __future__ import annotations
 
 from uuid import UUID
 
+from collections.abc import AsyncIterator, Iterator
+import csv
+from datetime import date, datetime
+import io
+import json
+
 from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.core.settings import get_settings
 from app.repositories import track_repository
-from app.schemas.leaderboard import LeaderboardEntryResponse, LeaderboardListResponse
-from app.services.leaderboard_service import LeaderboardService
+from app.schemas.leaderboard import (
+    LeaderboardEntryResponse,
+    LeaderboardHistoryEntryResponse,
+    LeaderboardHistoryPointResponse,
+    LeaderboardHistoryResponse,
+    LeaderboardListResponse,
+)
+from app.services.leaderboard_service import LeaderboardEntry, LeaderboardService
+from app.services.leaderboard_snapshot_service import LeaderboardHistoryPoint, LeaderboardSnapshotService
+from app.services.scoreboard_event_hub import scoreboard_event_hub
 
 
 _leaderboard_service = LeaderboardService()
+_leaderboard_snapshot_service = LeaderboardSnapshotService(_leaderboard_service)
+
+_EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+_EXPORT_CSV_COLUMNS = ("rank", "user_id", "total_xp", "first_solve_at")
+_EXPORT_CHUNK_ROWS = 500
 
 
-def get_global_leaderboard(session: Session, limit: int, offset: int) -> LeaderboardListResponse:
+def get_global_leaderboard(
+    session: Session,
+    limit: int,
+    offset: int,
+    start_day: date | None = None,
+    end_day: date | None = None,
+) -> LeaderboardListResponse:
     try:
-        entries = _leaderboard_service.get_global_leaderboard(
-            session=session,
-            limit=limit,
-            offset=offset,
-        )
+        if start_day is None and end_day is None:
+            entries = _leaderboard_service.get_global_leaderboard(
+                session=session,
+                limit=limit,
+                offset=offset,
+            )
+        else:
+            entries = _leaderboard_service.get_global_range_leaderboard(
+                session=session,
+                start_day=start_day,
+                end_day=end_day,
+                limit=limit,
+                offset=offset,
+            )
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid pagination parameters.",
+            detail=_invalid_parameters_detail(start_day, end_day),
         ) from None
     except Exception:
         raise HTTPException(
@@ -38,7 +77,14 @@ def get_global_leaderboard(session: Session, limit: int, offset: int) -> Leaderb
     )
 
 
-def get_track_leaderboard(session: Session, track_id: UUID, limit: int, offset: int) -> LeaderboardListResponse:
+def get_track_leaderboard(
+    session: Session,
+    track_id: UUID,
+    limit: int,
+    offset: int,
+    start_day: date | None = None,
+    end_day: date | None = None,
+) -> LeaderboardListResponse:
     if track_repository.get_by_id(session, track_id) is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -46,16 +92,26 @@ def get_track_leaderboard(session: Session, track_id: UUID, limit: int, offset:
         )
 
     try:
-        entries = _leaderboard_service.get_track_leaderboard(
-            session=session,
-            track_id=track_id,
-            limit=limit,
-            offset=offset,
-        )
+        if start_day is None and end_day is None:
+            entries = _leaderboard_service.get_track_leaderboard(
+                session=session,
+                track_id=track_id,
+                limit=limit,
+                offset=offset,
+            )
+        else:
+            entries = _leaderboard_service.get_track_range_leaderboard(
+                session=session,
+                track_id=track_id,
+                start_day=start_day,
+                end_day=end_day,
+                limit=limit,
+                offset=offset,
+            )
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid pagination parameters.",
+            detail=_invalid_parameters_detail(start_day, end_day),
         ) from None
     except Exception:
         raise HTTPException(
@@ -70,6 +126,135 @@ def get_track_leaderboard(session: Session, track_id: UUID, limit: int, offset:
     )
 
 
+def get_leaderboard_history(
+    session: Session,
+    at: datetime | None,
+    start: datetime | None,
+    end: datetime | None,
+    top: int,
+    max_points: int,
+    user_id: UUID | None,
+) -> LeaderboardHistoryResponse:
+    try:
+        if at is not None:
+            point = _leaderboard_snapshot_service.get_snapshot_at(
+                session=session,
+                at=at,
+                top=top,
+                user_id=user_id,
+            )
+            points = [point] if point is not None else []
+        else:
+            points = _leaderboard_snapshot_service.get_history(
+                session=session,
+                start=start,
+                end=end,
+                top=top,
+                max_points=max_points,
+                user_id=user_id,
+            )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid history parameters.",
+        ) from None
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Leaderboard history retrieval failed.",
+        ) from None
+
+    return LeaderboardHistoryResponse(
+        points=[_map_history_point(point) for point in points],
+        top=top,
+    )
+
+
+def export_leaderboard(session: Session, export_format: str, track_id: UUID | None) -> StreamingResponse:
+    media_type = _EXPORT_MEDIA_TYPES.get(export_format)
+    if media_type is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unsupported export format.",
+        )
+    if track_id is not None and track_repository.get_by_id(session, track_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Track not found.",
+        )
+
+    entries = _leaderboard_service.iter_full_leaderboard(session=session, track_id=track_id)
+    scope = "global" if track_id is None else f"track-{track_id}"
+    return StreamingResponse(
+        _iter_export_chunks(entries, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="leaderboard-{scope}.{export_format}"'},
+    )
+
+
+def stream_scoreboard_events(session: Session) -> StreamingResponse:
+    # Release the pooled connection used for authentication; the stream itself never touches the DB.
+    session.close()
+    return StreamingResponse(
+        _iter_scoreboard_frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _iter_scoreboard_frames() -> AsyncIterator[bytes]:
+    settings = get_settings()
+    subscription = scoreboard_event_hub.subscribe(max_queue_size=settings.SCOREBOARD_STREAM_QUEUE_SIZE)
+    try:
+        yield b": connected\n\n"
+        async for frame in subscription.frames(settings.SCOREBOARD_STREAM_HEARTBEAT_SECONDS):
+            yield frame
+    finally:
+        scoreboard_event_hub.unsubscribe(subscription)
+
+
+def _invalid_parameters_detail(start_day: date | None, end_day: date | None) -> str:
+    if start_day is None and end_day is None:
+        return "Invalid pagination parameters."
+    return "Invalid leaderboard range parameters."
+
+
+def _iter_export_chunks(entries: Iterator[LeaderboardEntry], export_format: str) -> Iterator[bytes]:
+    # Rows are buffered into modest chunks so the socket sees a few large writes instead of one per entry.
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n") if export_format == "csv" else None
+    if writer is not None:
+        writer.writerow(_EXPORT_CSV_COLUMNS)
+
+    pending = 0
+    for entry in entries:
+        first_solve_at = entry.first_solve_at.isoformat()
+        if writer is not None:
+            writer.writerow((entry.rank, entry.user_id, entry.total_xp, first_solve_at))
+        else:
+            buffer.write(
+                json.dumps(
+                    {
+                        "rank": entry.rank,
+                        "user_id": str(entry.user_id),
+                        "total_xp": entry.total_xp,
+                        "first_solve_at": first_solve_at,
+                    },
+                    separators=(",", ":"),
+                )
+            )
+            buffer.write("\n")
+        pending += 1
+        if pending >= _EXPORT_CHUNK_ROWS:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
 def _map_entry(entry) -> LeaderboardEntryResponse:
     return LeaderboardEntryResponse(
         user_id=entry.user_id,
@@ -78,3 +263,17 @@ def _map_entry(entry) -> LeaderboardEntryResponse:
         rank=entry.rank,
     )
 
+
+def _map_history_point(point: LeaderboardHistoryPoint) -> LeaderboardHistoryPointResponse:
+    return LeaderboardHistoryPointResponse(
+        captured_at=point.captured_at,
+        entry_count=point.entry_count,
+        results=[
+            LeaderboardHistoryEntryResponse(
+                user_id=entry.user_id,
+                total_xp=entry.total_xp,
+                rank=entry.rank,
+            )
+            for entry in point.entries
+        ],
+    )
@@ -1,17 +1,33 @@
 from __future__ import annotations
 
-from fastapi import HTTPException, status
+from pathlib import PurePath
+
+from fastapi import HTTPException, UploadFile, status
 from sqlalchemy.orm import Session
 
-from app.models.user import User
-from app.schemas.user import UserXPResponse
+from app.schemas.user import (
+    UserImportResponse,
+    UserImportRowResponse,
+    UserXPResponse,
+    UserXPTimelinePointResponse,
+    UserXPTimelineResponse,
+)
+from app.security.principal_cache import Principal
+from app.services.user_import_service import SUPPORTED_IMPORT_FORMATS, UserImportService, iter_user_import_rows
 from app.services.xp_service import XPService
 
 
 _xp_service = XPService()
+_user_import_service = UserImportService()
+
+_IMPORT_FORMATS_BY_SUFFIX = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+}
 
 
-def get_current_user_xp(session: Session, current_user: User) -> UserXPResponse:
+def get_current_user_xp(session: Session, current_user: Principal) -> UserXPResponse:
     try:
         total_xp = _xp_service.get_total_xp_for_user(session=session, user_id=current_user.id)
     except Exception:
@@ -21,3 +37,77 @@ def get_current_user_xp(session: Session, current_user: User) -> UserXPResponse:
         ) from None
 
     return UserXPResponse(total_xp=total_xp)
+
+
+def get_current_user_xp_timeline(session: Session, current_user: Principal, granularity: str) -> UserXPTimelineResponse:
+    try:
+        timeline = _xp_service.get_timeline_for_user(
+            session=session,
+            user_id=current_user.id,
+            granularity=granularity,
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid timeline granularity.",
+        ) from None
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="XP retrieval failed.",
+        ) from None
+
+    return UserXPTimelineResponse(
+        granularity=granularity,
+        total_xp=timeline.total_xp,
+        points=[
+            UserXPTimelinePointResponse(
+                timestamp=point.timestamp,
+                xp_awarded=point.xp_awarded,
+                cumulative_xp=point.cumulative_xp,
+                challenge_id=point.challenge_id,
+            )
+            for point in timeline.points
+        ],
+    )
+
+
+def import_users(session: Session, upload: UploadFile, import_format: str | None) -> UserImportResponse:
+    resolved_format = import_format or _IMPORT_FORMATS_BY_SUFFIX.get(PurePath(upload.filename or "").suffix.lower())
+    if resolved_format not in SUPPORTED_IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unsupported import format.",
+        )
+
+    try:
+        report = _user_import_service.import_users(session, iter_user_import_rows(upload.file, resolved_format))
+        session.commit()
+    except ValueError as exc:
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(exc),
+        ) from None
+    except Exception:
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="User import failed.",
+        ) from None
+
+    return UserImportResponse(
+        created=report.created,
+        skipped=report.skipped,
+        failed=report.failed,
+        truncated=report.truncated,
+        rows=[
+            UserImportRowResponse(
+                line_number=row.line_number,
+                email=row.email,
+                status=row.status,
+                detail=row.detail,
+            )
+            for row in report.rows
+        ],
+    )
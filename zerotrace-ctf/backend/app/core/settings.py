@@ -26,9 +26,22 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=60, gt=0)
+    JWT_DECODE_CACHE_SIZE: int = Field(default=4096, ge=0, le=1000000)
+    PASSWORD_HASH_ROUNDS: int = Field(default=12, ge=4, le=31)
+    FLAG_HASH_ROUNDS: int = Field(default=12, ge=4, le=31)
     XP_FIRST_BLOOD_ENABLED: bool = True
     XP_FIRST_BLOOD_BONUS_MODE: Literal["fixed", "percent"] = "percent"
     XP_FIRST_BLOOD_BONUS_VALUE: int = Field(default=20, ge=0)
+    AUTH_ROLE_CLAIMS_ENABLED: bool = True
+    AUTH_SECURITY_VERSION_BACKEND: Literal["memory", "redis"] = "memory"
+    AUTH_SECURITY_VERSION_REDIS_URL: str = "redis://localhost:6379/0"
+    AUTH_SECURITY_VERSION_REDIS_KEY_PREFIX: str = "zerotrace:security_version"
+    AUTH_SECURITY_VERSION_CACHE_SECONDS: float = Field(default=1.0, ge=0, le=60)
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: float = Field(default=5.0, ge=0, le=300)
+    AUTH_PRINCIPAL_CACHE_MAX_ENTRIES: int = Field(default=10000, ge=0, le=1000000)
+    USER_IMPORT_MAX_ROWS: int = Field(default=5000, ge=1, le=100000)
+    USER_IMPORT_BATCH_SIZE: int = Field(default=500, ge=1, le=5000)
+    USER_IMPORT_HASH_WORKERS: int = Field(default=0, ge=0, le=64)
     AUTH_RATE_LIMIT_ENABLED: bool = True
     AUTH_RATE_LIMIT_MAX_ATTEMPTS: int = 20
     AUTH_RATE_LIMIT_WINDOW_SECONDS: int = 60
@@ -45,6 +58,40 @@ class Settings(BaseSettings):
     LAB_COMMAND_RATE_LIMIT_MAX_ATTEMPTS: int = 30
     LAB_COMMAND_RATE_LIMIT_WINDOW_SECONDS: int = 60
     LAB_COMMAND_RATE_LIMIT_LOCK_SECONDS: int = 30
+    LAB_WS_MAX_CONNECTIONS: int = Field(default=256, ge=1, le=100000)
+    LAB_WS_IDLE_TIMEOUT_SECONDS: float = Field(default=300.0, gt=0, le=86400)
+    LAB_WS_AUTH_TIMEOUT_SECONDS: float = Field(default=10.0, gt=0, le=300)
+    LAB_BATCH_MAX_OUTPUT_BYTES: int = Field(default=65536, ge=1024, le=4194304)
+    LAB_COMMAND_MAX_NODES: int = Field(default=200000, ge=100, le=100000000)
+    LAB_COMMAND_MAX_BYTES_SCANNED: int = Field(default=67108864, ge=1024, le=4294967296)
+    LAB_COMMAND_MAX_SECONDS: float = Field(default=2.0, gt=0, le=60)
+    LAB_RESULT_CACHE_MAX_BYTES: int = Field(default=33554432, ge=0, le=4294967296)
+    LAB_RESULT_CACHE_MAX_ENTRY_BYTES: int = Field(default=262144, ge=1024, le=67108864)
+    LAB_GENERATED_CONTENT_CACHE_MAX_BYTES: int = Field(default=67108864, ge=0, le=4294967296)
+    LAB_OUTPUT_PAGE_MAX_BYTES: int = Field(default=65536, ge=1024, le=4194304)
+    LAB_OUTPUT_PAGE_MAX_LINES: int = Field(default=2000, ge=1, le=100000)
+    LAB_OUTPUT_CURSOR_TTL_SECONDS: int = Field(default=300, ge=1, le=86400)
+    LAB_OUTPUT_MAX_CURSORS: int = Field(default=1000, ge=1, le=100000)
+    LAB_RESIDENT_CACHE_SIZE: int = Field(default=64, ge=1, le=100000)
+    LAB_SNAPSHOT_FILE: str = ""
+    LAB_RELOAD_WATCH_ENABLED: bool = False
+    LAB_RELOAD_WATCH_INTERVAL_SECONDS: float = Field(default=2.0, gt=0, le=300)
+    LAB_RELOAD_WATCH_DEBOUNCE_SECONDS: float = Field(default=1.0, ge=0, le=60)
+    LAB_SESSION_BACKEND: Literal["memory", "redis"] = "memory"
+    LAB_SESSION_REDIS_URL: str = "redis://localhost:6379/0"
+    LAB_SESSION_REDIS_KEY_PREFIX: str = "zerotrace:lab_session"
+    LAB_SESSION_IDLE_TTL_SECONDS: int = Field(default=1800, ge=1, le=86400)
+    LAB_SESSION_MAX_SESSIONS: int = Field(default=10000, ge=1, le=1000000)
+    LAB_SESSION_HISTORY_LIMIT: int = Field(default=100, ge=1, le=1000)
+    SCOREBOARD_STREAM_QUEUE_SIZE: int = Field(default=64, ge=1, le=10000)
+    SCOREBOARD_STREAM_HEARTBEAT_SECONDS: float = Field(default=15.0, gt=0, le=300)
+    SCOREBOARD_EVENT_BRIDGE: Literal["local", "redis"] = "local"
+    SCOREBOARD_EVENT_REDIS_URL: str = "redis://localhost:6379/0"
+    SCOREBOARD_EVENT_REDIS_CHANNEL: str = "zerotrace:scoreboard"
+    XP_CACHE_MAX_USERS: int = Field(default=10000, ge=0, le=1000000)
+    XP_CACHE_TTL_SECONDS: float = Field(default=30.0, ge=0, le=3600)
+    LEADERBOARD_SNAPSHOT_ENABLED: bool = False
+    LEADERBOARD_SNAPSHOT_INTERVAL_SECONDS: int = Field(default=300, ge=10, le=86400)
     SEED_SYNC_WATCH_ENABLED: bool = False
     SEED_SYNC_WATCH_INTERVAL_SECONDS: float = Field(default=2.0, gt=0, le=300)
     SEED_SYNC_WATCH_DEBOUNCE_SECONDS: float = Field(default=1.0, ge=0, le=60)
@@ -1,13 +1,19 @@
 from __future__ import annotations
 
+from time import time
 from uuid import UUID
 
 from fastapi import Depends, Header, HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.core.settings import get_settings
 from app.dependencies.db import get_db
 from app.models.user import User
+from app.observability.metrics import metrics
 from app.repositories import user_repository
+from app.schemas.token import TokenPayload
+from app.security.principal_cache import Principal, principal_cache
+from app.security.security_version import security_versions
 from app.services.auth_service import AuthService
 from app.services.exceptions import ExpiredAuthTokenError, TokenValidationError
 
@@ -15,10 +21,10 @@ from app.services.exceptions import ExpiredAuthTokenError, TokenValidationError
 _auth_service = AuthService()
 
 
-def get_current_user(
+def get_current_principal(
     session: Session = Depends(get_db),
     authorization: str | None = Header(default=None, alias="Authorization"),
-) -> User:
+) -> Principal:
     if not authorization:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -40,15 +46,50 @@ def get_current_user(
             detail="Invalid authentication credentials.",
         ) from None
 
-    try:
-        user_id = UUID(payload.sub)
-    except (TypeError, ValueError):
+    principal = _principal_from_claims(payload)
+    if principal is not None:
+        metrics.increment("zerotrace_auth_principal_cache_total", labels={"outcome": "claims"})
+        return principal
+
+    principal = principal_cache.get(payload.sub, payload.iat)
+    if principal is not None:
+        metrics.increment("zerotrace_auth_principal_cache_total", labels={"outcome": "hit"})
+    else:
+        metrics.increment("zerotrace_auth_principal_cache_total", labels={"outcome": "miss"})
+        try:
+            user_id = UUID(payload.sub)
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid authentication credentials.",
+            ) from None
+
+        user = user_repository.get_by_id(session, user_id)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid authentication credentials.",
+            )
+
+        principal = Principal.from_user(user)
+        principal_cache.put(payload.sub, payload.iat, principal)
+
+    if not principal.is_active:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials.",
-        ) from None
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied.",
+        )
+
+    return principal
 
-    user = user_repository.get_by_id(session, user_id)
+
+def get_current_user(
+    session: Session = Depends(get_db),
+    principal: Principal = Depends(get_current_principal),
+) -> User:
+    """Load the full user row for handlers that need ORM state; prefer get_current_principal otherwise."""
+    # session.get() reuses the row already loaded on a principal cache miss.
+    user = session.get(User, principal.id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -62,3 +103,26 @@ def get_current_user(
         )
 
     return user
+
+
+def _principal_from_claims(payload: TokenPayload) -> Principal | None:
+    """Trust signed role claims while the token's security version is still current."""
+    settings = get_settings()
+    if payload.sv is None or not settings.AUTH_ROLE_CLAIMS_ENABLED:
+        return None
+    if not security_versions.is_shared() and time() - payload.iat > settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS:
+        # Per-process counters never see bumps made by other workers or scripts, so claims are trusted
+        # no longer than a cached principal may be stale.
+        return None
+
+    try:
+        user_id = UUID(payload.sub)
+    except (TypeError, ValueError):
+        return None
+
+    # A bump that could not be stored leaves the old version current, so it is checked first.
+    if security_versions.claims_disabled(user_id) or security_versions.current(user_id) != payload.sv:
+        return None
+
+    # Deactivation bumps the version, so a matching version implies the user is still active.
+    return Principal(id=user_id, is_active=True, role_names=frozenset(role for role in payload.roles if role))
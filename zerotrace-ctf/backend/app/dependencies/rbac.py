@@ -4,15 +4,15 @@ from collections.abc import Callable, Iterable
 
 from fastapi import Depends, HTTPException, status
 
-from app.dependencies.auth import get_current_user
-from app.models.user import User
+from app.dependencies.auth import get_current_principal
+from app.security.principal_cache import Principal
 
 
-def require_roles(required_roles: list[str]) -> Callable[..., User]:
+def require_roles(required_roles: list[str]) -> Callable[..., Principal]:
     allowed_roles = tuple(required_roles)
 
-    def _role_guard(current_user: User = Depends(get_current_user)) -> User:
-        user_roles = {role.name for role in current_user.roles if role.name}
+    def _role_guard(current_user: Principal = Depends(get_current_principal)) -> Principal:
+        user_roles = current_user.role_names
 
         if not user_roles:
             raise HTTPException(
@@ -31,7 +31,7 @@ def require_roles(required_roles: list[str]) -> Callable[..., User]:
     return _role_guard
 
 
-def _has_any_required_role(user_roles: set[str], required_roles: Iterable[str]) -> bool:
+def _has_any_required_role(user_roles: frozenset[str], required_roles: Iterable[str]) -> bool:
     return any(role_name in user_roles for role_name in required_roles)
 
 
@@ -41,10 +41,10 @@ require_admin = require_roles(["admin"])
 # Example usage:
 # from fastapi import APIRouter, Depends
 # from app.dependencies.rbac import require_admin
-# from app.models.user import User
+# from app.security.principal_cache import Principal
 #
 # router = APIRouter()
 #
 # @router.post("/admin/example")
-# async def admin_action(current_user: User = Depends(require_admin)) -> dict[str, str]:
+# async def admin_action(current_user: Principal = Depends(require_admin)) -> dict[str, str]:
 #     return {"status": "ok"}
@@ -3,10 +3,14 @@ from app.models.challenge import Challenge, ChallengeDifficulty
 from app.models.challenge_attempt import ChallengeAttempt
 from app.models.challenge_flag import ChallengeFlag
 from app.models.challenge_solve import ChallengeSolve
+from app.models.leaderboard_snapshot import LeaderboardSnapshot
+from app.models.leaderboard_latest_position import LeaderboardLatestPosition
+from app.models.leaderboard_user_position import LeaderboardUserPosition
 from app.models.role import Role
 from app.models.submission_rate_limit import SubmissionRateLimit
 from app.models.track import Track
 from app.models.user import User
+from app.models.user_daily_xp import UserDailyXp
 from app.models.user_role import UserRole
 
 __all__ = [
@@ -19,9 +23,13 @@ __all__ = [
     "ChallengeAttempt",
     "ChallengeFlag",
     "ChallengeSolve",
+    "LeaderboardSnapshot",
+    "LeaderboardLatestPosition",
+    "LeaderboardUserPosition",
     "Role",
     "SubmissionRateLimit",
     "Track",
     "User",
+    "UserDailyXp",
     "UserRole",
 ]
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, Index, Integer, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, UUIDPrimaryKeyMixin
+
+
+class LeaderboardSnapshot(UUIDPrimaryKeyMixin, Base):
+    __tablename__ = "leaderboard_snapshots"
+    __table_args__ = (
+        Index(None, "captured_at"),
+    )
+
+    captured_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP"),
+    )
+    entry_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    # SHA-256 of the whole ranked board, so an unchanged board is detected without storing it.
+    board_digest: Mapped[str] = mapped_column(String(64), nullable=False)
+    # Parallel arrays for the leading ranks only: top_user_ids[i] holds rank i + 1 with top_total_xp[i].
+    top_user_ids: Mapped[list[str]] = mapped_column(JSON, nullable=False)
+    top_total_xp: Mapped[list[int]] = mapped_column(JSON, nullable=False)
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy import (
+    CheckConstraint,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, UUIDPrimaryKeyMixin
+
+
+class UserDailyXp(UUIDPrimaryKeyMixin, Base):
+    """XP a user earned in one track on one UTC day, maintained as solves are awarded."""
+
+    __tablename__ = "user_daily_xp"
+    __table_args__ = (
+        CheckConstraint("xp > 0", name="ck_user_daily_xp_xp_positive"),
+        UniqueConstraint("user_id", "track_id", "day"),
+        Index("ix_user_daily_xp_day_track_id", "day", "track_id"),
+    )
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    track_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("tracks.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    xp: Mapped[int] = mapped_column(Integer, nullable=False)
+    solve_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    first_solve_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
 from uuid import UUID
 
 from sqlalchemy import select
@@ -11,6 +12,7 @@ from app.models.challenge_flag import ChallengeFlag
 from app.models.challenge_solve import ChallengeSolve
 from app.models.track import Track
 from app.models.user import User
+from app.models.user_daily_xp import UserDailyXp
 
 REDACTED_SUBMITTED_FLAG = "[REDACTED]"
 
@@ -120,6 +122,7 @@ def create_challenge_solve(
     challenge: Challenge,
     points_awarded: int,
     is_first_blood: bool,
+    created_at: datetime | None = None,
 ) -> ChallengeSolve:
     solve = ChallengeSolve(
         user=user,
@@ -127,10 +130,46 @@ def create_challenge_solve(
         points_awarded=points_awarded,
         is_first_blood=is_first_blood,
     )
+    if created_at is not None:
+        solve.created_at = created_at
     session.add(solve)
     return solve
 
 
+def add_daily_xp(
+    session: Session,
+    user_id: UUID,
+    track_id: UUID,
+    points_awarded: int,
+    awarded_at: datetime,
+) -> UserDailyXp:
+    # Callers hold the per-user submission lock, so read-then-update cannot race for the same user.
+    awarded_at_utc = awarded_at.astimezone(timezone.utc)
+    day = awarded_at_utc.date()
+    bucket = session.execute(
+        select(UserDailyXp).where(
+            UserDailyXp.user_id == user_id,
+            UserDailyXp.track_id == track_id,
+            UserDailyXp.day == day,
+        )
+    ).scalar_one_or_none()
+    if bucket is None:
+        bucket = UserDailyXp(
+            user_id=user_id,
+            track_id=track_id,
+            day=day,
+            xp=points_awarded,
+            solve_count=1,
+            first_solve_at=awarded_at_utc,
+        )
+        session.add(bucket)
+        return bucket
+
+    bucket.xp += points_awarded
+    bucket.solve_count += 1
+    return bucket
+
+
 def get_solve_by_user_and_challenge(
     session: Session,
     user_id: UUID,
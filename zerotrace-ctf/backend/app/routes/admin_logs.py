@@ -6,8 +6,8 @@ from sqlalchemy.orm import Session
 from app.controllers import admin_log_controller
 from app.dependencies.db import get_db
 from app.dependencies.rbac import require_admin
-from app.models.user import User
 from app.schemas.admin_log import AdminLogListResponse
+from app.security.principal_cache import Principal
 
 
 router = APIRouter(tags=["admin"])
@@ -18,6 +18,6 @@ def get_admin_logs(
     limit: int = 50,
     offset: int = 0,
     session: Session = Depends(get_db),
-    _: User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ) -> AdminLogListResponse:
     return admin_log_controller.get_admin_logs(session=session, limit=limit, offset=offset)
@@ -2,18 +2,21 @@ from __future__ import annotations
 
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, WebSocket
 from sqlalchemy.orm import Session
 
 from app.controllers import challenge_controller
-from app.dependencies.auth import get_current_user
+from app.dependencies.auth import get_current_principal, get_current_user
 from app.dependencies.db import get_db
 from app.dependencies.rbac import require_admin
 from app.models.user import User
 from app.schemas.challenge import (
     ChallengeActionMessageResponse,
+    ChallengeLabBatchRequest,
+    ChallengeLabBatchResponse,
     ChallengeLabCommandRequest,
     ChallengeLabCommandResponse,
+    ChallengeLabOutputRequest,
     ChallengeCreateResponse,
     ChallengeDetailResponse,
     ChallengeSummaryResponse,
@@ -22,6 +25,7 @@ from app.schemas.challenge import (
     SubmitFlagRequest,
     SubmitFlagResponse,
 )
+from app.security.principal_cache import Principal
 
 
 router = APIRouter(tags=["challenges"])
@@ -31,7 +35,7 @@ router = APIRouter(tags=["challenges"])
 def create_admin_challenge(
     payload: CreateChallengeRequest,
     session: Session = Depends(get_db),
-    _: User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ) -> ChallengeCreateResponse:
     return challenge_controller.create_challenge(session, payload)
 
@@ -41,7 +45,7 @@ def set_admin_challenge_flag(
     challenge_id: UUID,
     payload: SetFlagRequest,
     session: Session = Depends(get_db),
-    _: User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ) -> ChallengeActionMessageResponse:
     return challenge_controller.set_flag(
         session=session,
@@ -54,7 +58,7 @@ def set_admin_challenge_flag(
 def publish_admin_challenge(
     challenge_id: UUID,
     session: Session = Depends(get_db),
-    _: User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ) -> ChallengeActionMessageResponse:
     return challenge_controller.publish_challenge(session=session, challenge_id=challenge_id)
 
@@ -63,7 +67,7 @@ def publish_admin_challenge(
 def unpublish_admin_challenge(
     challenge_id: UUID,
     session: Session = Depends(get_db),
-    _: User = Depends(require_admin),
+    _: Principal = Depends(require_admin),
 ) -> ChallengeActionMessageResponse:
     return challenge_controller.unpublish_challenge(session=session, challenge_id=challenge_id)
 
@@ -72,7 +76,7 @@ def unpublish_admin_challenge(
 def list_track_challenges(
     track_slug: str,
     session: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ) -> list[ChallengeSummaryResponse]:
     return challenge_controller.list_track_challenges(session=session, track_slug=track_slug)
 
@@ -114,3 +118,42 @@ def execute_challenge_lab_command(
         slug=slug,
         payload=payload,
     )
+
+
+@router.post("/challenges/{slug}/lab/output", response_model=ChallengeLabCommandResponse)
+def fetch_challenge_lab_output(
+    slug: str,
+    payload: ChallengeLabOutputRequest,
+    session: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> ChallengeLabCommandResponse:
+    return challenge_controller.fetch_lab_output(
+        session=session,
+        current_user=current_user,
+        slug=slug,
+        payload=payload,
+    )
+
+
+@router.post("/challenges/{slug}/lab/batch", response_model=ChallengeLabBatchResponse)
+def execute_challenge_lab_batch(
+    slug: str,
+    payload: ChallengeLabBatchRequest,
+    session: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> ChallengeLabBatchResponse:
+    return challenge_controller.execute_lab_batch(
+        session=session,
+        current_user=current_user,
+        slug=slug,
+        payload=payload,
+    )
+
+
+@router.websocket("/challenges/{slug}/lab/ws")
+async def challenge_lab_terminal(
+    websocket: WebSocket,
+    slug: str,
+    session: Session = Depends(get_db),
+) -> None:
+    await challenge_controller.run_lab_terminal(websocket, session=session, slug=slug)
@@ -1,15 +1,18 @@
 from __future__ import annotations
 
+from datetime import date, datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.controllers import leaderboard_controller
-from app.dependencies.auth import get_current_user
+from app.dependencies.auth import get_current_principal
 from app.dependencies.db import get_db
-from app.models.user import User
-from app.schemas.leaderboard import LeaderboardListResponse
+from app.dependencies.rbac import require_admin
+from app.schemas.leaderboard import LeaderboardHistoryResponse, LeaderboardListResponse
+from app.security.principal_cache import Principal
 
 
 router = APIRouter(tags=["leaderboard"])
@@ -19,28 +22,79 @@ router = APIRouter(tags=["leaderboard"])
 def get_global_leaderboard(
     limit: int = 50,
     offset: int = 0,
+    start_day: date | None = None,
+    end_day: date | None = None,
     session: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ) -> LeaderboardListResponse:
     return leaderboard_controller.get_global_leaderboard(
         session=session,
         limit=limit,
         offset=offset,
+        start_day=start_day,
+        end_day=end_day,
     )
 
 
+@router.get("/leaderboard/history", response_model=LeaderboardHistoryResponse)
+def get_leaderboard_history(
+    at: datetime | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    top: int = 10,
+    max_points: int = 100,
+    user_id: UUID | None = None,
+    session: Session = Depends(get_db),
+    _: Principal = Depends(get_current_principal),
+) -> LeaderboardHistoryResponse:
+    return leaderboard_controller.get_leaderboard_history(
+        session=session,
+        at=at,
+        start=start,
+        end=end,
+        top=top,
+        max_points=max_points,
+        user_id=user_id,
+    )
+
+
+@router.get("/leaderboard/stream", response_class=StreamingResponse)
+def stream_leaderboard_events(
+    session: Session = Depends(get_db),
+    _: Principal = Depends(get_current_principal),
+) -> StreamingResponse:
+    return leaderboard_controller.stream_scoreboard_events(session=session)
+
+
 @router.get("/tracks/{track_id}/leaderboard", response_model=LeaderboardListResponse)
 def get_track_leaderboard(
     track_id: UUID,
     limit: int = 50,
     offset: int = 0,
+    start_day: date | None = None,
+    end_day: date | None = None,
     session: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ) -> LeaderboardListResponse:
     return leaderboard_controller.get_track_leaderboard(
         session=session,
         track_id=track_id,
         limit=limit,
         offset=offset,
+        start_day=start_day,
+        end_day=end_day,
     )
 
+
+@router.get("/admin/leaderboard/export", response_class=StreamingResponse, tags=["admin"])
+def export_leaderboard(
+    export_format: str = Query(default="ndjson", alias="format"),
+    track_id: UUID | None = None,
+    session: Session = Depends(get_db),
+    _: Principal = Depends(require_admin),
+) -> StreamingResponse:
+    return leaderboard_controller.export_leaderboard(
+        session=session,
+        export_format=export_format,
+        track_id=track_id,
+    )
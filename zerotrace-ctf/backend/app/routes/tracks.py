@@ -4,10 +4,10 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from app.controllers import track_controller
-from app.dependencies.auth import get_current_user
+from app.dependencies.auth import get_current_principal
 from app.dependencies.db import get_db
-from app.models.user import User
 from app.schemas.track import TrackSummaryResponse
+from app.security.principal_cache import Principal
 
 
 router = APIRouter(tags=["tracks"])
@@ -16,6 +16,6 @@ router = APIRouter(tags=["tracks"])
 @router.get("/tracks", response_model=list[TrackSummaryResponse])
 def list_tracks(
     session: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    _: Principal = Depends(get_current_principal),
 ) -> list[TrackSummaryResponse]:
     return track_controller.list_tracks(session=session)
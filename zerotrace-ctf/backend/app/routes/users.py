@@ -1,13 +1,14 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, File, Query, UploadFile
 from sqlalchemy.orm import Session
 
 from app.controllers import user_controller
-from app.dependencies.auth import get_current_user
+from app.dependencies.auth import get_current_principal
 from app.dependencies.db import get_db
-from app.models.user import User
-from app.schemas.user import UserXPResponse
+from app.dependencies.rbac import require_admin
+from app.schemas.user import UserImportResponse, UserXPResponse, UserXPTimelineResponse
+from app.security.principal_cache import Principal
 
 
 router = APIRouter(tags=["users"])
@@ -16,6 +17,29 @@ router = APIRouter(tags=["users"])
 @router.get("/users/me/xp", response_model=UserXPResponse)
 def get_me_xp(
     session: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ) -> UserXPResponse:
     return user_controller.get_current_user_xp(session=session, current_user=current_user)
+
+
+@router.get("/users/me/xp/timeline", response_model=UserXPTimelineResponse)
+def get_me_xp_timeline(
+    granularity: str = "solve",
+    session: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+) -> UserXPTimelineResponse:
+    return user_controller.get_current_user_xp_timeline(
+        session=session,
+        current_user=current_user,
+        granularity=granularity,
+    )
+
+
+@router.post("/admin/users/import", response_model=UserImportResponse, tags=["admin"])
+def import_users(
+    file: UploadFile = File(...),
+    import_format: str | None = Query(default=None, alias="format"),
+    session: Session = Depends(get_db),
+    _: Principal = Depends(require_admin),
+) -> UserImportResponse:
+    return user_controller.import_users(session=session, upload=file, import_format=import_format)
@@ -8,6 +8,9 @@ from pydantic import BaseModel, ConfigDict, Field, field_validator
 from app.models.challenge import ChallengeDifficulty
 
 
+LAB_BATCH_MAX_COMMANDS = 20
+
+
 class CreateChallengeRequest(BaseModel):
     track_id: UUID
     title: str = Field(min_length=1, max_length=150)
@@ -49,6 +52,37 @@ class ChallengeLabCommandRequest(BaseModel):
         return value.strip()
 
 
+class ChallengeLabBatchRequest(BaseModel):
+    commands: list[str] = Field(min_length=1, max_length=LAB_BATCH_MAX_COMMANDS)
+    cwd: str = Field(default="/", min_length=1, max_length=256)
+
+    model_config = ConfigDict(extra="forbid")
+
+    @field_validator("commands")
+    @classmethod
+    def strip_commands(cls, value: list[str]) -> list[str]:
+        commands = [command.strip() for command in value]
+        if any(not command or len(command) > 256 for command in commands):
+            raise ValueError("Each command must be between 1 and 256 characters.")
+        return commands
+
+    @field_validator("cwd")
+    @classmethod
+    def strip_cwd(cls, value: str) -> str:
+        return value.strip()
+
+
+class ChallengeLabOutputRequest(BaseModel):
+    cursor: str = Field(min_length=1, max_length=128)
+
+    model_config = ConfigDict(extra="forbid")
+
+    @field_validator("cursor")
+    @classmethod
+    def strip_cursor(cls, value: str) -> str:
+        return value.strip()
+
+
 class ChallengeCreateResponse(BaseModel):
     id: UUID
     slug: str
@@ -103,6 +137,16 @@ class ChallengeLabCommandResponse(BaseModel):
     output: str
     cwd: str
     exit_code: int
+    truncated: bool = False
+    next_cursor: str | None = None
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class ChallengeLabBatchResponse(BaseModel):
+    results: list[ChallengeLabCommandResponse]
+    cwd: str
+    truncated: bool
 
     model_config = ConfigDict(extra="forbid")
 
@@ -22,3 +22,25 @@ class LeaderboardListResponse(BaseModel):
 
     model_config = ConfigDict(extra="forbid")
 
+
+class LeaderboardHistoryEntryResponse(BaseModel):
+    user_id: UUID
+    total_xp: int = Field(ge=0)
+    rank: int = Field(ge=1)
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class LeaderboardHistoryPointResponse(BaseModel):
+    captured_at: datetime
+    entry_count: int = Field(ge=0)
+    results: list[LeaderboardHistoryEntryResponse]
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class LeaderboardHistoryResponse(BaseModel):
+    points: list[LeaderboardHistoryPointResponse]
+    top: int = Field(ge=1)
+
+    model_config = ConfigDict(extra="forbid")
@@ -8,8 +8,10 @@ class TokenPayload(BaseModel):
     roles: list[str]
     exp: int
     iat: int
+    sv: str | None = None
 
-    model_config = ConfigDict(extra="forbid")
+    # Frozen because validated payloads are shared through the decoded-token cache.
+    model_config = ConfigDict(extra="forbid", frozen=True)
 
 
 class AccessTokenResponse(BaseModel):
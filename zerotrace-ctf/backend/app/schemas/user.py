@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+from datetime import datetime
+from typing import Literal
+from uuid import UUID
+
 from pydantic import BaseModel, ConfigDict, Field
 
 
@@ -7,3 +11,39 @@ class UserXPResponse(BaseModel):
     total_xp: int = Field(ge=0)
 
     model_config = ConfigDict(extra="forbid")
+
+
+class UserXPTimelinePointResponse(BaseModel):
+    timestamp: datetime
+    xp_awarded: int = Field(ge=0)
+    cumulative_xp: int = Field(ge=0)
+    challenge_id: UUID | None = None
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class UserXPTimelineResponse(BaseModel):
+    granularity: Literal["solve", "day"]
+    total_xp: int = Field(ge=0)
+    points: list[UserXPTimelinePointResponse]
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class UserImportRowResponse(BaseModel):
+    line_number: int = Field(ge=1)
+    email: str
+    status: Literal["created", "skipped", "failed"]
+    detail: str | None = None
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class UserImportResponse(BaseModel):
+    created: int = Field(ge=0)
+    skipped: int = Field(ge=0)
+    failed: int = Field(ge=0)
+    truncated: bool
+    rows: list[UserImportRowResponse]
+
+    model_config = ConfigDict(extra="forbid")
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
+from hashlib import sha256
+from threading import Lock
+from time import time
 from typing import Any
 
 from jose import ExpiredSignatureError, JWTError, jwt as jose_jwt
 from pydantic import ValidationError
 
 from app.core.settings import get_settings
+from app.observability.metrics import metrics
 from app.schemas.token import TokenPayload
 from app.security.exceptions import ExpiredTokenError, InvalidTokenError, TokenDecodeError
 
@@ -14,6 +19,60 @@ from app.security.exceptions import ExpiredTokenError, InvalidTokenError, TokenD
 _DISALLOWED_CLAIMS = {"email", "password_hash"}
 
 
+class DecodedTokenCache:
+    """Bounded LRU of validated payloads keyed by a SHA-256 digest of the raw token.
+
+    Entries never outlive the token's ``exp`` and the whole cache is dropped as
+    soon as the signing key or algorithm changes, so a hit is only ever served
+    for a token the current key would still accept.
+    """
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[bytes, TokenPayload] = OrderedDict()
+        self._key_fingerprint: bytes | None = None
+        self._lock = Lock()
+
+    def get(self, token: str, key_fingerprint: bytes) -> TokenPayload | None:
+        digest = sha256(token.encode("utf-8")).digest()
+        with self._lock:
+            if key_fingerprint != self._key_fingerprint:
+                self._entries.clear()
+                self._key_fingerprint = key_fingerprint
+                return None
+            payload = self._entries.get(digest)
+            if payload is None:
+                return None
+            if payload.exp <= time():
+                del self._entries[digest]
+                return None
+            self._entries.move_to_end(digest)
+            return payload
+
+    def put(self, token: str, key_fingerprint: bytes, payload: TokenPayload, max_entries: int) -> None:
+        if max_entries <= 0:
+            return
+        digest = sha256(token.encode("utf-8")).digest()
+        with self._lock:
+            if key_fingerprint != self._key_fingerprint:
+                self._entries.clear()
+                self._key_fingerprint = key_fingerprint
+            self._entries[digest] = payload
+            self._entries.move_to_end(digest)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+decoded_token_cache = DecodedTokenCache()
+
+
 def create_access_token(data: dict[str, Any], expires_delta: timedelta | None = None) -> str:
     if any(claim in data for claim in _DISALLOWED_CLAIMS):
         raise InvalidTokenError("Sensitive fields are not allowed in token payload.")
@@ -32,13 +91,19 @@ def create_access_token(data: dict[str, Any], expires_delta: timedelta | None =
         raise InvalidTokenError("Token payload is invalid.") from None
 
     try:
-        return jose_jwt.encode(validated.model_dump(), settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+        return jose_jwt.encode(validated.model_dump(exclude_none=True), settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     except JWTError:
         raise InvalidTokenError("Access token creation failed.") from None
 
 
 def decode_access_token(token: str) -> TokenPayload:
     settings = get_settings()
+    key_fingerprint = _key_fingerprint(settings.SECRET_KEY, settings.ALGORITHM)
+    cached = decoded_token_cache.get(token, key_fingerprint)
+    if cached is not None:
+        metrics.increment("zerotrace_jwt_decode_cache_total", labels={"outcome": "hit"})
+        return cached
+    metrics.increment("zerotrace_jwt_decode_cache_total", labels={"outcome": "miss"})
 
     try:
         payload = jose_jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
@@ -48,6 +113,14 @@ def decode_access_token(token: str) -> TokenPayload:
         raise TokenDecodeError("Access token is invalid.") from None
 
     try:
-        return TokenPayload.model_validate(payload)
+        validated = TokenPayload.model_validate(payload)
     except ValidationError:
         raise TokenDecodeError("Access token payload is invalid.") from None
+
+    # Only successfully verified tokens are cached; failures always take the full path.
+    decoded_token_cache.put(token, key_fingerprint, validated, settings.JWT_DECODE_CACHE_SIZE)
+    return validated
+
+
+def _key_fingerprint(secret_key: str, algorithm: str) -> bytes:
+    return sha256(f"{algorithm}\0{secret_key}".encode("utf-8")).digest()
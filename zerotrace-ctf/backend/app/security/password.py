@@ -1,22 +1,109 @@
 from __future__ import annotations
 
+from collections.abc import Callable
+from functools import lru_cache
+from statistics import median
+from time import perf_counter
+
 from passlib.context import CryptContext
 
+from app.core.settings import get_settings
 from app.security.exceptions import PasswordHashError
 
 
-_pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_CALIBRATION_SAMPLE_SECRET = "calibration-sample-password"
+
+
+@lru_cache(maxsize=8)
+def build_bcrypt_context(rounds: int) -> CryptContext:
+    """Return a bcrypt context whose policy is exactly ``rounds``.
+
+    Pinning min and max rounds to the configured cost makes ``needs_update``
+    report hashes created under any other cost, in either direction.
+    """
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+def _pwd_context() -> CryptContext:
+    return build_bcrypt_context(get_settings().PASSWORD_HASH_ROUNDS)
 
 
 def hash_password(plain_password: str) -> str:
     try:
-        return _pwd_context.hash(plain_password)
+        return _pwd_context().hash(plain_password)
     except Exception:
         raise PasswordHashError("Password hashing failed.") from None
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     try:
-        return _pwd_context.verify(plain_password, hashed_password)
+        return _pwd_context().verify(plain_password, hashed_password)
     except Exception:
         return False
+
+
+def hash_password_with_rounds(plain_password: str, rounds: int) -> str | None:
+    """Hash under an explicit cost, returning None if the backend rejects the password.
+
+    Takes the cost as an argument so process-pool workers never need to load settings.
+    """
+    try:
+        return build_bcrypt_context(rounds).hash(plain_password)
+    except Exception:
+        return None
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verify a password and, when the stored hash is off-policy, return its replacement."""
+    try:
+        return _pwd_context().verify_and_update(plain_password, hashed_password)
+    except Exception:
+        return False, None
+
+
+def measure_bcrypt_seconds(rounds: int, samples: int = 3) -> float:
+    context = build_bcrypt_context(rounds)
+    timings: list[float] = []
+    for _ in range(max(1, samples)):
+        started = perf_counter()
+        context.hash(_CALIBRATION_SAMPLE_SECRET)
+        timings.append(perf_counter() - started)
+    return median(timings)
+
+
+def calibrate_bcrypt_rounds(
+    target_ms: float,
+    *,
+    min_rounds: int = 10,
+    max_rounds: int = 16,
+    samples: int = 3,
+    measure: Callable[[int, int], float] = measure_bcrypt_seconds,
+) -> tuple[int, dict[int, float]]:
+    """Pick the highest bcrypt cost whose median hash time stays within ``target_ms``.
+
+    Each extra round doubles the work, so measuring stops at the first cost over
+    budget. ``min_rounds`` is returned even if it is already over budget.
+    """
+    if target_ms <= 0:
+        raise ValueError("target_ms must be positive.")
+    if not 4 <= min_rounds <= max_rounds <= 31:
+        raise ValueError("Rounds must satisfy 4 <= min_rounds <= max_rounds <= 31.")
+
+    # The first bcrypt call loads the backend; keep that out of the measurements.
+    build_bcrypt_context(4).hash(_CALIBRATION_SAMPLE_SECRET)
+
+    timings_ms: dict[int, float] = {}
+    selected = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        elapsed_ms = measure(rounds, samples) * 1000
+        timings_ms[rounds] = elapsed_ms
+        if elapsed_ms > target_ms:
+            break
+        selected = rounds
+    return selected, timings_ms
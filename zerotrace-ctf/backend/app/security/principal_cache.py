@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core.settings import get_settings
+from app.models.user import User
+from app.security.security_version import security_versions
+
+
+_PENDING_INVALIDATIONS_KEY = "zerotrace_pending_principal_invalidations"
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Immutable snapshot of the caller, detached from any database session."""
+
+    id: UUID
+    is_active: bool
+    role_names: frozenset[str]
+
+    @classmethod
+    def from_user(cls, user: User) -> Principal:
+        return cls(
+            id=user.id,
+            is_active=bool(user.is_active),
+            role_names=frozenset(role.name for role in user.roles if role.name),
+        )
+
+
+class PrincipalCache:
+    """Bounded TTL cache of principals keyed by the token's (sub, iat).
+
+    Entries are dropped, and the user's security version bumped, as soon as the
+    user's roles or active flag change through the ORM. The short TTL bounds
+    staleness for changes made by other workers or by bulk UPDATE statements
+    that bypass attribute events.
+    """
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[tuple[str, int], tuple[float, Principal]] = OrderedDict()
+        self._keys_by_user: dict[UUID, set[tuple[str, int]]] = {}
+        self._lock = Lock()
+
+    def get(self, sub: str, iat: int) -> Principal | None:
+        key = (sub, iat)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None:
+                return None
+            expires_at, principal = cached
+            if monotonic() >= expires_at:
+                self._discard(key, principal.id)
+                return None
+            self._entries.move_to_end(key)
+            return principal
+
+    def put(self, sub: str, iat: int, principal: Principal) -> None:
+        settings = get_settings()
+        ttl_seconds = settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS
+        max_entries = settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES
+        if ttl_seconds <= 0 or max_entries <= 0:
+            return
+
+        key = (sub, iat)
+        with self._lock:
+            self._entries[key] = (monotonic() + ttl_seconds, principal)
+            self._entries.move_to_end(key)
+            self._keys_by_user.setdefault(principal.id, set()).add(key)
+            while len(self._entries) > max_entries:
+                evicted_key, (_, evicted) = self._entries.popitem(last=False)
+                self._forget_key(evicted_key, evicted.id)
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        with self._lock:
+            for key in self._keys_by_user.pop(user_id, ()):
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _discard(self, key: tuple[str, int], user_id: UUID) -> None:
+        self._entries.pop(key, None)
+        self._forget_key(key, user_id)
+
+    def _forget_key(self, key: tuple[str, int], user_id: UUID) -> None:
+        keys = self._keys_by_user.get(user_id)
+        if keys is None:
+            return
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_user[user_id]
+
+
+def _invalidate_principal(user: User) -> None:
+    if user.id is None:
+        return
+    principal_cache.invalidate_user(user.id)
+    security_versions.bump(user.id)
+    # Repeat when the transaction ends so a concurrent request or login cannot
+    # capture the pre-change roles between the change and its commit.
+    session = object_session(user)
+    if session is not None:
+        session.info.setdefault(_PENDING_INVALIDATIONS_KEY, set()).add(user.id)
+
+
+@event.listens_for(User.roles, "append")
+@event.listens_for(User.roles, "remove")
+def _on_roles_changed(target: User, value, initiator) -> None:
+    _invalidate_principal(target)
+
+
+@event.listens_for(User.is_active, "set")
+def _on_active_flag_changed(target: User, value, oldvalue, initiator) -> None:
+    if value != oldvalue:
+        _invalidate_principal(target)
+
+
+@event.listens_for(User, "after_delete")
+def _on_user_deleted(mapper, connection, target: User) -> None:
+    _invalidate_principal(target)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _apply_pending_invalidations(session: Session) -> None:
+    pending = session.info.pop(_PENDING_INVALIDATIONS_KEY, None)
+    if not pending:
+        return
+    for user_id in pending:
+        principal_cache.invalidate_user(user_id)
+        security_versions.bump(user_id)
+
+
+principal_cache = PrincipalCache()
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+from threading import Lock
+from time import monotonic
+from typing import Any, Protocol
+from uuid import UUID, uuid4
+
+from app.core.settings import get_settings
+from app.observability.logger import log_event
+
+
+class SecurityVersionBackend(Protocol):
+    def current(self, user_id: str) -> str: ...
+
+    def bump(self, user_id: str) -> None: ...
+
+
+class InMemorySecurityVersionBackend:
+    """Per-process counters tagged with a random epoch.
+
+    The epoch changes on every restart, so tokens stamped by a previous process
+    (or by another worker) never match and simply take the database path. A
+    bump only reaches the process that made it, so callers must not trust a
+    match here for longer than they would trust a cached principal.
+    """
+
+    def __init__(self) -> None:
+        self._epoch = uuid4().hex[:12]
+        self._versions: dict[str, int] = {}
+        self._lock = Lock()
+
+    def current(self, user_id: str) -> str:
+        with self._lock:
+            return f"{self._epoch}.{self._versions.get(user_id, 0)}"
+
+    def bump(self, user_id: str) -> None:
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+
+class RedisSecurityVersionBackend:
+    """Random per-user nonces shared by every worker through Redis, read through a sub-second local cache.
+
+    A missing key is filled with a fresh nonce rather than read as a default,
+    so a flush or eviction can only invalidate tokens, never revalidate ones
+    issued under an earlier version.
+    """
+
+    def __init__(self, *, redis_client: Any, key_prefix: str, cache_seconds: float) -> None:
+        self._redis = redis_client
+        self._key_prefix = key_prefix.strip() or "zerotrace:security_version"
+        self._cache_seconds = cache_seconds
+        self._cache: dict[str, tuple[float, str]] = {}
+        self._lock = Lock()
+
+    def current(self, user_id: str) -> str:
+        now = monotonic()
+        with self._lock:
+            cached = self._cache.get(user_id)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        key = self._key(user_id)
+        nonce = self._redis.get(key)
+        if nonce is None:
+            # NX keeps the first writer's nonce when several workers hit the same missing key.
+            self._redis.set(key, _new_nonce(), nx=True)
+            nonce = self._redis.get(key)
+        version = f"r.{nonce}"
+        with self._lock:
+            if len(self._cache) >= 10000:
+                self._cache.clear()
+            self._cache[user_id] = (now + self._cache_seconds, version)
+        return version
+
+    def bump(self, user_id: str) -> None:
+        with self._lock:
+            self._cache.pop(user_id, None)
+        self._redis.set(self._key(user_id), _new_nonce())
+
+    def _key(self, user_id: str) -> str:
+        return f"{self._key_prefix}:{user_id}"
+
+
+class SecurityVersionRegistry:
+    """Tracks a per-user security version that is bumped on role changes and deactivation.
+
+    Tokens carry the version they were issued under; a token whose version no
+    longer matches cannot use its role claims and falls back to a database check.
+    Redis failures fail closed: while Redis is configured but unreachable no
+    version is issued, and a bump that cannot be stored disables the user's
+    claims locally until it is stored or every older token has expired.
+    """
+
+    _REDIS_RETRY_SECONDS = 5.0
+
+    def __init__(self) -> None:
+        self._memory_backend = InMemorySecurityVersionBackend()
+        self._redis_backend: RedisSecurityVersionBackend | None = None
+        self._backend_identity: tuple[str, str, str] | None = None
+        self._next_redis_attempt = 0.0
+        # user id -> monotonic deadline; claims stay disabled while a bump could not be stored.
+        self._unstored_bumps: dict[str, float] = {}
+        self._lock = Lock()
+
+    def current(self, user_id: UUID | str) -> str | None:
+        """Return the user's current version, or None when it cannot be determined reliably."""
+        key = str(user_id)
+        if self.claims_disabled(key):
+            # Tokens issued now would carry the version the failed bump meant to retire.
+            return None
+        backend = self._select_backend()
+        if backend is None:
+            return None
+        try:
+            return backend.current(key)
+        except Exception as exc:
+            log_event("security_version_lookup_failed", outcome="error", error_type=type(exc).__name__)
+            return None
+
+    def is_shared(self) -> bool:
+        """True when versions live in Redis, so a bump made by any process is seen by every other one."""
+        backend = self._select_backend()
+        return backend is not None and backend is not self._memory_backend
+
+    def bump(self, user_id: UUID | str) -> None:
+        key = str(user_id)
+        self._memory_backend.bump(key)
+        if not self._store_bump(key):
+            # Every token issued so far has expired by the deadline, stale version or not.
+            deadline = monotonic() + get_settings().ACCESS_TOKEN_EXPIRE_MINUTES * 60
+            with self._lock:
+                self._unstored_bumps[key] = deadline
+
+    def claims_disabled(self, user_id: UUID | str) -> bool:
+        """True while a bump for the user is unstored and tokens carrying the old version may still be live."""
+        key = str(user_id)
+        with self._lock:
+            deadline = self._unstored_bumps.get(key)
+        if deadline is None:
+            return False
+        if deadline <= monotonic() or self._store_bump(key):
+            with self._lock:
+                if self._unstored_bumps.get(key) == deadline:
+                    del self._unstored_bumps[key]
+            return False
+        return True
+
+    def _store_bump(self, key: str) -> bool:
+        backend = self._select_backend()
+        if backend is self._memory_backend:
+            return True
+        if backend is None:
+            log_event("security_version_bump_failed", outcome="error", error_type="BackendUnavailable")
+            return False
+        try:
+            backend.bump(key)
+        except Exception as exc:
+            log_event("security_version_bump_failed", outcome="error", error_type=type(exc).__name__)
+            return False
+        return True
+
+    def _select_backend(self) -> SecurityVersionBackend | None:
+        """The configured backend, or None when Redis is configured but cannot be reached."""
+        settings = get_settings()
+        backend_name = settings.AUTH_SECURITY_VERSION_BACKEND
+        redis_url = (settings.AUTH_SECURITY_VERSION_REDIS_URL or "").strip()
+        key_prefix = settings.AUTH_SECURITY_VERSION_REDIS_KEY_PREFIX.strip()
+
+        if backend_name != "redis" or not redis_url:
+            return self._memory_backend
+
+        identity = (backend_name, redis_url, key_prefix)
+        with self._lock:
+            if identity != self._backend_identity:
+                self._redis_backend = None
+                self._backend_identity = identity
+                self._next_redis_attempt = 0.0
+            if self._redis_backend is None and monotonic() >= self._next_redis_attempt:
+                # Retried on a short interval so one failed connect at startup is not permanent.
+                self._next_redis_attempt = monotonic() + self._REDIS_RETRY_SECONDS
+                self._redis_backend = self._build_redis_backend(redis_url=redis_url, key_prefix=key_prefix)
+            return self._redis_backend
+
+    @staticmethod
+    def _build_redis_backend(*, redis_url: str, key_prefix: str) -> RedisSecurityVersionBackend | None:
+        settings = get_settings()
+        try:
+            import redis
+        except Exception:
+            return None
+
+        timeout_seconds = max(0.01, settings.RATE_LIMIT_REDIS_SOCKET_TIMEOUT_MS / 1000)
+        try:
+            client = redis.Redis.from_url(
+                redis_url,
+                decode_responses=True,
+                socket_connect_timeout=timeout_seconds,
+                socket_timeout=timeout_seconds,
+            )
+            client.ping()
+        except Exception as exc:
+            log_event("security_version_backend_unavailable", outcome="claims_disabled", error_type=type(exc).__name__)
+            return None
+
+        return RedisSecurityVersionBackend(
+            redis_client=client,
+            key_prefix=key_prefix,
+            cache_seconds=settings.AUTH_SECURITY_VERSION_CACHE_SECONDS,
+        )
+
+
+security_versions = SecurityVersionRegistry()
+
+
+def _new_nonce() -> str:
+    return uuid4().hex[:16]
@@ -7,7 +7,8 @@ from app.repositories import user_repository
 from app.schemas.token import AccessTokenResponse, TokenPayload
 from app.security.exceptions import ExpiredTokenError, InvalidTokenError, PasswordHashError
 from app.security.jwt import create_access_token, decode_access_token
-from app.security.password import hash_password, verify_password
+from app.security.password import hash_password, verify_and_update_password
+from app.security.security_version import security_versions
 from app.services.exceptions import (
     AuthServiceError,
     ExpiredAuthTokenError,
@@ -46,12 +47,17 @@ class AuthService:
         if user is None:
             raise InvalidCredentialsError("Invalid credentials.")
 
-        if not verify_password(password, user.password_hash):
+        verified, replacement_hash = verify_and_update_password(password, user.password_hash)
+        if not verified:
             raise InvalidCredentialsError("Invalid credentials.")
 
         if not user.is_active:
             raise InactiveUserError("User account is inactive.")
 
+        # Hashes made under a different PASSWORD_HASH_ROUNDS are upgraded while the plaintext is at hand.
+        if replacement_hash is not None:
+            user.password_hash = replacement_hash
+
         return user
 
     def issue_token(self, user: User) -> AccessTokenResponse:
@@ -62,6 +68,9 @@ class AuthService:
             "sub": str(user.id),
             "roles": self._extract_role_names(user),
         }
+        security_version = security_versions.current(user.id)
+        if security_version is not None:
+            token_payload["sv"] = security_version
 
         try:
             access_token = create_access_token(token_payload)
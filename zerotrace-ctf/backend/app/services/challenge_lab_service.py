@@ -1,14 +1,28 @@
 from __future__ import annotations
 
+from collections import OrderedDict
+from collections.abc import Iterable, Mapping
 from dataclasses import dataclass
 from fnmatch import fnmatch
 import json
 import os
 from pathlib import Path
 import posixpath
-
-from app.services.challenge_loader import ChallengeLoader
-from app.services.linux_shell_engine import LinuxShellEngine, ShellSession
+import shlex
+import sys
+from threading import RLock
+from time import perf_counter
+
+from app.core.settings import get_settings
+from app.observability.metrics import metrics
+from app.services.challenge_loader import ChallengeLoader, LabIndexEntry
+from app.services.lab_command_budget import CommandBudget
+from app.services.lab_filesystem import FileContent, FilesystemLayer, VirtualFilesystem
+from app.services.lab_output_pager import LabOutputCursorStore, LabOutputReader
+from app.services.lab_result_cache import LabResultCache, LabResultCacheStats, LabResultKey
+from app.services.lab_session_store import LabSessionState, LabSessionStore
+from app.services.lab_snapshot import build_challenge_loader
+from app.services.linux_shell_engine import LinuxShellEngine, ShellCommandStream, ShellSession, iter_lines
 
 
 class ChallengeLabServiceError(Exception):
@@ -19,166 +33,146 @@ class ChallengeLabUnavailableError(ChallengeLabServiceError):
     """Raised when no lab is configured for a challenge."""
 
 
+class ChallengeLabOutputCursorError(ChallengeLabServiceError):
+    """Raised when an output cursor is unknown, expired or belongs to another session."""
+
+
 @dataclass(frozen=True, slots=True)
 class ChallengeLabCommandResult:
     output: str
     cwd: str
     exit_code: int
+    # Set when the output was cut at the page budget; fetch the rest with ``fetch_output_page``.
+    next_cursor: str | None = None
 
+    @property
+    def truncated(self) -> bool:
+        return self.next_cursor is not None
 
-class _VirtualFilesystem:
-    def __init__(self, files: dict[str, str], permissions: dict[str, str] | None = None) -> None:
-        self._files = {self.normalize_path(path): content for path, content in files.items()}
-        self._directories = self._derive_directories(self._files)
-        self._permission_bits: dict[str, int] = {}
-        for directory in self._directories:
-            self._permission_bits[directory] = 0o755
-        for file_path in self._files:
-            self._permission_bits[file_path] = 0o644
-        for raw_path, raw_mode in (permissions or {}).items():
-            normalized_path = self.normalize_path(raw_path)
-            if normalized_path not in self._permission_bits:
-                continue
-            parsed_mode = self._parse_permission_mode(raw_mode)
-            if parsed_mode is None:
-                continue
-            self._permission_bits[normalized_path] = parsed_mode
-
-    @staticmethod
-    def normalize_path(path: str) -> str:
-        normalized = posixpath.normpath(path.strip() or "/")
-        if not normalized.startswith("/"):
-            normalized = f"/{normalized}"
-        return normalized or "/"
-
-    def resolve(self, cwd: str, target: str) -> str:
-        if target.startswith("/"):
-            return self.normalize_path(target)
-        return self.normalize_path(posixpath.join(cwd, target))
-
-    def exists(self, path: str) -> bool:
-        normalized = self.normalize_path(path)
-        return normalized in self._files or normalized in self._directories
 
-    def is_file(self, path: str) -> bool:
-        return self.normalize_path(path) in self._files
-
-    def is_dir(self, path: str) -> bool:
-        return self.normalize_path(path) in self._directories
+@dataclass(frozen=True, slots=True)
+class ChallengeLabBatchResult:
+    results: tuple[ChallengeLabCommandResult, ...]
+    cwd: str
+    truncated: bool
 
-    def read_file(self, path: str) -> str:
-        return self._files[self.normalize_path(path)]
 
-    def file_size_bytes(self, path: str) -> int:
-        content = self.read_file(path)
-        return len(content.encode("utf-8"))
+@dataclass(frozen=True, slots=True)
+class LabMemoryUsage:
+    slug: str
+    overlay_files: int
+    overlay_bytes: int
+    base_files: int
+    # Non-zero only on the first lab that uses a given base layer.
+    shared_base_bytes: int
 
-    def list_dir(self, path: str, show_all: bool) -> list[str]:
-        normalized = self.normalize_path(path)
-        prefix = "/" if normalized == "/" else f"{normalized}/"
-        children: set[str] = set()
 
-        for candidate in self._directories | set(self._files.keys()):
-            if candidate == normalized:
-                continue
-            if not candidate.startswith(prefix):
-                continue
-            remainder = candidate[len(prefix) :]
-            if not remainder:
-                continue
-            children.add(remainder.split("/", maxsplit=1)[0])
-
-        visible = sorted(name for name in children if show_all or not name.startswith("."))
-        if show_all:
-            return [".", "..", *visible]
-        return visible
-
-    def iter_files_under(self, path: str, recursive: bool) -> list[str]:
-        normalized = self.normalize_path(path)
-        if self.is_file(normalized):
-            return [normalized]
-        if not self.is_dir(normalized):
-            return []
+@dataclass(frozen=True, slots=True)
+class _ResidentLab:
+    filesystem: VirtualFilesystem
+    default_cwd: str
+    content_version: int
+
+
+def _record_command_budget(command: str, budget: CommandBudget) -> None:
+    labels = {"command": command}
+    metrics.observe("zerotrace_lab_command_nodes_visited", budget.nodes_visited, labels=labels)
+    metrics.observe("zerotrace_lab_command_bytes_scanned", budget.bytes_scanned, labels=labels)
+    metrics.observe("zerotrace_lab_command_duration_ms", budget.elapsed_seconds * 1000, labels=labels)
+    if budget.exceeded is not None:
+        metrics.increment(
+            "zerotrace_lab_command_budget_exceeded_total",
+            labels={"command": command, "resource": budget.exceeded},
+        )
 
-        prefix = "/" if normalized == "/" else f"{normalized}/"
-        files = []
-        for file_path in sorted(self._files):
-            if not file_path.startswith(prefix):
-                continue
-            remainder = file_path[len(prefix) :]
-            if not recursive and "/" in remainder:
-                continue
-            files.append(file_path)
-        return files
 
-    def walk(self, path: str) -> list[str]:
-        normalized = self.normalize_path(path)
-        if not self.exists(normalized):
-            return []
-        if self.is_file(normalized):
-            return [normalized]
+class LabTerminal:
+    """One open shell session; commands run in order and ``save`` writes cwd and history back to the store.
+
+    Commands in ``_CACHEABLE_COMMANDS`` only read the lab, so their output is
+    looked up in (and recorded into) the shared result cache under the lab's
+    content version and the session's cwd. Pipelines are keyed by their whole
+    argv; every stage a pipeline accepts is read-only as well.
+    """
+
+    _CACHEABLE_COMMANDS = frozenset(
+        {"help", "pwd", "ls", "cat", "grep", "find", "du", "head", "tail", "wc", "sort", "uniq", "cut"}
+    )
+
+    def __init__(
+        self,
+        *,
+        shell_engine: LinuxShellEngine,
+        shell_session: ShellSession,
+        session_store: LabSessionStore,
+        session_key: str | None,
+        result_cache: LabResultCache | None = None,
+        cache_scope: tuple[str, int] | None = None,
+    ) -> None:
+        self._shell_engine = shell_engine
+        self._shell_session = shell_session
+        self._session_store = session_store
+        self._session_key = session_key
+        self._result_cache = result_cache
+        self._cache_scope = cache_scope
+
+    @property
+    def cwd(self) -> str:
+        return self._shell_session.cwd
+
+    def stream(self, command: str) -> ShellCommandStream:
+        """Run ``command`` under a fresh budget; its output lines are produced only as the caller consumes them."""
+        cache_key = self._cache_key(command)
+        if cache_key is not None:
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                if cached.records_history:
+                    self._shell_session.history.append(command.strip())
+                return ShellCommandStream(
+                    lines=iter_lines(cached.output),
+                    cwd=self._shell_session.cwd,
+                    exit_code=cached.exit_code,
+                )
 
-        prefix = "/" if normalized == "/" else f"{normalized}/"
-        nodes = [normalized]
-        for directory in sorted(self._directories):
-            if directory == normalized:
-                continue
-            if directory.startswith(prefix):
-                nodes.append(directory)
-        for file_path in sorted(self._files):
-            if file_path.startswith(prefix):
-                nodes.append(file_path)
-        return nodes
-
-    def permission_bits(self, path: str) -> int:
-        normalized = self.normalize_path(path)
-        return self._permission_bits.get(normalized, 0o644)
-
-    def permission_string(self, path: str) -> str:
-        normalized = self.normalize_path(path)
-        bits = self.permission_bits(normalized)
-        return self._render_permission_string(bits, is_dir=self.is_dir(normalized))
+        settings = get_settings()
+        budget = CommandBudget(
+            max_nodes=settings.LAB_COMMAND_MAX_NODES,
+            max_bytes=settings.LAB_COMMAND_MAX_BYTES_SCANNED,
+            max_seconds=settings.LAB_COMMAND_MAX_SECONDS,
+            on_finish=_record_command_budget,
+        )
+        history_length = len(self._shell_session.history)
+        result = self._shell_engine.stream(command, self._shell_session, budget=budget)
+        self._shell_session.cwd = result.cwd
+        if cache_key is None:
+            return result
+
+        lines = self._result_cache.record(
+            cache_key,
+            result.lines,
+            exit_code=result.exit_code,
+            records_history=len(self._shell_session.history) > history_length,
+            # Output cut short by the budget depends on timing, so it is never shared.
+            is_deterministic=lambda: budget.exceeded is None,
+        )
+        return ShellCommandStream(lines=lines, cwd=result.cwd, exit_code=result.exit_code)
 
-    @staticmethod
-    def _derive_directories(files: dict[str, str]) -> set[str]:
-        directories = {"/"}
-        for file_path in files:
-            parent = posixpath.dirname(file_path)
-            while parent:
-                directories.add(parent)
-                if parent == "/":
-                    break
-                parent = posixpath.dirname(parent)
-        return directories
+    def save(self) -> None:
+        if self._session_key is not None:
+            state = LabSessionState(cwd=self._shell_session.cwd, history=self._shell_session.history)
+            self._session_store.save(self._session_key, state)
 
-    @staticmethod
-    def _parse_permission_mode(raw_mode: str) -> int | None:
-        candidate = str(raw_mode).strip()
-        if not candidate:
+    def _cache_key(self, command: str) -> LabResultKey | None:
+        if self._result_cache is None or self._cache_scope is None or not self._result_cache.enabled():
             return None
         try:
-            if candidate.startswith("0o"):
-                return int(candidate, 8)
-            return int(candidate, 8)
+            argv = tuple(shlex.split(command))
         except ValueError:
             return None
-
-    @classmethod
-    def _render_permission_string(cls, bits: int, *, is_dir: bool) -> str:
-        file_type = "d" if is_dir else "-"
-        user = cls._triplet((bits >> 6) & 0b111, execute_special=bits & 0o4000, special_char="s")
-        group = cls._triplet((bits >> 3) & 0b111, execute_special=bits & 0o2000, special_char="s")
-        other = cls._triplet(bits & 0b111, execute_special=bits & 0o1000, special_char="t")
-        return f"{file_type}{user}{group}{other}"
-
-    @staticmethod
-    def _triplet(value: int, *, execute_special: int, special_char: str) -> str:
-        read = "r" if value & 0b100 else "-"
-        write = "w" if value & 0b010 else "-"
-        execute = "x" if value & 0b001 else "-"
-        if execute_special:
-            execute = special_char if execute == "x" else special_char.upper()
-        return f"{read}{write}{execute}"
+        if not argv or argv[0] not in self._CACHEABLE_COMMANDS:
+            return None
+        slug, content_version = self._cache_scope
+        return (slug, content_version, self._shell_session.cwd, argv)
 
 
 class ChallengeLabService:
@@ -291,70 +285,242 @@ class ChallengeLabService:
         },
     }
 
-    def __init__(self) -> None:
-        challenge_loader = ChallengeLoader()
-        structured_definitions = []
-        for module_code in ("m11", "m12"):
-            structured_definitions.extend(challenge_loader.load_module(module_code))
-        lab_files: dict[str, dict[str, str]] = {
-            "m12-permission-denied": dict(self._M12_FILES),
-            "m13-suid-secrets": dict(self._M13_FILES),
-            "m14-cron-exploit": dict(self._M14_FILES),
-            "m15-shadow-hunter": dict(self._M15_FILES),
-            "m16-reverse-shell-drop": dict(self._M16_FILES),
-            "m17-bash-injection": dict(self._M17_FILES),
-            "m18-root-me": dict(self._M18_FILES),
-            "m19-kernel-panic": dict(self._M19_FILES),
-            "m20-log-miner": dict(self._M20_FILES),
-            "m21-zombie-process": dict(self._M21_FILES),
-            "m22-kali-recon-lab": dict(self._M22_FILES),
-        }
-        lab_permissions: dict[str, dict[str, str]] = {}
-        flag_templates = dict(self._LAB_FLAG_TEMPLATES)
-        self._default_cwds: dict[str, str] = {}
-        self._lab_hints: dict[str, list[str]] = {}
-
-        for definition in structured_definitions:
-            lab_files[definition.slug] = dict(definition.files)
-            flag_templates[definition.slug] = dict(definition.flag_templates)
-            lab_permissions[definition.slug] = dict(definition.permissions)
-            self._default_cwds[definition.slug] = definition.start_path
-            self._lab_hints[definition.slug] = list(definition.hints)
-
-        self._inject_runtime_flags(lab_files, self._load_private_flags(), flag_templates)
-        self._labs = {
-            slug: _VirtualFilesystem(files, permissions=lab_permissions.get(slug))
-            for slug, files in lab_files.items()
-        }
+    _LEGACY_LAB_FILES: dict[str, dict[str, str]] = {
+        "m12-permission-denied": _M12_FILES,
+        "m13-suid-secrets": _M13_FILES,
+        "m14-cron-exploit": _M14_FILES,
+        "m15-shadow-hunter": _M15_FILES,
+        "m16-reverse-shell-drop": _M16_FILES,
+        "m17-bash-injection": _M17_FILES,
+        "m18-root-me": _M18_FILES,
+        "m19-kernel-panic": _M19_FILES,
+        "m20-log-miner": _M20_FILES,
+        "m21-zombie-process": _M21_FILES,
+        "m22-kali-recon-lab": _M22_FILES,
+    }
+
+    def __init__(
+        self,
+        loader: ChallengeLoader | None = None,
+        session_store: LabSessionStore | None = None,
+    ) -> None:
+        # Construction does no I/O: the lab index is read on first lookup and each
+        # lab's filesystem is built on first use, then kept in a bounded LRU.
+        self._loader = loader or build_challenge_loader()
+        self._private_flags_file = self._resolve_private_flags_file()
+        self._private_flags: dict[str, str] | None = None
+        self._index: dict[str, LabIndexEntry] | None = None
+        self._unavailable_slugs: set[str] = set()
+        self._resident: OrderedDict[str, _ResidentLab] = OrderedDict()
+        self._base_layer: FilesystemLayer | None = None
+        self._lock = RLock()
+        self._sessions = session_store or LabSessionStore()
+        self._output_pages = LabOutputCursorStore()
+        self._result_cache = LabResultCache()
+        # Bumped whenever a lab's content changes, so cached command results for the old content are never served.
+        self._content_versions: dict[str, int] = {}
         self._shell_engine = LinuxShellEngine()
 
-        for slug, filesystem in self._labs.items():
-            configured = _VirtualFilesystem.normalize_path(self._default_cwds.get(slug, "/"))
-            self._default_cwds[slug] = configured if filesystem.is_dir(configured) else "/"
+    def _lab_index(self) -> dict[str, LabIndexEntry]:
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = {entry.slug: entry for entry in self._loader.index_all()}
+        return self._index
+
+    def _get_lab(self, challenge_slug: str) -> _ResidentLab | None:
+        with self._lock:
+            resident = self._resident.get(challenge_slug)
+            if resident is not None:
+                self._resident.move_to_end(challenge_slug)
+                metrics.increment("zerotrace_lab_residency_total", labels={"outcome": "hit"})
+                return resident
+        if not self.has_lab(challenge_slug):
+            return None
+
+        metrics.increment("zerotrace_lab_residency_total", labels={"outcome": "miss"})
+        started = perf_counter()
+        resident = self._materialize(challenge_slug)
+        metrics.observe("zerotrace_lab_materialize_duration_ms", (perf_counter() - started) * 1000)
+
+        with self._lock:
+            if resident is None:
+                self._unavailable_slugs.add(challenge_slug)
+                return None
+            if resident.content_version != self._content_versions.get(challenge_slug, 0):
+                # A reload swapped new content in while this build ran; serve it once but keep the reloaded lab.
+                return self._resident.get(challenge_slug, resident)
+            # Another request may have built the same lab meanwhile; keep whichever landed first.
+            resident = self._resident.setdefault(challenge_slug, resident)
+            self._resident.move_to_end(challenge_slug)
+            max_resident = get_settings().LAB_RESIDENT_CACHE_SIZE
+            while len(self._resident) > max_resident:
+                self._resident.popitem(last=False)
+                metrics.increment("zerotrace_lab_residency_total", labels={"outcome": "evicted"})
+        return resident
+
+    def _materialize(self, challenge_slug: str) -> _ResidentLab | None:
+        return self._build_lab(
+            challenge_slug,
+            entry=self._lab_index().get(challenge_slug),
+            runtime_flag=self._runtime_flags().get(challenge_slug),
+            content_version=self._content_versions.get(challenge_slug, 0),
+        )
+
+    def _build_lab(
+        self,
+        challenge_slug: str,
+        *,
+        entry: LabIndexEntry | None,
+        runtime_flag: str | None,
+        content_version: int,
+        base_layer: FilesystemLayer | None = None,
+    ) -> _ResidentLab | None:
+        if entry is not None:
+            definition = self._loader.materialize(entry)
+            if definition is None:
+                return None
+            files: dict[str, FileContent] = dict(definition.files)
+            flag_templates = definition.flag_templates
+            permissions: dict[str, str] | None = definition.permissions
+            start_path = definition.start_path
+            if base_layer is None:
+                base_layer = self._shared_base_layer(definition.base_files)
+        elif challenge_slug in self._LEGACY_LAB_FILES:
+            files = dict(self._LEGACY_LAB_FILES[challenge_slug])
+            flag_templates = self._LAB_FLAG_TEMPLATES.get(challenge_slug, {})
+            permissions = None
+            start_path = "/"
+            base_layer = None
+        else:
+            return None
+
+        self._inject_runtime_flag(files, flag_templates, runtime_flag)
+        filesystem = VirtualFilesystem(files, permissions=permissions, base=base_layer)
+        configured = VirtualFilesystem.normalize_path(start_path)
+        return _ResidentLab(
+            filesystem=filesystem,
+            default_cwd=configured if filesystem.is_dir(configured) else "/",
+            content_version=content_version,
+        )
+
+    def source_paths(self) -> tuple[Path, ...]:
+        """Files and directories whose changes ``reload_changed_files`` knows how to apply."""
+        paths = [self._loader.labs_root]
+        if self._private_flags_file is not None:
+            paths.append(self._private_flags_file)
+        return tuple(paths)
+
+    def reload_changed_files(self, changed_paths: Iterable[Path]) -> list[str]:
+        """Rebuild only the labs affected by ``changed_paths`` and swap them in under a new content version.
+
+        Challenge definitions are re-indexed per module, overlays map to the
+        labs that use them, the private flags file affects the labs whose flag
+        value changed, and the base filesystem affects every structured lab.
+        Resident labs are rebuilt before anything is swapped, so requests keep
+        using the previous content until the swap and then never see it again;
+        other labs, their resident filesystems and their cached results are
+        left untouched. Returns the affected slugs.
+        """
+        changed = {Path(path).resolve() for path in changed_paths}
+        labs_root = self._loader.labs_root.resolve()
+        old_index = self._lab_index()
+        new_index = dict(old_index)
+        affected: set[str] = set()
+
+        new_base_layer: FilesystemLayer | None = None
+        if self._loader.base_filesystem_path.resolve() in changed:
+            new_base_layer = FilesystemLayer(self._loader.reload_base_files())
+            affected.update(old_index)
+
+        changed_modules = {
+            path.parent.parent.name
+            for path in changed
+            if path.parent.name == "challenges" and path.parent.parent.parent == labs_root
+        }
+        for module_code in sorted(changed_modules):
+            fresh = {entry.slug: entry for entry in self._loader.index_module(module_code)}
+            for slug, entry in old_index.items():
+                if entry.overlay_path.parent.parent.name == module_code and slug not in fresh:
+                    del new_index[slug]
+                    affected.add(slug)
+            for slug, entry in fresh.items():
+                if old_index.get(slug) != entry:
+                    new_index[slug] = entry
+                    affected.add(slug)
+
+        affected.update(slug for slug, entry in new_index.items() if entry.overlay_path.resolve() in changed)
+
+        old_flags = self._runtime_flags()
+        new_flags = old_flags
+        if self._private_flags_file is not None and self._private_flags_file.resolve() in changed:
+            new_flags = self._load_private_flags(self._private_flags_file)
+            affected.update(slug for slug in {*old_flags, *new_flags} if old_flags.get(slug) != new_flags.get(slug))
+
+        if not affected:
+            return []
+
+        with self._lock:
+            target_versions = {slug: self._content_versions.get(slug, 0) + 1 for slug in affected}
+            resident_slugs = [slug for slug in affected if slug in self._resident]
+        rebuilt: dict[str, _ResidentLab] = {}
+        for slug in resident_slugs:
+            lab = self._build_lab(
+                slug,
+                entry=new_index.get(slug),
+                runtime_flag=new_flags.get(slug),
+                content_version=target_versions[slug],
+                base_layer=new_base_layer,
+            )
+            if lab is not None:
+                rebuilt[slug] = lab
+
+        with self._lock:
+            self._index = new_index
+            self._private_flags = new_flags
+            if new_base_layer is not None:
+                self._base_layer = new_base_layer
+            for slug in affected:
+                self._content_versions[slug] = target_versions[slug]
+                self._unavailable_slugs.discard(slug)
+                if slug in self._resident:
+                    if slug in rebuilt:
+                        self._resident[slug] = rebuilt[slug]
+                    else:
+                        # Built before the swap from the old sources, or no longer valid; rebuild on next use.
+                        del self._resident[slug]
+
+        metrics.increment("zerotrace_lab_reloads_total", value=len(affected))
+        return sorted(affected)
+
+    def _shared_base_layer(self, base_files: Mapping[str, FileContent]) -> FilesystemLayer:
+        # The loader hands every definition the same base mapping, so it is indexed once and never evicted.
+        with self._lock:
+            if self._base_layer is None:
+                self._base_layer = FilesystemLayer(base_files)
+            return self._base_layer
+
+    def _runtime_flags(self) -> dict[str, str]:
+        if self._private_flags is None:
+            self._private_flags = self._load_private_flags(self._private_flags_file)
+        return self._private_flags
 
     @classmethod
-    def _inject_runtime_flags(
+    def _inject_runtime_flag(
         cls,
-        lab_files: dict[str, dict[str, str]],
-        private_flags: dict[str, str],
-        flag_templates: dict[str, dict[str, str]],
+        files: dict[str, FileContent],
+        templates: Mapping[str, str],
+        runtime_flag: str | None,
     ) -> None:
-        for slug, templates in flag_templates.items():
-            files = lab_files.get(slug)
-            if files is None:
-                continue
-
-            runtime_flag = private_flags.get(slug)
-            resolved_flag = runtime_flag.strip() if runtime_flag else cls._MISSING_FLAG_MARKER
-            if not resolved_flag:
-                resolved_flag = cls._MISSING_FLAG_MARKER
+        resolved_flag = runtime_flag.strip() if runtime_flag else cls._MISSING_FLAG_MARKER
+        if not resolved_flag:
+            resolved_flag = cls._MISSING_FLAG_MARKER
 
-            for file_path, template in templates.items():
-                files[file_path] = template.format(flag=resolved_flag)
+        for file_path, template in templates.items():
+            files[file_path] = template.format(flag=resolved_flag)
 
     @classmethod
-    def _load_private_flags(cls) -> dict[str, str]:
-        flags_file = cls._resolve_private_flags_file()
+    def _load_private_flags(cls, flags_file: Path | None) -> dict[str, str]:
         if flags_file is None or not flags_file.exists():
             return {}
 
@@ -401,32 +567,149 @@ class ChallengeLabService:
         return normalized.upper().startswith("REDACTED_")
 
     def has_lab(self, challenge_slug: str) -> bool:
-        return challenge_slug in self._labs
+        if challenge_slug in self._unavailable_slugs:
+            return False
+        return challenge_slug in self._lab_index() or challenge_slug in self._LEGACY_LAB_FILES
+
+    def lab_slugs(self) -> list[str]:
+        slugs = {*self._lab_index(), *self._LEGACY_LAB_FILES} - self._unavailable_slugs
+        return sorted(slugs)
 
     def get_default_cwd(self, challenge_slug: str) -> str:
-        return self._default_cwds.get(challenge_slug, "/")
+        resident = self._get_lab(challenge_slug)
+        return resident.default_cwd if resident is not None else "/"
 
     def get_lab_hints(self, challenge_slug: str) -> list[str] | None:
-        hints = self._lab_hints.get(challenge_slug)
-        if hints is None:
+        entry = self._lab_index().get(challenge_slug)
+        if entry is None:
             return None
-        return list(hints)
+        return list(entry.hints)
+
+    def memory_report(self) -> list[LabMemoryUsage]:
+        """Approximate memory of the resident labs; the shared base layer is reported once, not per lab."""
+        with self._lock:
+            resident = sorted(self._resident.items())
+        reported_bases: set[int] = set()
+        report: list[LabMemoryUsage] = []
+        for slug, lab in resident:
+            filesystem = lab.filesystem
+            base_bytes = 0
+            if id(filesystem.base) not in reported_bases:
+                reported_bases.add(id(filesystem.base))
+                base_bytes = filesystem.base.approximate_size_bytes()
+            report.append(
+                LabMemoryUsage(
+                    slug=slug,
+                    overlay_files=len(filesystem.overlay),
+                    overlay_bytes=filesystem.overlay.approximate_size_bytes(),
+                    base_files=len(filesystem.base),
+                    shared_base_bytes=base_bytes,
+                )
+            )
+        return report
+
+    def result_cache_stats(self) -> LabResultCacheStats:
+        return self._result_cache.stats()
+
+    def execute_command(
+        self,
+        challenge_slug: str,
+        command: str,
+        cwd: str,
+        *,
+        session_key: str | None = None,
+    ) -> ChallengeLabCommandResult:
+        """Run one command; with a ``session_key`` the stored cwd and history are resumed and saved back.
+
+        A stored session's cwd takes precedence over the ``cwd`` sent by the
+        client, which only seeds a new session. Output beyond
+        ``LAB_OUTPUT_PAGE_MAX_BYTES``/``LAB_OUTPUT_PAGE_MAX_LINES`` is left
+        unproduced and the result carries a cursor for the next page.
+        """
+        terminal = self.open_terminal(challenge_slug, cwd, session_key=session_key)
+        stream = terminal.stream(command)
+        terminal.save()
+        page = self._output_pages.first_page(
+            stream.lines,
+            cwd=stream.cwd,
+            exit_code=stream.exit_code,
+            owner=session_key,
+        )
+        return ChallengeLabCommandResult(
+            output=page.output,
+            cwd=page.cwd,
+            exit_code=page.exit_code,
+            next_cursor=page.next_cursor,
+        )
+
+    def fetch_output_page(self, cursor: str, *, session_key: str | None = None) -> ChallengeLabCommandResult:
+        """Continue a truncated command's output from ``cursor`` without running the command again."""
+        page = self._output_pages.next_page(cursor, owner=session_key)
+        if page is None:
+            raise ChallengeLabOutputCursorError("Output cursor expired or not found.")
+        return ChallengeLabCommandResult(
+            output=page.output,
+            cwd=page.cwd,
+            exit_code=page.exit_code,
+            next_cursor=page.next_cursor,
+        )
 
-    def execute_command(self, challenge_slug: str, command: str, cwd: str) -> ChallengeLabCommandResult:
-        filesystem = self._labs.get(challenge_slug)
-        if filesystem is None:
+    def execute_batch(
+        self,
+        challenge_slug: str,
+        commands: list[str],
+        cwd: str,
+        *,
+        session_key: str | None = None,
+        max_output_bytes: int,
+    ) -> ChallengeLabBatchResult:
+        """Run ``commands`` in order against one session, loading and saving its state once.
+
+        Once the combined UTF-8 output reaches ``max_output_bytes`` the current
+        output stops being produced at the cap and the remaining commands are
+        not run.
+        """
+        terminal = self.open_terminal(challenge_slug, cwd, session_key=session_key)
+        results: list[ChallengeLabCommandResult] = []
+        remaining_bytes = max_output_bytes
+        truncated = False
+        for command in commands:
+            stream = terminal.stream(command)
+            reader = LabOutputReader(stream.lines)
+            output = reader.read(max_bytes=remaining_bytes, max_lines=sys.maxsize)
+            results.append(ChallengeLabCommandResult(output=output, cwd=stream.cwd, exit_code=stream.exit_code))
+            remaining_bytes -= len(output.encode("utf-8"))
+            if not reader.exhausted:
+                truncated = True
+                break
+
+        terminal.save()
+        return ChallengeLabBatchResult(results=tuple(results), cwd=terminal.cwd, truncated=truncated)
+
+    def open_terminal(self, challenge_slug: str, cwd: str, *, session_key: str | None = None) -> LabTerminal:
+        """Resume (or start) the shell session for ``session_key`` on the lab's current filesystem."""
+        resident = self._get_lab(challenge_slug)
+        if resident is None:
             raise ChallengeLabUnavailableError("Lab unavailable for this challenge.")
 
-        normalized_cwd = filesystem.normalize_path(cwd or "/")
+        state = self._sessions.load(session_key) if session_key is not None else None
+        filesystem = resident.filesystem
+        normalized_cwd = filesystem.normalize_path((state.cwd if state is not None else cwd) or "/")
         if not filesystem.is_dir(normalized_cwd):
-            normalized_cwd = self.get_default_cwd(challenge_slug)
+            normalized_cwd = resident.default_cwd
 
-        session = ShellSession(filesystem=filesystem, cwd=normalized_cwd)
-        result = self._shell_engine.run(command, session)
-        return ChallengeLabCommandResult(
-            output=result.output,
-            cwd=result.cwd,
-            exit_code=result.exit_code,
+        shell_session = ShellSession(
+            filesystem=filesystem,
+            cwd=normalized_cwd,
+            history=state.history if state is not None else [],
+        )
+        return LabTerminal(
+            shell_engine=self._shell_engine,
+            shell_session=shell_session,
+            session_store=self._sessions,
+            session_key=session_key,
+            result_cache=self._result_cache,
+            cache_scope=(challenge_slug, resident.content_version),
         )
 
     @classmethod
@@ -447,7 +730,7 @@ class ChallengeLabService:
 
         return False
 
-    def _cmd_cd(self, filesystem: _VirtualFilesystem, cwd: str, args: list[str]) -> ChallengeLabCommandResult:
+    def _cmd_cd(self, filesystem: VirtualFilesystem, cwd: str, args: list[str]) -> ChallengeLabCommandResult:
         target = "/" if not args else args[0]
         if len(args) > 1:
             return ChallengeLabCommandResult(output="cd: too many arguments", cwd=cwd, exit_code=1)
@@ -467,7 +750,7 @@ class ChallengeLabService:
             )
         return ChallengeLabCommandResult(output="", cwd=destination, exit_code=0)
 
-    def _cmd_ls(self, filesystem: _VirtualFilesystem, cwd: str, args: list[str]) -> ChallengeLabCommandResult:
+    def _cmd_ls(self, filesystem: VirtualFilesystem, cwd: str, args: list[str]) -> ChallengeLabCommandResult:
         show_all = False
         target: str | None = None
 
@@ -513,7 +796,7 @@ class ChallengeLabService:
         listing = filesystem.list_dir(path, show_all=show_all)
         return ChallengeLabCommandResult(output="\n".join(listing), cwd=cwd, exit_code=0)
 
-    def _cmd_cat(self, filesystem: _VirtualFilesystem, cwd: str, args: list[str]) -> ChallengeLabCommandResult:
+    def _cmd_cat(self, filesystem: VirtualFilesystem, cwd: str, args: list[str]) -> ChallengeLabCommandResult:
         if not args:
             return ChallengeLabCommandResult(output="cat: missing file operand", cwd=cwd, exit_code=1)
 
@@ -540,7 +823,7 @@ class ChallengeLabService:
 
         return ChallengeLabCommandResult(output="\n".join(chunks), cwd=cwd, exit_code=0)
 
-    def _cmd_grep(self, filesystem: _VirtualFilesystem, cwd: str, args: list[str]) -> ChallengeLabCommandResult:
+    def _cmd_grep(self, filesystem: VirtualFilesystem, cwd: str, args: list[str]) -> ChallengeLabCommandResult:
         recursive = False
         index = 0
         while index < len(args) and args[index].startswith("-"):
@@ -594,7 +877,7 @@ class ChallengeLabService:
 
         return ChallengeLabCommandResult(output="\n".join(matches), cwd=cwd, exit_code=0)
 
-    def _cmd_find(self, filesystem: _VirtualFilesystem, cwd: str, args: list[str]) -> ChallengeLabCommandResult:
+    def _cmd_find(self, filesystem: VirtualFilesystem, cwd: str, args: list[str]) -> ChallengeLabCommandResult:
         if not args:
             return ChallengeLabCommandResult(
                 output="usage: find PATH [-type f|d] [-name GLOB]",
@@ -654,7 +937,7 @@ class ChallengeLabService:
 
         return ChallengeLabCommandResult(output="\n".join(results), cwd=cwd, exit_code=0)
 
-    def _cmd_du(self, filesystem: _VirtualFilesystem, cwd: str, args: list[str]) -> ChallengeLabCommandResult:
+    def _cmd_du(self, filesystem: VirtualFilesystem, cwd: str, args: list[str]) -> ChallengeLabCommandResult:
         human_readable = False
         target: str | None = None
 
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
-from copy import deepcopy
+from collections.abc import Mapping
 from dataclasses import dataclass
 import json
 from pathlib import Path
 import posixpath
+import sys
+from types import MappingProxyType
 from typing import Any
 
+from app.services.lab_filesystem import FileContent
+from app.services.lab_generators import GENERATOR_KEY, GeneratedContent
+
 
 @dataclass(frozen=True, slots=True)
 class LabDefinition:
@@ -15,23 +20,76 @@ class LabDefinition:
     title: str
     start_path: str
     hints: list[str]
-    files: dict[str, str]
+    # Only the challenge overlay; base_files is the loader-wide base layer, shared by every definition.
+    files: dict[str, FileContent]
+    base_files: Mapping[str, FileContent]
     flag_templates: dict[str, str]
     permissions: dict[str, str]
 
 
+@dataclass(frozen=True, slots=True)
+class LabIndexEntry:
+    challenge_id: str
+    slug: str
+    title: str
+    start_path: str
+    hints: tuple[str, ...]
+    flag_path: str
+    flag_template: str
+    permissions: dict[str, str]
+    overlay_path: Path
+
+
 class ChallengeLoader:
     _BACKEND_ROOT = Path(__file__).resolve().parents[2]
     _LABS_ROOT = _BACKEND_ROOT / "app" / "labs"
 
+    def __init__(self) -> None:
+        self._base_files: Mapping[str, FileContent] | None = None
+
+    @property
+    def labs_root(self) -> Path:
+        return self._LABS_ROOT
+
+    @property
+    def base_filesystem_path(self) -> Path:
+        return self._LABS_ROOT / "base_filesystem.json"
+
+    def reload_base_files(self) -> Mapping[str, FileContent]:
+        """Re-read the base filesystem; definitions materialized before keep the previous mapping."""
+        self._base_files = None
+        return self.load_base_files()
+
+    def load_base_files(self) -> Mapping[str, FileContent]:
+        """Return the flattened base filesystem, built once per loader and shared read-only."""
+        if self._base_files is None:
+            files: dict[str, FileContent] = {}
+            self._flatten_tree(self.load_base_filesystem(), "/", files)
+            self._base_files = MappingProxyType(files)
+        return self._base_files
+
     def load_base_filesystem(self) -> dict[str, Any]:
-        base_path = self._LABS_ROOT / "base_filesystem.json"
         try:
-            return self._load_json(base_path)
+            return self._load_json(self.base_filesystem_path)
         except (OSError, json.JSONDecodeError, ValueError):
             return {"/": {}}
 
-    def load_module(self, module_code: str) -> list[LabDefinition]:
+    def discover_module_codes(self) -> list[str]:
+        """Module directories that contain challenge definitions, in sorted order."""
+        try:
+            candidates = sorted(self._LABS_ROOT.iterdir())
+        except OSError:
+            return []
+        return [candidate.name.lower() for candidate in candidates if (candidate / "challenges").is_dir()]
+
+    def index_all(self) -> list[LabIndexEntry]:
+        entries: list[LabIndexEntry] = []
+        for module_code in self.discover_module_codes():
+            entries.extend(self.index_module(module_code))
+        return entries
+
+    def index_module(self, module_code: str) -> list[LabIndexEntry]:
+        """Read challenge metadata only; overlays are left on disk until ``materialize``."""
         normalized_module = module_code.strip().lower()
         module_root = self._LABS_ROOT / normalized_module
         challenges_dir = module_root / "challenges"
@@ -39,8 +97,7 @@ class ChallengeLoader:
         if not challenges_dir.exists():
             return []
 
-        base_fs = self.load_base_filesystem()
-        definitions: list[LabDefinition] = []
+        entries: list[LabIndexEntry] = []
         for challenge_file in sorted(challenges_dir.glob("*.json")):
             try:
                 payload = self._load_json(challenge_file)
@@ -75,33 +132,59 @@ class ChallengeLoader:
                     continue
                 normalized_permissions[normalized_path] = normalized_mode
 
-            overlay_file = overlays_dir / f"{challenge_id}.json"
-            if overlay_file.exists():
-                try:
-                    overlay = self._load_json(overlay_file)
-                except (OSError, json.JSONDecodeError, ValueError):
-                    overlay = {}
-            else:
-                overlay = {}
-            merged_tree = self._merge_trees(deepcopy(base_fs), overlay)
-            files: dict[str, str] = {}
-            self._flatten_tree(merged_tree, "/", files)
-            if flag_path not in files:
-                continue
-
-            definitions.append(
-                LabDefinition(
+            entries.append(
+                LabIndexEntry(
                     challenge_id=challenge_id,
                     slug=slug,
                     title=title,
                     start_path=start_path,
-                    hints=[item.strip() for item in hints if item.strip()],
-                    files=files,
-                    flag_templates={flag_path: flag_template},
+                    hints=tuple(item.strip() for item in hints if item.strip()),
+                    flag_path=flag_path,
+                    flag_template=flag_template,
                     permissions=normalized_permissions,
+                    overlay_path=overlays_dir / f"{challenge_id}.json",
                 )
             )
 
+        return entries
+
+    def materialize(self, entry: LabIndexEntry) -> LabDefinition | None:
+        """Load the entry's overlay; ``None`` when its flag path would not be a file."""
+        base_files = self.load_base_files()
+        files = self.load_overlay_files(entry)
+        if not self._is_layered_file(entry.flag_path, base_files, files):
+            return None
+
+        return LabDefinition(
+            challenge_id=entry.challenge_id,
+            slug=entry.slug,
+            title=entry.title,
+            start_path=entry.start_path,
+            hints=list(entry.hints),
+            files=files,
+            base_files=base_files,
+            flag_templates={entry.flag_path: entry.flag_template},
+            permissions=dict(entry.permissions),
+        )
+
+    def load_overlay_files(self, entry: LabIndexEntry) -> dict[str, FileContent]:
+        if entry.overlay_path.exists():
+            try:
+                overlay = self._load_json(entry.overlay_path)
+            except (OSError, json.JSONDecodeError, ValueError):
+                overlay = {}
+        else:
+            overlay = {}
+        files: dict[str, FileContent] = {}
+        self._flatten_tree(overlay, "/", files)
+        return files
+
+    def load_module(self, module_code: str) -> list[LabDefinition]:
+        definitions: list[LabDefinition] = []
+        for entry in self.index_module(module_code):
+            definition = self.materialize(entry)
+            if definition is not None:
+                definitions.append(definition)
         return definitions
 
     @classmethod
@@ -111,24 +194,41 @@ class ChallengeLoader:
             raise ValueError(f"Expected JSON object in {path}")
         return payload
 
-    @classmethod
-    def _merge_trees(cls, base: dict[str, Any], overlay: dict[str, Any]) -> dict[str, Any]:
-        for key, value in overlay.items():
-            if key in base and isinstance(base[key], dict) and isinstance(value, dict):
-                base[key] = cls._merge_trees(base[key], value)
-                continue
-            base[key] = deepcopy(value)
-        return base
+    @staticmethod
+    def _is_layered_file(
+        path: str,
+        base_files: Mapping[str, FileContent],
+        overlay_files: Mapping[str, FileContent],
+    ) -> bool:
+        """Whether ``path`` is a file once the overlay is laid over the base."""
+        if path in overlay_files:
+            return True
+        if path not in base_files:
+            return False
+        # An overlay file on an ancestor replaces the base directory; overlay entries below
+        # the path turn it into a directory. Either way the base file is no longer visible.
+        for overlay_path in overlay_files:
+            if path.startswith(f"{overlay_path}/") or overlay_path.startswith(f"{path}/"):
+                return False
+        return True
 
     @classmethod
-    def _flatten_tree(cls, node: Any, current_path: str, output: dict[str, str]) -> None:
+    def _flatten_tree(cls, node: Any, current_path: str, output: dict[str, FileContent]) -> None:
         if isinstance(node, str):
-            output[cls._normalize_path(current_path)] = node
+            # Interned so identical paths and contents across labs share one string object.
+            output[sys.intern(cls._normalize_path(current_path))] = sys.intern(node)
             return
 
         if not isinstance(node, dict):
             return
 
+        if GENERATOR_KEY in node:
+            # Only the spec is kept; the file's text is generated when something first reads it.
+            generated = GeneratedContent.from_spec(node)
+            if generated is not None:
+                output[sys.intern(cls._normalize_path(current_path))] = generated
+            return
+
         for name, child in node.items():
             key = str(name)
             if current_path == "/" and key == "/":
@@ -30,7 +30,10 @@ from app.services.challenge_exceptions import (
     TrackNotFoundError,
 )
 from app.services.flag_hashing import hash_flag, verify_flag
+from app.services.leaderboard_service import LeaderboardService
 from app.services.rate_limiter import DbSubmissionRateLimiter, SubmissionRateLimiter
+from app.services.scoreboard_event_hub import queue_scoreboard_event
+from app.services.xp_service import invalidate_user_xp_after_commit
 
 
 class FlagSubmissionResult(TypedDict):
@@ -57,8 +60,13 @@ class PublicChallengeData:
 class ChallengeService:
     _M1_SINGLE_ATTEMPT_PREFIX = "m1-"
 
-    def __init__(self, rate_limiter: SubmissionRateLimiter | None = None) -> None:
+    def __init__(
+        self,
+        rate_limiter: SubmissionRateLimiter | None = None,
+        leaderboard_service: LeaderboardService | None = None,
+    ) -> None:
         self._rate_limiter = rate_limiter or DbSubmissionRateLimiter()
+        self._leaderboard_service = leaderboard_service or LeaderboardService()
 
     def create_challenge(
         self,
@@ -355,6 +363,13 @@ class ChallengeService:
                     first_blood=True,
                     latency_ms=self._elapsed_millis(started),
                 )
+                self._queue_solve_events(
+                    session=session,
+                    user=user,
+                    challenge=challenge,
+                    xp_awarded=base_points + bonus_points,
+                    first_blood=True,
+                )
                 return {
                     "correct": True,
                     "xp_awarded": base_points + bonus_points,
@@ -399,6 +414,13 @@ class ChallengeService:
                 first_blood=False,
                 latency_ms=self._elapsed_millis(started),
             )
+            self._queue_solve_events(
+                session=session,
+                user=user,
+                challenge=challenge,
+                xp_awarded=base_points,
+                first_blood=False,
+            )
             return {
                 "correct": True,
                 "xp_awarded": base_points,
@@ -512,6 +534,7 @@ class ChallengeService:
         if points_awarded <= 0:
             raise InvalidChallengeConfigurationError("Awarded points must be greater than zero.")
 
+        awarded_at = datetime.now(timezone.utc)
         try:
             with session.begin_nested():
                 challenge_repository.create_challenge_solve(
@@ -520,13 +543,61 @@ class ChallengeService:
                     challenge=challenge,
                     points_awarded=points_awarded,
                     is_first_blood=is_first_blood,
+                    created_at=awarded_at,
+                )
+                session.flush()
+                challenge_repository.add_daily_xp(
+                    session=session,
+                    user_id=user.id,
+                    track_id=challenge.track_id,
+                    points_awarded=points_awarded,
+                    awarded_at=awarded_at,
                 )
                 session.flush()
         except IntegrityError:
             return False
 
+        invalidate_user_xp_after_commit(session, user.id)
         return True
 
+    def _queue_solve_events(
+        self,
+        session: Session,
+        user: User,
+        challenge: Challenge,
+        xp_awarded: int,
+        first_blood: bool,
+    ) -> None:
+        # Events are only broadcast after the surrounding transaction commits. They carry the new
+        # total but no rank: ranking every user here would put a full-board query in the solve path,
+        # so subscribers re-rank from the totals they receive.
+        total_xp = self._leaderboard_service.get_user_total_xp(session, user.id)
+        queue_scoreboard_event(
+            session,
+            "solve",
+            {
+                "user_id": str(user.id),
+                "challenge_id": str(challenge.id),
+                "track_id": str(challenge.track_id),
+                "xp_awarded": xp_awarded,
+                "first_blood": first_blood,
+                "total_xp": total_xp,
+            },
+        )
+        if first_blood:
+            queue_scoreboard_event(
+                session,
+                "first_blood",
+                {
+                    "user_id": str(user.id),
+                    "challenge_id": str(challenge.id),
+                    "challenge_slug": challenge.slug,
+                    "challenge_title": challenge.title,
+                    "track_id": str(challenge.track_id),
+                    "xp_awarded": xp_awarded,
+                },
+            )
+
     @staticmethod
     def _elapsed_millis(started: float) -> float:
         return round((perf_counter() - started) * 1000, 3)
@@ -1,22 +1,35 @@
 from __future__ import annotations
 
-from passlib.context import CryptContext
-
+from app.core.settings import get_settings
+from app.security.password import build_bcrypt_context
 from app.services.challenge_exceptions import FlagHashingError
 
 
-_flag_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
 def hash_flag(plaintext_flag: str) -> str:
     try:
-        return _flag_context.hash(plaintext_flag)
+        return build_bcrypt_context(get_settings().FLAG_HASH_ROUNDS).hash(plaintext_flag)
     except Exception:
         raise FlagHashingError("Flag hashing failed.") from None
 
 
 def verify_flag(plaintext_flag: str, hashed_flag: str) -> bool:
     try:
-        return _flag_context.verify(plaintext_flag, hashed_flag)
+        return build_bcrypt_context(get_settings().FLAG_HASH_ROUNDS).verify(plaintext_flag, hashed_flag)
+    except Exception:
+        return False
+
+
+def verify_and_update_flag(plaintext_flag: str, hashed_flag: str) -> tuple[bool, str | None]:
+    """Verify a flag and, when the stored hash is off-policy, return its replacement."""
+    try:
+        return build_bcrypt_context(get_settings().FLAG_HASH_ROUNDS).verify_and_update(plaintext_flag, hashed_flag)
+    except Exception:
+        return False, None
+
+
+def flag_needs_rehash(hashed_flag: str) -> bool:
+    """Whether a stored hash is off-policy; reads only the hash's parameters, no bcrypt work."""
+    try:
+        return build_bcrypt_context(get_settings().FLAG_HASH_ROUNDS).needs_update(hashed_flag)
     except Exception:
         return False
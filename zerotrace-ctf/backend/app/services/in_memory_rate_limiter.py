@@ -3,6 +3,7 @@ from __future__ import annotations
 from collections import deque
 from dataclasses import dataclass, field
 from hashlib import sha256
+from itertools import repeat
 from math import ceil
 from threading import Lock
 from time import monotonic, time
@@ -26,6 +27,7 @@ class SlidingWindowRateLimiter(Protocol):
         max_attempts: int,
         window_seconds: int,
         lock_seconds: int,
+        permits: int = 1,
     ) -> InMemoryRateLimitDecision: ...
 
     def reset(self) -> None: ...
@@ -49,12 +51,14 @@ class InMemorySlidingWindowRateLimiter:
         max_attempts: int,
         window_seconds: int,
         lock_seconds: int,
+        permits: int = 1,
     ) -> InMemoryRateLimitDecision:
         _validate_rate_limit_params(
             key=key,
             max_attempts=max_attempts,
             window_seconds=window_seconds,
             lock_seconds=lock_seconds,
+            permits=permits,
         )
 
         now = monotonic()
@@ -74,14 +78,22 @@ class InMemorySlidingWindowRateLimiter:
                     )
                 state.lock_until = None
 
-            if len(state.attempts) >= max_attempts:
+            if len(state.attempts) < max_attempts < len(state.attempts) + permits:
+                # Refused only for asking more than remains: wait until enough attempts age out, no lockout.
+                freeing_attempt = state.attempts[len(state.attempts) + permits - max_attempts - 1]
+                return InMemoryRateLimitDecision(
+                    allowed=False,
+                    retry_after_seconds=self._retry_after_seconds(freeing_attempt + window_seconds, now),
+                )
+
+            if len(state.attempts) + permits > max_attempts:
                 state.lock_until = now + lock_seconds
                 return InMemoryRateLimitDecision(
                     allowed=False,
                     retry_after_seconds=lock_seconds,
                 )
 
-            state.attempts.append(now)
+            state.attempts.extend(repeat(now, permits))
             return InMemoryRateLimitDecision(allowed=True, retry_after_seconds=None)
 
     def reset(self) -> None:
@@ -109,6 +121,7 @@ local max_attempts = tonumber(ARGV[3])
 local lock_ms = tonumber(ARGV[4])
 local member = ARGV[5]
 local data_ttl_ms = tonumber(ARGV[6])
+local permits = tonumber(ARGV[7] or '1')
 
 local lock_ttl = redis.call('PTTL', lock_key)
 if lock_ttl > 0 then
@@ -117,13 +130,19 @@ end
 
 redis.call('ZREMRANGEBYSCORE', attempts_key, '-inf', now_ms - window_ms)
 local count = redis.call('ZCARD', attempts_key)
-if count >= max_attempts then
+if count < max_attempts and count + permits > max_attempts then
+  local freeing = redis.call('ZRANGE', attempts_key, count + permits - max_attempts - 1, count + permits - max_attempts - 1, 'WITHSCORES')
+  return {0, math.max(1, tonumber(freeing[2]) + window_ms - now_ms)}
+end
+if count + permits > max_attempts then
   redis.call('PSETEX', lock_key, lock_ms, '1')
   redis.call('PEXPIRE', attempts_key, data_ttl_ms)
   return {0, lock_ms}
 end
 
-redis.call('ZADD', attempts_key, now_ms, member)
+for index = 1, permits do
+  redis.call('ZADD', attempts_key, now_ms, member .. ':' .. index)
+end
 redis.call('PEXPIRE', attempts_key, data_ttl_ms)
 return {1, 0}
 """.strip()
@@ -141,12 +160,14 @@ return {1, 0}
         max_attempts: int,
         window_seconds: int,
         lock_seconds: int,
+        permits: int = 1,
     ) -> InMemoryRateLimitDecision:
         _validate_rate_limit_params(
             key=key,
             max_attempts=max_attempts,
             window_seconds=window_seconds,
             lock_seconds=lock_seconds,
+            permits=permits,
         )
 
         normalized_key = key.strip()
@@ -163,7 +184,7 @@ return {1, 0}
 
         result = self._script(
             keys=[attempts_key, lock_key],
-            args=[now_ms, window_ms, max_attempts, lock_ms, member, data_ttl_ms],
+            args=[now_ms, window_ms, max_attempts, lock_ms, member, data_ttl_ms, permits],
         )
         allowed = bool(int(result[0]))
         retry_after_ms = int(result[1])
@@ -200,6 +221,7 @@ class DistributedSlidingWindowRateLimiter:
         max_attempts: int,
         window_seconds: int,
         lock_seconds: int,
+        permits: int = 1,
     ) -> InMemoryRateLimitDecision:
         backend = self._select_backend()
         try:
@@ -208,6 +230,7 @@ class DistributedSlidingWindowRateLimiter:
                 max_attempts=max_attempts,
                 window_seconds=window_seconds,
                 lock_seconds=lock_seconds,
+                permits=permits,
             )
         except Exception:
             # Keep service availability even if Redis is transiently unavailable.
@@ -216,6 +239,7 @@ class DistributedSlidingWindowRateLimiter:
                 max_attempts=max_attempts,
                 window_seconds=window_seconds,
                 lock_seconds=lock_seconds,
+                permits=permits,
             )
 
     def reset(self) -> None:
@@ -292,6 +316,7 @@ def _validate_rate_limit_params(
     max_attempts: int,
     window_seconds: int,
     lock_seconds: int,
+    permits: int = 1,
 ) -> None:
     normalized_key = key.strip()
     if not normalized_key:
@@ -302,6 +327,10 @@ def _validate_rate_limit_params(
         raise ValueError("window_seconds must be at least 1.")
     if lock_seconds < 1:
         raise ValueError("lock_seconds must be at least 1.")
+    if permits < 1:
+        raise ValueError("permits must be at least 1.")
+    if permits > max_attempts:
+        raise ValueError("permits must not exceed max_attempts.")
 
 
 auth_rate_limiter = DistributedSlidingWindowRateLimiter(scope="auth")
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from time import perf_counter
+
+
+class CommandBudget:
+    """Cooperative per-command limits on nodes visited, bytes scanned and active wall time.
+
+    Filesystem traversals call ``charge`` as they go and stop early once it
+    returns ``False``; the first limit hit is kept in ``exceeded``. Wall time
+    only accrues between ``resume`` and ``pause``, so time a paged command
+    spends waiting for the client to fetch its next page is not counted.
+    Bytes are counted as characters of file content, which is exact for the
+    ASCII text labs ship.
+    """
+
+    __slots__ = (
+        "max_nodes",
+        "max_bytes",
+        "max_seconds",
+        "nodes_visited",
+        "bytes_scanned",
+        "exceeded",
+        "_elapsed",
+        "_resumed_at",
+        "_on_finish",
+    )
+
+    def __init__(
+        self,
+        *,
+        max_nodes: int,
+        max_bytes: int,
+        max_seconds: float,
+        on_finish: Callable[[str, CommandBudget], None] | None = None,
+    ) -> None:
+        self.max_nodes = max_nodes
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.nodes_visited = 0
+        self.bytes_scanned = 0
+        self.exceeded: str | None = None
+        self._elapsed = 0.0
+        self._resumed_at: float | None = None
+        self._on_finish = on_finish
+
+    @property
+    def elapsed_seconds(self) -> float:
+        if self._resumed_at is None:
+            return self._elapsed
+        return self._elapsed + perf_counter() - self._resumed_at
+
+    def charge(self, *, nodes: int = 0, bytes_scanned: int = 0) -> bool:
+        if self.exceeded is not None:
+            return False
+        self.nodes_visited += nodes
+        self.bytes_scanned += bytes_scanned
+        if self.nodes_visited > self.max_nodes:
+            self.exceeded = "nodes"
+        elif self.bytes_scanned > self.max_bytes:
+            self.exceeded = "bytes"
+        elif self.elapsed_seconds > self.max_seconds:
+            self.exceeded = "time"
+        return self.exceeded is None
+
+    def resume(self) -> None:
+        if self._resumed_at is None:
+            self._resumed_at = perf_counter()
+
+    def pause(self) -> None:
+        if self._resumed_at is not None:
+            self._elapsed += perf_counter() - self._resumed_at
+            self._resumed_at = None
+
+    def exceeded_message(self, command: str) -> str:
+        if self.exceeded == "nodes":
+            limit = f"visiting {self.max_nodes} filesystem entries"
+        elif self.exceeded == "bytes":
+            limit = f"scanning {self.max_bytes} bytes"
+        else:
+            limit = f"{self.max_seconds:g}s"
+        return f"{command}: output truncated after {limit} (command budget exceeded)"
+
+    def finish(self, command: str) -> None:
+        self.pause()
+        if self._on_finish is not None:
+            on_finish, self._on_finish = self._on_finish, None
+            try:
+                on_finish(command, self)
+            except Exception:
+                # Reporting is best effort: abandoned output can be closed by the GC as late as interpreter shutdown.
+                return
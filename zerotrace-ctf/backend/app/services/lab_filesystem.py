@@ -0,0 +1,716 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from functools import lru_cache
+from heapq import merge
+from itertools import chain
+import posixpath
+import sys
+
+from app.services.lab_command_budget import CommandBudget
+from app.services.lab_generators import GeneratedContent, generated_content_cache
+
+
+def normalize_lab_path(path: str) -> str:
+    normalized = posixpath.normpath(path.strip() or "/")
+    if not normalized.startswith("/"):
+        normalized = f"/{normalized}"
+    return normalized or "/"
+
+
+@dataclass(frozen=True, slots=True)
+class MappedContent:
+    """A file's UTF-8 bytes inside a shared read-only buffer (a compiled lab snapshot), decoded on read."""
+
+    buffer: memoryview
+    start: int
+    end: int
+
+    @property
+    def size_bytes(self) -> int:
+        return self.end - self.start
+
+    def decode(self) -> str:
+        return str(self.buffer[self.start : self.end], "utf-8")
+
+
+FileContent = str | MappedContent | GeneratedContent
+
+
+@dataclass(slots=True, eq=False)
+class VfsNode:
+    name: str
+    path: str
+    is_dir: bool
+    content: FileContent | None = None
+    children: list[VfsNode] = field(default_factory=list)
+    # UTF-8 bytes of a file, or of every file below a directory within its own layer. ``None`` until
+    # first asked for when generated content is involved, since knowing it means generating the file.
+    size: int | None = None
+
+    def text(self) -> str:
+        content = self.content
+        if content is None:
+            return ""
+        return content if isinstance(content, str) else content.decode()
+
+    def size_bytes(self) -> int:
+        size = self.size
+        if size is None:
+            if self.is_dir:
+                size = sum(child.size_bytes() for child in self.children)
+            else:
+                size = _content_size(self.content) if self.content is not None else 0
+            self.size = size
+        return size
+
+
+@dataclass(frozen=True, slots=True)
+class FileLines:
+    """A file split exactly like ``str.splitlines()``, with each line's offset into the content."""
+
+    lines: tuple[str, ...]
+    starts: tuple[int, ...]
+
+    @classmethod
+    def from_content(cls, content: str) -> FileLines:
+        starts: list[int] = []
+        offset = 0
+        for line in content.splitlines(keepends=True):
+            starts.append(offset)
+            offset += len(line)
+        return cls(lines=tuple(content.splitlines()), starts=tuple(starts))
+
+
+class FilesystemLayer:
+    """Immutable index over one flat ``{path: content}`` mapping.
+
+    A layer owns a node tree with sorted children plus sorted arrays of every
+    directory and file path; any subtree is a contiguous range of those arrays.
+    Layers never change after construction, so one base layer is shared by
+    every lab built on top of it.
+    """
+
+    _MAX_CACHED_NAME_GLOBS = 128
+
+    def __init__(self, files: Mapping[str, FileContent]) -> None:
+        self.root = VfsNode(name="", path="/", is_dir=True)
+        self.nodes: dict[str, VfsNode] = {"/": self.root}
+        for raw_path, content in files.items():
+            self._add_file(normalize_lab_path(raw_path), content)
+
+        directory_paths: list[str] = []
+        file_paths: list[str] = []
+        self.paths_by_name: dict[str, list[str]] = {}
+        for path, node in self.nodes.items():
+            if node.is_dir:
+                node.children.sort(key=lambda child: child.name)
+            if node is self.root:
+                continue
+            (directory_paths if node.is_dir else file_paths).append(path)
+            self.paths_by_name.setdefault(node.name, []).append(path)
+
+        self.directory_paths = sorted(directory_paths)
+        self.file_paths = sorted(file_paths)
+        self.generated_paths = frozenset(
+            path for path in self.file_paths if isinstance(self.nodes[path].content, GeneratedContent)
+        )
+        # Deepest directories first, so every child total is final before its parent sums it. A
+        # directory holding generated content keeps ``None`` and totals itself on first use.
+        for path in sorted(self.directory_paths, key=lambda path: path.count("/"), reverse=True):
+            self._total_children(self.nodes[path])
+        self._total_children(self.root)
+        self._name_glob_matches: dict[str, tuple[str, ...]] = {}
+        self._file_lines: dict[str, FileLines] = {}
+        self._trigram_postings: dict[str, frozenset[str]] | None = None
+
+    def subtree_range(self, sorted_paths: list[str], directory: str) -> list[str]:
+        low, high = self._subtree_bounds(sorted_paths, directory)
+        return sorted_paths[low:high]
+
+    def subtree_size(self, directory: str) -> int:
+        size = 0
+        for sorted_paths in (self.directory_paths, self.file_paths):
+            low, high = self._subtree_bounds(sorted_paths, directory)
+            size += high - low
+        return size
+
+    def names_matching(self, name_glob: str) -> tuple[str, ...]:
+        cached = self._name_glob_matches.get(name_glob)
+        if cached is not None:
+            return cached
+        matches = tuple(name for name in self.paths_by_name if fnmatch(name, name_glob))
+        if len(self._name_glob_matches) >= self._MAX_CACHED_NAME_GLOBS:
+            self._name_glob_matches.clear()
+        self._name_glob_matches[name_glob] = matches
+        return matches
+
+    def has_cached_glob(self, name_glob: str) -> bool:
+        return name_glob in self._name_glob_matches
+
+    def file_lines(self, path: str) -> FileLines:
+        cached = self._file_lines.get(path)
+        if cached is None:
+            cached = FileLines.from_content(self.nodes[path].text())
+            # Generated text lives in its own size-capped cache; keeping its lines here would bypass the cap.
+            if path not in self.generated_paths:
+                self._file_lines[path] = cached
+        return cached
+
+    @property
+    def has_trigram_index(self) -> bool:
+        return self._trigram_postings is not None
+
+    def files_containing(self, literal: str) -> frozenset[str] | None:
+        """Files whose content holds every trigram of ``literal``; ``None`` if it is too short to filter.
+
+        The result is a superset of the files that contain ``literal``. The
+        trigram index is built on first use and kept for the layer's lifetime.
+        Generated files are left out of the index and always returned, so it
+        never forces them into memory.
+        """
+        if len(literal) < 3:
+            return None
+        postings = self._trigram_postings
+        if postings is None:
+            postings = self._trigram_postings = self._build_trigram_postings()
+        trigram_sets = sorted(
+            (postings.get(literal[index : index + 3], frozenset()) for index in range(len(literal) - 2)),
+            key=len,
+        )
+        candidates = trigram_sets[0]
+        for paths in trigram_sets[1:]:
+            if not candidates:
+                break
+            candidates = candidates & paths
+        return candidates | self.generated_paths
+
+    def approximate_size_bytes(self) -> int:
+        """Rough retained size of this layer's own structures and strings."""
+        seen: set[int] = set()
+
+        def sized(value: object) -> int:
+            if id(value) in seen:
+                return 0
+            seen.add(id(value))
+            return sys.getsizeof(value)
+
+        total = sized(self.nodes) + sized(self.paths_by_name)
+        total += sized(self.directory_paths) + sized(self.file_paths)
+        for node in self.nodes.values():
+            total += sized(node) + sized(node.children) + sized(node.name) + sized(node.path)
+            if node.content is not None:
+                total += sized(node.content)
+        for paths in self.paths_by_name.values():
+            total += sized(paths)
+        return total
+
+    def __len__(self) -> int:
+        return len(self.file_paths)
+
+    def _build_trigram_postings(self) -> dict[str, frozenset[str]]:
+        postings: dict[str, set[str]] = {}
+        for path in self.file_paths:
+            if path in self.generated_paths:
+                continue
+            content = self.nodes[path].text()
+            for trigram in {content[index : index + 3] for index in range(len(content) - 2)}:
+                postings.setdefault(trigram, set()).add(path)
+        return {trigram: frozenset(paths) for trigram, paths in postings.items()}
+
+    def _add_file(self, path: str, content: FileContent) -> None:
+        existing = self.nodes.get(path)
+        if existing is not None:
+            if not existing.is_dir:
+                existing.content = content
+                existing.size = _known_size(content)
+            return
+
+        parent = self._ensure_directory(posixpath.dirname(path))
+        node = VfsNode(
+            name=sys.intern(posixpath.basename(path)),
+            path=sys.intern(path),
+            is_dir=False,
+            content=content,
+            size=_known_size(content),
+        )
+        parent.children.append(node)
+        self.nodes[node.path] = node
+
+    @staticmethod
+    def _total_children(directory: VfsNode) -> None:
+        sizes = [child.size for child in directory.children]
+        directory.size = None if None in sizes else sum(sizes)
+
+    def _ensure_directory(self, path: str) -> VfsNode:
+        node = self.nodes.get(path)
+        if node is not None and node.is_dir:
+            return node
+
+        parent = self._ensure_directory(posixpath.dirname(path))
+        if node is not None:
+            # A path used both as a file and as a parent directory resolves to the directory.
+            parent.children.remove(node)
+        directory = VfsNode(name=sys.intern(posixpath.basename(path)), path=sys.intern(path), is_dir=True)
+        parent.children.append(directory)
+        self.nodes[directory.path] = directory
+        return directory
+
+    @staticmethod
+    def _subtree_bounds(sorted_paths: list[str], directory: str) -> tuple[int, int]:
+        # Paths under "dir/" sort between "dir/" and "dir0" because "0" follows "/".
+        prefix = "/" if directory == "/" else f"{directory}/"
+        return bisect_left(sorted_paths, prefix), bisect_left(sorted_paths, f"{prefix[:-1]}0")
+
+
+EMPTY_LAYER = FilesystemLayer({})
+
+
+class VirtualFilesystem:
+    """Read-only lab filesystem: a shared base layer seen through a per-lab overlay.
+
+    Overlay entries win over base entries at the same path, and an overlay file
+    placed where the base has a directory hides that whole base subtree, which
+    matches how overlays are merged onto the base tree. ``ls`` costs
+    O(children) and subtree walks O(log n + subtree); memory per lab is the
+    overlay plus permission overrides, never a copy of the base. Byte sizes
+    are node lookups: layers total their own subtrees bottom-up, and the few
+    directories an overlay touches get a merged total on first use.
+    """
+
+    _GREP_INDEX_MIN_SUBTREE = 256
+
+    def __init__(
+        self,
+        files: Mapping[str, FileContent],
+        permissions: Mapping[str, str] | None = None,
+        *,
+        base: FilesystemLayer | None = None,
+    ) -> None:
+        self._base = base if base is not None else EMPTY_LAYER
+        self._overlay = FilesystemLayer(files)
+        self._hidden_base_dirs = tuple(
+            path
+            for path, node in self._overlay.nodes.items()
+            if not node.is_dir and path in self._base.nodes and self._base.nodes[path].is_dir
+        )
+        self._shadowed_base_paths = sorted(
+            path
+            for path, node in self._overlay.nodes.items()
+            if path != "/" and path in self._base.nodes and not (node.is_dir and self._base.nodes[path].is_dir)
+        )
+        self._merged_directory_sizes: dict[str, int] = {}
+        self._modes: dict[str, int] = {}
+        for raw_path, raw_mode in (permissions or {}).items():
+            normalized_path = self.normalize_path(raw_path)
+            if not self.exists(normalized_path):
+                continue
+            parsed_mode = self._parse_permission_mode(raw_mode)
+            if parsed_mode is None:
+                continue
+            self._modes[normalized_path] = parsed_mode
+
+    @property
+    def overlay(self) -> FilesystemLayer:
+        return self._overlay
+
+    @property
+    def base(self) -> FilesystemLayer:
+        return self._base
+
+    @staticmethod
+    def normalize_path(path: str) -> str:
+        return normalize_lab_path(path)
+
+    def resolve(self, cwd: str, target: str) -> str:
+        if target.startswith("/"):
+            return self.normalize_path(target)
+        return self.normalize_path(posixpath.join(cwd, target))
+
+    def exists(self, path: str) -> bool:
+        return self._lookup(self.normalize_path(path)) is not None
+
+    def is_file(self, path: str) -> bool:
+        node = self._lookup(self.normalize_path(path))
+        return node is not None and not node.is_dir
+
+    def is_dir(self, path: str) -> bool:
+        node = self._lookup(self.normalize_path(path))
+        return node is not None and node.is_dir
+
+    def read_file(self, path: str) -> str:
+        node = self._lookup(self.normalize_path(path))
+        if node is None or node.is_dir:
+            raise KeyError(path)
+        return node.text()
+
+    def iter_file_lines(self, path: str, *, budget: CommandBudget | None = None) -> Iterator[str]:
+        """The file's lines without newlines, the final newline ending the last line rather than starting another.
+
+        Generated files are produced a line at a time instead of rendered
+        whole. Opening the file is charged to ``budget`` as one node and each
+        line as its length, and the lines stop once the budget runs out.
+        """
+        node = self._lookup(self.normalize_path(path))
+        if node is None or node.is_dir:
+            raise KeyError(path)
+        if budget is not None and not budget.charge(nodes=1):
+            return
+        content = node.content
+        if isinstance(content, GeneratedContent):
+            lines = generated_content_cache.lines_of(content)
+        else:
+            text = node.text()
+            lines = iter(text.removesuffix("\n").split("\n") if text else ())
+        for line in lines:
+            if budget is not None and not budget.charge(bytes_scanned=len(line) + 1):
+                return
+            yield line
+
+    def file_size_bytes(self, path: str) -> int:
+        node = self._lookup(self.normalize_path(path))
+        if node is None or node.is_dir:
+            raise KeyError(path)
+        return node.size_bytes()
+
+    def disk_usage(self, path: str) -> int:
+        """Bytes of ``path``, or of every file visible below it, as ``iter_files_under(recursive=True)`` lists them."""
+        normalized = self.normalize_path(path)
+        node = self._lookup(normalized)
+        if node is None:
+            raise KeyError(path)
+        if not node.is_dir or normalized not in self._overlay.nodes:
+            return node.size_bytes()
+        return self._merged_directory_size(normalized, node)
+
+    def list_dir(self, path: str, show_all: bool) -> list[str]:
+        visible = [
+            child.name
+            for child in self._children(self.normalize_path(path))
+            if show_all or not child.name.startswith(".")
+        ]
+        if show_all:
+            return [".", "..", *visible]
+        return visible
+
+    def iter_files_under(self, path: str, recursive: bool, *, budget: CommandBudget | None = None) -> Iterator[str]:
+        """Files at or below ``path`` in path order, produced (and charged) as they are consumed."""
+        normalized = self.normalize_path(path)
+        node = self._lookup(normalized)
+        if node is None:
+            return iter(())
+        if not node.is_dir:
+            return iter((normalized,))
+        if not recursive:
+            return _within_budget((child.path for child in self._children(normalized) if not child.is_dir), budget)
+        return _within_budget(self._merged_range(normalized, directories=False), budget)
+
+    def walk(self, path: str, *, budget: CommandBudget | None = None) -> Iterator[str]:
+        """``path``, then every directory and every file below it, each charged to ``budget`` as it is consumed."""
+        normalized = self.normalize_path(path)
+        node = self._lookup(normalized)
+        if node is None:
+            return iter(())
+        if not node.is_dir:
+            return iter((normalized,))
+        return _within_budget(
+            chain(
+                (normalized,),
+                self._merged_range(normalized, directories=True),
+                self._merged_range(normalized, directories=False),
+            ),
+            budget,
+        )
+
+    def find(
+        self,
+        path: str,
+        *,
+        name_glob: str | None = None,
+        type_filter: str | None = None,
+        budget: CommandBudget | None = None,
+    ) -> Iterator[str]:
+        """Return ``walk(path)`` filtered by basename glob and node type, in the same order.
+
+        With a name glob the per-layer basename index is consulted instead of
+        the subtree whenever that is cheaper, so directories without a matching
+        name are never visited. A subtree walk is lazy, so a consumer that
+        stops early stops the traversal; index matches are sorted, so that
+        branch gathers them all first.
+        """
+        normalized = self.normalize_path(path)
+        node = self._lookup(normalized)
+        if node is None:
+            return iter(())
+
+        subtree_size = 1
+        if node.is_dir:
+            subtree_size += self._overlay.subtree_size(normalized) + self._base.subtree_size(normalized)
+        index_size = len(self._overlay.paths_by_name) + len(self._base.paths_by_name)
+        use_index = name_glob is not None and (
+            self._overlay.has_cached_glob(name_glob)
+            or self._base.has_cached_glob(name_glob)
+            or subtree_size > index_size
+        )
+        if not use_index:
+            return (
+                candidate
+                for candidate in self.walk(normalized, budget=budget)
+                if self._matches_type(candidate, type_filter)
+                and (name_glob is None or fnmatch(posixpath.basename(candidate), name_glob))
+            )
+
+        prefix = "/" if normalized == "/" else f"{normalized}/"
+        directories: list[str] = []
+        files: list[str] = []
+        for candidate in self._indexed_paths(name_glob):
+            if budget is not None and not budget.charge(nodes=1):
+                break
+            if candidate == normalized or not candidate.startswith(prefix):
+                continue
+            if self._lookup(candidate).is_dir:
+                directories.append(candidate)
+            else:
+                files.append(candidate)
+
+        results: list[str] = []
+        if self._matches_type(normalized, type_filter) and fnmatch(posixpath.basename(normalized), name_glob):
+            results.append(normalized)
+        if type_filter != "f":
+            results.extend(sorted(directories))
+        if type_filter != "d":
+            results.extend(sorted(files))
+        return iter(results)
+
+    def grep(
+        self,
+        path: str,
+        pattern: str,
+        *,
+        recursive: bool,
+        budget: CommandBudget | None = None,
+    ) -> list[tuple[str, int, str]]:
+        """Return ``(file, line_no, line)`` for every line containing the literal ``pattern``.
+
+        Results follow ``iter_files_under(path, recursive)`` order and match a
+        ``pattern in line`` scan over ``splitlines()``; recursive searches only
+        open files the trigram index cannot rule out. Each opened file is
+        charged to ``budget`` as one node plus its length, generated files a
+        line at a time as they are produced, and the scan stops with the
+        matches found so far once the budget runs out.
+        """
+        return list(self.iter_grep(path, pattern, recursive=recursive, budget=budget))
+
+    def iter_grep(
+        self,
+        path: str,
+        pattern: str,
+        *,
+        recursive: bool,
+        budget: CommandBudget | None = None,
+    ) -> Iterator[tuple[str, int, str]]:
+        """Lazy ``grep``: a file is only opened (and charged) once the matches before it are consumed."""
+        normalized = self.normalize_path(path)
+        node = self._lookup(normalized)
+        if node is None or not pattern:
+            return
+
+        candidates: Iterable[str] | None = None
+        if node.is_dir and recursive and self._should_use_trigram_index(normalized):
+            candidates = self._grep_candidates(normalized, pattern)
+        if candidates is None:
+            candidates = self.iter_files_under(normalized, recursive=recursive)
+
+        for file_path in candidates:
+            layer = self._overlay if file_path in self._overlay.nodes else self._base
+            if file_path in layer.generated_paths:
+                # Scanned as it is generated, so the budget bounds the generation itself, not just the scan.
+                for line_no, line in enumerate(self.iter_file_lines(file_path, budget=budget), start=1):
+                    if pattern in line:
+                        yield file_path, line_no, line
+                if budget is not None and budget.exceeded is not None:
+                    return
+                continue
+            if budget is not None and not budget.charge(nodes=1, bytes_scanned=len(self.read_file(file_path))):
+                return
+            yield from self._matching_lines(file_path, pattern)
+
+    def permission_bits(self, path: str) -> int:
+        normalized = self.normalize_path(path)
+        mode = self._modes.get(normalized)
+        if mode is not None:
+            return mode
+        node = self._lookup(normalized)
+        return 0o755 if node is not None and node.is_dir else 0o644
+
+    def permission_string(self, path: str) -> str:
+        normalized = self.normalize_path(path)
+        return _cached_permission_string(self.permission_bits(normalized), self.is_dir(normalized))
+
+    def _merged_directory_size(self, directory: str, node: VfsNode) -> int:
+        # Only directories present in the overlay can differ from their base totals: overlay plus
+        # base, less every base node the overlay shadows below it, whether a replaced file or a
+        # subtree hidden by an overlay file. Totals are memoized, so each costs one pass at most.
+        size = self._merged_directory_sizes.get(directory)
+        if size is None:
+            size = node.size_bytes()
+            base_node = self._base.nodes.get(directory)
+            if base_node is not None and base_node.is_dir:
+                size += base_node.size_bytes()
+            shadowed = self._overlay.subtree_range(self._shadowed_base_paths, directory)
+            size -= sum(self._base.nodes[path].size_bytes() for path in shadowed)
+            self._merged_directory_sizes[directory] = size
+        return size
+
+    def _lookup(self, path: str) -> VfsNode | None:
+        node = self._overlay.nodes.get(path)
+        if node is not None:
+            return node
+        if self._is_hidden_base_path(path):
+            return None
+        return self._base.nodes.get(path)
+
+    def _is_base_path_visible(self, path: str) -> bool:
+        return path not in self._overlay.nodes and not self._is_hidden_base_path(path)
+
+    def _is_hidden_base_path(self, path: str) -> bool:
+        return any(path.startswith(f"{hidden}/") for hidden in self._hidden_base_dirs)
+
+    def _children(self, path: str) -> list[VfsNode]:
+        overlay_node = self._overlay.nodes.get(path)
+        base_node = None if self._is_hidden_base_path(path) else self._base.nodes.get(path)
+        overlay_children = overlay_node.children if overlay_node is not None and overlay_node.is_dir else []
+        if base_node is None or not base_node.is_dir or (overlay_node is not None and not overlay_node.is_dir):
+            return overlay_children
+        if not overlay_children:
+            return base_node.children
+
+        children: list[VfsNode] = []
+        # Overlay children come first on equal names, so they shadow base entries.
+        for child in merge(overlay_children, base_node.children, key=lambda node: node.name):
+            if children and children[-1].name == child.name:
+                continue
+            children.append(child)
+        return children
+
+    def _merged_range(self, directory: str, *, directories: bool) -> Iterator[str]:
+        overlay_paths = self._overlay.directory_paths if directories else self._overlay.file_paths
+        base_paths = self._base.directory_paths if directories else self._base.file_paths
+        overlay_range = self._overlay.subtree_range(overlay_paths, directory)
+        if not base_paths or self._is_hidden_base_path(directory):
+            return iter(overlay_range)
+        base_range: Iterable[str] = (
+            path for path in self._base.subtree_range(base_paths, directory) if self._is_base_path_visible(path)
+        )
+        return merge(overlay_range, base_range)
+
+    def _should_use_trigram_index(self, directory: str) -> bool:
+        # Building a layer's index costs a full pass over its content, so small subtrees are
+        # scanned directly until some larger search has paid for the index.
+        if self._overlay.has_trigram_index and (self._base.has_trigram_index or not self._base.file_paths):
+            return True
+        subtree_size = self._overlay.subtree_size(directory) + self._base.subtree_size(directory)
+        return subtree_size >= self._GREP_INDEX_MIN_SUBTREE
+
+    def _grep_candidates(self, directory: str, pattern: str) -> list[str] | None:
+        overlay_files = self._overlay.files_containing(pattern)
+        base_files = self._base.files_containing(pattern) if self._base.file_paths else frozenset()
+        if overlay_files is None or base_files is None:
+            return None
+        prefix = "/" if directory == "/" else f"{directory}/"
+        candidates = [candidate for candidate in overlay_files if candidate.startswith(prefix)]
+        candidates.extend(
+            candidate
+            for candidate in base_files
+            if candidate.startswith(prefix) and self._is_base_path_visible(candidate)
+        )
+        # Plain path order is exactly the order of the merged file range walked without an index.
+        candidates.sort()
+        return candidates
+
+    def _matching_lines(self, file_path: str, pattern: str) -> Iterator[tuple[str, int, str]]:
+        layer = self._overlay if file_path in self._overlay.nodes else self._base
+        content = layer.nodes[file_path].text()
+        position = content.find(pattern)
+        if position == -1:
+            return
+        file_lines = layer.file_lines(file_path)
+        while position != -1:
+            line_index = bisect_right(file_lines.starts, position) - 1
+            line = file_lines.lines[line_index]
+            # A hit that runs past the line's end spans a line break, which a per-line scan never matches.
+            if position + len(pattern) <= file_lines.starts[line_index] + len(line):
+                yield file_path, line_index + 1, line
+            if line_index + 1 >= len(file_lines.starts):
+                return
+            position = content.find(pattern, file_lines.starts[line_index + 1])
+
+    def _indexed_paths(self, name_glob: str) -> Iterator[str]:
+        for name in self._overlay.names_matching(name_glob):
+            yield from self._overlay.paths_by_name[name]
+        for name in self._base.names_matching(name_glob):
+            for candidate in self._base.paths_by_name[name]:
+                if self._is_base_path_visible(candidate):
+                    yield candidate
+
+    def _matches_type(self, path: str, type_filter: str | None) -> bool:
+        if type_filter is None:
+            return True
+        is_dir = self._lookup(path).is_dir
+        return is_dir if type_filter == "d" else not is_dir
+
+    @staticmethod
+    def _parse_permission_mode(raw_mode: str) -> int | None:
+        candidate = str(raw_mode).strip()
+        if not candidate:
+            return None
+        try:
+            if candidate.startswith("0o"):
+                return int(candidate, 8)
+            return int(candidate, 8)
+        except ValueError:
+            return None
+
+    @classmethod
+    def _render_permission_string(cls, bits: int, *, is_dir: bool) -> str:
+        file_type = "d" if is_dir else "-"
+        user = cls._triplet((bits >> 6) & 0b111, execute_special=bits & 0o4000, special_char="s")
+        group = cls._triplet((bits >> 3) & 0b111, execute_special=bits & 0o2000, special_char="s")
+        other = cls._triplet(bits & 0b111, execute_special=bits & 0o1000, special_char="t")
+        return f"{file_type}{user}{group}{other}"
+
+    @staticmethod
+    def _triplet(value: int, *, execute_special: int, special_char: str) -> str:
+        read = "r" if value & 0b100 else "-"
+        write = "w" if value & 0b010 else "-"
+        execute = "x" if value & 0b001 else "-"
+        if execute_special:
+            execute = special_char if execute == "x" else special_char.upper()
+        return f"{read}{write}{execute}"
+
+
+def _content_size(content: FileContent) -> int:
+    return len(content.encode("utf-8")) if isinstance(content, str) else content.size_bytes
+
+
+def _known_size(content: FileContent) -> int | None:
+    return None if isinstance(content, GeneratedContent) else _content_size(content)
+
+
+def _within_budget(paths: Iterable[str], budget: CommandBudget | None) -> Iterator[str]:
+    if budget is None:
+        yield from paths
+        return
+    for path in paths:
+        if not budget.charge(nodes=1):
+            return
+        yield path
+
+
+@lru_cache(maxsize=256)
+def _cached_permission_string(bits: int, is_dir: bool) -> str:
+    # Only a handful of distinct modes exist across all labs, so rendered strings are shared.
+    return VirtualFilesystem._render_permission_string(bits, is_dir=is_dir)
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from random import Random
+import sys
+from threading import Lock
+from typing import Any
+
+from app.core.settings import get_settings
+from app.observability.metrics import metrics
+
+# Overlay nodes holding this key are generator specs rather than directories.
+GENERATOR_KEY = "$generator"
+MAX_GENERATED_LINES = 1_000_000
+
+# Emits the ``process[pid]: message`` part of one line; the timestamp and host are added around it.
+MessageGenerator = Callable[[Random], str]
+
+# Upper bound on the characters a generator's message can have, used to bound a spec's text unrendered.
+MAX_MESSAGE_CHARS = 120
+# "Mmm dd hh:mm:ss " before the host, and the space after it.
+_LINE_OVERHEAD_CHARS = 17
+
+_EPOCH = datetime(2024, 1, 1)
+
+_CRON_COMMANDS = (
+    "(root) CMD (run-parts /etc/cron.hourly)",
+    "(root) CMD (test -x /usr/sbin/anacron || run-parts --report /etc/cron.daily)",
+    "(www-data) CMD (php /var/www/html/cron.php)",
+    "(backup) CMD (/usr/local/bin/backup.sh --incremental)",
+)
+_SYSTEMD_UNITS = ("nginx.service", "ssh.service", "cron.service", "rsyslog.service", "systemd-tmpfiles-clean.timer")
+_KERNEL_MESSAGES = (
+    "[UFW BLOCK] IN=eth0 OUT= SRC=203.0.113.{octet} DST=10.0.0.5 PROTO=TCP DPT={port}",
+    "EXT4-fs (sda1): re-mounted. Opts: errors=remount-ro",
+    "TCP: request_sock_TCP: Possible SYN flooding on port {port}. Sending cookies.",
+)
+_USERS = ("root", "admin", "deploy", "backup", "www-data", "oracle", "test", "ubuntu")
+
+
+def _syslog_message(rng: Random) -> str:
+    kind = rng.randrange(10)
+    pid = rng.randint(300, 32000)
+    if kind < 4:
+        return f"CRON[{pid}]: {rng.choice(_CRON_COMMANDS)}"
+    if kind < 7:
+        verb = rng.choice(("Started", "Stopping", "Finished", "Reloading"))
+        return f"systemd[1]: {verb} {rng.choice(_SYSTEMD_UNITS)}."
+    if kind < 9:
+        message = rng.choice(_KERNEL_MESSAGES)
+        return "kernel: " + message.format(octet=rng.randint(1, 254), port=rng.choice((22, 80, 443, 3306, 8080)))
+    return f"rsyslogd[{pid}]: action 'action-1-builtin:omfile' resumed (module 'builtin:omfile')"
+
+
+def _auth_log_message(rng: Random) -> str:
+    kind = rng.randrange(10)
+    pid = rng.randint(300, 32000)
+    address = f"198.51.100.{rng.randint(1, 254)}"
+    port = rng.randint(1024, 65535)
+    user = rng.choice(_USERS)
+    if kind < 5:
+        return f"sshd[{pid}]: Failed password for invalid user {user} from {address} port {port} ssh2"
+    if kind < 7:
+        return f"sshd[{pid}]: Connection closed by authenticating user {user} {address} port {port} [preauth]"
+    if kind < 9:
+        return f"CRON[{pid}]: pam_unix(cron:session): session opened for user {user} by (uid=0)"
+    return f"sudo: {user} : TTY=pts/0 ; PWD=/home/{user} ; USER=root ; COMMAND=/usr/bin/apt update"
+
+
+GENERATORS: Mapping[str, MessageGenerator] = {
+    "syslog": _syslog_message,
+    "auth_log": _auth_log_message,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class GeneratedContent:
+    """A file whose text is produced from a seeded generator on first read.
+
+    The spec is a few dozen bytes however long the file is. Equal specs
+    always yield identical text, so the text is cached process-wide by spec
+    (``generated_content_cache``) and can be evicted and rebuilt at will.
+    Needles are ``(line_number, message)`` pairs placed verbatim at those
+    1-based lines in place of generated noise.
+    """
+
+    generator: str
+    seed: int
+    lines: int
+    host: str = "lab-server"
+    needles: tuple[tuple[int, str], ...] = ()
+
+    @classmethod
+    def from_spec(cls, spec: Mapping[str, Any]) -> GeneratedContent | None:
+        """Parse an overlay generator node; ``None`` when it does not describe a valid generator."""
+        generator = spec.get(GENERATOR_KEY)
+        seed = spec.get("seed", 0)
+        lines = spec.get("lines")
+        host = spec.get("host", "lab-server")
+        raw_needles = spec.get("needles", [])
+        if generator not in GENERATORS or not isinstance(host, str) or not host.strip() or "\n" in host:
+            return None
+        if not _is_int(seed) or not _is_int(lines) or not 0 <= lines <= MAX_GENERATED_LINES:
+            return None
+        if not isinstance(raw_needles, list):
+            return None
+
+        needles: dict[int, str] = {}
+        for raw_needle in raw_needles:
+            if not isinstance(raw_needle, dict):
+                return None
+            line, message = raw_needle.get("line"), raw_needle.get("text")
+            if not _is_int(line) or not 1 <= line <= lines or not isinstance(message, str) or "\n" in message:
+                return None
+            needles[line] = message
+        content = cls(
+            generator=generator,
+            seed=seed,
+            lines=lines,
+            host=host.strip(),
+            needles=tuple(sorted(needles.items())),
+        )
+        max_bytes = get_settings().LAB_GENERATED_CONTENT_CACHE_MAX_BYTES
+        if max_bytes and content.max_retained_bytes() > max_bytes:
+            # Text the cache could never hold would be rebuilt in full by every read that needs all of it.
+            return None
+        return content
+
+    def to_spec(self) -> dict[str, Any]:
+        return {
+            GENERATOR_KEY: self.generator,
+            "seed": self.seed,
+            "lines": self.lines,
+            "host": self.host,
+            "needles": [{"line": line, "text": message} for line, message in self.needles],
+        }
+
+    @property
+    def size_bytes(self) -> int:
+        return generated_content_cache.size_of(self)
+
+    def decode(self) -> str:
+        return generated_content_cache.text_of(self)
+
+    def max_retained_bytes(self) -> int:
+        """An upper bound on the memory the rendered text retains, worked out without rendering it."""
+        line_overhead = _LINE_OVERHEAD_CHARS + len(self.host) + 1
+        chars = (self.lines - len(self.needles)) * (line_overhead + MAX_MESSAGE_CHARS)
+        chars += sum(line_overhead + len(message) for _, message in self.needles)
+        widest = max(map(ord, "".join([self.host, *(message for _, message in self.needles)])), default=0)
+        char_width = 1 if widest < 0x100 else 2 if widest < 0x10000 else 4
+        return sys.getsizeof("") + 32 + chars * char_width
+
+    def count_bytes(self) -> int:
+        """UTF-8 size of the text, streamed line by line so no more than one line is held at a time."""
+        return self.bytes_for_chars(sum(map(len, self.iter_lines())))
+
+    def bytes_for_chars(self, line_chars: int) -> int:
+        """UTF-8 size of the text given the characters of its lines, newlines excluded."""
+        # Noise is ASCII, so only the host and the needles can take more bytes than characters.
+        extra_bytes = (len(self.host.encode("utf-8")) - len(self.host)) * self.lines
+        extra_bytes += sum(len(message.encode("utf-8")) - len(message) for _, message in self.needles)
+        return line_chars + self.lines + extra_bytes
+
+    def iter_lines(self) -> Iterator[str]:
+        rng = Random(self.seed)
+        message = GENERATORS[self.generator]
+        needles = dict(self.needles)
+        day = _EPOCH + timedelta(days=rng.randrange(365))
+        seconds = rng.randrange(86400)
+        day_prefix = f"{day:%b} {day.day:>2}"
+        for line_number in range(1, self.lines + 1):
+            seconds += rng.randint(0, 40)
+            if seconds >= 86400:
+                elapsed_days, seconds = divmod(seconds, 86400)
+                day += timedelta(days=elapsed_days)
+                day_prefix = f"{day:%b} {day.day:>2}"
+            hours, remainder = divmod(seconds, 3600)
+            # Noise is drawn for needle lines too, so adding a needle never shifts the lines around it.
+            noise = message(rng)
+            yield (
+                f"{day_prefix} {hours:02d}:{remainder // 60:02d}:{remainder % 60:02d} {self.host} "
+                f"{needles.get(line_number, noise)}"
+            )
+
+    def render(self) -> str:
+        return "".join(f"{line}\n" for line in self.iter_lines())
+
+
+class GeneratedContentCache:
+    """Process-wide LRU of generated file text, capped at ``LAB_GENERATED_CONTENT_CACHE_MAX_BYTES``.
+
+    Entries are weighed by the memory their text retains; specs whose text
+    could exceed the cap are rejected when parsed, and 0 disables the cache.
+    Byte sizes are kept for the most recently used specs, so ``du`` and
+    ``ls -l`` rarely regenerate a file, and never render one just to size it.
+    """
+
+    _MAX_SIZES = 4096
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[GeneratedContent, str] = OrderedDict()
+        self._sizes: OrderedDict[GeneratedContent, int] = OrderedDict()
+        self._retained_bytes = 0
+        self._lock = Lock()
+
+    def text_of(self, content: GeneratedContent) -> str:
+        text = self._cached_text(content)
+        if text is not None:
+            return text
+
+        # Generated outside the lock; two threads racing on one spec produce the same text.
+        text = content.render()
+        metrics.increment("zerotrace_lab_generated_content_total", labels={"outcome": "generated"})
+        self._put(content, text)
+        return text
+
+    def lines_of(self, content: GeneratedContent) -> Iterator[str]:
+        """The file's lines, from cached text when present, otherwise generated one at a time without caching."""
+        text = self._cached_text(content)
+        if text is None:
+            return self._streamed_lines(content)
+        return iter(text.split("\n")[:-1])
+
+    def size_of(self, content: GeneratedContent) -> int:
+        with self._lock:
+            size = self._sizes.get(content)
+            if size is not None:
+                self._sizes.move_to_end(content)
+                return size
+        text = self._cached_text(content)
+        size = content.count_bytes() if text is None else len(text.encode("utf-8"))
+        self._put_size(content, size)
+        return size
+
+    @property
+    def retained_bytes(self) -> int:
+        with self._lock:
+            return self._retained_bytes
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._retained_bytes = 0
+
+    def _streamed_lines(self, content: GeneratedContent) -> Iterator[str]:
+        line_chars = 0
+        for line in content.iter_lines():
+            line_chars += len(line)
+            yield line
+        # A read to the end has done count_bytes' work; keeping the size spares du, ls -l and wc a second pass.
+        self._put_size(content, content.bytes_for_chars(line_chars))
+
+    def _cached_text(self, content: GeneratedContent) -> str | None:
+        with self._lock:
+            text = self._entries.get(content)
+            if text is not None:
+                self._entries.move_to_end(content)
+        return text
+
+    def _put(self, content: GeneratedContent, text: str) -> None:
+        max_bytes = get_settings().LAB_GENERATED_CONTENT_CACHE_MAX_BYTES
+        weight = sys.getsizeof(text)
+        evicted = 0
+        self._put_size(content, len(text.encode("utf-8")))
+        with self._lock:
+            if weight > max_bytes or content in self._entries:
+                return
+            self._entries[content] = text
+            self._retained_bytes += weight
+            while self._retained_bytes > max_bytes:
+                _, oldest = self._entries.popitem(last=False)
+                self._retained_bytes -= sys.getsizeof(oldest)
+                evicted += 1
+        if evicted:
+            metrics.increment("zerotrace_lab_generated_content_total", value=evicted, labels={"outcome": "evicted"})
+
+    def _put_size(self, content: GeneratedContent, size: int) -> None:
+        with self._lock:
+            self._sizes[content] = size
+            self._sizes.move_to_end(content)
+            # Specs from labs replaced by a hot reload are never asked for again; they age out here.
+            while len(self._sizes) > self._MAX_SIZES:
+                self._sizes.popitem(last=False)
+
+
+generated_content_cache = GeneratedContentCache()
+
+
+def _is_int(value: object) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from collections.abc import Iterator
+from dataclasses import dataclass
+import secrets
+from threading import Lock
+from time import monotonic
+
+from app.core.settings import get_settings
+from app.observability.metrics import metrics
+
+
+@dataclass(frozen=True, slots=True)
+class LabOutputPage:
+    output: str
+    cwd: str
+    exit_code: int
+    next_cursor: str | None
+
+    @property
+    def truncated(self) -> bool:
+        return self.next_cursor is not None
+
+
+class LabOutputReader:
+    """Reads a command's lazily produced lines in pages bounded by bytes and lines.
+
+    Each page keeps the newline that separates it from the next one, so the
+    pages concatenated are exactly the full output. A page ends on a line
+    boundary unless a single line is larger than the byte budget, in which
+    case that line is split and its remainder starts the next page. A budget
+    of at least 4 bytes always fits one character, so every read advances.
+    """
+
+    __slots__ = ("_lines", "_buffered")
+
+    def __init__(self, lines: Iterator[str]) -> None:
+        self._lines = lines
+        self._buffered: deque[str] = deque()
+
+    @property
+    def exhausted(self) -> bool:
+        return not self._fill(1)
+
+    def read(self, *, max_bytes: int, max_lines: int) -> str:
+        parts: list[str] = []
+        used_bytes = 0
+        while len(parts) < max_lines and self._fill(1):
+            line = self._buffered[0]
+            piece = line + "\n" if self._fill(2) else line
+            encoded = piece.encode("utf-8")
+            if used_bytes + len(encoded) <= max_bytes:
+                self._buffered.popleft()
+                parts.append(piece)
+                used_bytes += len(encoded)
+                continue
+
+            if not parts:
+                fitted = encoded[: max_bytes - used_bytes].decode("utf-8", errors="ignore")
+                parts.append(fitted)
+                self._buffered[0] = line[len(fitted) :]
+            break
+        return "".join(parts)
+
+    def _fill(self, count: int) -> bool:
+        while len(self._buffered) < count:
+            line = next(self._lines, None)
+            if line is None:
+                return False
+            self._buffered.append(line)
+        return True
+
+
+@dataclass(slots=True)
+class _PendingOutput:
+    reader: LabOutputReader
+    cwd: str
+    exit_code: int
+    owner: str | None
+    expires_at: float
+
+
+class LabOutputCursorStore:
+    """Per-process continuation cursors for truncated command output.
+
+    A cursor holds the command's live generator, so fetching the next page
+    resumes where the previous one stopped instead of re-running the command.
+    Cursors are single-use (every page returns a fresh one), bound to the
+    session that created them, and bounded by ``LAB_OUTPUT_MAX_CURSORS`` and
+    ``LAB_OUTPUT_CURSOR_TTL_SECONDS``.
+    """
+
+    def __init__(self) -> None:
+        self._pending: OrderedDict[str, _PendingOutput] = OrderedDict()
+        self._lock = Lock()
+
+    def first_page(self, lines: Iterator[str], *, cwd: str, exit_code: int, owner: str | None) -> LabOutputPage:
+        pending = _PendingOutput(
+            reader=LabOutputReader(lines),
+            cwd=cwd,
+            exit_code=exit_code,
+            owner=owner,
+            expires_at=0.0,
+        )
+        return self._read_page(pending)
+
+    def next_page(self, cursor: str, *, owner: str | None) -> LabOutputPage | None:
+        now = monotonic()
+        with self._lock:
+            pending = self._pending.get(cursor)
+            if pending is None or pending.owner != owner:
+                metrics.increment("zerotrace_lab_output_cursors_total", labels={"outcome": "missing"})
+                return None
+            del self._pending[cursor]
+            if pending.expires_at <= now:
+                metrics.increment("zerotrace_lab_output_cursors_total", labels={"outcome": "expired"})
+                return None
+        metrics.increment("zerotrace_lab_output_cursors_total", labels={"outcome": "resumed"})
+        # Read outside the lock: the cursor is already removed, so no other request can advance this generator.
+        return self._read_page(pending)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pending.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _read_page(self, pending: _PendingOutput) -> LabOutputPage:
+        settings = get_settings()
+        output = pending.reader.read(
+            max_bytes=settings.LAB_OUTPUT_PAGE_MAX_BYTES,
+            max_lines=settings.LAB_OUTPUT_PAGE_MAX_LINES,
+        )
+        next_cursor = None
+        if not pending.reader.exhausted:
+            next_cursor = self._store(pending)
+        return LabOutputPage(output=output, cwd=pending.cwd, exit_code=pending.exit_code, next_cursor=next_cursor)
+
+    def _store(self, pending: _PendingOutput) -> str:
+        settings = get_settings()
+        now = monotonic()
+        cursor = secrets.token_urlsafe(18)
+        pending.expires_at = now + settings.LAB_OUTPUT_CURSOR_TTL_SECONDS
+        with self._lock:
+            self._pending[cursor] = pending
+            while self._pending:
+                oldest_cursor, oldest = next(iter(self._pending.items()))
+                if oldest.expires_at > now and len(self._pending) <= settings.LAB_OUTPUT_MAX_CURSORS:
+                    break
+                del self._pending[oldest_cursor]
+                outcome = "expired" if oldest.expires_at <= now else "evicted"
+                metrics.increment("zerotrace_lab_output_cursors_total", labels={"outcome": outcome})
+        metrics.increment("zerotrace_lab_output_cursors_total", labels={"outcome": "created"})
+        return cursor
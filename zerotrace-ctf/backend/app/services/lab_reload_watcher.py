@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+import time
+
+from app.core.settings import get_settings
+from app.observability.logger import log_event
+from app.services.challenge_lab_service import ChallengeLabService
+
+
+@dataclass
+class LabReloadWatcherHandle:
+    task: asyncio.Task[None]
+
+
+def start_lab_reload_watcher(service: ChallengeLabService) -> LabReloadWatcherHandle | None:
+    settings = get_settings()
+    if not settings.LAB_RELOAD_WATCH_ENABLED:
+        return None
+
+    task = asyncio.create_task(_watch_loop(service), name="lab-reload-watcher")
+    log_event(
+        "lab_reload_watcher_started",
+        interval_seconds=settings.LAB_RELOAD_WATCH_INTERVAL_SECONDS,
+        debounce_seconds=settings.LAB_RELOAD_WATCH_DEBOUNCE_SECONDS,
+    )
+    return LabReloadWatcherHandle(task=task)
+
+
+async def stop_lab_reload_watcher(handle: LabReloadWatcherHandle | None) -> None:
+    if handle is None:
+        return
+    handle.task.cancel()
+    with suppress(asyncio.CancelledError):
+        await handle.task
+    log_event("lab_reload_watcher_stopped")
+
+
+async def _watch_loop(service: ChallengeLabService) -> None:
+    settings = get_settings()
+    source_paths = service.source_paths()
+    last_snapshot = _collect_snapshot(source_paths)
+    pending_change_since: float | None = None
+
+    while True:
+        await asyncio.sleep(settings.LAB_RELOAD_WATCH_INTERVAL_SECONDS)
+
+        current_snapshot = _collect_snapshot(source_paths)
+        if current_snapshot == last_snapshot:
+            pending_change_since = None
+            continue
+
+        now = time.monotonic()
+        if pending_change_since is None:
+            pending_change_since = now
+            continue
+        if now - pending_change_since < settings.LAB_RELOAD_WATCH_DEBOUNCE_SECONDS:
+            continue
+
+        changed_paths = _changed_paths(last_snapshot, current_snapshot)
+        try:
+            reloaded = await asyncio.to_thread(service.reload_changed_files, changed_paths)
+        except Exception as exc:
+            log_event(
+                "lab_reload_failed",
+                outcome="error",
+                error_type=type(exc).__name__,
+                changed_files=len(changed_paths),
+            )
+            pending_change_since = now
+            continue
+
+        log_event(
+            "lab_reload_applied",
+            outcome="ok",
+            changed_files=len(changed_paths),
+            reloaded_labs=reloaded,
+        )
+        last_snapshot = current_snapshot
+        pending_change_since = None
+
+
+def _changed_paths(
+    previous: dict[str, tuple[bool, int, int]],
+    current: dict[str, tuple[bool, int, int]],
+) -> list[Path]:
+    return [Path(path) for path in sorted({*previous, *current}) if previous.get(path) != current.get(path)]
+
+
+def _collect_snapshot(source_paths: tuple[Path, ...]) -> dict[str, tuple[bool, int, int]]:
+    snapshot: dict[str, tuple[bool, int, int]] = {}
+    for source in source_paths:
+        if source.is_dir():
+            for candidate in sorted(source.rglob("*.json")):
+                if candidate.is_file():
+                    snapshot[str(candidate)] = _stat_tuple(candidate)
+        else:
+            snapshot[str(source)] = _stat_tuple(source)
+    return snapshot
+
+
+def _stat_tuple(path: Path) -> tuple[bool, int, int]:
+    try:
+        stat = path.stat()
+        return (True, stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        return (False, 0, 0)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+import sys
+from threading import Lock
+
+from app.core.settings import get_settings
+from app.observability.metrics import metrics
+
+# (lab slug, lab content version, normalized cwd, parsed argv)
+LabResultKey = tuple[str, int, str, tuple[str, ...]]
+
+
+@dataclass(frozen=True, slots=True)
+class CachedLabResult:
+    output: str
+    exit_code: int
+    # Whether running the command appended it to the session history, which a hit has to replay.
+    records_history: bool
+    size_bytes: int
+
+
+@dataclass(frozen=True, slots=True)
+class LabResultCacheStats:
+    hits: int
+    misses: int
+    entries: int
+    size_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class LabResultCache:
+    """Process-wide LRU of deterministic command output, shared by every player of a lab.
+
+    Entries are weighed by the memory their output retains and evicted from
+    the cold end once ``LAB_RESULT_CACHE_MAX_BYTES`` is exceeded; outputs above
+    ``LAB_RESULT_CACHE_MAX_ENTRY_BYTES`` are never stored. Setting the total
+    to 0 disables the cache.
+    """
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[LabResultKey, CachedLabResult] = OrderedDict()
+        self._size_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = Lock()
+
+    @staticmethod
+    def enabled() -> bool:
+        return get_settings().LAB_RESULT_CACHE_MAX_BYTES > 0
+
+    def get(self, key: LabResultKey) -> CachedLabResult | None:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None:
+                self._misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self._hits += 1
+        metrics.increment("zerotrace_lab_result_cache_total", labels={"outcome": "miss" if cached is None else "hit"})
+        return cached
+
+    def record(
+        self,
+        key: LabResultKey,
+        lines: Iterator[str],
+        *,
+        exit_code: int,
+        records_history: bool,
+        is_deterministic: Callable[[], bool],
+    ) -> Iterator[str]:
+        """Pass ``lines`` through and store the output once they are exhausted.
+
+        Nothing is stored if the consumer stops early, if the output grows past
+        the per-entry limit, or if ``is_deterministic()`` is false at the end
+        (for example because the command ran out of budget).
+        """
+        max_entry_bytes = get_settings().LAB_RESULT_CACHE_MAX_ENTRY_BYTES
+        recorded: list[str] | None = []
+        recorded_bytes = 0
+        for line in lines:
+            if recorded is not None:
+                recorded_bytes += len(line) + 1
+                if recorded_bytes > max_entry_bytes:
+                    recorded = None
+                else:
+                    recorded.append(line)
+            yield line
+
+        if recorded is None or not is_deterministic():
+            metrics.increment("zerotrace_lab_result_cache_total", labels={"outcome": "skipped"})
+            return
+        output = "\n".join(recorded)
+        self._put(
+            key,
+            CachedLabResult(
+                output=output,
+                exit_code=exit_code,
+                records_history=records_history,
+                size_bytes=sys.getsizeof(output) + sum(sys.getsizeof(arg) for arg in key[3]),
+            ),
+        )
+
+    def stats(self) -> LabResultCacheStats:
+        with self._lock:
+            return LabResultCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                entries=len(self._entries),
+                size_bytes=self._size_bytes,
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+            self._hits = 0
+            self._misses = 0
+
+    def _put(self, key: LabResultKey, result: CachedLabResult) -> None:
+        max_bytes = get_settings().LAB_RESULT_CACHE_MAX_BYTES
+        evicted = 0
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size_bytes -= previous.size_bytes
+            self._entries[key] = result
+            self._size_bytes += result.size_bytes
+            while self._entries and self._size_bytes > max_bytes:
+                _, oldest = self._entries.popitem(last=False)
+                self._size_bytes -= oldest.size_bytes
+                evicted += 1
+        if evicted:
+            metrics.increment("zerotrace_lab_result_cache_total", value=evicted, labels={"outcome": "evicted"})
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import json
+from threading import Lock
+from time import monotonic
+from typing import Any, Protocol
+
+from app.core.settings import get_settings
+from app.observability.logger import log_event
+from app.observability.metrics import metrics
+
+
+@dataclass(slots=True)
+class LabSessionState:
+    cwd: str
+    history: list[str] = field(default_factory=list)
+
+
+class LabSessionBackend(Protocol):
+    def load(self, key: str) -> LabSessionState | None: ...
+
+    def save(self, key: str, state: LabSessionState) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def reset(self) -> None: ...
+
+
+class InMemoryLabSessionBackend:
+    """Per-process sessions in an LRU bounded by count, with an idle TTL refreshed on every save.
+
+    Entries are ordered by last use, so expired sessions always sit at the
+    cold end and are purged there before anything live is evicted.
+    """
+
+    def __init__(self) -> None:
+        self._sessions: OrderedDict[str, tuple[float, LabSessionState]] = OrderedDict()
+        self._lock = Lock()
+
+    def load(self, key: str) -> LabSessionState | None:
+        now = monotonic()
+        with self._lock:
+            entry = self._sessions.get(key)
+            if entry is None:
+                return None
+            expires_at, state = entry
+            if expires_at <= now:
+                del self._sessions[key]
+                metrics.increment("zerotrace_lab_sessions_total", labels={"outcome": "expired"})
+                return None
+            self._sessions.move_to_end(key)
+            return LabSessionState(cwd=state.cwd, history=list(state.history))
+
+    def save(self, key: str, state: LabSessionState) -> None:
+        settings = get_settings()
+        now = monotonic()
+        with self._lock:
+            self._sessions[key] = (now + settings.LAB_SESSION_IDLE_TTL_SECONDS, state)
+            self._sessions.move_to_end(key)
+            while self._sessions:
+                oldest_key, (expires_at, _) = next(iter(self._sessions.items()))
+                if expires_at > now and len(self._sessions) <= settings.LAB_SESSION_MAX_SESSIONS:
+                    break
+                del self._sessions[oldest_key]
+                outcome = "expired" if expires_at <= now else "evicted"
+                metrics.increment("zerotrace_lab_sessions_total", labels={"outcome": outcome})
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._sessions.pop(key, None)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+
+class RedisLabSessionBackend:
+    """Sessions shared by every worker as small JSON values; Redis expires idle keys itself."""
+
+    def __init__(self, *, redis_client: Any, key_prefix: str) -> None:
+        self._redis = redis_client
+        self._key_prefix = key_prefix.strip() or "zerotrace:lab_session"
+
+    def load(self, key: str) -> LabSessionState | None:
+        raw_value = self._redis.get(self._key(key))
+        if raw_value is None:
+            return None
+        try:
+            payload = json.loads(raw_value)
+            cwd = payload["cwd"]
+            history = payload["history"]
+        except (ValueError, TypeError, KeyError):
+            return None
+        if not isinstance(cwd, str) or not isinstance(history, list):
+            return None
+        return LabSessionState(cwd=cwd, history=[str(item) for item in history])
+
+    def save(self, key: str, state: LabSessionState) -> None:
+        payload = json.dumps({"cwd": state.cwd, "history": state.history}, separators=(",", ":"))
+        ttl_ms = get_settings().LAB_SESSION_IDLE_TTL_SECONDS * 1000
+        self._redis.set(self._key(key), payload, px=ttl_ms)
+
+    def delete(self, key: str) -> None:
+        self._redis.delete(self._key(key))
+
+    def reset(self) -> None:
+        cursor: int = 0
+        while True:
+            cursor, keys = self._redis.scan(cursor=cursor, match=f"{self._key_prefix}:*", count=500)
+            if keys:
+                self._redis.delete(*keys)
+            if cursor == 0:
+                break
+
+    def _key(self, key: str) -> str:
+        return f"{self._key_prefix}:{key}"
+
+
+class LabSessionStore:
+    """Server-side lab shell sessions (cwd and history) keyed by user and challenge.
+
+    History is trimmed to ``LAB_SESSION_HISTORY_LIMIT`` on every save, so a
+    session's size is bounded as well as the number of sessions. When Redis is
+    configured but unreachable the per-process store is used instead.
+    """
+
+    def __init__(self) -> None:
+        self._memory_backend = InMemoryLabSessionBackend()
+        self._redis_backend: RedisLabSessionBackend | None = None
+        self._backend_identity: tuple[str, str, str] | None = None
+        self._lock = Lock()
+
+    def load(self, key: str) -> LabSessionState | None:
+        backend = self._select_backend()
+        try:
+            state = backend.load(key)
+        except Exception as exc:
+            log_event("lab_session_load_failed", outcome="fallback_memory", error_type=type(exc).__name__)
+            state = self._memory_backend.load(key)
+        metrics.increment("zerotrace_lab_sessions_total", labels={"outcome": "created" if state is None else "resumed"})
+        return state
+
+    def save(self, key: str, state: LabSessionState) -> None:
+        history_limit = get_settings().LAB_SESSION_HISTORY_LIMIT
+        if len(state.history) > history_limit:
+            state = LabSessionState(cwd=state.cwd, history=state.history[-history_limit:])
+        backend = self._select_backend()
+        try:
+            backend.save(key, state)
+        except Exception as exc:
+            log_event("lab_session_save_failed", outcome="fallback_memory", error_type=type(exc).__name__)
+            self._memory_backend.save(key, state)
+
+    def delete(self, key: str) -> None:
+        self._memory_backend.delete(key)
+        backend = self._select_backend()
+        if backend is self._memory_backend:
+            return
+        try:
+            backend.delete(key)
+        except Exception as exc:
+            log_event("lab_session_delete_failed", outcome="error", error_type=type(exc).__name__)
+
+    def reset(self) -> None:
+        self._memory_backend.reset()
+        with self._lock:
+            redis_backend = self._redis_backend
+        if redis_backend is None:
+            return
+        try:
+            redis_backend.reset()
+        except Exception:
+            return
+
+    def _select_backend(self) -> LabSessionBackend:
+        settings = get_settings()
+        backend_name = settings.LAB_SESSION_BACKEND
+        redis_url = (settings.LAB_SESSION_REDIS_URL or "").strip()
+        key_prefix = settings.LAB_SESSION_REDIS_KEY_PREFIX.strip()
+
+        if backend_name != "redis" or not redis_url:
+            return self._memory_backend
+
+        identity = (backend_name, redis_url, key_prefix)
+        with self._lock:
+            if identity != self._backend_identity:
+                self._redis_backend = self._build_redis_backend(redis_url=redis_url, key_prefix=key_prefix)
+                self._backend_identity = identity
+
+            if self._redis_backend is not None:
+                return self._redis_backend
+
+        return self._memory_backend
+
+    @staticmethod
+    def _build_redis_backend(*, redis_url: str, key_prefix: str) -> RedisLabSessionBackend | None:
+        settings = get_settings()
+        try:
+            import redis
+        except Exception:
+            return None
+
+        timeout_seconds = max(0.01, settings.RATE_LIMIT_REDIS_SOCKET_TIMEOUT_MS / 1000)
+        try:
+            client = redis.Redis.from_url(
+                redis_url,
+                decode_responses=True,
+                socket_connect_timeout=timeout_seconds,
+                socket_timeout=timeout_seconds,
+            )
+            client.ping()
+        except Exception as exc:
+            log_event("lab_session_backend_unavailable", outcome="fallback_memory", error_type=type(exc).__name__)
+            return None
+
+        return RedisLabSessionBackend(redis_client=client, key_prefix=key_prefix)
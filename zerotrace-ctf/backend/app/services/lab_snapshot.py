@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+import json
+import mmap
+import os
+from pathlib import Path
+import struct
+from threading import Lock
+from types import MappingProxyType
+from typing import Any
+
+from app.core.settings import get_settings
+from app.observability.logger import log_event
+from app.services.challenge_loader import ChallengeLoader, LabIndexEntry
+from app.services.lab_filesystem import FileContent, MappedContent
+from app.services.lab_generators import GeneratedContent
+
+
+_BACKEND_ROOT = Path(__file__).resolve().parents[2]
+_MAGIC = b"ZTLABSNP"
+_FORMAT_VERSION = 2
+# magic, format version, manifest length, content blob length; the manifest and blob follow in that order.
+_HEADER = struct.Struct("<8sIQQ")
+
+
+class LabSnapshotError(ValueError):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class LabSnapshotSummary:
+    path: Path
+    labs: int
+    files: int
+    blob_bytes: int
+    size_bytes: int
+
+
+class LabSnapshot:
+    """A compiled lab snapshot mapped read-only into memory.
+
+    The file is a fixed header, a JSON manifest (lab metadata, source file
+    stats and a ``[path, start, end]`` index per layer) and one contiguous
+    blob of UTF-8 file contents, deduplicated across labs. File contents are
+    handed out as ``MappedContent`` slices of the mapping, so they live in the
+    page cache, shared by every worker, until a command actually reads them.
+    Generated files are stored as ``[path, spec]`` rows and stay lazy.
+    """
+
+    def __init__(self, manifest: dict[str, Any], blob: memoryview) -> None:
+        self._manifest = manifest
+        self._blob = blob
+
+    @classmethod
+    def open(cls, path: Path) -> LabSnapshot:
+        with path.open("rb") as handle:
+            try:
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as exc:
+                raise LabSnapshotError(f"Empty lab snapshot: {path}") from exc
+
+        if len(mapped) < _HEADER.size:
+            raise LabSnapshotError(f"Truncated lab snapshot: {path}")
+        magic, version, manifest_length, blob_length = _HEADER.unpack_from(mapped)
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            raise LabSnapshotError(f"Unsupported lab snapshot format: {path}")
+        blob_start = _HEADER.size + manifest_length
+        if blob_start + blob_length != len(mapped):
+            raise LabSnapshotError(f"Truncated lab snapshot: {path}")
+        try:
+            manifest = json.loads(mapped[_HEADER.size : blob_start])
+        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            raise LabSnapshotError(f"Corrupt lab snapshot manifest: {path}") from exc
+        if not isinstance(manifest, dict) or not {"base", "modules"} <= manifest.keys():
+            raise LabSnapshotError(f"Corrupt lab snapshot manifest: {path}")
+        return cls(manifest, memoryview(mapped)[blob_start:])
+
+    @property
+    def base_source(self) -> list[int] | None:
+        return self._manifest["base"]["source"]
+
+    def base_files(self) -> dict[str, FileContent]:
+        return self.layer_files(self._manifest["base"]["files"])
+
+    def module(self, module_code: str) -> dict[str, Any] | None:
+        return self._manifest["modules"].get(module_code)
+
+    def layer_files(self, rows: list[list[Any]]) -> dict[str, FileContent]:
+        files: dict[str, FileContent] = {}
+        for row in rows:
+            if len(row) == 2:
+                generated = GeneratedContent.from_spec(row[1])
+                if generated is not None:
+                    files[row[0]] = generated
+                continue
+            path, start, end = row
+            files[path] = MappedContent(self._blob, start, end)
+        return files
+
+    @property
+    def lab_count(self) -> int:
+        return sum(len(module["labs"]) for module in self._manifest["modules"].values())
+
+
+class CompiledChallengeLoader(ChallengeLoader):
+    """Serves lab definitions from a compiled snapshot instead of parsing the JSON sources.
+
+    The snapshot records the size and mtime of every source it was built
+    from. A module whose challenge files changed, an overlay or a base
+    filesystem that changed, or a snapshot that is missing or unreadable
+    falls back to the JSON sources, so a stale snapshot is never served.
+    """
+
+    def __init__(self, snapshot_path: Path) -> None:
+        super().__init__()
+        self._snapshot_path = snapshot_path
+        self._snapshot: LabSnapshot | None = None
+        self._snapshot_opened = False
+        self._snapshot_lock = Lock()
+        self._compiled_overlays: dict[Path, dict[str, Any]] = {}
+
+    def load_base_files(self) -> Mapping[str, FileContent]:
+        if self._base_files is None:
+            snapshot = self._open_snapshot()
+            if snapshot is None or snapshot.base_source != _source_stat(self.base_filesystem_path):
+                return super().load_base_files()
+            self._base_files = MappingProxyType(snapshot.base_files())
+        return self._base_files
+
+    def index_module(self, module_code: str) -> list[LabIndexEntry]:
+        normalized_module = module_code.strip().lower()
+        module_root = self._LABS_ROOT / normalized_module
+        snapshot = self._open_snapshot()
+        compiled = snapshot.module(normalized_module) if snapshot is not None else None
+        if compiled is None or compiled["challenges"] != _challenge_sources(module_root / "challenges"):
+            return super().index_module(module_code)
+
+        entries: list[LabIndexEntry] = []
+        for row in compiled["labs"]:
+            entry = LabIndexEntry(
+                challenge_id=row["challenge_id"],
+                slug=row["slug"],
+                title=row["title"],
+                start_path=row["start_path"],
+                hints=tuple(row["hints"]),
+                flag_path=row["flag_path"],
+                flag_template=row["flag_template"],
+                permissions=dict(row["permissions"]),
+                overlay_path=module_root / "overlays" / f"{row['challenge_id']}.json",
+            )
+            self._compiled_overlays[entry.overlay_path] = row
+            entries.append(entry)
+        return entries
+
+    def load_overlay_files(self, entry: LabIndexEntry) -> dict[str, FileContent]:
+        row = self._compiled_overlays.get(entry.overlay_path)
+        snapshot = self._snapshot
+        if row is None or snapshot is None or row["overlay_source"] != _source_stat(entry.overlay_path):
+            return super().load_overlay_files(entry)
+        return snapshot.layer_files(row["files"])
+
+    def _open_snapshot(self) -> LabSnapshot | None:
+        with self._snapshot_lock:
+            if not self._snapshot_opened:
+                self._snapshot_opened = True
+                try:
+                    self._snapshot = LabSnapshot.open(self._snapshot_path)
+                except (OSError, LabSnapshotError) as exc:
+                    log_event(
+                        "lab_snapshot_rejected",
+                        snapshot_file=str(self._snapshot_path),
+                        error_type=type(exc).__name__,
+                    )
+                else:
+                    log_event(
+                        "lab_snapshot_loaded",
+                        snapshot_file=str(self._snapshot_path),
+                        labs=self._snapshot.lab_count,
+                    )
+            return self._snapshot
+
+
+def build_challenge_loader() -> ChallengeLoader:
+    """The JSON loader, or a snapshot-backed one when ``LAB_SNAPSHOT_FILE`` is configured."""
+    configured_path = get_settings().LAB_SNAPSHOT_FILE.strip()
+    if not configured_path:
+        return ChallengeLoader()
+    return CompiledChallengeLoader(resolve_snapshot_path(configured_path))
+
+
+def resolve_snapshot_path(raw_path: str) -> Path:
+    path = Path(raw_path.strip()).expanduser()
+    if not path.is_absolute():
+        path = _BACKEND_ROOT / path
+    return path
+
+
+def compile_lab_snapshot(output_path: Path, loader: ChallengeLoader | None = None) -> LabSnapshotSummary:
+    """Compile every lab ``loader`` indexes from its JSON sources into one snapshot file.
+
+    Source stats are taken before each source is read, so an edit racing the
+    build leaves the snapshot looking stale rather than silently wrong. The
+    file is written beside ``output_path`` and renamed over it, which leaves
+    workers that already mapped the previous snapshot unaffected.
+    """
+    source = loader or ChallengeLoader()
+    blob = bytearray()
+    spans: dict[str, tuple[int, int]] = {}
+    file_count = 0
+
+    def index_layer(files: Mapping[str, FileContent]) -> list[list[Any]]:
+        nonlocal file_count
+        rows: list[list[Any]] = []
+        for path, content in files.items():
+            if isinstance(content, GeneratedContent):
+                rows.append([path, content.to_spec()])
+                continue
+            text = content if isinstance(content, str) else content.decode()
+            span = spans.get(text)
+            if span is None:
+                encoded = text.encode("utf-8")
+                span = spans[text] = (len(blob), len(blob) + len(encoded))
+                blob.extend(encoded)
+            rows.append([path, *span])
+        file_count += len(rows)
+        return rows
+
+    base_source = _source_stat(source.base_filesystem_path)
+    manifest: dict[str, Any] = {
+        "base": {"source": base_source, "files": index_layer(source.reload_base_files())},
+        "modules": {},
+    }
+    lab_count = 0
+    for module_code in source.discover_module_codes():
+        challenge_sources = _challenge_sources(source.labs_root / module_code / "challenges")
+        labs: list[dict[str, Any]] = []
+        for entry in source.index_module(module_code):
+            overlay_source = _source_stat(entry.overlay_path)
+            labs.append(
+                {
+                    "challenge_id": entry.challenge_id,
+                    "slug": entry.slug,
+                    "title": entry.title,
+                    "start_path": entry.start_path,
+                    "hints": list(entry.hints),
+                    "flag_path": entry.flag_path,
+                    "flag_template": entry.flag_template,
+                    "permissions": entry.permissions,
+                    "overlay_source": overlay_source,
+                    "files": index_layer(source.load_overlay_files(entry)),
+                }
+            )
+        manifest["modules"][module_code] = {"challenges": challenge_sources, "labs": labs}
+        lab_count += len(labs)
+
+    encoded_manifest = json.dumps(manifest, separators=(",", ":")).encode("utf-8")
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    staging_path = output_path.with_name(f"{output_path.name}.tmp")
+    with staging_path.open("wb") as handle:
+        handle.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, len(encoded_manifest), len(blob)))
+        handle.write(encoded_manifest)
+        handle.write(blob)
+    os.replace(staging_path, output_path)
+    return LabSnapshotSummary(
+        path=output_path,
+        labs=lab_count,
+        files=file_count,
+        blob_bytes=len(blob),
+        size_bytes=output_path.stat().st_size,
+    )
+
+
+def _challenge_sources(challenges_dir: Path) -> dict[str, list[int] | None]:
+    if not challenges_dir.is_dir():
+        return {}
+    return {path.name: _source_stat(path) for path in sorted(challenges_dir.glob("*.json"))}
+
+
+def _source_stat(path: Path) -> list[int] | None:
+    # Lists rather than tuples so a value read back from the manifest compares equal.
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import date, datetime
 from time import perf_counter
-from typing import List
+from typing import Iterator, List
 from uuid import UUID
 
 from sqlalchemy import Select, func, select
@@ -12,6 +12,7 @@ from sqlalchemy.orm import Session
 from app.models.challenge import Challenge
 from app.models.challenge_solve import ChallengeSolve
 from app.models.user import User
+from app.models.user_daily_xp import UserDailyXp
 from app.observability.metrics import metrics
 
 
@@ -25,6 +26,8 @@ class LeaderboardEntry:
 
 class LeaderboardService:
     MAX_LIMIT = 500
+    MAX_RANGE_DAYS = 366
+    EXPORT_BATCH_SIZE = 1000
 
     def get_global_leaderboard(self, session: Session, limit: int, offset: int) -> List[LeaderboardEntry]:
         started = perf_counter()
@@ -62,6 +65,69 @@ class LeaderboardService:
         metrics.observe("zerotrace_leaderboard_rows_returned", len(entries), labels={"type": "track"})
         return entries
 
+    def get_global_range_leaderboard(
+        self,
+        session: Session,
+        start_day: date,
+        end_day: date,
+        limit: int,
+        offset: int,
+    ) -> List[LeaderboardEntry]:
+        return self._get_range_leaderboard(session, None, start_day, end_day, limit, offset)
+
+    def get_track_range_leaderboard(
+        self,
+        session: Session,
+        track_id: UUID,
+        start_day: date,
+        end_day: date,
+        limit: int,
+        offset: int,
+    ) -> List[LeaderboardEntry]:
+        return self._get_range_leaderboard(session, track_id, start_day, end_day, limit, offset)
+
+    def build_full_ranked_query(self, track_id: UUID | None = None) -> Select:
+        user_scores = (
+            self._build_global_user_scores_cte()
+            if track_id is None
+            else self._build_track_user_scores_cte(track_id)
+        )
+        ranked = self._build_ranked_subquery(user_scores)
+        return select(ranked).order_by(ranked.c.rank.asc(), ranked.c.user_id.asc())
+
+    def iter_full_leaderboard(
+        self,
+        session: Session,
+        track_id: UUID | None = None,
+        batch_size: int | None = None,
+    ) -> Iterator[LeaderboardEntry]:
+        """Yield every ranked entry through a server-side cursor, one fetch batch in memory at a time."""
+        board_type = "global" if track_id is None else "track"
+        query = self.build_full_ranked_query(track_id).execution_options(
+            stream_results=True,
+            yield_per=batch_size or self.EXPORT_BATCH_SIZE,
+        )
+        started = perf_counter()
+        row_count = 0
+        result = session.execute(query)
+        try:
+            for partition in result.partitions():
+                row_count += len(partition)
+                yield from self._map_rows(partition)
+        finally:
+            result.close()
+            latency_ms = (perf_counter() - started) * 1000
+            metrics.increment("zerotrace_leaderboard_exports_total", labels={"type": board_type})
+            metrics.observe("zerotrace_leaderboard_export_latency_ms", latency_ms, labels={"type": board_type})
+            metrics.observe("zerotrace_leaderboard_rows_returned", row_count, labels={"type": f"{board_type}_export"})
+
+    def get_user_total_xp(self, session: Session, user_id: UUID) -> int:
+        # One user's solves only, served by the user_id index; ranking everyone is left to readers.
+        total = session.execute(
+            select(func.coalesce(func.sum(ChallengeSolve.points_awarded), 0)).where(ChallengeSolve.user_id == user_id)
+        ).scalar_one()
+        return int(total)
+
     @classmethod
     def _validate_pagination(cls, limit: int, offset: int) -> tuple[int, int]:
         if isinstance(limit, bool) or not isinstance(limit, int):
@@ -76,6 +142,63 @@ class LeaderboardService:
             raise ValueError(f"limit must be less than or equal to {cls.MAX_LIMIT}.")
         return limit, offset
 
+    def _get_range_leaderboard(
+        self,
+        session: Session,
+        track_id: UUID | None,
+        start_day: date,
+        end_day: date,
+        limit: int,
+        offset: int,
+    ) -> List[LeaderboardEntry]:
+        started = perf_counter()
+        board_type = "global_range" if track_id is None else "track_range"
+        validated_limit, validated_offset = self._validate_pagination(limit, offset)
+        self._validate_day_range(start_day, end_day)
+        query = self._build_ranked_query(
+            self._build_range_user_scores_cte(start_day, end_day, track_id),
+            validated_limit,
+            validated_offset,
+        )
+        entries = self._map_rows(session.execute(query).all())
+        latency_ms = (perf_counter() - started) * 1000
+        metrics.increment("zerotrace_leaderboard_queries_total", labels={"type": board_type})
+        metrics.observe("zerotrace_leaderboard_query_latency_ms", latency_ms, labels={"type": board_type})
+        metrics.observe("zerotrace_leaderboard_rows_returned", len(entries), labels={"type": board_type})
+        return entries
+
+    @classmethod
+    def _validate_day_range(cls, start_day: date, end_day: date) -> None:
+        if not isinstance(start_day, date) or not isinstance(end_day, date):
+            raise ValueError("start_day and end_day must be dates.")
+        if start_day > end_day:
+            raise ValueError("start_day must not be after end_day.")
+        if (end_day - start_day).days >= cls.MAX_RANGE_DAYS:
+            raise ValueError(f"range must span at most {cls.MAX_RANGE_DAYS} days.")
+
+    @staticmethod
+    def _build_range_user_scores_cte(start_day: date, end_day: date, track_id: UUID | None):
+        # Sums pre-aggregated (user, track, day) buckets instead of scanning raw solves;
+        # the earliest bucket solve inside the range keeps the usual first-solve tie-break.
+        conditions = [
+            User.is_active.is_(True),
+            UserDailyXp.day >= start_day,
+            UserDailyXp.day <= end_day,
+        ]
+        if track_id is not None:
+            conditions.append(UserDailyXp.track_id == track_id)
+        return (
+            select(
+                UserDailyXp.user_id.label("user_id"),
+                func.sum(UserDailyXp.xp).label("total_xp"),
+                func.min(UserDailyXp.first_solve_at).label("first_solve_at"),
+            )
+            .join(User, User.id == UserDailyXp.user_id)
+            .where(*conditions)
+            .group_by(UserDailyXp.user_id)
+            .cte("user_scores")
+        )
+
     @staticmethod
     def _build_global_user_scores_cte():
         return (
@@ -127,6 +250,20 @@ class LeaderboardService:
             .offset(offset)
         )
 
+    @staticmethod
+    def _build_ranked_subquery(user_scores_cte):
+        order_by = (
+            user_scores_cte.c.total_xp.desc(),
+            user_scores_cte.c.first_solve_at.asc(),
+            user_scores_cte.c.user_id.asc(),
+        )
+        return select(
+            user_scores_cte.c.user_id,
+            user_scores_cte.c.total_xp,
+            user_scores_cte.c.first_solve_at,
+            func.rank().over(order_by=order_by).label("rank"),
+        ).subquery("ranked_scores")
+
     @staticmethod
     def _map_rows(rows) -> List[LeaderboardEntry]:
         return [
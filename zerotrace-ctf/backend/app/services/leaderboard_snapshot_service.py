@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_right
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from hashlib import sha256
+from time import perf_counter
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.settings import get_settings
+from app.models.leaderboard_latest_position import LeaderboardLatestPosition
+from app.models.leaderboard_snapshot import LeaderboardSnapshot
+from app.models.leaderboard_user_position import LeaderboardUserPosition
+from app.observability.logger import log_event
+from app.observability.metrics import metrics
+from app.services.leaderboard_service import LeaderboardService
+
+
+LeaderboardSnapshotterHandle = tuple[asyncio.Task[None], Engine]
+
+
+@dataclass(frozen=True, slots=True)
+class LeaderboardHistoryEntry:
+    user_id: UUID
+    total_xp: int
+    rank: int
+
+
+@dataclass(frozen=True, slots=True)
+class LeaderboardHistoryPoint:
+    captured_at: datetime
+    entry_count: int
+    entries: List[LeaderboardHistoryEntry]
+
+
+class LeaderboardSnapshotService:
+    """Periodic leaderboard snapshots stored as a bounded top-N plus per-user change points.
+
+    Each snapshot keeps only the leading ``MAX_TOP`` ranks and a digest of the
+    whole board. A user's XP and rank go to ``leaderboard_user_positions``
+    only when they changed since that user's previous row, so a user's state
+    at any snapshot is one indexed lookup and reads never touch full boards.
+    """
+
+    MAX_TOP = 100
+    MAX_POINTS = 500
+    # Arbitrary constant identifying the capture lock among PostgreSQL advisory locks.
+    _CAPTURE_LOCK_KEY = 0x5A544C42
+
+    def __init__(self, leaderboard_service: LeaderboardService | None = None) -> None:
+        self._leaderboard_service = leaderboard_service or LeaderboardService()
+
+    def capture_snapshot(
+        self,
+        session: Session,
+        now: datetime | None = None,
+        *,
+        min_interval_seconds: float = 0,
+    ) -> LeaderboardSnapshot | None:
+        """Record the current board; ``None`` when it is unchanged, too recent, or another worker is capturing.
+
+        Every worker runs the snapshotter. On PostgreSQL a transaction-scoped
+        advisory lock lets one capture run at a time, and each capture first
+        checks the newest snapshot, so workers racing on one interval write a
+        single row.
+        """
+        if not self._try_capture_lock(session):
+            return None
+        captured_at = now or datetime.now(timezone.utc)
+        latest = session.execute(
+            select(LeaderboardSnapshot)
+            .order_by(LeaderboardSnapshot.captured_at.desc())
+            .limit(1)
+        ).scalar_one_or_none()
+        if (
+            latest is not None
+            and min_interval_seconds > 0
+            and captured_at - _as_utc(latest.captured_at) < timedelta(seconds=min_interval_seconds)
+        ):
+            return None
+
+        rows = session.execute(self._leaderboard_service.build_full_ranked_query()).all()
+        digest = sha256()
+        for row in rows:
+            digest.update(f"{row.user_id}:{int(row.total_xp)}\n".encode("ascii"))
+        board_digest = digest.hexdigest()
+        if latest is not None and latest.board_digest == board_digest:
+            # Unchanged standings add nothing to a time series; the previous point still answers "at T".
+            return None
+
+        snapshot = LeaderboardSnapshot(
+            captured_at=captured_at,
+            entry_count=len(rows),
+            board_digest=board_digest,
+            top_user_ids=[str(row.user_id) for row in rows[: self.MAX_TOP]],
+            top_total_xp=[int(row.total_xp) for row in rows[: self.MAX_TOP]],
+        )
+        session.add(snapshot)
+        session.flush()
+
+        # One row per user: the capture reads current state, however long the position history grows.
+        latest_positions = {
+            position.user_id: position for position in session.execute(select(LeaderboardLatestPosition)).scalars()
+        }
+        for row in rows:
+            total_xp, rank = int(row.total_xp), int(row.rank)
+            latest = latest_positions.get(row.user_id)
+            if latest is not None and (latest.total_xp, latest.rank) == (total_xp, rank):
+                continue
+            session.add(
+                LeaderboardUserPosition(
+                    user_id=row.user_id,
+                    snapshot_id=snapshot.id,
+                    captured_at=captured_at,
+                    total_xp=total_xp,
+                    rank=rank,
+                )
+            )
+            if latest is None:
+                session.add(
+                    LeaderboardLatestPosition(
+                        user_id=row.user_id,
+                        captured_at=captured_at,
+                        total_xp=total_xp,
+                        rank=rank,
+                    )
+                )
+            else:
+                latest.captured_at, latest.total_xp, latest.rank = captured_at, total_xp, rank
+        session.flush()
+        return snapshot
+
+    def get_snapshot_at(
+        self,
+        session: Session,
+        at: datetime,
+        top: int,
+        user_id: UUID | None = None,
+    ) -> LeaderboardHistoryPoint | None:
+        validated_top = self._validate_top(top)
+        snapshot = session.execute(
+            select(LeaderboardSnapshot)
+            .where(LeaderboardSnapshot.captured_at <= at)
+            .order_by(LeaderboardSnapshot.captured_at.desc())
+            .limit(1)
+        ).scalar_one_or_none()
+        if snapshot is None:
+            return None
+        if user_id is None:
+            return self._map_snapshot(snapshot, validated_top)
+
+        position = session.execute(
+            select(LeaderboardUserPosition)
+            .where(
+                LeaderboardUserPosition.user_id == user_id,
+                LeaderboardUserPosition.captured_at <= snapshot.captured_at,
+            )
+            .order_by(LeaderboardUserPosition.captured_at.desc())
+            .limit(1)
+        ).scalar_one_or_none()
+        return self._map_user_point(snapshot, user_id, position)
+
+    def get_history(
+        self,
+        session: Session,
+        start: datetime | None,
+        end: datetime | None,
+        top: int,
+        max_points: int,
+        user_id: UUID | None = None,
+    ) -> List[LeaderboardHistoryPoint]:
+        validated_top = self._validate_top(top)
+        if isinstance(max_points, bool) or not isinstance(max_points, int):
+            raise ValueError("max_points must be an integer.")
+        if max_points <= 0 or max_points > self.MAX_POINTS:
+            raise ValueError(f"max_points must be between 1 and {self.MAX_POINTS}.")
+        if start is not None and end is not None and start > end:
+            raise ValueError("start must not be after end.")
+
+        in_range = []
+        if start is not None:
+            in_range.append(LeaderboardSnapshot.captured_at >= start)
+        if end is not None:
+            in_range.append(LeaderboardSnapshot.captured_at <= end)
+        snapshot_count = session.execute(select(func.count(LeaderboardSnapshot.id)).where(*in_range)).scalar_one()
+        if not snapshot_count:
+            return []
+
+        query = select(LeaderboardSnapshot).where(*in_range).order_by(LeaderboardSnapshot.captured_at.asc())
+        if snapshot_count > max_points:
+            # Only the sampled rows leave the database; the range itself is walked on the captured_at index.
+            numbered = (
+                select(
+                    LeaderboardSnapshot.id,
+                    func.row_number().over(order_by=LeaderboardSnapshot.captured_at.asc()).label("position"),
+                )
+                .where(*in_range)
+                .subquery()
+            )
+            query = query.join(numbered, numbered.c.id == LeaderboardSnapshot.id).where(
+                numbered.c.position.in_(self._sample_positions(snapshot_count, max_points))
+            )
+        snapshots = list(session.execute(query).scalars())
+        if user_id is None:
+            return [self._map_snapshot(snapshot, validated_top) for snapshot in snapshots]
+
+        positions = self._user_positions_through(session, user_id, snapshots[0].captured_at, snapshots[-1].captured_at)
+        position_times = [_as_utc(position.captured_at) for position in positions]
+        points = []
+        for snapshot in snapshots:
+            index = bisect_right(position_times, _as_utc(snapshot.captured_at)) - 1
+            points.append(self._map_user_point(snapshot, user_id, positions[index] if index >= 0 else None))
+        return points
+
+    @classmethod
+    def _validate_top(cls, top: int) -> int:
+        if isinstance(top, bool) or not isinstance(top, int):
+            raise ValueError("top must be an integer.")
+        if top <= 0 or top > cls.MAX_TOP:
+            raise ValueError(f"top must be between 1 and {cls.MAX_TOP}.")
+        return top
+
+    @staticmethod
+    def _sample_positions(count: int, max_points: int) -> list[int]:
+        """1-based positions of ``max_points`` evenly spaced snapshots out of ``count``."""
+        if max_points == 1:
+            return [count]
+        # Keep both endpoints so charts always span the requested range.
+        step = (count - 1) / (max_points - 1)
+        return sorted({round(index * step) + 1 for index in range(max_points)})
+
+    def _try_capture_lock(self, session: Session) -> bool:
+        if session.get_bind().dialect.name != "postgresql":
+            return True
+        return bool(
+            session.execute(
+                text("SELECT pg_try_advisory_xact_lock(:key)"),
+                {"key": self._CAPTURE_LOCK_KEY},
+            ).scalar_one()
+        )
+
+    @staticmethod
+    def _user_positions_through(
+        session: Session,
+        user_id: UUID,
+        first: datetime,
+        last: datetime,
+    ) -> list[LeaderboardUserPosition]:
+        """The user's change points within ``[first, last]``, led by the one in force at ``first``."""
+        in_force = session.execute(
+            select(LeaderboardUserPosition)
+            .where(LeaderboardUserPosition.user_id == user_id, LeaderboardUserPosition.captured_at <= first)
+            .order_by(LeaderboardUserPosition.captured_at.desc())
+            .limit(1)
+        ).scalar_one_or_none()
+        later = session.execute(
+            select(LeaderboardUserPosition)
+            .where(
+                LeaderboardUserPosition.user_id == user_id,
+                LeaderboardUserPosition.captured_at > first,
+                LeaderboardUserPosition.captured_at <= last,
+            )
+            .order_by(LeaderboardUserPosition.captured_at.asc())
+        ).scalars()
+        return [*([in_force] if in_force is not None else []), *later]
+
+    @staticmethod
+    def _map_snapshot(snapshot: LeaderboardSnapshot, top: int) -> LeaderboardHistoryPoint:
+        return LeaderboardHistoryPoint(
+            captured_at=snapshot.captured_at,
+            entry_count=snapshot.entry_count,
+            entries=[
+                LeaderboardHistoryEntry(user_id=UUID(raw_user_id), total_xp=int(xp), rank=position + 1)
+                for position, (raw_user_id, xp) in enumerate(
+                    zip(snapshot.top_user_ids[:top], snapshot.top_total_xp[:top])
+                )
+            ],
+        )
+
+    @staticmethod
+    def _map_user_point(
+        snapshot: LeaderboardSnapshot,
+        user_id: UUID,
+        position: LeaderboardUserPosition | None,
+    ) -> LeaderboardHistoryPoint:
+        entries = []
+        if position is not None:
+            entries.append(LeaderboardHistoryEntry(user_id=user_id, total_xp=position.total_xp, rank=position.rank))
+        return LeaderboardHistoryPoint(
+            captured_at=snapshot.captured_at,
+            entry_count=snapshot.entry_count,
+            entries=entries,
+        )
+
+
+def start_leaderboard_snapshotter() -> LeaderboardSnapshotterHandle | None:
+    settings = get_settings()
+    if not settings.LEADERBOARD_SNAPSHOT_ENABLED:
+        return None
+
+    engine = create_engine(
+        settings.DATABASE_URL,
+        future=True,
+        pool_pre_ping=True,
+    )
+    session_factory = sessionmaker(bind=engine, class_=Session, expire_on_commit=False, autoflush=False)
+    task = asyncio.create_task(
+        _snapshot_loop(session_factory, settings.LEADERBOARD_SNAPSHOT_INTERVAL_SECONDS),
+        name="leaderboard-snapshotter",
+    )
+    log_event(
+        "leaderboard_snapshotter_started",
+        interval_seconds=settings.LEADERBOARD_SNAPSHOT_INTERVAL_SECONDS,
+    )
+    return task, engine
+
+
+async def stop_leaderboard_snapshotter(handle: LeaderboardSnapshotterHandle | None) -> None:
+    if handle is None:
+        return
+
+    task, engine = handle
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
+    engine.dispose()
+    log_event("leaderboard_snapshotter_stopped")
+
+
+async def _snapshot_loop(session_factory: sessionmaker[Session], interval_seconds: int) -> None:
+    service = LeaderboardSnapshotService()
+    while True:
+        started = perf_counter()
+        try:
+            await asyncio.to_thread(_capture_with_session, service, session_factory, interval_seconds)
+        except Exception as exc:
+            log_event(
+                "leaderboard_snapshot_failed",
+                outcome="error",
+                error_type=type(exc).__name__,
+            )
+        finally:
+            elapsed_ms = (perf_counter() - started) * 1000
+            metrics.observe("zerotrace_leaderboard_snapshot_latency_ms", elapsed_ms)
+
+        await asyncio.sleep(interval_seconds)
+
+
+def _capture_with_session(
+    service: LeaderboardSnapshotService,
+    session_factory: sessionmaker[Session],
+    interval_seconds: int,
+) -> None:
+    with session_factory() as session:
+        # Half an interval of spacing: a worker whose timer fires just after another's capture skips its turn.
+        snapshot = service.capture_snapshot(session, min_interval_seconds=interval_seconds / 2)
+        session.commit()
+    metrics.increment(
+        "zerotrace_leaderboard_snapshots_total",
+        labels={"outcome": "captured" if snapshot is not None else "unchanged"},
+    )
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands timezone-aware columns back naive.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+from collections import deque
+from collections.abc import Callable, Iterator
 from dataclasses import dataclass, field
-from fnmatch import fnmatch
+from functools import partial
+from itertools import chain, groupby, islice, repeat
 import posixpath
+import re
 import shlex
+import sys
 from typing import Protocol
 
+from app.services.lab_command_budget import CommandBudget
+
 
 class LinuxFilesystemView(Protocol):
     def normalize_path(self, path: str) -> str: ...
@@ -20,13 +27,50 @@ class LinuxFilesystemView(Protocol):
 
     def read_file(self, path: str) -> str: ...
 
+    def iter_file_lines(self, path: str, *, budget: CommandBudget | None = None) -> Iterator[str]: ...
+
     def file_size_bytes(self, path: str) -> int: ...
 
-    def list_dir(self, path: str, show_all: bool) -> list[str]: ...
+    def disk_usage(self, path: str) -> int: ...
 
-    def iter_files_under(self, path: str, recursive: bool) -> list[str]: ...
+    def list_dir(self, path: str, show_all: bool) -> list[str]: ...
 
-    def walk(self, path: str) -> list[str]: ...
+    def iter_files_under(
+        self,
+        path: str,
+        recursive: bool,
+        *,
+        budget: CommandBudget | None = None,
+    ) -> Iterator[str]: ...
+
+    def walk(self, path: str, *, budget: CommandBudget | None = None) -> Iterator[str]: ...
+
+    def find(
+        self,
+        path: str,
+        *,
+        name_glob: str | None = None,
+        type_filter: str | None = None,
+        budget: CommandBudget | None = None,
+    ) -> Iterator[str]: ...
+
+    def grep(
+        self,
+        path: str,
+        pattern: str,
+        *,
+        recursive: bool,
+        budget: CommandBudget | None = None,
+    ) -> list[tuple[str, int, str]]: ...
+
+    def iter_grep(
+        self,
+        path: str,
+        pattern: str,
+        *,
+        recursive: bool,
+        budget: CommandBudget | None = None,
+    ) -> Iterator[tuple[str, int, str]]: ...
 
     def permission_bits(self, path: str) -> int: ...
 
@@ -47,6 +91,33 @@ class ShellCommandResult:
     exit_code: int
 
 
+@dataclass(frozen=True, slots=True)
+class ShellCommandStream:
+    """Command output produced lazily, one line per item; ``cwd`` and ``exit_code`` are known up front."""
+
+    lines: Iterator[str]
+    cwd: str
+    exit_code: int
+
+
+LineTransform = Callable[[Iterator[str]], Iterator[str]]
+
+_LEADING_NUMBER = re.compile(r"\s*([-+]?\d+(?:\.\d+)?)")
+_DIRECTORY_BLOCK_BYTES = 4096
+
+
+def iter_lines(text: str) -> Iterator[str]:
+    """Lazy ``text.split("\\n")``: joining the items with newlines gives ``text`` back."""
+    start = 0
+    while True:
+        end = text.find("\n", start)
+        if end < 0:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
 class LinuxShellEngine:
     BLOCKED_COMMANDS = {
         "rm",
@@ -64,17 +135,100 @@ class LinuxShellEngine:
     }
     BLOCKED_TOKENS = {">", ">>", "1>", "1>>", "2>", "2>>", "<", "<<", "|", ";", "&&", "||"}
     BLOCKED_FRAGMENTS = (";", "&&", "||", "`", "$(", ">", "<", "|")
+    SUPPORTED_COMMANDS = frozenset(
+        {
+            "help",
+            "pwd",
+            "ls",
+            "cd",
+            "cat",
+            "grep",
+            "find",
+            "du",
+            "history",
+            "clear",
+            "head",
+            "tail",
+            "wc",
+            "sort",
+            "uniq",
+            "cut",
+        }
+    )
+    LINE_FILTERS = frozenset({"head", "tail", "wc", "sort", "uniq", "cut"})
+    # Pipelines start with a read-only command and feed it through side-effect-free line filters only.
+    PIPELINE_SOURCES = frozenset({"help", "pwd", "ls", "cat", "grep", "find", "du", "history"}) | LINE_FILTERS
+    PIPELINE_FILTERS = frozenset({"grep"}) | LINE_FILTERS
+
+    def run(self, command: str, session: ShellSession, *, budget: CommandBudget | None = None) -> ShellCommandResult:
+        stream = self.stream(command, session, budget=budget)
+        return ShellCommandResult(output="\n".join(stream.lines), cwd=stream.cwd, exit_code=stream.exit_code)
+
+    def stream(self, command: str, session: ShellSession, *, budget: CommandBudget | None = None) -> ShellCommandStream:
+        """Run ``command``; argument errors are reported eagerly, listings are generated as they are read.
+
+        With a ``budget``, traversals stop once it is spent and the output ends
+        with a line saying which limit was hit; the budget is finished when the
+        output is exhausted or abandoned.
+        """
+        if budget is not None:
+            budget.resume()
+        try:
+            result = self._dispatch(command, session, budget)
+        finally:
+            if budget is not None:
+                budget.pause()
+
+        if isinstance(result, ShellCommandStream):
+            lines = result.lines
+        else:
+            lines = iter_lines(result.output)
+        if budget is not None:
+            lines = self._metered(lines, budget, self._command_label(command))
+        return ShellCommandStream(lines=lines, cwd=result.cwd, exit_code=result.exit_code)
+
+    @classmethod
+    def _command_label(cls, command: str) -> str:
+        parts = command.split(maxsplit=1)
+        name = posixpath.basename(parts[0]) if parts else ""
+        return name if name in cls.SUPPORTED_COMMANDS else "other"
 
-    def run(self, command: str, session: ShellSession) -> ShellCommandResult:
+    @staticmethod
+    def _metered(lines: Iterator[str], budget: CommandBudget, command: str) -> Iterator[str]:
+        try:
+            while True:
+                budget.resume()
+                try:
+                    line = next(lines, None)
+                finally:
+                    budget.pause()
+                if line is None:
+                    break
+                yield line
+            if budget.exceeded is not None:
+                yield budget.exceeded_message(command)
+        finally:
+            budget.finish(command)
+
+    def _dispatch(
+        self,
+        command: str,
+        session: ShellSession,
+        budget: CommandBudget | None,
+    ) -> ShellCommandResult | ShellCommandStream:
         command_text = command.strip()
         if not command_text:
             return ShellCommandResult(output="", cwd=session.cwd, exit_code=0)
 
         try:
-            tokens = shlex.split(command_text)
+            stages = self._split_pipeline(command_text)
         except ValueError as exc:
             return ShellCommandResult(output=f"parse error: {exc}", cwd=session.cwd, exit_code=1)
 
+        if len(stages) > 1:
+            return self._run_pipeline(command_text, stages, session, budget)
+
+        tokens = stages[0]
         if not tokens:
             return ShellCommandResult(output="", cwd=session.cwd, exit_code=0)
 
@@ -88,17 +242,89 @@ class LinuxShellEngine:
             )
 
         session.history.append(command_text)
+        return self._execute(name, args, session, budget)
+
+    @staticmethod
+    def _split_pipeline(command_text: str) -> list[list[str]]:
+        """Tokens of each ``|``-separated stage; a command without a pipe is split exactly like ``shlex.split``."""
+        if "|" not in command_text:
+            return [shlex.split(command_text)]
+        lexer = shlex.shlex(command_text, posix=True, punctuation_chars="|")
+        lexer.whitespace_split = True
+        lexer.commenters = ""
+        stages: list[list[str]] = [[]]
+        for token in lexer:
+            if token == "|":
+                stages.append([])
+            else:
+                stages[-1].append(token)
+        return stages
+
+    def _run_pipeline(
+        self,
+        command_text: str,
+        stages: list[list[str]],
+        session: ShellSession,
+        budget: CommandBudget | None,
+    ) -> ShellCommandResult | ShellCommandStream:
+        """Chain the stages as generators, so a ``head`` at the end stops the source's traversal early.
+
+        Only the last stage's exit code is reported, as in a shell without
+        ``pipefail``; a stage that fails on its arguments (or a source that
+        fails with a message) ends the pipeline with that error instead.
+        """
+        if any(not tokens for tokens in stages):
+            return ShellCommandResult(output="syntax error near unexpected token `|'", cwd=session.cwd, exit_code=2)
+        if any(self._is_blocked_command(tokens[0], tokens) for tokens in stages):
+            return ShellCommandResult(output="Command not allowed in this lab.", cwd=session.cwd, exit_code=126)
+
+        session.history.append(command_text)
+        source, *filters = stages
+        if source[0] not in self.PIPELINE_SOURCES:
+            return ShellCommandResult(output=f"{source[0]}: cannot be piped", cwd=session.cwd, exit_code=1)
+        for tokens in filters:
+            if tokens[0] not in self.PIPELINE_FILTERS:
+                return ShellCommandResult(
+                    output=f"{tokens[0]}: not supported in a pipeline (use {', '.join(sorted(self.PIPELINE_FILTERS))})",
+                    cwd=session.cwd,
+                    exit_code=1,
+                )
 
+        result = self._execute(source[0], source[1:], session, budget)
+        for tokens in filters:
+            if isinstance(result, ShellCommandResult):
+                if result.exit_code != 0 and result.output:
+                    return result
+                upstream = iter_lines(result.output) if result.output else iter(())
+            else:
+                upstream = result.lines
+            if tokens[0] == "grep":
+                result = self._cmd_grep(session, tokens[1:], budget, upstream=upstream)
+            else:
+                result = self._cmd_line_filter(session, tokens[0], tokens[1:], budget, upstream=upstream)
+        return result
+
+    def _execute(
+        self,
+        name: str,
+        args: list[str],
+        session: ShellSession,
+        budget: CommandBudget | None,
+    ) -> ShellCommandResult | ShellCommandStream:
         if name == "help":
             return ShellCommandResult(
                 output=(
-                    "Supported commands: help, pwd, ls, cd, cat, grep, find, du, history, clear\n"
+                    "Supported commands: help, pwd, ls, cd, cat, grep, find, du, history, clear, "
+                    "head, tail, wc, sort, uniq, cut\n"
                     "Examples:\n"
                     "  ls -la /etc\n"
                     "  find / -perm -4000\n"
                     "  grep -R include /etc\n"
                     "  find /etc -name '*.conf'\n"
-                    "  du -ah /var"
+                    "  du -h /etc\n"
+                    "  du -ah /var\n"
+                    "  grep -R password /etc | head -n 5\n"
+                    "  cut -d: -f1 /etc/passwd | sort"
                 ),
                 cwd=session.cwd,
                 exit_code=0,
@@ -108,7 +334,7 @@ class LinuxShellEngine:
             return ShellCommandResult(output=session.cwd, cwd=session.cwd, exit_code=0)
 
         if name == "history":
-            return ShellCommandResult(output="\n".join(session.history), cwd=session.cwd, exit_code=0)
+            return ShellCommandStream(lines=iter(list(session.history)), cwd=session.cwd, exit_code=0)
 
         if name == "clear":
             return ShellCommandResult(output="__CLEAR__", cwd=session.cwd, exit_code=0)
@@ -118,13 +344,15 @@ class LinuxShellEngine:
         if name == "ls":
             return self._cmd_ls(session, args)
         if name == "cat":
-            return self._cmd_cat(session, args)
+            return self._cmd_cat(session, args, budget)
         if name == "grep":
-            return self._cmd_grep(session, args)
+            return self._cmd_grep(session, args, budget)
         if name == "find":
-            return self._cmd_find(session, args)
+            return self._cmd_find(session, args, budget)
         if name == "du":
-            return self._cmd_du(session, args)
+            return self._cmd_du(session, args, budget)
+        if name in self.LINE_FILTERS:
+            return self._cmd_line_filter(session, name, args, budget, upstream=None)
 
         return ShellCommandResult(output=f"{name}: command not found", cwd=session.cwd, exit_code=127)
 
@@ -159,7 +387,7 @@ class LinuxShellEngine:
         session.cwd = destination
         return ShellCommandResult(output="", cwd=session.cwd, exit_code=0)
 
-    def _cmd_ls(self, session: ShellSession, args: list[str]) -> ShellCommandResult:
+    def _cmd_ls(self, session: ShellSession, args: list[str]) -> ShellCommandResult | ShellCommandStream:
         show_all = False
         long_format = False
         target: str | None = None
@@ -195,29 +423,48 @@ class LinuxShellEngine:
             if not long_format:
                 return ShellCommandResult(output=posixpath.basename(path), cwd=session.cwd, exit_code=0)
             mode = session.filesystem.permission_string(path)
-            return ShellCommandResult(output=f"{mode} {posixpath.basename(path)}", cwd=session.cwd, exit_code=0)
+            size = session.filesystem.file_size_bytes(path)
+            return ShellCommandResult(
+                output=f"{mode} {size} {posixpath.basename(path)}",
+                cwd=session.cwd,
+                exit_code=0,
+            )
 
         listing = session.filesystem.list_dir(path, show_all=show_all)
         if not long_format:
-            return ShellCommandResult(output="\n".join(listing), cwd=session.cwd, exit_code=0)
+            return ShellCommandStream(lines=iter(listing), cwd=session.cwd, exit_code=0)
+        return ShellCommandStream(
+            lines=self._iter_long_listing(session.filesystem, path, listing),
+            cwd=session.cwd,
+            exit_code=0,
+        )
 
-        rendered: list[str] = []
+    @staticmethod
+    def _iter_long_listing(filesystem: LinuxFilesystemView, path: str, listing: list[str]) -> Iterator[str]:
+        entries: list[tuple[str, str, int]] = []
         for entry in listing:
             if entry == ".":
                 entry_path = path
             elif entry == "..":
-                entry_path = session.filesystem.resolve(path, "..")
+                entry_path = filesystem.resolve(path, "..")
             else:
-                entry_path = session.filesystem.resolve(path, entry)
-            mode = session.filesystem.permission_string(entry_path)
-            rendered.append(f"{mode} {entry}")
-        return ShellCommandResult(output="\n".join(rendered), cwd=session.cwd, exit_code=0)
-
-    def _cmd_cat(self, session: ShellSession, args: list[str]) -> ShellCommandResult:
+                entry_path = filesystem.resolve(path, entry)
+            entries.append((entry, entry_path, _long_listing_size(filesystem, entry_path)))
+        # Sizes are right-aligned in one column, as ls -l does.
+        width = max((len(str(size)) for _, _, size in entries), default=0)
+        for entry, entry_path, size in entries:
+            yield f"{filesystem.permission_string(entry_path)} {size:>{width}} {entry}"
+
+    def _cmd_cat(
+        self,
+        session: ShellSession,
+        args: list[str],
+        budget: CommandBudget | None,
+    ) -> ShellCommandResult | ShellCommandStream:
         if not args:
             return ShellCommandResult(output="cat: missing file operand", cwd=session.cwd, exit_code=1)
 
-        chunks: list[str] = []
+        paths: list[str] = []
         for raw_path in args:
             path = session.filesystem.resolve(session.cwd, raw_path)
             if not session.filesystem.exists(path):
@@ -233,14 +480,41 @@ class LinuxShellEngine:
                     exit_code=1,
                 )
 
-            content = session.filesystem.read_file(path).rstrip("\n")
-            if len(args) > 1:
-                chunks.append(f"==> {path} <==")
-            chunks.append(content)
+            paths.append(path)
 
-        return ShellCommandResult(output="\n".join(chunks), cwd=session.cwd, exit_code=0)
+        return ShellCommandStream(
+            lines=self._iter_cat(session.filesystem, paths, budget),
+            cwd=session.cwd,
+            exit_code=0,
+        )
 
-    def _cmd_grep(self, session: ShellSession, args: list[str]) -> ShellCommandResult:
+    @staticmethod
+    def _iter_cat(filesystem: LinuxFilesystemView, paths: list[str], budget: CommandBudget | None) -> Iterator[str]:
+        for path in paths:
+            if len(paths) > 1:
+                yield f"==> {path} <=="
+            # Trailing blank lines are dropped and an empty file shows one empty line, without reading ahead.
+            blank_lines = 0
+            shown = False
+            for line in filesystem.iter_file_lines(path, budget=budget):
+                if not line:
+                    blank_lines += 1
+                    continue
+                yield from repeat("", blank_lines)
+                blank_lines = 0
+                shown = True
+                yield line
+            if not shown:
+                yield ""
+
+    def _cmd_grep(
+        self,
+        session: ShellSession,
+        args: list[str],
+        budget: CommandBudget | None,
+        *,
+        upstream: Iterator[str] | None = None,
+    ) -> ShellCommandResult | ShellCommandStream:
         recursive = False
         index = 0
         while index < len(args) and args[index].startswith("-"):
@@ -257,6 +531,17 @@ class LinuxShellEngine:
             index += 1
 
         remaining = args[index:]
+        if len(remaining) == 1 and upstream is not None:
+            # Piped input: filter the previous stage's lines instead of reading the filesystem.
+            pattern = remaining[0]
+            if not pattern:
+                return ShellCommandResult(output="grep: empty pattern", cwd=session.cwd, exit_code=1)
+            matches: Iterator[str] = (line for line in upstream if pattern in line)
+            first_line = next(matches, None)
+            if first_line is None:
+                return ShellCommandResult(output="", cwd=session.cwd, exit_code=1)
+            return ShellCommandStream(lines=chain((first_line,), matches), cwd=session.cwd, exit_code=0)
+
         if len(remaining) < 2:
             return ShellCommandResult(output="grep: usage grep -R <term> <path>", cwd=session.cwd, exit_code=1)
 
@@ -269,17 +554,269 @@ class LinuxShellEngine:
         if not pattern:
             return ShellCommandResult(output="grep: empty pattern", cwd=session.cwd, exit_code=1)
 
-        matches: list[str] = []
-        for file_path in session.filesystem.iter_files_under(path, recursive=recursive):
-            for line_no, line in enumerate(session.filesystem.read_file(file_path).splitlines(), start=1):
-                if pattern in line:
-                    matches.append(f"{file_path}:{line_no}:{line}")
-
-        if not matches:
+        matches = (
+            f"{file_path}:{line_no}:{line}"
+            for file_path, line_no, line in session.filesystem.iter_grep(
+                path,
+                pattern,
+                recursive=recursive,
+                budget=budget,
+            )
+        )
+        # The exit status depends on whether anything matched, so only the first match is produced eagerly.
+        first_match = next(matches, None)
+        if first_match is None:
+            if budget is not None and budget.exceeded is not None:
+                return ShellCommandStream(lines=iter(()), cwd=session.cwd, exit_code=2)
             return ShellCommandResult(output="", cwd=session.cwd, exit_code=1)
-        return ShellCommandResult(output="\n".join(matches), cwd=session.cwd, exit_code=0)
+        return ShellCommandStream(lines=chain((first_match,), matches), cwd=session.cwd, exit_code=0)
+
+    def _cmd_line_filter(
+        self,
+        session: ShellSession,
+        name: str,
+        args: list[str],
+        budget: CommandBudget | None,
+        *,
+        upstream: Iterator[str] | None,
+    ) -> ShellCommandResult | ShellCommandStream:
+        """Run ``head``/``tail``/``wc``/``sort``/``uniq``/``cut`` over file operands or the piped lines."""
+        if name == "wc":
+            return self._cmd_wc(session, args, budget, upstream=upstream)
+        if name in {"head", "tail"}:
+            parsed = self._parse_line_count(name, args)
+        elif name == "sort":
+            parsed = self._parse_sort(args)
+        elif name == "uniq":
+            parsed = self._parse_uniq(args)
+        else:
+            parsed = self._parse_cut(args)
+        if isinstance(parsed, str):
+            return ShellCommandResult(output=parsed, cwd=session.cwd, exit_code=1)
+
+        transform, raw_paths = parsed
+        if not raw_paths:
+            if upstream is None:
+                return ShellCommandResult(output=f"{name}: missing file operand", cwd=session.cwd, exit_code=1)
+            return ShellCommandStream(lines=transform(upstream), cwd=session.cwd, exit_code=0)
+
+        paths = self._resolve_file_operands(session, name, raw_paths)
+        if isinstance(paths, ShellCommandResult):
+            return paths
+        return ShellCommandStream(
+            lines=transform(self._iter_file_lines(session.filesystem, paths, budget)),
+            cwd=session.cwd,
+            exit_code=0,
+        )
+
+    def _cmd_wc(
+        self,
+        session: ShellSession,
+        args: list[str],
+        budget: CommandBudget | None,
+        *,
+        upstream: Iterator[str] | None,
+    ) -> ShellCommandResult | ShellCommandStream:
+        selected = ""
+        raw_paths: list[str] = []
+        for arg in args:
+            if arg.startswith("-") and arg != "-":
+                for flag in arg[1:]:
+                    if flag not in "lwmc":
+                        return ShellCommandResult(
+                            output=f"wc: invalid option -- '{flag}'",
+                            cwd=session.cwd,
+                            exit_code=1,
+                        )
+                    selected += flag
+                continue
+            raw_paths.append(arg)
+        # Counts are always printed in wc's own order, whatever order the flags were given in.
+        columns = tuple(column for column in "lwmc" if column in selected) or ("l", "w", "c")
+
+        if not raw_paths:
+            if upstream is None:
+                return ShellCommandResult(output="wc: missing file operand", cwd=session.cwd, exit_code=1)
+            return ShellCommandStream(lines=_wc_lines(upstream, columns=columns), cwd=session.cwd, exit_code=0)
+
+        paths = self._resolve_file_operands(session, "wc", raw_paths)
+        if isinstance(paths, ShellCommandResult):
+            return paths
+        return ShellCommandStream(
+            lines=_wc_files(session.filesystem, list(zip(paths, raw_paths)), columns=columns, budget=budget),
+            cwd=session.cwd,
+            exit_code=0,
+        )
+
+    @staticmethod
+    def _resolve_file_operands(
+        session: ShellSession,
+        name: str,
+        raw_paths: list[str],
+    ) -> list[str] | ShellCommandResult:
+        paths: list[str] = []
+        for raw_path in raw_paths:
+            path = session.filesystem.resolve(session.cwd, raw_path)
+            if not session.filesystem.exists(path):
+                return ShellCommandResult(
+                    output=f"{name}: {raw_path}: No such file or directory",
+                    cwd=session.cwd,
+                    exit_code=1,
+                )
+            if session.filesystem.is_dir(path):
+                return ShellCommandResult(output=f"{name}: {raw_path}: Is a directory", cwd=session.cwd, exit_code=1)
+            paths.append(path)
+        return paths
+
+    @staticmethod
+    def _iter_file_lines(
+        filesystem: LinuxFilesystemView,
+        paths: list[str],
+        budget: CommandBudget | None,
+    ) -> Iterator[str]:
+        for path in paths:
+            yield from filesystem.iter_file_lines(path, budget=budget)
+
+    @staticmethod
+    def _parse_line_count(name: str, args: list[str]) -> tuple[LineTransform, list[str]] | str:
+        count = 10
+        operands: list[str] = []
+        index = 0
+        while index < len(args):
+            arg = args[index]
+            if arg == "-n":
+                if index + 1 >= len(args):
+                    return f"{name}: option requires an argument -- 'n'"
+                raw_count = args[index + 1]
+                index += 2
+            elif arg.startswith("-n"):
+                raw_count = arg[2:]
+                index += 1
+            elif arg.startswith("-") and arg[1:].isdigit():
+                raw_count = arg[1:]
+                index += 1
+            elif arg.startswith("-") and arg != "-":
+                return f"{name}: invalid option -- '{arg[1]}'"
+            else:
+                operands.append(arg)
+                index += 1
+                continue
+            if not raw_count.isdigit():
+                return f"{name}: invalid number of lines: '{raw_count}'"
+            count = min(int(raw_count), sys.maxsize)
 
-    def _cmd_find(self, session: ShellSession, args: list[str]) -> ShellCommandResult:
+        if name == "head":
+            return partial(_head_lines, count=count), operands
+        return partial(_tail_lines, count=count), operands
+
+    @staticmethod
+    def _parse_sort(args: list[str]) -> tuple[LineTransform, list[str]] | str:
+        numeric = reverse = unique = False
+        operands: list[str] = []
+        for arg in args:
+            if arg.startswith("-") and arg != "-":
+                for flag in arg[1:]:
+                    if flag == "n":
+                        numeric = True
+                    elif flag == "r":
+                        reverse = True
+                    elif flag == "u":
+                        unique = True
+                    else:
+                        return f"sort: invalid option -- '{flag}'"
+                continue
+            operands.append(arg)
+        return partial(_sort_lines, numeric=numeric, reverse=reverse, unique=unique), operands
+
+    @staticmethod
+    def _parse_uniq(args: list[str]) -> tuple[LineTransform, list[str]] | str:
+        count = repeated_only = unique_only = False
+        operands: list[str] = []
+        for arg in args:
+            if arg.startswith("-") and arg != "-":
+                for flag in arg[1:]:
+                    if flag == "c":
+                        count = True
+                    elif flag == "d":
+                        repeated_only = True
+                    elif flag == "u":
+                        unique_only = True
+                    else:
+                        return f"uniq: invalid option -- '{flag}'"
+                continue
+            operands.append(arg)
+        if len(operands) > 1:
+            # A second operand would name an output file, and labs are read-only.
+            return f"uniq: extra operand '{operands[1]}'"
+        transform = partial(_uniq_lines, count=count, repeated_only=repeated_only, unique_only=unique_only)
+        return transform, operands
+
+    @classmethod
+    def _parse_cut(cls, args: list[str]) -> tuple[LineTransform, list[str]] | str:
+        delimiter: str | None = None
+        mode: str | None = None
+        raw_list = ""
+        operands: list[str] = []
+        index = 0
+        while index < len(args):
+            arg = args[index]
+            option = arg[1:2] if arg.startswith("-") and arg != "-" else ""
+            if option not in {"", "d", "f", "c"}:
+                return f"cut: invalid option -- '{option}'"
+            if not option:
+                operands.append(arg)
+                index += 1
+                continue
+            value = arg[2:]
+            index += 1
+            if not value:
+                if index >= len(args):
+                    return f"cut: option requires an argument -- '{option}'"
+                value = args[index]
+                index += 1
+            if option == "d":
+                delimiter = value
+                continue
+            if mode is not None:
+                return "cut: only one type of list may be specified"
+            mode, raw_list = option, value
+
+        if mode is None:
+            return "cut: you must specify a list of characters or fields"
+        if delimiter is not None and mode != "f":
+            return "cut: an input delimiter may be specified only when operating on fields"
+        if delimiter is not None and len(delimiter) != 1:
+            return "cut: the delimiter must be a single character"
+        ranges = cls._parse_cut_ranges(raw_list)
+        if isinstance(ranges, str):
+            return ranges
+        separator = "\t" if delimiter is None else delimiter
+        return partial(_cut_lines, ranges=ranges, delimiter=separator if mode == "f" else None), operands
+
+    @staticmethod
+    def _parse_cut_ranges(raw_list: str) -> list[tuple[int, int]] | str:
+        ranges: list[tuple[int, int]] = []
+        for part in raw_list.split(","):
+            start_text, separator, end_text = part.partition("-")
+            if not separator:
+                end_text = start_text
+            if not (start_text or end_text) or not all(text.isdigit() for text in (start_text, end_text) if text):
+                return f"cut: invalid field value '{part}'"
+            start = int(start_text) if start_text else 1
+            end = int(end_text) if end_text else sys.maxsize
+            if start < 1:
+                return "cut: fields and positions are numbered from 1"
+            if end < start:
+                return "cut: invalid decreasing range"
+            ranges.append((start, end))
+        return ranges
+
+    def _cmd_find(
+        self,
+        session: ShellSession,
+        args: list[str],
+        budget: CommandBudget | None,
+    ) -> ShellCommandResult | ShellCommandStream:
         if not args:
             return ShellCommandResult(output="find: usage find <path> -name <pattern>", cwd=session.cwd, exit_code=1)
 
@@ -323,19 +860,21 @@ class LinuxShellEngine:
 
             return ShellCommandResult(output=f"find: unsupported predicate '{token}'", cwd=session.cwd, exit_code=1)
 
-        results: list[str] = []
-        for candidate in session.filesystem.walk(query_path):
-            if type_filter == "f" and not session.filesystem.is_file(candidate):
-                continue
-            if type_filter == "d" and not session.filesystem.is_dir(candidate):
-                continue
-            if name_glob and not fnmatch(posixpath.basename(candidate), name_glob):
-                continue
-            if perm_filter is not None and not self._matches_perm(session.filesystem.permission_bits(candidate), perm_filter):
-                continue
-            results.append(candidate)
-
-        return ShellCommandResult(output="\n".join(results), cwd=session.cwd, exit_code=0)
+        candidates = session.filesystem.find(
+            query_path,
+            name_glob=name_glob or None,
+            type_filter=type_filter,
+            budget=budget,
+        )
+        if perm_filter is not None:
+            filesystem = session.filesystem
+            results = (
+                candidate
+                for candidate in candidates
+                if self._matches_perm(filesystem.permission_bits(candidate), perm_filter)
+            )
+            return ShellCommandStream(lines=results, cwd=session.cwd, exit_code=0)
+        return ShellCommandStream(lines=candidates, cwd=session.cwd, exit_code=0)
 
     @staticmethod
     def _matches_perm(mode_bits: int, expression: str) -> bool:
@@ -351,7 +890,12 @@ class LinuxShellEngine:
         except ValueError:
             return False
 
-    def _cmd_du(self, session: ShellSession, args: list[str]) -> ShellCommandResult:
+    def _cmd_du(
+        self,
+        session: ShellSession,
+        args: list[str],
+        budget: CommandBudget | None,
+    ) -> ShellCommandResult | ShellCommandStream:
         human_readable = False
         all_entries = False
         summary_only = False
@@ -392,25 +936,24 @@ class LinuxShellEngine:
             all_entries = False
 
         if all_entries and session.filesystem.is_dir(path):
-            lines: list[str] = []
-            for candidate in session.filesystem.walk(path):
-                size = self._du_size(session.filesystem, candidate)
-                rendered_size = self._format_size(size, human_readable=human_readable)
-                lines.append(f"{rendered_size}\t{candidate}")
-            return ShellCommandResult(output="\n".join(lines), cwd=session.cwd, exit_code=0)
-
-        size = self._du_size(session.filesystem, path)
-        rendered_size = self._format_size(size, human_readable=human_readable)
+            lines = self._iter_du_entries(session.filesystem, path, human_readable=human_readable, budget=budget)
+            return ShellCommandStream(lines=lines, cwd=session.cwd, exit_code=0)
+
+        rendered_size = self._format_size(session.filesystem.disk_usage(path), human_readable=human_readable)
         return ShellCommandResult(output=f"{rendered_size}\t{path}", cwd=session.cwd, exit_code=0)
 
-    @staticmethod
-    def _du_size(filesystem: LinuxFilesystemView, path: str) -> int:
-        if filesystem.is_file(path):
-            return filesystem.file_size_bytes(path)
-        return sum(
-            filesystem.file_size_bytes(file_path)
-            for file_path in filesystem.iter_files_under(path, recursive=True)
-        )
+    def _iter_du_entries(
+        self,
+        filesystem: LinuxFilesystemView,
+        path: str,
+        *,
+        human_readable: bool,
+        budget: CommandBudget | None,
+    ) -> Iterator[str]:
+        # Directory totals are precomputed, so each printed entry is one lookup rather than a subtree sum.
+        for candidate in filesystem.walk(path, budget=budget):
+            size = filesystem.disk_usage(candidate)
+            yield f"{self._format_size(size, human_readable=human_readable)}\t{candidate}"
 
     @staticmethod
     def _format_size(size: int, *, human_readable: bool) -> str:
@@ -427,3 +970,104 @@ class LinuxShellEngine:
         if unit_index == 0:
             return f"{int(value)}{units[unit_index]}"
         return f"{value:.1f}{units[unit_index]}"
+
+
+def _long_listing_size(filesystem: LinuxFilesystemView, path: str) -> int:
+    # Like ls -l on ext4, a directory shows its own block rather than what it contains; that total is du's job.
+    return filesystem.file_size_bytes(path) if filesystem.is_file(path) else _DIRECTORY_BLOCK_BYTES
+
+
+def _head_lines(lines: Iterator[str], *, count: int) -> Iterator[str]:
+    # islice stops pulling from upstream after ``count`` lines, which ends the source's traversal early.
+    return islice(lines, count)
+
+
+def _tail_lines(lines: Iterator[str], *, count: int) -> Iterator[str]:
+    if count:
+        yield from deque(lines, maxlen=count)
+
+
+def _wc_lines(lines: Iterator[str], *, columns: tuple[str, ...]) -> Iterator[str]:
+    # Piped lines are the previous output split on newlines, so each one stands for a newline-terminated line.
+    totals = {"l": 0, "w": 0, "m": 0, "c": 0}
+    for line in lines:
+        totals["l"] += 1
+        totals["w"] += len(line.split())
+        totals["m"] += len(line) + 1
+        totals["c"] += len(line.encode("utf-8")) + 1
+    yield " ".join(str(totals[column]) for column in columns)
+
+
+def _wc_files(
+    filesystem: LinuxFilesystemView,
+    operands: list[tuple[str, str]],
+    *,
+    columns: tuple[str, ...],
+    budget: CommandBudget | None,
+) -> Iterator[str]:
+    # File counts come from the content itself, so a missing final newline is not counted as a line.
+    grand_totals = dict.fromkeys(columns, 0)
+    for path, raw_path in operands:
+        counts = {"l": 0, "w": 0, "m": 0, "c": 0}
+        for line in filesystem.iter_file_lines(path, budget=budget):
+            counts["l"] += 1
+            counts["w"] += len(line.split())
+            counts["m"] += len(line) + 1
+            counts["c"] += len(line.encode("utf-8")) + 1
+        if budget is not None and budget.exceeded is not None:
+            # Partial counts would read as the file's; the budget line says why there are none.
+            return
+        if counts["c"] > filesystem.file_size_bytes(path):
+            # Every line was counted with a newline, but the last one has none.
+            counts = {"l": counts["l"] - 1, "w": counts["w"], "m": counts["m"] - 1, "c": counts["c"] - 1}
+        for column in columns:
+            grand_totals[column] += counts[column]
+        yield " ".join([*(str(counts[column]) for column in columns), raw_path])
+    if len(operands) > 1:
+        yield " ".join([*(str(grand_totals[column]) for column in columns), "total"])
+
+
+def _sort_lines(lines: Iterator[str], *, numeric: bool, reverse: bool, unique: bool) -> Iterator[str]:
+    key = _numeric_sort_key if numeric else None
+    previous: object = None
+    for line in sorted(lines, key=key, reverse=reverse):
+        if unique:
+            # -u compares what the sort compares: the number with -n, otherwise the whole line.
+            marker = _leading_number(line) if numeric else line
+            if marker == previous:
+                continue
+            previous = marker
+        yield line
+
+
+def _numeric_sort_key(line: str) -> tuple[float, str]:
+    return _leading_number(line), line
+
+
+def _leading_number(line: str) -> float:
+    match = _LEADING_NUMBER.match(line)
+    return float(match.group(1)) if match is not None else 0.0
+
+
+def _uniq_lines(lines: Iterator[str], *, count: bool, repeated_only: bool, unique_only: bool) -> Iterator[str]:
+    for line, group in groupby(lines):
+        occurrences = sum(1 for _ in group)
+        if (repeated_only and occurrences < 2) or (unique_only and occurrences > 1):
+            continue
+        yield f"{occurrences:7d} {line}" if count else line
+
+
+def _cut_lines(lines: Iterator[str], *, ranges: list[tuple[int, int]], delimiter: str | None) -> Iterator[str]:
+    for line in lines:
+        if delimiter is None:
+            yield "".join(char for position, char in enumerate(line, 1) if _in_ranges(position, ranges))
+        elif delimiter not in line:
+            # Like cut without -s, a line with no delimiter is passed through whole.
+            yield line
+        else:
+            fields = line.split(delimiter)
+            yield delimiter.join(field for position, field in enumerate(fields, 1) if _in_ranges(position, ranges))
+
+
+def _in_ranges(position: int, ranges: list[tuple[int, int]]) -> bool:
+    return any(start <= position <= end for start, end in ranges)
@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Callable
+import json
+from threading import Event, Lock, Thread
+from typing import Any, Protocol
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.settings import get_settings
+from app.observability.logger import log_event
+from app.observability.metrics import metrics
+
+
+_PENDING_EVENTS_KEY = "zerotrace_pending_scoreboard_events"
+_KEEPALIVE_FRAME = b": keepalive\n\n"
+
+
+class ScoreboardEventBridge(Protocol):
+    def publish(self, frame: bytes) -> None: ...
+
+    def start(self, deliver: Callable[[bytes], None]) -> None: ...
+
+    def stop(self) -> None: ...
+
+
+class LocalScoreboardEventBridge:
+    """Delivers frames to subscribers of the current worker only."""
+
+    def __init__(self) -> None:
+        self._deliver: Callable[[bytes], None] | None = None
+
+    def publish(self, frame: bytes) -> None:
+        if self._deliver is not None:
+            self._deliver(frame)
+
+    def start(self, deliver: Callable[[bytes], None]) -> None:
+        self._deliver = deliver
+
+    def stop(self) -> None:
+        self._deliver = None
+
+
+class RedisScoreboardEventBridge:
+    """Relays frames through a Redis pub/sub channel so every worker fans them out.
+
+    A dropped subscription is re-established with capped exponential backoff
+    instead of ending the listener; while Redis is down, frames this worker
+    fails to publish are still delivered locally by ``ScoreboardEventHub.publish``.
+    """
+
+    _RECONNECT_MIN_SECONDS = 0.5
+    _RECONNECT_MAX_SECONDS = 30.0
+
+    def __init__(self, *, redis_client: Any, channel: str) -> None:
+        self._redis = redis_client
+        self._channel = channel
+        self._pubsub: Any | None = None
+        self._thread: Thread | None = None
+        self._stopped = Event()
+
+    def publish(self, frame: bytes) -> None:
+        self._redis.publish(self._channel, frame)
+
+    def start(self, deliver: Callable[[bytes], None]) -> None:
+        self._stopped = Event()
+        # The first subscription is made before returning so no frame published after start is missed.
+        pubsub = self._subscribe()
+        self._pubsub = pubsub
+        self._thread = Thread(
+            target=self._listen,
+            args=(deliver, self._stopped, pubsub),
+            name="scoreboard-event-bridge",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        pubsub, self._pubsub = self._pubsub, None
+        _close_quietly(pubsub)
+        self._thread = None
+
+    def _subscribe(self) -> Any:
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self._channel)
+        return pubsub
+
+    def _listen(self, deliver: Callable[[bytes], None], stopped: Event, pubsub: Any | None) -> None:
+        delay = self._RECONNECT_MIN_SECONDS
+        while True:
+            try:
+                if pubsub is None:
+                    pubsub = self._subscribe()
+                    # Published so stop() can close it, which is what unblocks listen().
+                    self._pubsub = pubsub
+                    if stopped.is_set():
+                        break
+                    log_event("scoreboard_event_bridge_reconnected", outcome="success")
+                    delay = self._RECONNECT_MIN_SECONDS
+                for message in pubsub.listen():
+                    data = message.get("data")
+                    if isinstance(data, str):
+                        data = data.encode("utf-8")
+                    if isinstance(data, bytes):
+                        deliver(data)
+            except Exception as exc:
+                if not stopped.is_set():
+                    log_event("scoreboard_event_bridge_disconnected", outcome="retry", error_type=type(exc).__name__)
+            if stopped.is_set():
+                break
+            # Reached on errors and when listen() ends without one; either way the subscription is gone.
+            _close_quietly(pubsub)
+            pubsub = None
+            if stopped.wait(delay):
+                break
+            delay = min(delay * 2, self._RECONNECT_MAX_SECONDS)
+        _close_quietly(pubsub)
+
+
+class ScoreboardSubscription:
+    def __init__(self, *, max_queue_size: int, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.dropped = False
+        self._queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=max_queue_size + 1)
+        self._max_queue_size = max_queue_size
+
+    def offer(self, frame: bytes) -> bool:
+        """Enqueue a frame on the subscriber loop; returns False if the subscriber was dropped."""
+        if self.dropped:
+            return False
+        if self._queue.qsize() >= self._max_queue_size:
+            self._close()
+            return False
+        self._queue.put_nowait(frame)
+        return True
+
+    def close(self) -> None:
+        if not self.dropped:
+            self._close()
+
+    async def frames(self, heartbeat_seconds: float) -> AsyncIterator[bytes]:
+        while True:
+            try:
+                frame = await asyncio.wait_for(self._queue.get(), timeout=heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield _KEEPALIVE_FRAME
+                continue
+            if frame is None:
+                return
+            yield frame
+
+    def _close(self) -> None:
+        self.dropped = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+
+
+class ScoreboardEventHub:
+    """In-process broadcast hub for scoreboard deltas and first-blood announcements.
+
+    Each event is serialized to an SSE frame exactly once and the same bytes are
+    handed to every subscriber. Subscribers have bounded queues; one that falls
+    behind is disconnected instead of buffering without limit.
+    """
+
+    def __init__(self, bridge: ScoreboardEventBridge | None = None) -> None:
+        self._subscribers: dict[ScoreboardSubscription, None] = {}
+        self._lock = Lock()
+        self._bridge: ScoreboardEventBridge = bridge or LocalScoreboardEventBridge()
+        self._bridge.start(self._deliver)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def use_bridge(self, bridge: ScoreboardEventBridge) -> None:
+        previous = self._bridge
+        self._bridge = bridge
+        previous.stop()
+        bridge.start(self._deliver)
+
+    def subscribe(self, *, max_queue_size: int | None = None) -> ScoreboardSubscription:
+        queue_size = max_queue_size or get_settings().SCOREBOARD_STREAM_QUEUE_SIZE
+        subscription = ScoreboardSubscription(
+            max_queue_size=queue_size,
+            loop=asyncio.get_running_loop(),
+        )
+        with self._lock:
+            self._subscribers[subscription] = None
+            count = len(self._subscribers)
+        metrics.set_gauge("zerotrace_scoreboard_stream_subscribers", count)
+        return subscription
+
+    def unsubscribe(self, subscription: ScoreboardSubscription) -> None:
+        with self._lock:
+            self._subscribers.pop(subscription, None)
+            count = len(self._subscribers)
+        subscription.close()
+        metrics.set_gauge("zerotrace_scoreboard_stream_subscribers", count)
+
+    def publish(self, event_type: str, payload: dict[str, Any]) -> None:
+        frame = self.encode_frame(event_type, payload)
+        try:
+            self._bridge.publish(frame)
+        except Exception as exc:
+            # Fall back to local delivery so this worker's clients still see the event.
+            log_event("scoreboard_event_publish_failed", outcome="error", error_type=type(exc).__name__)
+            self._deliver(frame)
+        metrics.increment("zerotrace_scoreboard_events_published_total", labels={"event_type": event_type})
+
+    @staticmethod
+    def encode_frame(event_type: str, payload: dict[str, Any]) -> bytes:
+        data = json.dumps(payload, separators=(",", ":"), sort_keys=True, default=str)
+        return f"event: {event_type}\ndata: {data}\n\n".encode("utf-8")
+
+    def reset(self) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self._subscribers.clear()
+        for subscription in subscribers:
+            subscription.loop.call_soon_threadsafe(subscription.close)
+
+    def _deliver(self, frame: bytes) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return
+
+        by_loop: dict[asyncio.AbstractEventLoop, list[ScoreboardSubscription]] = {}
+        for subscription in subscribers:
+            by_loop.setdefault(subscription.loop, []).append(subscription)
+        for loop, batch in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(self._fan_out, batch, frame)
+            except RuntimeError:
+                # The loop is closed; its subscribers can never be served again.
+                for subscription in batch:
+                    self._forget(subscription)
+
+    def _fan_out(self, subscriptions: list[ScoreboardSubscription], frame: bytes) -> None:
+        for subscription in subscriptions:
+            if subscription.offer(frame):
+                continue
+            self._forget(subscription)
+            metrics.increment("zerotrace_scoreboard_stream_dropped_total")
+
+    def _forget(self, subscription: ScoreboardSubscription) -> None:
+        with self._lock:
+            self._subscribers.pop(subscription, None)
+
+
+def queue_scoreboard_event(session: Session, event_type: str, payload: dict[str, Any]) -> None:
+    """Stage an event to be broadcast once the session's transaction commits."""
+    session.info.setdefault(_PENDING_EVENTS_KEY, []).append((event_type, payload))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_events(session: Session) -> None:
+    pending = session.info.pop(_PENDING_EVENTS_KEY, None)
+    if not pending:
+        return
+    for event_type, payload in pending:
+        try:
+            scoreboard_event_hub.publish(event_type, payload)
+        except Exception as exc:
+            log_event("scoreboard_event_publish_failed", outcome="error", error_type=type(exc).__name__)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_events(session: Session) -> None:
+    session.info.pop(_PENDING_EVENTS_KEY, None)
+
+
+def _close_quietly(pubsub: Any | None) -> None:
+    if pubsub is None:
+        return
+    try:
+        pubsub.close()
+    except Exception:
+        pass
+
+
+def build_scoreboard_event_bridge() -> ScoreboardEventBridge:
+    settings = get_settings()
+    if settings.SCOREBOARD_EVENT_BRIDGE != "redis":
+        return LocalScoreboardEventBridge()
+
+    try:
+        import redis
+
+        timeout_seconds = max(0.01, settings.RATE_LIMIT_REDIS_SOCKET_TIMEOUT_MS / 1000)
+        client = redis.Redis.from_url(
+            settings.SCOREBOARD_EVENT_REDIS_URL,
+            socket_connect_timeout=timeout_seconds,
+        )
+        client.ping()
+    except Exception as exc:
+        log_event("scoreboard_event_bridge_unavailable", outcome="fallback_local", error_type=type(exc).__name__)
+        return LocalScoreboardEventBridge()
+
+    return RedisScoreboardEventBridge(
+        redis_client=client,
+        channel=settings.SCOREBOARD_EVENT_REDIS_CHANNEL,
+    )
+
+
+scoreboard_event_hub = ScoreboardEventHub()
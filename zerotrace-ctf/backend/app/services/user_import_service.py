@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import csv
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import io
+from itertools import islice, repeat
+import json
+import multiprocessing
+import os
+from time import perf_counter
+from typing import Any, BinaryIO, Literal
+from uuid import UUID, uuid4
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.settings import get_settings
+from app.models.role import Role
+from app.models.user import User
+from app.models.user_role import UserRole
+from app.observability.logger import log_event
+from app.observability.metrics import metrics
+from app.security.password import hash_password_with_rounds
+
+
+ImportRowStatus = Literal["created", "skipped", "failed"]
+
+SUPPORTED_IMPORT_FORMATS = ("csv", "ndjson")
+_MAX_EMAIL_LENGTH = 320
+_MAX_PASSWORD_LENGTH = 255
+
+
+@dataclass(frozen=True, slots=True)
+class UserImportRow:
+    line_number: int
+    email: str
+    password: str
+    error: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class UserImportRowResult:
+    line_number: int
+    email: str
+    status: ImportRowStatus
+    detail: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class UserImportReport:
+    created: int
+    skipped: int
+    failed: int
+    truncated: bool
+    rows: tuple[UserImportRowResult, ...]
+
+
+def iter_user_import_rows(stream: BinaryIO, import_format: str) -> Iterator[UserImportRow]:
+    """Parse an uploaded CSV or NDJSON file lazily.
+
+    Malformed rows are yielded with an ``error`` so they show up in the report;
+    only a missing CSV header or a non UTF-8 upload abort the import.
+    """
+    if import_format not in SUPPORTED_IMPORT_FORMATS:
+        raise ValueError("Unsupported import format.")
+
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if import_format == "csv":
+            yield from _iter_csv_rows(text)
+        else:
+            yield from _iter_ndjson_rows(text)
+    except UnicodeDecodeError:
+        raise ValueError("Import file must be UTF-8 encoded.") from None
+    finally:
+        # Leave the upload's own file object open for whoever owns it.
+        text.detach()
+
+
+class UserImportService:
+    DEFAULT_PLAYER_ROLE = "player"
+
+    def import_users(self, session: Session, rows: Iterable[UserImportRow]) -> UserImportReport:
+        """Create users in batches: one email prefetch, one hash fan-out and two INSERTs per batch.
+
+        Existing emails and repeats within the upload are skipped, never updated.
+        The caller owns the transaction.
+        """
+        settings = get_settings()
+        started = perf_counter()
+        role_id = session.scalar(select(Role.id).where(Role.name == self.DEFAULT_PLAYER_ROLE))
+        if role_id is None:
+            raise LookupError(f"Role '{self.DEFAULT_PLAYER_ROLE}' not found.")
+
+        max_rows = settings.USER_IMPORT_MAX_ROWS
+        batch_size = settings.USER_IMPORT_BATCH_SIZE
+        results: list[UserImportRowResult] = []
+        seen_emails: set[str] = set()
+        row_iterator = iter(rows)
+
+        with _PasswordHasher(settings.PASSWORD_HASH_ROUNDS, settings.USER_IMPORT_HASH_WORKERS) as hasher:
+            while len(results) < max_rows:
+                batch = list(islice(row_iterator, min(batch_size, max_rows - len(results))))
+                if not batch:
+                    break
+                results.extend(self._import_batch(session, batch, role_id, seen_emails, hasher))
+
+        truncated = next(row_iterator, None) is not None
+        report = UserImportReport(
+            created=sum(1 for result in results if result.status == "created"),
+            skipped=sum(1 for result in results if result.status == "skipped"),
+            failed=sum(1 for result in results if result.status == "failed"),
+            truncated=truncated,
+            rows=tuple(results),
+        )
+
+        duration_ms = (perf_counter() - started) * 1000
+        for row_status, count in (("created", report.created), ("skipped", report.skipped), ("failed", report.failed)):
+            if count:
+                metrics.increment("zerotrace_user_import_rows_total", value=count, labels={"status": row_status})
+        metrics.observe("zerotrace_user_import_duration_ms", duration_ms)
+        log_event(
+            "user_import_completed",
+            outcome="truncated" if truncated else "success",
+            created=report.created,
+            skipped=report.skipped,
+            failed=report.failed,
+            duration_ms=round(duration_ms, 2),
+        )
+        return report
+
+    def _import_batch(
+        self,
+        session: Session,
+        batch: list[UserImportRow],
+        role_id: UUID,
+        seen_emails: set[str],
+        hasher: _PasswordHasher,
+    ) -> list[UserImportRowResult]:
+        results: list[UserImportRowResult | None] = [None] * len(batch)
+        candidates: list[int] = []
+        for index, row in enumerate(batch):
+            if row.error is not None:
+                results[index] = UserImportRowResult(row.line_number, row.email, "failed", row.error)
+            elif row.email in seen_emails:
+                results[index] = UserImportRowResult(row.line_number, row.email, "skipped", "Duplicate email in upload.")
+            else:
+                seen_emails.add(row.email)
+                candidates.append(index)
+
+        existing_emails = self._existing_emails(session, [batch[index].email for index in candidates])
+        pending: list[int] = []
+        for index in candidates:
+            row = batch[index]
+            if row.email in existing_emails:
+                results[index] = UserImportRowResult(row.line_number, row.email, "skipped", "Email already registered.")
+            else:
+                pending.append(index)
+
+        password_hashes = hasher.hash_all([batch[index].password for index in pending])
+        user_values: list[dict[str, Any]] = []
+        for index, password_hash in zip(pending, password_hashes):
+            row = batch[index]
+            if password_hash is None:
+                results[index] = UserImportRowResult(row.line_number, row.email, "failed", "Password could not be hashed.")
+                continue
+            user_values.append(
+                {"id": uuid4(), "email": row.email, "password_hash": password_hash, "is_active": True}
+            )
+
+        created_emails = self._insert_users(session, user_values, role_id)
+        for index in pending:
+            if results[index] is not None:
+                continue
+            row = batch[index]
+            if row.email in created_emails:
+                results[index] = UserImportRowResult(row.line_number, row.email, "created")
+            else:
+                results[index] = UserImportRowResult(row.line_number, row.email, "skipped", "Email already registered.")
+
+        return [result for result in results if result is not None]
+
+    @staticmethod
+    def _existing_emails(session: Session, emails: list[str]) -> set[str]:
+        if not emails:
+            return set()
+        return set(session.scalars(select(User.email).where(User.email.in_(emails))))
+
+    @staticmethod
+    def _insert_users(session: Session, user_values: list[dict[str, Any]], role_id: UUID) -> set[str]:
+        """Insert users and their role links, returning the emails that were actually created."""
+        if not user_values:
+            return set()
+
+        try:
+            with session.begin_nested():
+                session.execute(insert(User), user_values)
+                session.execute(
+                    insert(UserRole),
+                    [{"user_id": values["id"], "role_id": role_id} for values in user_values],
+                )
+        except IntegrityError:
+            pass
+        else:
+            return {values["email"] for values in user_values}
+
+        # A concurrent registration took one of the emails after the prefetch;
+        # retry row by row so only the conflicting rows are skipped.
+        created: set[str] = set()
+        for values in user_values:
+            try:
+                with session.begin_nested():
+                    session.execute(insert(User), [values])
+                    session.execute(insert(UserRole), [{"user_id": values["id"], "role_id": role_id}])
+            except IntegrityError:
+                continue
+            created.add(values["email"])
+        return created
+
+
+class _PasswordHasher:
+    """Hashes passwords inline or, for multi-row batches, across a lazily started process pool.
+
+    Workers are spawned rather than forked so they never inherit the server's
+    threads, locks or pooled database connections.
+    """
+
+    def __init__(self, rounds: int, workers: int) -> None:
+        self._rounds = rounds
+        self._workers = workers or os.cpu_count() or 1
+        self._pool: ProcessPoolExecutor | None = None
+
+    def __enter__(self) -> _PasswordHasher:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def hash_all(self, passwords: list[str]) -> list[str | None]:
+        if self._workers <= 1 or len(passwords) < 2:
+            return [hash_password_with_rounds(password, self._rounds) for password in passwords]
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        chunksize = max(1, len(passwords) // (self._workers * 4))
+        return list(self._pool.map(hash_password_with_rounds, passwords, repeat(self._rounds), chunksize=chunksize))
+
+
+def _iter_csv_rows(text: io.TextIOWrapper) -> Iterator[UserImportRow]:
+    reader = csv.DictReader(text)
+    fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+    if "email" not in fieldnames or "password" not in fieldnames:
+        raise ValueError("CSV header must include email and password columns.")
+    reader.fieldnames = fieldnames
+
+    for record in reader:
+        yield _build_row(reader.line_num, record.get("email"), record.get("password"))
+
+
+def _iter_ndjson_rows(text: io.TextIOWrapper) -> Iterator[UserImportRow]:
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            yield UserImportRow(line_number, "", "", "Row is not valid JSON.")
+            continue
+        if not isinstance(record, dict):
+            yield UserImportRow(line_number, "", "", "Row must be a JSON object.")
+            continue
+        yield _build_row(line_number, record.get("email"), record.get("password"))
+
+
+def _build_row(line_number: int, raw_email: object, raw_password: object) -> UserImportRow:
+    # Mirrors RegisterRequest so bulk-imported accounts obey the same rules as self-registration.
+    email = raw_email.strip() if isinstance(raw_email, str) else ""
+    if not email:
+        return UserImportRow(line_number, "", "", "Email must not be empty.")
+    if len(email) > _MAX_EMAIL_LENGTH:
+        return UserImportRow(line_number, email[:_MAX_EMAIL_LENGTH], "", "Email is too long.")
+    if not isinstance(raw_password, str) or not raw_password:
+        return UserImportRow(line_number, email, "", "Password must not be empty.")
+    if len(raw_password) > _MAX_PASSWORD_LENGTH:
+        return UserImportRow(line_number, email, "", "Password is too long.")
+    return UserImportRow(line_number, email, raw_password)
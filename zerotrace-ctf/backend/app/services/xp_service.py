@@ -1,18 +1,195 @@
 from __future__ import annotations
 
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from threading import Lock
+from time import monotonic
+from typing import List, Literal
 from uuid import UUID
 
-from sqlalchemy import func, select
+from sqlalchemy import event, func, select
 from sqlalchemy.orm import Session
 
+from app.core.settings import get_settings
 from app.models.challenge_solve import ChallengeSolve
+from app.observability.metrics import metrics
+
+
+_PENDING_INVALIDATIONS_KEY = "zerotrace_pending_xp_invalidations"
+
+XPTimelineGranularity = Literal["solve", "day"]
+
+
+@dataclass(frozen=True, slots=True)
+class XPTimelinePoint:
+    timestamp: datetime
+    xp_awarded: int
+    cumulative_xp: int
+    challenge_id: UUID | None
+
+
+@dataclass(frozen=True, slots=True)
+class UserXPAggregate:
+    total_xp: int
+    points: tuple[XPTimelinePoint, ...]
+
+    def daily(self) -> List[XPTimelinePoint]:
+        points: list[XPTimelinePoint] = []
+        current_day: date | None = None
+        day_xp = 0
+        cumulative_xp = 0
+        for solve in self.points:
+            solve_day = _as_utc(solve.timestamp).date()
+            if current_day is not None and solve_day != current_day:
+                points.append(_day_point(current_day, day_xp, cumulative_xp))
+                day_xp = 0
+            current_day = solve_day
+            day_xp += solve.xp_awarded
+            cumulative_xp = solve.cumulative_xp
+        if current_day is not None:
+            points.append(_day_point(current_day, day_xp, cumulative_xp))
+        return points
+
+
+class UserXPCache:
+    """Bounded per-user cache of XP aggregates.
+
+    Entries are dropped when the user's next solve commits. The TTL only bounds
+    staleness for solves committed by other worker processes. Limits not passed
+    explicitly are read from settings on each call.
+    """
+
+    def __init__(self, *, max_entries: int | None = None, ttl_seconds: float | None = None) -> None:
+        self._entries: OrderedDict[UUID, tuple[float, UserXPAggregate]] = OrderedDict()
+        self._lock = Lock()
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+
+    def get(self, user_id: UUID) -> UserXPAggregate | None:
+        ttl_seconds = self._ttl_seconds
+        if ttl_seconds is None:
+            ttl_seconds = get_settings().XP_CACHE_TTL_SECONDS
+        with self._lock:
+            cached = self._entries.get(user_id)
+            if cached is None:
+                return None
+            stored_at, aggregate = cached
+            if monotonic() - stored_at > ttl_seconds:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return aggregate
+
+    def put(self, user_id: UUID, aggregate: UserXPAggregate) -> None:
+        max_entries = self._max_entries
+        if max_entries is None:
+            max_entries = get_settings().XP_CACHE_MAX_USERS
+        if max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (monotonic(), aggregate)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: UUID) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
 
 
 class XPService:
+    def __init__(self, cache: UserXPCache | None = None) -> None:
+        self._cache = cache or user_xp_cache
+
+    def get_total_xp_for_user(self, session: Session, user_id: UUID) -> int:
+        return self.get_user_aggregate(session, user_id).total_xp
+
+    def get_timeline_for_user(
+        self,
+        session: Session,
+        user_id: UUID,
+        granularity: XPTimelineGranularity,
+    ) -> UserXPAggregate:
+        if granularity not in ("solve", "day"):
+            raise ValueError("granularity must be 'solve' or 'day'.")
+        aggregate = self.get_user_aggregate(session, user_id)
+        if granularity == "day":
+            return UserXPAggregate(total_xp=aggregate.total_xp, points=tuple(aggregate.daily()))
+        return aggregate
+
+    def get_user_aggregate(self, session: Session, user_id: UUID) -> UserXPAggregate:
+        cached = self._cache.get(user_id)
+        if cached is not None:
+            metrics.increment("zerotrace_xp_cache_requests_total", labels={"outcome": "hit"})
+            return cached
+
+        metrics.increment("zerotrace_xp_cache_requests_total", labels={"outcome": "miss"})
+        aggregate = self._load_aggregate(session, user_id)
+        self._cache.put(user_id, aggregate)
+        return aggregate
+
     @staticmethod
-    def get_total_xp_for_user(session: Session, user_id: UUID) -> int:
-        stmt = select(func.coalesce(func.sum(ChallengeSolve.points_awarded), 0)).where(
-            ChallengeSolve.user_id == user_id
+    def _load_aggregate(session: Session, user_id: UUID) -> UserXPAggregate:
+        # Served by ix_challenge_solves_user_id_created_at: equality on user_id, rows already in window order.
+        order_by = (ChallengeSolve.created_at.asc(), ChallengeSolve.id.asc())
+        stmt = (
+            select(
+                ChallengeSolve.challenge_id,
+                ChallengeSolve.points_awarded,
+                ChallengeSolve.created_at,
+                func.sum(ChallengeSolve.points_awarded).over(order_by=order_by).label("cumulative_xp"),
+            )
+            .where(ChallengeSolve.user_id == user_id)
+            .order_by(*order_by)
+        )
+        solves = tuple(
+            XPTimelinePoint(
+                timestamp=row.created_at,
+                xp_awarded=int(row.points_awarded),
+                cumulative_xp=int(row.cumulative_xp),
+                challenge_id=row.challenge_id,
+            )
+            for row in session.execute(stmt)
         )
-        total_xp = session.execute(stmt).scalar_one()
-        return int(total_xp)
+        total_xp = solves[-1].cumulative_xp if solves else 0
+        return UserXPAggregate(total_xp=total_xp, points=solves)
+
+
+def invalidate_user_xp_after_commit(session: Session, user_id: UUID) -> None:
+    """Drop the user's cached XP now and again once the session's transaction ends."""
+    user_xp_cache.invalidate(user_id)
+    session.info.setdefault(_PENDING_INVALIDATIONS_KEY, set()).add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _apply_pending_invalidations(session: Session) -> None:
+    # A concurrent reader may have cached the pre-solve total between flush and commit.
+    pending = session.info.pop(_PENDING_INVALIDATIONS_KEY, None)
+    if not pending:
+        return
+    for user_id in pending:
+        user_xp_cache.invalidate(user_id)
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _day_point(day: date, xp: int, cumulative_xp: int) -> XPTimelinePoint:
+    return XPTimelinePoint(
+        timestamp=datetime(day.year, day.month, day.day, tzinfo=timezone.utc),
+        xp_awarded=xp,
+        cumulative_xp=cumulative_xp,
+        challenge_id=None,
+    )
+
+
+user_xp_cache = UserXPCache()
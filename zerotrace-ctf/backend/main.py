@@ -4,10 +4,22 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 
+from app.controllers.challenge_controller import get_challenge_lab_service
 from app.core.settings import get_settings
 from app.middleware import register_middleware
 from app.observability.integrity import IntegritySchedulerHandle, start_integrity_scheduler, stop_integrity_scheduler
 from app.routes import api_router
+from app.services.lab_reload_watcher import (
+    LabReloadWatcherHandle,
+    start_lab_reload_watcher,
+    stop_lab_reload_watcher,
+)
+from app.services.leaderboard_snapshot_service import (
+    LeaderboardSnapshotterHandle,
+    start_leaderboard_snapshotter,
+    stop_leaderboard_snapshotter,
+)
+from app.services.scoreboard_event_hub import build_scoreboard_event_bridge, scoreboard_event_hub
 from app.services.seed_sync_watcher import (
     SeedSyncWatcherHandle,
     start_seed_sync_watcher,
@@ -55,11 +67,20 @@ def download_artifact(artifact_path: str) -> FileResponse:
 async def startup_observability_tasks() -> None:
     app.state.integrity_scheduler = start_integrity_scheduler()
     app.state.seed_sync_watcher = start_seed_sync_watcher()
+    app.state.lab_reload_watcher = start_lab_reload_watcher(get_challenge_lab_service())
+    app.state.leaderboard_snapshotter = start_leaderboard_snapshotter()
+    if settings.SCOREBOARD_EVENT_BRIDGE != "local":
+        scoreboard_event_hub.use_bridge(build_scoreboard_event_bridge())
 
 
 @app.on_event("shutdown")
 async def shutdown_observability_tasks() -> None:
     handle: IntegritySchedulerHandle | None = getattr(app.state, "integrity_scheduler", None)
     watcher_handle: SeedSyncWatcherHandle | None = getattr(app.state, "seed_sync_watcher", None)
+    lab_reload_handle: LabReloadWatcherHandle | None = getattr(app.state, "lab_reload_watcher", None)
+    snapshotter_handle: LeaderboardSnapshotterHandle | None = getattr(app.state, "leaderboard_snapshotter", None)
     await stop_integrity_scheduler(handle)
     await stop_seed_sync_watcher(watcher_handle)
+    await stop_lab_reload_watcher(lab_reload_handle)
+    await stop_leaderboard_snapshotter(snapshotter_handle)
+    scoreboard_event_hub.reset()
@@ -0,0 +1,38 @@
+"""create leaderboard_snapshots table
+
+Revision ID: b7d41e9a2c55
+Revises: 516b9bce5e2c
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d41e9a2c55'
+down_revision: Union[str, Sequence[str], None] = '516b9bce5e2c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('leaderboard_snapshots',
+    sa.Column('captured_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('entry_count', sa.Integer(), nullable=False),
+    sa.Column('user_ids', sa.JSON(), nullable=False),
+    sa.Column('total_xp', sa.JSON(), nullable=False),
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_leaderboard_snapshots'))
+    )
+    op.create_index(op.f('ix_leaderboard_snapshots_captured_at'), 'leaderboard_snapshots', ['captured_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_leaderboard_snapshots_captured_at'), table_name='leaderboard_snapshots')
+    op.drop_table('leaderboard_snapshots')
@@ -0,0 +1,90 @@
+"""create user_daily_xp table
+
+Revision ID: c3e8f0a1d7b4
+Revises: b7d41e9a2c55
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from datetime import timezone
+from typing import Sequence, Union
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e8f0a1d7b4'
+down_revision: Union[str, Sequence[str], None] = 'b7d41e9a2c55'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    user_daily_xp = op.create_table('user_daily_xp',
+    sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('track_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('xp', sa.Integer(), nullable=False),
+    sa.Column('solve_count', sa.Integer(), nullable=False),
+    sa.Column('first_solve_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.CheckConstraint('xp > 0', name='ck_user_daily_xp_xp_positive'),
+    sa.ForeignKeyConstraint(['track_id'], ['tracks.id'], name=op.f('fk_user_daily_xp_track_id_tracks'), ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_user_daily_xp_user_id_users'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_user_daily_xp')),
+    sa.UniqueConstraint('user_id', 'track_id', 'day', name=op.f('uq_user_daily_xp_user_id'))
+    )
+    op.create_index('ix_user_daily_xp_day_track_id', 'user_daily_xp', ['day', 'track_id'], unique=False)
+
+    # Backfill buckets from existing solves so range boards cover history from day one.
+    challenge_solves = sa.table('challenge_solves',
+    sa.column('user_id', postgresql.UUID(as_uuid=True)),
+    sa.column('challenge_id', postgresql.UUID(as_uuid=True)),
+    sa.column('points_awarded', sa.Integer()),
+    sa.column('created_at', sa.DateTime(timezone=True)),
+    )
+    challenges = sa.table('challenges',
+    sa.column('id', postgresql.UUID(as_uuid=True)),
+    sa.column('track_id', postgresql.UUID(as_uuid=True)),
+    )
+    solves = op.get_bind().execute(
+        sa.select(
+            challenge_solves.c.user_id,
+            challenges.c.track_id,
+            challenge_solves.c.points_awarded,
+            challenge_solves.c.created_at,
+        ).join(challenges, challenges.c.id == challenge_solves.c.challenge_id)
+    )
+    buckets: dict[tuple, dict] = {}
+    for user_id, track_id, points_awarded, created_at in solves:
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        day = created_at.astimezone(timezone.utc).date()
+        bucket = buckets.setdefault(
+            (user_id, track_id, day),
+            {'xp': 0, 'solve_count': 0, 'first_solve_at': created_at},
+        )
+        bucket['xp'] += points_awarded
+        bucket['solve_count'] += 1
+        bucket['first_solve_at'] = min(bucket['first_solve_at'], created_at)
+
+    if buckets:
+        op.bulk_insert(user_daily_xp, [
+            {
+                'id': uuid.uuid4(),
+                'user_id': user_id,
+                'track_id': track_id,
+                'day': day,
+                **values,
+            }
+            for (user_id, track_id, day), values in buckets.items()
+        ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_daily_xp_day_track_id', table_name='user_daily_xp')
+    op.drop_table('user_daily_xp')
@@ -0,0 +1,112 @@
+"""bound leaderboard snapshots to top-N plus per-user positions
+
+Revision ID: d4f9a2b6e8c1
+Revises: c3e8f0a1d7b4
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from hashlib import sha256
+from typing import Sequence, Union
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f9a2b6e8c1'
+down_revision: Union[str, Sequence[str], None] = 'c3e8f0a1d7b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_MAX_TOP = 100
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('leaderboard_snapshots', sa.Column('board_digest', sa.String(length=64), nullable=True))
+    op.add_column('leaderboard_snapshots', sa.Column('top_user_ids', sa.JSON(), nullable=True))
+    op.add_column('leaderboard_snapshots', sa.Column('top_total_xp', sa.JSON(), nullable=True))
+    positions = op.create_table('leaderboard_user_positions',
+    sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('snapshot_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('captured_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('total_xp', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.ForeignKeyConstraint(['snapshot_id'], ['leaderboard_snapshots.id'], name=op.f('fk_leaderboard_user_positions_snapshot_id_leaderboard_snapshots'), ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_leaderboard_user_positions_user_id_users'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_leaderboard_user_positions'))
+    )
+    op.create_index('ix_leaderboard_user_positions_user_id_captured_at', 'leaderboard_user_positions', ['user_id', 'captured_at'], unique=False)
+    op.create_index(op.f('ix_leaderboard_user_positions_snapshot_id'), 'leaderboard_user_positions', ['snapshot_id'], unique=False)
+
+    # Rewrite existing full boards one at a time, oldest first, keeping only each user's change points.
+    snapshots = sa.table('leaderboard_snapshots',
+    sa.column('id', postgresql.UUID(as_uuid=True)),
+    sa.column('captured_at', sa.DateTime(timezone=True)),
+    sa.column('user_ids', sa.JSON()),
+    sa.column('total_xp', sa.JSON()),
+    sa.column('board_digest', sa.String(length=64)),
+    sa.column('top_user_ids', sa.JSON()),
+    sa.column('top_total_xp', sa.JSON()),
+    )
+    users = sa.table('users', sa.column('id', postgresql.UUID(as_uuid=True)))
+    bind = op.get_bind()
+    existing_users = {str(user_id) for user_id in bind.execute(sa.select(users.c.id)).scalars()}
+    snapshot_ids = bind.execute(
+        sa.select(snapshots.c.id).order_by(snapshots.c.captured_at.asc())
+    ).scalars().all()
+    previous: dict[str, tuple[int, int]] = {}
+    for snapshot_id in snapshot_ids:
+        captured_at, user_ids, total_xp = bind.execute(
+            sa.select(snapshots.c.captured_at, snapshots.c.user_ids, snapshots.c.total_xp)
+            .where(snapshots.c.id == snapshot_id)
+        ).one()
+        digest = sha256()
+        rows = []
+        for index, (user_id, xp) in enumerate(zip(user_ids, total_xp)):
+            digest.update(f"{user_id}:{int(xp)}\n".encode("ascii"))
+            position = (int(xp), index + 1)
+            if user_id in existing_users and previous.get(user_id) != position:
+                rows.append({
+                    'id': uuid.uuid4(),
+                    'user_id': uuid.UUID(user_id),
+                    'snapshot_id': snapshot_id,
+                    'captured_at': captured_at,
+                    'total_xp': position[0],
+                    'rank': position[1],
+                })
+            previous[user_id] = position
+        bind.execute(
+            snapshots.update().where(snapshots.c.id == snapshot_id).values(
+                board_digest=digest.hexdigest(),
+                top_user_ids=list(user_ids[:_MAX_TOP]),
+                top_total_xp=[int(xp) for xp in total_xp[:_MAX_TOP]],
+            )
+        )
+        if rows:
+            op.bulk_insert(positions, rows)
+
+    op.alter_column('leaderboard_snapshots', 'board_digest', nullable=False)
+    op.alter_column('leaderboard_snapshots', 'top_user_ids', nullable=False)
+    op.alter_column('leaderboard_snapshots', 'top_total_xp', nullable=False)
+    op.drop_column('leaderboard_snapshots', 'user_ids')
+    op.drop_column('leaderboard_snapshots', 'total_xp')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Full boards cannot be rebuilt from top-N arrays; older snapshots come back truncated to their top ranks.
+    op.add_column('leaderboard_snapshots', sa.Column('user_ids', sa.JSON(), nullable=True))
+    op.add_column('leaderboard_snapshots', sa.Column('total_xp', sa.JSON(), nullable=True))
+    op.execute('UPDATE leaderboard_snapshots SET user_ids = top_user_ids, total_xp = top_total_xp')
+    op.alter_column('leaderboard_snapshots', 'user_ids', nullable=False)
+    op.alter_column('leaderboard_snapshots', 'total_xp', nullable=False)
+    op.drop_index(op.f('ix_leaderboard_user_positions_snapshot_id'), table_name='leaderboard_user_positions')
+    op.drop_index('ix_leaderboard_user_positions_user_id_captured_at', table_name='leaderboard_user_positions')
+    op.drop_table('leaderboard_user_positions')
+    op.drop_column('leaderboard_snapshots', 'top_total_xp')
+    op.drop_column('leaderboard_snapshots', 'top_user_ids')
+    op.drop_column('leaderboard_snapshots', 'board_digest')
@@ -0,0 +1,59 @@
+"""create leaderboard_latest_positions table
+
+Revision ID: e7a3c5d9f1b2
+Revises: d4f9a2b6e8c1
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3c5d9f1b2'
+down_revision: Union[str, Sequence[str], None] = 'd4f9a2b6e8c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    latest_positions = op.create_table('leaderboard_latest_positions',
+    sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('captured_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('total_xp', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_leaderboard_latest_positions_user_id_users'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_leaderboard_latest_positions')),
+    sa.UniqueConstraint('user_id', name=op.f('uq_leaderboard_latest_positions_user_id'))
+    )
+
+    # One pass over the existing history seeds each user's latest position; captures never repeat it.
+    positions = sa.table('leaderboard_user_positions',
+    sa.column('user_id', postgresql.UUID(as_uuid=True)),
+    sa.column('captured_at', sa.DateTime(timezone=True)),
+    sa.column('total_xp', sa.Integer()),
+    sa.column('rank', sa.Integer()),
+    )
+    rows = op.get_bind().execute(
+        sa.select(positions.c.user_id, positions.c.captured_at, positions.c.total_xp, positions.c.rank)
+        .order_by(positions.c.captured_at.asc())
+    )
+    latest: dict = {}
+    for user_id, captured_at, total_xp, rank in rows:
+        latest[user_id] = {'captured_at': captured_at, 'total_xp': total_xp, 'rank': rank}
+    if latest:
+        op.bulk_insert(latest_positions, [
+            {'id': uuid.uuid4(), 'user_id': user_id, **values}
+            for user_id, values in latest.items()
+        ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('leaderboard_latest_positions')
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import posixpath
+from statistics import median
+import sys
+from time import perf_counter
+from typing import Callable
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.services.lab_filesystem import VirtualFilesystem
+from app.services.linux_shell_engine import LinuxShellEngine, ShellSession
+
+
+def build_synthetic_files(file_count: int, files_per_directory: int) -> dict[str, str]:
+    files: dict[str, str] = {
+        "/etc/hosts": "127.0.0.1 localhost\n",
+        "/etc/passwd": "root:x:0:0:root:/root:/bin/bash\n",
+        "/root/flag.txt": "ZTCTF{benchmark}\n",
+    }
+    for index in range(file_count):
+        directory = index // files_per_directory
+        files[f"/srv/data/group{directory % 10}/d{directory:05d}/record-{index:06d}.log"] = (
+            f"record {index} status=ok\nchecksum={index * 7919 % 100003}\n"
+        )
+    return files
+
+
+def _flat_list_dir(files: dict[str, str], directories: set[str], path: str) -> list[str]:
+    """Original O(total) listing, kept here only as the comparison baseline."""
+    prefix = "/" if path == "/" else f"{path}/"
+    children = {
+        candidate[len(prefix) :].split("/", maxsplit=1)[0]
+        for candidate in directories | set(files)
+        if candidate != path and candidate.startswith(prefix)
+    }
+    return sorted(children)
+
+
+def _flat_walk(files: dict[str, str], directories: set[str], path: str) -> list[str]:
+    prefix = "/" if path == "/" else f"{path}/"
+    return [
+        path,
+        *sorted(directory for directory in directories if directory != path and directory.startswith(prefix)),
+        *sorted(file_path for file_path in files if file_path.startswith(prefix)),
+    ]
+
+
+def _flat_grep(files: dict[str, str], pattern: str) -> list[str]:
+    return [
+        f"{path}:{line_no}:{line}"
+        for path in sorted(files)
+        for line_no, line in enumerate(files[path].splitlines(), start=1)
+        if pattern in line
+    ]
+
+
+def _time_ms(operation: Callable[[], object], repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = perf_counter()
+        operation()
+        timings.append((perf_counter() - started) * 1000)
+    return median(timings)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark lab terminal commands against a synthetic large lab.")
+    parser.add_argument("--files", type=int, default=100_000, help="Number of synthetic files.")
+    parser.add_argument("--files-per-directory", type=int, default=200, help="Files per leaf directory.")
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per operation; the median is reported.")
+    parser.add_argument("--skip-baseline", action="store_true", help="Do not time the original flat-scan algorithm.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.files <= 0 or args.files_per_directory <= 0 or args.repeats <= 0:
+        print("--files, --files-per-directory and --repeats must be positive.", file=sys.stderr)
+        return 2
+
+    files = build_synthetic_files(args.files, args.files_per_directory)
+    started = perf_counter()
+    filesystem = VirtualFilesystem(files)
+    build_ms = (perf_counter() - started) * 1000
+
+    leaf = posixpath.dirname(next(path for path in files if path.startswith("/srv/data/")))
+    engine = LinuxShellEngine()
+    commands = [
+        f"ls -la {leaf}",
+        f"find {leaf} -name '*.log'",
+        "find / -name flag.txt",
+        "find /srv/data/group3 -type d",
+        f"grep -R checksum=7919 {leaf}",
+        "grep -R ZTCTF{ /",
+        "du -sh /srv/data/group3",
+    ]
+
+    print(f"files: {len(files)}  build: {build_ms:.1f} ms")
+    started = perf_counter()
+    filesystem.grep("/", "ZTCTF{", recursive=True)
+    print(f"trigram index + first grep: {(perf_counter() - started) * 1000:.1f} ms")
+    for command in commands:
+        elapsed_ms = _time_ms(lambda: engine.run(command, ShellSession(filesystem=filesystem, cwd="/")), args.repeats)
+        print(f"{elapsed_ms:10.3f} ms  {command}")
+
+    if not args.skip_baseline:
+        directories = {posixpath.dirname(path) for path in files}
+        for path in list(directories):
+            while path != "/":
+                path = posixpath.dirname(path)
+                directories.add(path)
+        print("flat-scan baseline:")
+        flat_ls_ms = _time_ms(lambda: _flat_list_dir(files, directories, leaf), args.repeats)
+        flat_walk_ms = _time_ms(lambda: _flat_walk(files, directories, leaf), args.repeats)
+        print(f"{flat_ls_ms:10.3f} ms  ls {leaf}")
+        flat_grep_ms = _time_ms(lambda: _flat_grep(files, "ZTCTF{"), args.repeats)
+        print(f"{flat_walk_ms:10.3f} ms  walk {leaf}")
+        print(f"{flat_grep_ms:10.3f} ms  grep -R ZTCTF{{ /")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.security.password import calibrate_bcrypt_rounds
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Measure bcrypt hash time on this host and print the highest cost that fits the target latency. "
+            "Run it on the deployment hardware and copy the output into the environment."
+        ),
+    )
+    parser.add_argument(
+        "--target-ms",
+        type=float,
+        default=250.0,
+        help="Maximum acceptable hash time for a single login, in milliseconds.",
+    )
+    parser.add_argument(
+        "--flag-target-ms",
+        type=float,
+        help="Separate target for flag hashes (verified on every submission). Defaults to --target-ms.",
+    )
+    parser.add_argument("--min-rounds", type=int, default=10, help="Lowest bcrypt cost to consider.")
+    parser.add_argument("--max-rounds", type=int, default=16, help="Highest bcrypt cost to consider.")
+    parser.add_argument("--samples", type=int, default=3, help="Hashes per cost; the median is used.")
+    return parser
+
+
+def _rounds_within(timings_ms: dict[int, float], target_ms: float, min_rounds: int) -> int:
+    return max((rounds for rounds, elapsed_ms in timings_ms.items() if elapsed_ms <= target_ms), default=min_rounds)
+
+
+def main() -> int:
+    args = _build_parser().parse_args()
+    flag_target_ms = args.flag_target_ms if args.flag_target_ms is not None else args.target_ms
+
+    try:
+        # Measure once up to the larger budget, then pick each cost from the same timings.
+        _, timings_ms = calibrate_bcrypt_rounds(
+            max(args.target_ms, flag_target_ms),
+            min_rounds=args.min_rounds,
+            max_rounds=args.max_rounds,
+            samples=args.samples,
+        )
+    except ValueError as exc:
+        print(f"Calibration failed: {exc}", file=sys.stderr)
+        return 2
+
+    password_rounds = _rounds_within(timings_ms, args.target_ms, args.min_rounds)
+    flag_rounds = _rounds_within(timings_ms, flag_target_ms, args.min_rounds)
+    for rounds, elapsed_ms in timings_ms.items():
+        print(f"# rounds={rounds} median_ms={elapsed_ms:.1f}")
+    print(f"PASSWORD_HASH_ROUNDS={password_rounds}")
+    print(f"FLAG_HASH_ROUNDS={flag_rounds}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
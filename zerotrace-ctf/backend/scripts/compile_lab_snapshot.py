@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.services.lab_snapshot import compile_lab_snapshot, resolve_snapshot_path
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compile every lab under app/labs into one snapshot file for LAB_SNAPSHOT_FILE.",
+    )
+    parser.add_argument(
+        "--output",
+        default="lab-snapshot.bin",
+        help="Snapshot path; relative paths resolve against the backend root.",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    summary = compile_lab_snapshot(resolve_snapshot_path(args.output))
+    print(
+        f"compiled {summary.labs} labs ({summary.files} files, {summary.blob_bytes} content bytes) "
+        f"into {summary.path} ({summary.size_bytes} bytes)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
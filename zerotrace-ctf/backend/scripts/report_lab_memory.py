@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+import sys
+import tracemalloc
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.services.challenge_lab_service import ChallengeLabService
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Report approximate memory retained by loaded lab filesystems.")
+    parser.add_argument("--max-labs", type=int, default=100_000, help="Resident lab limit while measuring.")
+    parser.add_argument("--per-lab", action="store_true", help="Print one line per lab.")
+    return parser.parse_args()
+
+
+def _format_bytes(value: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if value < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GiB"
+
+
+def main() -> int:
+    args = parse_args()
+    # Keep every lab resident so the report covers all of them, not just the LRU's share.
+    os.environ["LAB_RESIDENT_CACHE_SIZE"] = str(args.max_labs)
+    os.environ["OBSERVABILITY_ENABLED"] = "false"
+    tracemalloc.start()
+    service = ChallengeLabService()
+    slugs = service.lab_slugs()
+    for slug in slugs:
+        service.get_default_cwd(slug)
+    traced_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    report = service.memory_report()
+    overlay_bytes = sum(usage.overlay_bytes for usage in report)
+    shared_base_bytes = sum(usage.shared_base_bytes for usage in report)
+    layered_labs = sum(1 for usage in report if usage.base_files)
+    base_bytes_per_lab = max((usage.shared_base_bytes for usage in report), default=0)
+
+    if args.per_lab:
+        for usage in report:
+            print(
+                f"{usage.slug:40} overlay {usage.overlay_files:6d} files {_format_bytes(usage.overlay_bytes):>11}"
+                f"  base {usage.base_files:6d} files"
+            )
+    print(f"labs: {len(report)} resident of {len(slugs)} indexed ({layered_labs} on the shared base)")
+    print(f"overlays:    {_format_bytes(overlay_bytes)}")
+    print(f"shared base: {_format_bytes(shared_base_bytes)}")
+    print(f"base copied per lab would be: {_format_bytes(base_bytes_per_lab * layered_labs)}")
+    print(f"allocated while loading (tracemalloc): {_format_bytes(traced_bytes)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -20,7 +20,7 @@ from app.models.challenge import Challenge, ChallengeDifficulty
 from app.models.track import Track
 from app.repositories import challenge_repository
 from app.services.challenge_service import ChallengeService
-from app.services.flag_hashing import hash_flag, verify_flag
+from app.services.flag_hashing import flag_needs_rehash, hash_flag, verify_and_update_flag
 
 
 @dataclass
@@ -32,6 +32,7 @@ class SeedStats:
     challenges_pruned: int = 0
     flags_set: int = 0
     flags_updated: int = 0
+    flags_rehashed: int = 0
     challenges_published: int = 0
     challenges_skipped: int = 0
 
@@ -324,9 +325,19 @@ def _upsert_challenge(
         if challenge.flag is None:
             challenge_service.set_flag(session, challenge, normalized_plaintext_flag)
             stats.flags_set += 1
-        elif overwrite_flags and not verify_flag(normalized_plaintext_flag, challenge.flag.flag_hash):
-            challenge.flag.flag_hash = hash_flag(normalized_plaintext_flag)
-            stats.flags_updated += 1
+        elif overwrite_flags or flag_needs_rehash(challenge.flag.flag_hash):
+            # Without either, nothing below could change, so the full bcrypt verify is skipped.
+            flag_matches, replacement_hash = verify_and_update_flag(
+                normalized_plaintext_flag,
+                challenge.flag.flag_hash,
+            )
+            if overwrite_flags and not flag_matches:
+                challenge.flag.flag_hash = hash_flag(normalized_plaintext_flag)
+                stats.flags_updated += 1
+            elif flag_matches and replacement_hash is not None:
+                # Stored hash predates the current FLAG_HASH_ROUNDS; upgrade it in place.
+                challenge.flag.flag_hash = replacement_hash
+                stats.flags_rehashed += 1
 
     seed_publish = bool(challenge_payload.get("publish", False))
     if allow_publish and seed_publish and not challenge.is_published:
@@ -522,6 +533,7 @@ def main() -> int:
     print(f"challenges_pruned={stats.challenges_pruned}")
     print(f"flags_set={stats.flags_set}")
     print(f"flags_updated={stats.flags_updated}")
+    print(f"flags_rehashed={stats.flags_rehashed}")
     print(f"challenges_published={stats.challenges_published}")
     print(f"challenges_skipped={stats.challenges_skipped}")
     print(f"dry_run={args.dry_run}")
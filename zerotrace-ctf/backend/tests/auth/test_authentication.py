@@ -3,6 +3,8 @@ from __future__ import annotations
 import pytest
 from sqlalchemy.orm import Session
 
+from app.core.settings import get_settings
+
 from app.services.auth_service import AuthService
 from app.services.exceptions import InactiveUserError, InvalidCredentialsError
 
@@ -66,3 +68,27 @@ def test_authenticate_inactive_user(
 
     with pytest.raises(InactiveUserError):
         auth_service.authenticate_user(session, email=email, password=password)
+
+
+def test_authenticate_rehashes_password_created_under_a_different_cost(
+    session: Session,
+    seed_roles: dict[str, object],
+    auth_service: AuthService,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    email = "rehash@example.com"
+    password = "StrongPassword!123"
+    monkeypatch.setenv("PASSWORD_HASH_ROUNDS", "4")
+    get_settings.cache_clear()
+    user = _register_user(session, auth_service, email=email, password=password)
+    original_hash = user.password_hash
+
+    monkeypatch.setenv("PASSWORD_HASH_ROUNDS", "5")
+    get_settings.cache_clear()
+    authenticated_user = auth_service.authenticate_user(session, email=email, password=password)
+    upgraded_hash = authenticated_user.password_hash
+    auth_service.authenticate_user(session, email=email, password=password)
+
+    assert original_hash.startswith("$2b$04$")
+    assert upgraded_hash.startswith("$2b$05$")
+    assert authenticated_user.password_hash == upgraded_hash
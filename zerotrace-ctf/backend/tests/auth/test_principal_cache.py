@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.settings import get_settings
+from app.models.role import Role
+from app.models.user import User
+from app.security.principal_cache import Principal, PrincipalCache, principal_cache
+
+
+def _principal(*roles: str) -> Principal:
+    return Principal(id=uuid4(), is_active=True, role_names=frozenset(roles))
+
+
+def test_cache_returns_snapshot_for_matching_sub_and_iat() -> None:
+    cache = PrincipalCache()
+    principal = _principal("player")
+
+    cache.put(str(principal.id), 100, principal)
+
+    assert cache.get(str(principal.id), 100) is principal
+    assert cache.get(str(principal.id), 101) is None
+
+
+def test_cache_expires_entries_after_ttl(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("AUTH_PRINCIPAL_CACHE_TTL_SECONDS", "0")
+    get_settings.cache_clear()
+    cache = PrincipalCache()
+    principal = _principal("player")
+
+    cache.put(str(principal.id), 100, principal)
+
+    assert cache.get(str(principal.id), 100) is None
+
+
+def test_cache_evicts_least_recently_used_and_invalidates_every_token_of_a_user(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("AUTH_PRINCIPAL_CACHE_MAX_ENTRIES", "2")
+    get_settings.cache_clear()
+    cache = PrincipalCache()
+    first, second = _principal("player"), _principal("admin")
+
+    cache.put(str(first.id), 1, first)
+    cache.put(str(first.id), 2, first)
+    cache.put(str(second.id), 1, second)
+
+    assert cache.get(str(first.id), 1) is None
+    assert cache.get(str(first.id), 2) is first
+
+    cache.invalidate_user(first.id)
+
+    assert cache.get(str(first.id), 2) is None
+    assert cache.get(str(second.id), 1) is second
+    assert len(cache) == 1
+
+
+def test_orm_role_and_active_changes_invalidate_cached_principal(session: Session) -> None:
+    role = Role(name=f"role-{uuid4().hex[:8]}", description="Test role")
+    user = User(email=f"cached-{uuid4()}@example.com", password_hash="placeholder-hash", is_active=True)
+    session.add_all([role, user])
+    session.flush()
+    sub = str(user.id)
+
+    principal_cache.put(sub, 1, Principal.from_user(user))
+    user.roles.append(role)
+    assert principal_cache.get(sub, 1) is None
+
+    principal_cache.put(sub, 1, Principal.from_user(user))
+    assert principal_cache.get(sub, 1).role_names == frozenset({role.name})
+    user.is_active = False
+    assert principal_cache.get(sub, 1) is None
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from time import time
+from types import SimpleNamespace
+import sys
+from uuid import uuid4
+
+import pytest
+
+from app.core.settings import get_settings
+from app.dependencies import auth
+from app.schemas.token import TokenPayload
+from app.security.security_version import InMemorySecurityVersionBackend, SecurityVersionRegistry
+
+
+class _FakeRedisClient:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+        self.failing = False
+
+    def ping(self) -> bool:
+        return True
+
+    def get(self, key: str):
+        return self.values.get(key)
+
+    def set(self, key: str, value: str, nx: bool = False) -> bool:
+        if self.failing:
+            raise ConnectionError("redis down")
+        if nx and key in self.values:
+            return False
+        self.values[key] = value
+        return True
+
+
+@pytest.fixture
+def fake_redis(monkeypatch: pytest.MonkeyPatch) -> _FakeRedisClient:
+    fake_client = _FakeRedisClient()
+    monkeypatch.setitem(
+        sys.modules,
+        "redis",
+        SimpleNamespace(Redis=SimpleNamespace(from_url=lambda *args, **kwargs: fake_client)),
+    )
+    monkeypatch.setenv("AUTH_SECURITY_VERSION_BACKEND", "redis")
+    monkeypatch.setenv("AUTH_SECURITY_VERSION_CACHE_SECONDS", "0")
+    get_settings.cache_clear()
+    yield fake_client
+    get_settings.cache_clear()
+
+
+def test_in_memory_versions_change_on_bump_and_differ_between_processes() -> None:
+    backend = InMemorySecurityVersionBackend()
+    other_process = InMemorySecurityVersionBackend()
+    user_id = str(uuid4())
+
+    before = backend.current(user_id)
+    backend.bump(user_id)
+
+    assert backend.current(user_id) != before
+    assert other_process.current(user_id) != before
+
+
+def test_memory_bump_on_another_worker_only_bounds_claims_by_the_cache_ttl(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("AUTH_SECURITY_VERSION_BACKEND", "memory")
+    monkeypatch.setenv("AUTH_PRINCIPAL_CACHE_TTL_SECONDS", "5")
+    get_settings.cache_clear()
+    revoking_worker, serving_worker = SecurityVersionRegistry(), SecurityVersionRegistry()
+    monkeypatch.setattr(auth, "security_versions", serving_worker)
+    user_id = uuid4()
+
+    def _token(age_seconds: int) -> TokenPayload:
+        issued_at = int(time()) - age_seconds
+        return TokenPayload(
+            sub=str(user_id),
+            roles=["admin"],
+            exp=issued_at + 3600,
+            iat=issued_at,
+            sv=serving_worker.current(user_id),
+        )
+
+    revoking_worker.bump(user_id)
+
+    # The serving worker never saw the bump, so only the token's age keeps a revoked role from lingering.
+    assert serving_worker.is_shared() is False
+    assert auth._principal_from_claims(_token(age_seconds=0)) is not None
+    assert auth._principal_from_claims(_token(age_seconds=6)) is None
+    get_settings.cache_clear()
+
+
+def test_redis_versions_are_shared_across_registries(fake_redis: _FakeRedisClient) -> None:
+    issuer, verifier = SecurityVersionRegistry(), SecurityVersionRegistry()
+    user_id = uuid4()
+
+    issued = issuer.current(user_id)
+    matches_before_bump = verifier.current(user_id) == issued
+    issuer.bump(user_id)
+
+    assert issued is not None and issued.startswith("r.")
+    assert matches_before_bump is True
+    assert verifier.current(user_id) not in {None, issued}
+    assert verifier.is_shared() is True
+
+
+def test_redis_flush_never_revalidates_an_old_version(fake_redis: _FakeRedisClient) -> None:
+    registry = SecurityVersionRegistry()
+    user_id = uuid4()
+
+    issued = registry.current(user_id)
+    registry.bump(user_id)
+    fake_redis.values.clear()
+
+    assert registry.current(user_id) not in {None, issued}
+
+
+def test_unstored_bump_disables_claims_until_it_is_stored(fake_redis: _FakeRedisClient) -> None:
+    registry = SecurityVersionRegistry()
+    user_id = uuid4()
+    issued = registry.current(user_id)
+
+    fake_redis.failing = True
+    registry.bump(user_id)
+
+    assert registry.claims_disabled(user_id) is True
+    assert registry.current(user_id) is None
+    assert fake_redis.values[f"zerotrace:security_version:{user_id}"] == issued.removeprefix("r.")
+
+    fake_redis.failing = False
+
+    assert registry.claims_disabled(user_id) is False
+    assert registry.current(user_id) not in {None, issued}
+
+
+def test_unreachable_redis_is_retried_instead_of_cached(
+    fake_redis: _FakeRedisClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(SecurityVersionRegistry, "_REDIS_RETRY_SECONDS", 0.0)
+    reachable = False
+
+    def _from_url(*args, **kwargs):
+        if not reachable:
+            raise ConnectionError("redis down")
+        return fake_redis
+
+    monkeypatch.setitem(sys.modules, "redis", SimpleNamespace(Redis=SimpleNamespace(from_url=_from_url)))
+    registry = SecurityVersionRegistry()
+    user_id = uuid4()
+
+    assert registry.current(user_id) is None
+    reachable = True
+    assert registry.current(user_id) is not None
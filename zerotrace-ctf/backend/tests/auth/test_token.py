@@ -7,8 +7,9 @@ import pytest
 from sqlalchemy.orm import Session
 
 from app.security.exceptions import InvalidTokenError
-from app.security.jwt import create_access_token
-from app.security.password import hash_password, verify_password
+from app.core.settings import get_settings
+from app.security.jwt import create_access_token, decode_access_token, decoded_token_cache
+from app.security.password import calibrate_bcrypt_rounds, hash_password, verify_password
 from app.services.auth_service import AuthService
 from app.services.exceptions import ExpiredAuthTokenError, TokenIssuanceError, TokenValidationError
 
@@ -51,7 +52,8 @@ def test_token_payload_contains_expected_fields(
     payload = auth_service.validate_token(response.access_token)
     payload_data = payload.model_dump()
 
-    assert set(payload_data.keys()) == {"sub", "roles", "exp", "iat"}
+    assert set(payload_data.keys()) == {"sub", "roles", "exp", "iat", "sv"}
+    assert payload.sv is not None
     assert "email" not in payload_data
     assert "password_hash" not in payload_data
     assert "is_active" not in payload_data
@@ -110,6 +112,25 @@ def test_verify_password_false_on_invalid_hash() -> None:
     assert verify_password("StrongPassword!123", "not-a-valid-hash") is False
 
 
+def test_calibration_picks_highest_cost_within_target() -> None:
+    measured: list[int] = []
+
+    def fake_measure(rounds: int, samples: int) -> float:
+        measured.append(rounds)
+        return 0.05 * 2 ** (rounds - 10)
+
+    rounds, timings_ms = calibrate_bcrypt_rounds(250, min_rounds=10, max_rounds=16, measure=fake_measure)
+
+    assert rounds == 12
+    assert measured == [10, 11, 12, 13]
+    assert timings_ms[13] == pytest.approx(400)
+
+
+def test_calibration_rejects_invalid_bounds() -> None:
+    with pytest.raises(ValueError):
+        calibrate_bcrypt_rounds(250, min_rounds=12, max_rounds=10)
+
+
 def test_token_rejects_sensitive_claim_injection() -> None:
     with pytest.raises(InvalidTokenError):
         create_access_token(
@@ -143,3 +164,49 @@ def test_issue_token_missing_user_id_raises(
 
     with pytest.raises(TokenIssuanceError):
         auth_service.issue_token(user)
+
+
+def test_decode_reuses_cached_payload_for_the_same_token() -> None:
+    decoded_token_cache.clear()
+    token = create_access_token({"sub": str(uuid4()), "roles": ["player"]})
+
+    first = decode_access_token(token)
+    second = decode_access_token(token)
+
+    assert second is first
+    assert len(decoded_token_cache) == 1
+
+
+def test_decode_cache_is_cleared_when_secret_key_rotates(monkeypatch: pytest.MonkeyPatch) -> None:
+    decoded_token_cache.clear()
+    token = create_access_token({"sub": str(uuid4()), "roles": ["player"]})
+    decode_access_token(token)
+
+    monkeypatch.setenv("SECRET_KEY", "rotated-secret-key-for-auth-unit-tests-000000000000")
+    get_settings.cache_clear()
+
+    with pytest.raises(InvalidTokenError):
+        decode_access_token(token)
+    assert len(decoded_token_cache) == 0
+
+
+def test_decode_cache_does_not_serve_entries_past_token_expiry(monkeypatch: pytest.MonkeyPatch) -> None:
+    decoded_token_cache.clear()
+    token = create_access_token({"sub": str(uuid4()), "roles": ["player"]}, expires_delta=timedelta(minutes=5))
+    payload = decode_access_token(token)
+
+    monkeypatch.setattr("app.security.jwt.time", lambda: payload.exp + 1)
+
+    assert decoded_token_cache.get(token, decoded_token_cache._key_fingerprint) is None
+    assert len(decoded_token_cache) == 0
+
+
+def test_decode_cache_skips_rejected_tokens() -> None:
+    decoded_token_cache.clear()
+    token = create_access_token({"sub": str(uuid4()), "roles": ["player"]})
+    header, payload, signature = token.split(".")
+    tampered = ".".join([header, payload, f"{'a' if signature[0] != 'a' else 'b'}{signature[1:]}"])
+
+    with pytest.raises(InvalidTokenError):
+        decode_access_token(tampered)
+    assert len(decoded_token_cache) == 0
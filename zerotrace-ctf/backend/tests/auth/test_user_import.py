@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.settings import get_settings
+from app.models.user import User
+from app.repositories import user_repository
+from app.security.password import verify_password
+from app.services.auth_service import AuthService
+from app.services.user_import_service import UserImportService, iter_user_import_rows
+
+
+@pytest.fixture(autouse=True)
+def fast_import_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("PASSWORD_HASH_ROUNDS", "4")
+    monkeypatch.setenv("USER_IMPORT_HASH_WORKERS", "1")
+    get_settings.cache_clear()
+
+
+def _rows(payload: str, import_format: str):
+    return iter_user_import_rows(io.BytesIO(payload.encode("utf-8")), import_format)
+
+
+def test_csv_import_creates_players_and_reports_every_row(
+    session: Session,
+    seed_roles: dict[str, object],
+    auth_service: AuthService,
+) -> None:
+    auth_service.register_user(session, email="existing@example.com", password="StrongPassword!123")
+    session.flush()
+    payload = (
+        "Email,Password\n"
+        "alice@example.com,AlicePassword!1\n"
+        " bob@example.com ,BobPassword!1\n"
+        "alice@example.com,Another!1\n"
+        "existing@example.com,Whatever!1\n"
+        ",NoEmail!1\n"
+        "carol@example.com,\n"
+    )
+
+    report = UserImportService().import_users(session, _rows(payload, "csv"))
+
+    assert (report.created, report.skipped, report.failed, report.truncated) == (2, 2, 2, False)
+    assert [(row.line_number, row.status) for row in report.rows] == [
+        (2, "created"),
+        (3, "created"),
+        (4, "skipped"),
+        (5, "skipped"),
+        (6, "failed"),
+        (7, "failed"),
+    ]
+    bob = user_repository.get_by_email(session, "bob@example.com")
+    assert bob is not None
+    assert [role.name for role in bob.roles] == ["player"]
+    assert verify_password("BobPassword!1", bob.password_hash) is True
+
+
+def test_ndjson_import_reports_malformed_lines_and_truncates_at_row_limit(
+    session: Session,
+    seed_roles: dict[str, object],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("USER_IMPORT_MAX_ROWS", "3")
+    monkeypatch.setenv("USER_IMPORT_BATCH_SIZE", "2")
+    get_settings.cache_clear()
+    payload = "\n".join(
+        [
+            '{"email": "one@example.com", "password": "OnePassword!1"}',
+            "not json",
+            "",
+            '["not", "an", "object"]',
+            '{"email": "four@example.com", "password": "FourPassword!1"}',
+        ]
+    )
+
+    report = UserImportService().import_users(session, _rows(payload, "ndjson"))
+
+    assert report.truncated is True
+    assert [(row.line_number, row.status, row.detail) for row in report.rows] == [
+        (1, "created", None),
+        (2, "failed", "Row is not valid JSON."),
+        (4, "failed", "Row must be a JSON object."),
+    ]
+    assert session.scalar(select(User.id).where(User.email == "four@example.com")) is None
+
+
+def test_import_hashes_across_process_pool(
+    session: Session,
+    seed_roles: dict[str, object],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv("USER_IMPORT_HASH_WORKERS", "2")
+    get_settings.cache_clear()
+    payload = "email,password\n" + "".join(f"pool{index}@example.com,PoolPassword!{index}\n" for index in range(4))
+
+    report = UserImportService().import_users(session, _rows(payload, "csv"))
+
+    assert report.created == 4
+    user = user_repository.get_by_email(session, "pool3@example.com")
+    assert user is not None
+    assert verify_password("PoolPassword!3", user.password_hash) is True
+
+
+def test_csv_without_required_header_is_rejected(session: Session, seed_roles: dict[str, object]) -> None:
+    with pytest.raises(ValueError):
+        UserImportService().import_users(session, _rows("mail,secret\na@example.com,x\n", "csv"))
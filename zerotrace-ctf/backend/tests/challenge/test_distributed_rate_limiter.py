@@ -3,6 +3,8 @@ from __future__ import annotations
 from types import SimpleNamespace
 import sys
 
+import pytest
+
 from app.core.settings import get_settings
 from app.services.in_memory_rate_limiter import DistributedSlidingWindowRateLimiter
 
@@ -22,6 +24,7 @@ class _FakeRedisClient:
             window_ms = int(args[1])
             max_attempts = int(args[2])
             lock_ms = int(args[3])
+            permits = int(args[6])
 
             lock_until = self._locks.get(lock_key)
             if lock_until is not None and lock_until > now_ms:
@@ -34,12 +37,14 @@ class _FakeRedisClient:
                 for timestamp in self._attempts.get(attempts_key, [])
                 if timestamp > now_ms - window_ms
             ]
-            if len(pruned) >= max_attempts:
+            self._attempts[attempts_key] = pruned
+            if len(pruned) < max_attempts < len(pruned) + permits:
+                return [0, pruned[len(pruned) + permits - max_attempts - 1] + window_ms - now_ms]
+            if len(pruned) + permits > max_attempts:
                 self._locks[lock_key] = now_ms + lock_ms
-                self._attempts[attempts_key] = pruned
                 return [0, lock_ms]
 
-            pruned.append(now_ms)
+            pruned.extend([now_ms] * permits)
             self._attempts[attempts_key] = pruned
             return [1, 0]
 
@@ -126,3 +131,48 @@ def test_distributed_limiter_blocks_across_instances_with_redis_backend(monkeypa
     assert second.allowed is False
     assert second.retry_after_seconds == 5
     get_settings.cache_clear()
+
+
+def test_multi_permit_check_is_admitted_or_refused_as_a_whole(monkeypatch) -> None:
+    monkeypatch.setenv("RATE_LIMIT_BACKEND", "memory")
+    get_settings.cache_clear()
+    limiter = DistributedSlidingWindowRateLimiter(scope="lab")
+    limits = {"max_attempts": 5, "window_seconds": 60, "lock_seconds": 5}
+
+    batch = limiter.check_and_consume(key="lab:user:m12", permits=3, **limits)
+    over_remaining = limiter.check_and_consume(key="lab:user:m12", permits=3, **limits)
+    remaining = limiter.check_and_consume(key="lab:user:m12", permits=2, **limits)
+    overrun = limiter.check_and_consume(key="lab:user:m12", permits=1, **limits)
+
+    assert batch.allowed is True
+    assert over_remaining.allowed is False
+    # Asking for more than remains waits for the window, without the lockout an overrun gets.
+    assert 5 < over_remaining.retry_after_seconds <= 60
+    assert remaining.allowed is True
+    assert (overrun.allowed, overrun.retry_after_seconds) == (False, 5)
+    with pytest.raises(ValueError):
+        limiter.check_and_consume(key="lab:user:m13", permits=6, **limits)
+    get_settings.cache_clear()
+
+
+def test_redis_over_remaining_batch_is_refused_without_lockout(monkeypatch) -> None:
+    fake_client = _FakeRedisClient()
+    monkeypatch.setenv("RATE_LIMIT_BACKEND", "redis")
+    monkeypatch.setenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+    get_settings.cache_clear()
+    monkeypatch.setitem(
+        sys.modules,
+        "redis",
+        SimpleNamespace(Redis=SimpleNamespace(from_url=lambda *args, **kwargs: fake_client)),
+    )
+    limiter = DistributedSlidingWindowRateLimiter(scope="lab")
+    limits = {"max_attempts": 5, "window_seconds": 60, "lock_seconds": 5}
+
+    limiter.check_and_consume(key="lab:user:m12", permits=4, **limits)
+    over_remaining = limiter.check_and_consume(key="lab:user:m12", permits=2, **limits)
+    remaining = limiter.check_and_consume(key="lab:user:m12", permits=1, **limits)
+
+    assert over_remaining.allowed is False and over_remaining.retry_after_seconds > 5
+    assert remaining.allowed is True
+    assert fake_client._locks == {}
+    get_settings.cache_clear()
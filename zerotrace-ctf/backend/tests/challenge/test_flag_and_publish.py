@@ -3,6 +3,7 @@ from __future__ import annotations
 import pytest
 from sqlalchemy.orm import Session
 
+from app.core.settings import get_settings
 from app.repositories import challenge_repository
 from app.services.challenge_exceptions import (
     ChallengeAlreadyHasFlagError,
@@ -10,7 +11,7 @@ from app.services.challenge_exceptions import (
     FlagNotSetError,
 )
 from app.services.challenge_service import ChallengeService
-from app.services.flag_hashing import hash_flag, verify_flag
+from app.services.flag_hashing import flag_needs_rehash, hash_flag, verify_and_update_flag, verify_flag
 
 
 def test_set_flag_success(
@@ -86,3 +87,22 @@ def test_flag_hash_not_equal_plaintext_and_verify_roundtrip() -> None:
     assert hashed_flag != plaintext_flag
     assert verify_flag(plaintext_flag, hashed_flag) is True
     assert verify_flag("ZTCTF{different}", hashed_flag) is False
+
+
+def test_verify_and_update_flag_returns_replacement_for_off_policy_hash(monkeypatch: pytest.MonkeyPatch) -> None:
+    plaintext_flag = "ZTCTF{rehash-me}"
+    monkeypatch.setenv("FLAG_HASH_ROUNDS", "4")
+    get_settings.cache_clear()
+    legacy_hash = hash_flag(plaintext_flag)
+
+    monkeypatch.setenv("FLAG_HASH_ROUNDS", "5")
+    get_settings.cache_clear()
+    matches, replacement = verify_and_update_flag(plaintext_flag, legacy_hash)
+    wrong_matches, wrong_replacement = verify_and_update_flag("ZTCTF{different}", legacy_hash)
+
+    assert matches is True
+    assert replacement is not None and replacement.startswith("$2b$05$")
+    assert verify_and_update_flag(plaintext_flag, replacement) == (True, None)
+    assert (wrong_matches, wrong_replacement) == (False, None)
+    assert flag_needs_rehash(legacy_hash) is True
+    assert flag_needs_rehash(replacement) is False
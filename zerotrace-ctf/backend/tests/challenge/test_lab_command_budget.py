@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import pytest
+
+from app.services import lab_command_budget
+from app.services.lab_command_budget import CommandBudget
+from app.services.lab_filesystem import VirtualFilesystem
+from app.services.linux_shell_engine import LinuxShellEngine, ShellSession
+
+_FILES = {f"/srv/logs/app-{index:03d}.log": f"request {index} ok\nstatus=200\n" for index in range(200)}
+
+
+def _run(command: str, budget: CommandBudget | None) -> tuple[list[str], int]:
+    session = ShellSession(filesystem=VirtualFilesystem(_FILES), cwd="/")
+    stream = LinuxShellEngine().stream(command, session, budget=budget)
+    return list(stream.lines), stream.exit_code
+
+
+def _budget(finished: list[tuple[str, CommandBudget]], **limits: float) -> CommandBudget:
+    return CommandBudget(
+        max_nodes=int(limits.get("max_nodes", 10**9)),
+        max_bytes=int(limits.get("max_bytes", 10**12)),
+        max_seconds=limits.get("max_seconds", 3600.0),
+        on_finish=lambda command, budget: finished.append((command, budget)),
+    )
+
+
+def test_grep_stops_at_byte_budget_with_a_prefix_of_the_full_output() -> None:
+    finished: list[tuple[str, CommandBudget]] = []
+    full, _ = _run("grep -R status /srv", None)
+    lines, exit_code = _run("grep -R status /srv", _budget(finished, max_bytes=500))
+
+    assert exit_code == 0
+    assert lines[:-1] == full[: len(lines) - 1] and 0 < len(lines) - 1 < len(full)
+    assert lines[-1] == "grep: output truncated after scanning 500 bytes (command budget exceeded)"
+    assert [(command, budget.exceeded) for command, budget in finished] == [("grep", "bytes")]
+    assert finished[0][1].bytes_scanned > 500
+
+
+def test_walk_based_commands_stop_at_node_budget() -> None:
+    finished: list[tuple[str, CommandBudget]] = []
+    found, _ = _run("find /srv -name '*.log'", _budget(finished, max_nodes=50))
+    sized, exit_code = _run("du -a /srv", _budget(finished, max_nodes=50))
+
+    assert len(found) == 49  # /srv and /srv/logs use two of the 50 nodes
+    assert found[-1] == "find: output truncated after visiting 50 filesystem entries (command budget exceeded)"
+    assert (len(sized), exit_code) == (51, 0)
+    assert sized[-1] == "du: output truncated after visiting 50 filesystem entries (command budget exceeded)"
+    assert [(command, budget.exceeded, budget.nodes_visited) for command, budget in finished] == [
+        ("find", "nodes", 51),
+        ("du", "nodes", 51),
+    ]
+
+
+def test_wall_time_counts_only_while_output_is_produced(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = [0.0]
+    monkeypatch.setattr(lab_command_budget, "perf_counter", lambda: clock[0])
+    finished: list[tuple[str, CommandBudget]] = []
+    budget = _budget(finished, max_seconds=1.0)
+    session = ShellSession(filesystem=VirtualFilesystem(_FILES), cwd="/")
+    stream = LinuxShellEngine().stream("du -a /srv", session, budget=budget)
+
+    first = next(stream.lines)
+    clock[0] += 30.0  # idle between pages
+    second = next(stream.lines)
+    budget.resume()
+    clock[0] += 2.0
+    budget.pause()
+    rest = list(stream.lines)
+
+    assert first.endswith("\t/srv") and second.endswith("\t/srv/logs")
+    assert rest == ["du: output truncated after 1s (command budget exceeded)"]
+    assert finished[0][0] == "du" and finished[0][1].exceeded == "time"
+
+
+def test_budget_is_reported_once_when_output_is_abandoned() -> None:
+    finished: list[tuple[str, CommandBudget]] = []
+    session = ShellSession(filesystem=VirtualFilesystem(_FILES), cwd="/")
+    stream = LinuxShellEngine().stream("find /srv", session, budget=_budget(finished))
+
+    next(stream.lines)
+    stream.lines.close()
+
+    assert [(command, budget.exceeded, budget.nodes_visited) for command, budget in finished] == [("find", None, 1)]
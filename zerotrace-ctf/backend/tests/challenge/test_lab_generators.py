@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+from itertools import islice
+import json
+from pathlib import Path
+from random import Random
+import shutil
+
+import pytest
+
+from app.core.settings import get_settings
+from app.services.challenge_loader import ChallengeLoader
+from app.services.lab_filesystem import FilesystemLayer, VirtualFilesystem
+from app.services.lab_command_budget import CommandBudget
+from app.services.lab_generators import GENERATORS, MAX_MESSAGE_CHARS, GeneratedContent, generated_content_cache
+from app.services.lab_snapshot import CompiledChallengeLoader, compile_lab_snapshot
+from app.services.linux_shell_engine import LinuxShellEngine, ShellSession
+
+_NEEDLE = "sshd[4242]: Accepted password for backup from 198.51.100.77 port 50022 ssh2"
+_SPEC = {"$generator": "auth_log", "seed": 7, "lines": 5000, "needles": [{"line": 4321, "text": _NEEDLE}]}
+
+
+@pytest.fixture(autouse=True)
+def fresh_generated_content_cache():
+    generated_content_cache.reset()
+    get_settings.cache_clear()
+    yield
+    generated_content_cache.reset()
+    get_settings.cache_clear()
+
+
+def _generated(**overrides: object) -> GeneratedContent:
+    generated = GeneratedContent.from_spec({**_SPEC, **overrides})
+    assert generated is not None
+    return generated
+
+
+def test_generated_text_is_deterministic_and_needles_do_not_shift_noise() -> None:
+    text = _generated().decode()
+    lines = text.splitlines()
+    without_needle = _generated(needles=[]).render().splitlines()
+
+    assert text == _generated().render() and text.endswith("\n")
+    assert len(lines) == 5000
+    assert lines[4320].endswith(f" lab-server {_NEEDLE}")
+    assert lines[:4320] == without_needle[:4320] and lines[4321:] == without_needle[4321:]
+    assert _generated(seed=8).render() != text
+    assert _generated().size_bytes == len(text.encode("utf-8"))
+
+
+@pytest.mark.parametrize(
+    "spec",
+    [
+        {"$generator": "unknown", "lines": 10},
+        {"$generator": "syslog", "lines": -1},
+        {"$generator": "syslog", "lines": 10, "seed": "7"},
+        {"$generator": "syslog", "lines": 10, "needles": [{"line": 11, "text": "beyond the end"}]},
+        {"$generator": "syslog", "lines": 10, "needles": [{"line": 1, "text": "two\nlines"}]},
+        {"$generator": "syslog", "lines": 1_000_000},
+    ],
+)
+def test_invalid_generator_specs_are_rejected(spec: dict) -> None:
+    assert GeneratedContent.from_spec(spec) is None
+
+
+def test_message_bound_holds_and_sizes_are_streamed_without_caching_text() -> None:
+    for generator in GENERATORS.values():
+        rng = Random(3)
+        assert max(len(generator(rng)) for _ in range(20000)) <= MAX_MESSAGE_CHARS
+    content = _generated(host="läb-server", needles=[{"line": 2, "text": "café ☕"}])
+
+    assert content.max_retained_bytes() >= len(content.render()) * 2
+    assert content.size_bytes == len(content.render().encode("utf-8"))
+    assert generated_content_cache.retained_bytes == 0
+
+
+def test_large_generated_files_stream_through_the_command_budget() -> None:
+    generated = _generated(lines=400_000, needles=[{"line": 399_999, "text": _NEEDLE}])
+    filesystem = VirtualFilesystem({"/var/log/auth.log": generated}, base=FilesystemLayer({}))
+    session = ShellSession(filesystem=filesystem, cwd="/")
+    engine = LinuxShellEngine()
+
+    def budget() -> CommandBudget:
+        return CommandBudget(max_nodes=1000, max_bytes=100_000, max_seconds=30)
+
+    head = engine.run("head -n 2 /var/log/auth.log", session, budget=budget())
+    cat = engine.run("cat /var/log/auth.log", session, budget=budget())
+    grep = engine.run("grep Accepted /var/log/auth.log", session, budget=budget())
+
+    assert head.output.splitlines() == list(islice(generated.iter_lines(), 2))
+    assert cat.output.endswith("cat: output truncated after scanning 100000 bytes (command budget exceeded)")
+    assert len(cat.output) < 101_000
+    assert grep.output == "grep: output truncated after scanning 100000 bytes (command budget exceeded)"
+    assert generated_content_cache.retained_bytes == 0
+
+
+def test_wc_counts_generated_files_within_the_command_budget() -> None:
+    generated = _generated(lines=200_000, needles=[])
+    filesystem = VirtualFilesystem({"/var/log/big.log": generated, "/etc/motd": "hi\n"}, base=FilesystemLayer({}))
+    session = ShellSession(filesystem=filesystem, cwd="/")
+    budget = CommandBudget(max_nodes=1000, max_bytes=1000, max_seconds=30)
+
+    truncated = LinuxShellEngine().run("wc /var/log/big.log", session, budget=budget)
+    small = LinuxShellEngine().run("wc /etc/motd", session, budget=CommandBudget(max_nodes=10, max_bytes=1000, max_seconds=30))
+
+    assert truncated.output == "wc: output truncated after scanning 1000 bytes (command budget exceeded)"
+    assert budget.nodes_visited == 1 and 1000 < budget.bytes_scanned < 1200
+    assert small.output == "1 1 3 /etc/motd"
+
+
+def test_wc_streams_a_generated_file_once_without_caching_its_text(monkeypatch: pytest.MonkeyPatch) -> None:
+    generated = _generated()
+    text = generated.render()
+    generations = []
+    original_iter_lines = GeneratedContent.iter_lines
+
+    def _counting_iter_lines(self: GeneratedContent):
+        generations.append(self)
+        return original_iter_lines(self)
+
+    monkeypatch.setattr(GeneratedContent, "iter_lines", _counting_iter_lines)
+    filesystem = VirtualFilesystem({"/var/log/auth.log": generated}, base=FilesystemLayer({}))
+    session = ShellSession(filesystem=filesystem, cwd="/")
+
+    result = LinuxShellEngine().run("wc /var/log/auth.log", session)
+
+    assert result.output == f"{text.count(chr(10))} {len(text.split())} {len(text)} /var/log/auth.log"
+    assert len(generations) == 1
+    assert generated_content_cache.retained_bytes == 0
+
+
+def test_size_memo_is_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(type(generated_content_cache), "_MAX_SIZES", 2)
+    contents = [_generated(seed=seed, lines=10, needles=[]) for seed in range(3)]
+
+    sizes = [content.size_bytes for content in contents]
+
+    assert len(generated_content_cache._sizes) == 2
+    assert contents[0] not in generated_content_cache._sizes
+    assert contents[0].size_bytes == sizes[0]
+
+
+def test_generated_files_are_produced_only_when_read() -> None:
+    files = {f"/var/log/archive/auth.log.{index}": _generated(seed=index, lines=500, needles=[]) for index in range(50)}
+    files["/var/log/auth.log"] = _generated()
+    filesystem = VirtualFilesystem(files, base=FilesystemLayer({"/etc/hostname": "lab-server\n"}))
+    session = ShellSession(filesystem=filesystem, cwd="/")
+    engine = LinuxShellEngine()
+
+    listing = engine.run("find /var/log -name 'auth.log*'", session)
+    assert len(listing.output.splitlines()) == 51
+    assert generated_content_cache.retained_bytes == 0
+
+    result = engine.run("grep -R 'Accepted password' /var/log", session)
+    assert result.output == f"/var/log/auth.log:4321:{_generated().render().splitlines()[4320]}"
+    assert engine.run("du /var/log", session).output == f"{filesystem.disk_usage('/var/log')}\t/var/log"
+    assert filesystem.disk_usage("/var/log") == sum(
+        len(filesystem.read_file(path).encode("utf-8")) for path in filesystem.iter_files_under("/var/log", True)
+    )
+
+
+def test_cache_stays_under_its_cap_and_regenerates_evicted_text(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LAB_GENERATED_CONTENT_CACHE_MAX_BYTES", "800000")
+    get_settings.cache_clear()
+    contents = [_generated(seed=seed) for seed in range(6)]
+    expected = [content.render() for content in contents]
+
+    assert GeneratedContent.from_spec({**_SPEC, "lines": 6000}) is None
+
+    for _ in range(2):
+        assert [content.decode() for content in contents] == expected
+        assert 0 < generated_content_cache.retained_bytes <= 800_000
+    assert [content.size_bytes for content in contents] == [len(text) for text in expected]
+
+
+def test_overlay_generator_nodes_load_lazily_and_survive_the_snapshot(tmp_path: Path) -> None:
+    labs_root = tmp_path / "labs"
+    shutil.copytree(ChallengeLoader._LABS_ROOT, labs_root)
+    overlay = labs_root / "m11" / "overlays" / "m11-01.json"
+    tree = json.loads(overlay.read_text(encoding="utf-8"))
+    tree["/"].setdefault("var", {}).setdefault("log", {})["auth.log"] = _SPEC
+    tree["/"]["var"]["log"]["broken.log"] = {"$generator": "syslog"}
+    overlay.write_text(json.dumps(tree), encoding="utf-8")
+
+    class _JsonLoader(ChallengeLoader):
+        _LABS_ROOT = labs_root
+
+    class _CompiledLoader(CompiledChallengeLoader):
+        _LABS_ROOT = labs_root
+
+    json_loader = _JsonLoader()
+    entry = next(entry for entry in json_loader.index_all() if entry.slug == "m11-hidden-in-etc")
+    files = json_loader.load_overlay_files(entry)
+    snapshot_path = tmp_path / "labs.bin"
+    compile_lab_snapshot(snapshot_path, json_loader)
+    compiled_files = _CompiledLoader(snapshot_path).load_overlay_files(entry)
+
+    assert files["/var/log/auth.log"] == _generated()
+    assert "/var/log/broken.log" not in files
+    assert compiled_files["/var/log/auth.log"] == _generated()
+    assert generated_content_cache.retained_bytes == 0
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import pytest
+
+from app.core.settings import get_settings
+from app.services.challenge_lab_service import ChallengeLabOutputCursorError, ChallengeLabService
+from app.services.lab_output_pager import LabOutputReader
+
+
+@pytest.fixture(autouse=True)
+def lab_output_settings(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("LAB_PRIVATE_FLAGS_FILE", "")
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+def _counted(lines: list[str], produced: list[str]) -> Iterator[str]:
+    for line in lines:
+        produced.append(line)
+        yield line
+
+
+@pytest.mark.parametrize("max_bytes", [4, 5, 7, 64])
+@pytest.mark.parametrize("max_lines", [1, 2, 10])
+def test_reader_pages_concatenate_to_the_joined_output(max_bytes: int, max_lines: int) -> None:
+    lines = ["alpha", "", "héllo wörld", "ζζζζ", "tail"]
+    reader = LabOutputReader(iter(lines))
+
+    pages = []
+    while not reader.exhausted:
+        pages.append(reader.read(max_bytes=max_bytes, max_lines=max_lines))
+
+    assert "".join(pages) == "\n".join(lines)
+    assert all(len(page.encode("utf-8")) <= max_bytes and page.count("\n") <= max_lines for page in pages)
+
+
+def test_reader_only_produces_lines_it_needs() -> None:
+    produced: list[str] = []
+    reader = LabOutputReader(_counted([f"line-{index}" for index in range(1000)], produced))
+
+    assert reader.read(max_bytes=4096, max_lines=3) == "line-0\nline-1\nline-2\n"
+    assert len(produced) == 4
+
+
+def test_truncated_output_resumes_from_cursor_without_rerunning(monkeypatch: pytest.MonkeyPatch) -> None:
+    service = ChallengeLabService()
+    full = service.execute_command("m13-suid-secrets", "find /", "/", session_key="reference").output
+    monkeypatch.setenv("LAB_OUTPUT_PAGE_MAX_LINES", "2")
+    get_settings.cache_clear()
+
+    first = service.execute_command("m13-suid-secrets", "find /", "/", session_key="user-1:m13-suid-secrets")
+    pages = [first]
+    while pages[-1].truncated:
+        pages.append(service.fetch_output_page(pages[-1].next_cursor, session_key="user-1:m13-suid-secrets"))
+
+    assert len(pages) > 1 and first.output == "/\n/etc\n"
+    assert "".join(page.output for page in pages) == full
+    # Cursors are single-use and bound to the session that created them.
+    with pytest.raises(ChallengeLabOutputCursorError):
+        service.fetch_output_page(first.next_cursor, session_key="user-1:m13-suid-secrets")
+    second = service.execute_command("m13-suid-secrets", "find /", "/", session_key="user-1:m13-suid-secrets")
+    with pytest.raises(ChallengeLabOutputCursorError):
+        service.fetch_output_page(second.next_cursor, session_key="user-2:m13-suid-secrets")
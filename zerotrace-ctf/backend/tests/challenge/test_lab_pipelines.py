@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import pytest
+
+from app.services.lab_command_budget import CommandBudget
+from app.services.lab_filesystem import VirtualFilesystem
+from app.services.linux_shell_engine import LinuxShellEngine, ShellSession
+
+_FILES = {
+    "/etc/passwd": (
+        "root:x:0:0:root:/root:/bin/bash\n"
+        "daemon:x:1:1:daemon:/usr/sbin:/usr/sbin/nologin\n"
+        "player:x:1000:1000:Player:/home/player:/bin/bash\n"
+        "backup:x:34:34:backup:/var/backups:/usr/sbin/nologin\n"
+    ),
+    "/var/log/auth.log": "accepted root\nfailed admin\nfailed admin\nfailed root\naccepted player\nfailed admin\n",
+    "/var/log/notes": "no trailing newline",
+    **{f"/srv/logs/app-{index:03d}.log": f"request {index} ok\npassword=hunter{index}\n" for index in range(300)},
+}
+
+
+def _run(command: str, budget: CommandBudget | None = None) -> tuple[str, int]:
+    session = ShellSession(filesystem=VirtualFilesystem(_FILES), cwd="/")
+    result = LinuxShellEngine().run(command, session, budget=budget)
+    return result.output, result.exit_code
+
+
+@pytest.mark.parametrize(
+    ("command", "expected"),
+    [
+        (
+            "grep -R password /srv | head -n 2",
+            "/srv/logs/app-000.log:2:password=hunter0\n/srv/logs/app-001.log:2:password=hunter1",
+        ),
+        ("cut -d: -f1 /etc/passwd | sort", "backup\ndaemon\nplayer\nroot"),
+        ("cat /etc/passwd | cut -d : -f 1,7 | grep nologin | wc -l", "2"),
+        (
+            "cat /var/log/auth.log | sort | uniq -c",
+            "      1 accepted player\n      1 accepted root\n      3 failed admin\n      1 failed root",
+        ),
+        ("sort /var/log/auth.log | uniq -d", "failed admin"),
+        ("cut -d: -f3 /etc/passwd | sort -n -r | head -2", "1000\n34"),
+        ("cut -d: -f3 /etc/passwd|sort -nu|tail -n 1", "1000"),
+        ("cut -c1-4 /etc/passwd | head -n 1", "root"),
+        ("cat /var/log/auth.log | grep failed | wc", "4 8 51"),
+        ("ls / | tail -1", "var"),
+        ("wc -l /etc/passwd /var/log/notes", "4 /etc/passwd\n0 /var/log/notes\n4 total"),
+        ("tail -n 1 /var/log/notes", "no trailing newline"),
+        (
+            "ls -la /var/log",
+            "drwxr-xr-x 4096 .\ndrwxr-xr-x 4096 ..\n-rw-r--r--   81 auth.log\n-rw-r--r--   19 notes",
+        ),
+        ("du -a /var", "100\t/var\n100\t/var/log\n81\t/var/log/auth.log\n19\t/var/log/notes"),
+    ],
+)
+def test_pipelines_and_line_filters_match_coreutils(command: str, expected: str) -> None:
+    assert _run(command) == (expected, 0)
+
+
+def test_exit_code_comes_from_the_last_stage() -> None:
+    assert _run("grep -R nomatch / | wc -l") == ("0", 0)
+    assert _run("cat /etc/passwd | grep nomatch") == ("", 1)
+    assert _run("cat /missing | head") == ("cat: /missing: No such file or directory", 1)
+    assert _run("cat /etc/passwd | head -n x") == ("head: invalid number of lines: 'x'", 1)
+
+
+@pytest.mark.parametrize(
+    ("command", "output", "exit_code"),
+    [
+        ("cat /etc/passwd | sh", "sh: not supported in a pipeline (use cut, grep, head, sort, tail, uniq, wc)", 1),
+        ("cat /etc/passwd | rm /etc/passwd", "Command not allowed in this lab.", 126),
+        ("cat /etc/passwd || id", "Command not allowed in this lab.", 126),
+        ("grep root /etc/passwd | head > /tmp/out", "Command not allowed in this lab.", 126),
+        ("cat /etc/passwd | grep $(id)", "Command not allowed in this lab.", 126),
+        ("cat /etc/passwd | head `id`", "Command not allowed in this lab.", 126),
+        ("cat /etc/passwd |", "syntax error near unexpected token `|'", 2),
+        ("cd /etc | head", "cd: cannot be piped", 1),
+        ("cat /etc/passwd | find /", "find: not supported in a pipeline (use cut, grep, head, sort, tail, uniq, wc)", 1),
+        ("uniq /var/log/auth.log /tmp/out", "uniq: extra operand '/tmp/out'", 1),
+    ],
+)
+def test_pipelines_keep_the_lab_read_only(command: str, output: str, exit_code: int) -> None:
+    assert _run(command) == (output, exit_code)
+
+
+def test_head_short_circuits_the_upstream_traversal() -> None:
+    def visited(command: str) -> int:
+        budget = CommandBudget(max_nodes=10**9, max_bytes=10**12, max_seconds=3600.0)
+        session = ShellSession(filesystem=VirtualFilesystem(_FILES), cwd="/")
+        LinuxShellEngine().run(command, session, budget=budget)
+        return budget.nodes_visited
+
+    assert visited("grep -R password /srv | head -n 1") < 5
+    assert visited("grep -R password /srv | wc -l") == 300
+    assert visited("find / | head -n 1") == 1
+    assert visited("du -a /srv | head -n 1") == 1
+
+
+def test_pipeline_is_recorded_once_in_history() -> None:
+    session = ShellSession(filesystem=VirtualFilesystem(_FILES), cwd="/")
+    engine = LinuxShellEngine()
+
+    engine.run("cat /etc/passwd | head -n 1", session)
+    result = engine.run("history | grep head", session)
+
+    assert result.output == "cat /etc/passwd | head -n 1\nhistory | grep head"
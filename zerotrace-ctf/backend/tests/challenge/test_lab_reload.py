@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import shutil
+
+import pytest
+
+from app.core.settings import get_settings
+from app.services.challenge_lab_service import ChallengeLabService
+from app.services.challenge_loader import ChallengeLoader
+from app.services.lab_reload_watcher import _changed_paths, _collect_snapshot
+
+
+@pytest.fixture
+def lab_sources(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    labs_root = tmp_path / "labs"
+    shutil.copytree(ChallengeLoader._LABS_ROOT, labs_root)
+    flags_file = tmp_path / "private-flags.json"
+    flags_file.write_text(
+        json.dumps({"m11-hidden-in-etc": "CTF{first}", "m12-permission-denied": "CTF{legacy}"}),
+        encoding="utf-8",
+    )
+    monkeypatch.setenv("LAB_PRIVATE_FLAGS_FILE", str(flags_file))
+    get_settings.cache_clear()
+
+    class _TmpLoader(ChallengeLoader):
+        _LABS_ROOT = labs_root
+
+    yield ChallengeLabService(loader=_TmpLoader()), labs_root, flags_file
+    get_settings.cache_clear()
+
+
+def _write_json(path: Path, payload: dict) -> None:
+    path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+def test_overlay_change_rebuilds_only_its_lab(lab_sources) -> None:
+    service, labs_root, _ = lab_sources
+    service.execute_command("m11-hidden-in-etc", "cat /home/player/notes.txt", "/")
+    other = service.execute_command("m11-forgotten-config", "ls /", "/")
+    other_lab = service._resident["m11-forgotten-config"]
+
+    overlay = labs_root / "m11" / "overlays" / "m11-01.json"
+    _write_json(overlay, {"/": {"home": {"player": {"notes.txt": "rewritten\n"}}}})
+    reloaded = service.reload_changed_files([overlay])
+
+    assert reloaded == ["m11-hidden-in-etc"]
+    assert service.execute_command("m11-hidden-in-etc", "cat /home/player/notes.txt", "/").output == "rewritten"
+    assert service._resident["m11-forgotten-config"] is other_lab
+    assert service.execute_command("m11-forgotten-config", "ls /", "/") == other
+    assert service._content_versions == {"m11-hidden-in-etc": 1}
+
+
+def test_reload_swaps_resident_lab_and_keeps_sessions(lab_sources) -> None:
+    service, labs_root, _ = lab_sources
+    session_key = "user-1:m11"
+    service.execute_command("m11-hidden-in-etc", "cd /home/player", "/etc", session_key=session_key)
+    service.execute_command("m11-hidden-in-etc", "cat notes.txt", "/etc", session_key=session_key)
+    previous = service._resident["m11-hidden-in-etc"]
+
+    overlay = labs_root / "m11" / "overlays" / "m11-01.json"
+    _write_json(overlay, {"/": {"home": {"player": {"notes.txt": "v2\n"}}}})
+    service.reload_changed_files([overlay])
+
+    swapped = service._resident["m11-hidden-in-etc"]
+    assert swapped is not previous
+    assert swapped.content_version == previous.content_version + 1
+    result = service.execute_command("m11-hidden-in-etc", "cat notes.txt", "/etc", session_key=session_key)
+    assert (result.output, result.cwd) == ("v2", "/home/player")
+    history = service.execute_command("m11-hidden-in-etc", "history", "/etc", session_key=session_key)
+    assert history.output.splitlines()[:2] == ["cd /home/player", "cat notes.txt"]
+
+
+def test_challenge_definition_changes_add_update_and_remove_labs(lab_sources) -> None:
+    service, labs_root, _ = lab_sources
+    challenges_dir = labs_root / "m11" / "challenges"
+    assert service.has_lab("m11-forgotten-config")
+    definition = json.loads((challenges_dir / "m11-01.json").read_text(encoding="utf-8"))
+
+    definition["hints"] = ["A brand new hint."]
+    _write_json(challenges_dir / "m11-01.json", definition)
+    added = dict(definition, id="m11-99", slug="m11-reload-added")
+    _write_json(challenges_dir / "m11-99.json", added)
+    (challenges_dir / "m11-02.json").unlink()
+
+    reloaded = service.reload_changed_files(
+        [challenges_dir / "m11-01.json", challenges_dir / "m11-99.json", challenges_dir / "m11-02.json"]
+    )
+
+    assert reloaded == ["m11-forgotten-config", "m11-hidden-in-etc", "m11-reload-added"]
+    assert service.get_lab_hints("m11-hidden-in-etc") == ["A brand new hint."]
+    assert service.has_lab("m11-reload-added")
+    assert not service.has_lab("m11-forgotten-config")
+    assert "m11-hidden-in-etc" in service.lab_slugs()
+
+
+def test_private_flag_change_affects_only_labs_whose_flag_changed(lab_sources) -> None:
+    service, _, flags_file = lab_sources
+    flag_path = "/etc/config_chain/.indicator"
+    assert service.execute_command("m11-hidden-in-etc", f"cat {flag_path}", "/").output == "CTF{first}"
+    assert service.execute_command("m12-permission-denied", "cat /var/lib/secret/flag.txt", "/").output == "CTF{legacy}"
+
+    _write_json(flags_file, {"m11-hidden-in-etc": "CTF{second}", "m12-permission-denied": "CTF{legacy}"})
+    reloaded = service.reload_changed_files([flags_file])
+
+    assert reloaded == ["m11-hidden-in-etc"]
+    # The previous output was cached for the shared lab content; it must not outlive the reload.
+    assert service.execute_command("m11-hidden-in-etc", f"cat {flag_path}", "/").output == "CTF{second}"
+    assert service.execute_command("m12-permission-denied", "cat /var/lib/secret/flag.txt", "/").output == "CTF{legacy}"
+
+
+def test_unrelated_changes_reload_nothing(lab_sources, tmp_path: Path) -> None:
+    service, labs_root, _ = lab_sources
+    service.execute_command("m11-hidden-in-etc", "pwd", "/")
+
+    assert service.reload_changed_files([tmp_path / "elsewhere.json", labs_root / "README.md"]) == []
+    assert service._content_versions == {}
+
+
+def test_watcher_snapshot_reports_changed_added_and_removed_files(lab_sources) -> None:
+    service, labs_root, flags_file = lab_sources
+    before = _collect_snapshot(service.source_paths())
+    overlay = labs_root / "m11" / "overlays" / "m11-01.json"
+    added = labs_root / "m11" / "challenges" / "m11-99.json"
+    removed = labs_root / "m11" / "challenges" / "m11-02.json"
+    _write_json(overlay, {"/": {"changed": "yes\n"}})
+    _write_json(added, {})
+    removed.unlink()
+
+    changed = _changed_paths(before, _collect_snapshot(service.source_paths()))
+
+    assert set(changed) == {overlay, added, removed}
+    assert str(flags_file) in before
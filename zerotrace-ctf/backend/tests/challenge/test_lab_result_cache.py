@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import pytest
+
+from app.core.settings import get_settings
+from app.services.challenge_lab_service import ChallengeLabService
+
+
+@pytest.fixture(autouse=True)
+def lab_result_cache_settings(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("LAB_PRIVATE_FLAGS_FILE", "")
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+def test_read_only_commands_are_shared_across_players_and_keep_history() -> None:
+    service = ChallengeLabService()
+
+    first = service.execute_command("m13-suid-secrets", "find / -name shadow", "/", session_key="user-1:m13")
+    second = service.execute_command("m13-suid-secrets", "find / -name shadow", "/", session_key="user-2:m13")
+    history = service.execute_command("m13-suid-secrets", "history", "/", session_key="user-2:m13")
+
+    assert first == second
+    assert second.output == "/etc/shadow"
+    assert history.output == "find / -name shadow\nhistory"
+    stats = service.result_cache_stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+    assert stats.hit_rate == 0.5
+
+
+def test_cache_key_includes_cwd_and_skips_stateful_commands() -> None:
+    service = ChallengeLabService()
+
+    from_root = service.execute_command("m13-suid-secrets", "ls", "/", session_key="user-1:m13")
+    service.execute_command("m13-suid-secrets", "cd /etc", "/", session_key="user-1:m13")
+    from_etc = service.execute_command("m13-suid-secrets", "ls", "/", session_key="user-1:m13")
+    service.execute_command("m13-suid-secrets", "history", "/", session_key="user-1:m13")
+    service.execute_command("m13-suid-secrets", "history", "/", session_key="user-1:m13")
+
+    assert (from_root.output, from_etc.output) == ("etc\nroot\nusr", "shadow")
+    stats = service.result_cache_stats()
+    assert (stats.hits, stats.misses, stats.entries) == (0, 2, 2)
+
+
+def test_eviction_is_bounded_by_retained_bytes(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LAB_RESULT_CACHE_MAX_BYTES", "400")
+    get_settings.cache_clear()
+    service = ChallengeLabService()
+
+    for path in ("/", "/etc", "/root", "/usr", "/usr/bin"):
+        service.execute_command("m13-suid-secrets", f"ls -la {path}", "/")
+
+    stats = service.result_cache_stats()
+    assert 0 < stats.entries < 5
+    assert stats.size_bytes <= 400
+    service.execute_command("m13-suid-secrets", "ls -la /usr/bin", "/")
+    assert service.result_cache_stats().hits == 1
+
+
+def test_output_cut_by_budget_is_not_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LAB_COMMAND_MAX_BYTES_SCANNED", "1024")
+    get_settings.cache_clear()
+    service = ChallengeLabService()
+
+    truncated = service.execute_command("m11-hidden-in-etc", "grep -R e /", "/")
+    service.execute_command("m11-hidden-in-etc", "grep -R e /", "/")
+
+    assert truncated.output.endswith("(command budget exceeded)")
+    stats = service.result_cache_stats()
+    assert (stats.hits, stats.entries) == (0, 0)
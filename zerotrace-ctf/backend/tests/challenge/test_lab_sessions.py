@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+import sys
+
+import pytest
+
+from app.core.settings import get_settings
+from app.services import lab_session_store
+from app.services.challenge_lab_service import ChallengeLabService
+from app.services.lab_session_store import LabSessionState, LabSessionStore
+
+
+class _FakeRedisClient:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+        self.ttls: dict[str, int] = {}
+
+    def ping(self) -> bool:
+        return True
+
+    def get(self, key: str) -> str | None:
+        return self.values.get(key)
+
+    def set(self, key: str, value: str, px: int) -> None:
+        self.values[key] = value
+        self.ttls[key] = px
+
+    def delete(self, *keys: str) -> int:
+        return sum(1 for key in keys if self.values.pop(key, None) is not None)
+
+
+@pytest.fixture(autouse=True)
+def lab_session_settings(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("LAB_PRIVATE_FLAGS_FILE", "")
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+def test_session_resumes_cwd_and_history_per_user_and_challenge() -> None:
+    service = ChallengeLabService()
+
+    service.execute_command("m13-suid-secrets", "cd /etc", "/", session_key="user-1:m13-suid-secrets")
+    listing = service.execute_command("m13-suid-secrets", "ls", "/", session_key="user-1:m13-suid-secrets")
+    history = service.execute_command("m13-suid-secrets", "history", "/", session_key="user-1:m13-suid-secrets")
+    other_user = service.execute_command("m13-suid-secrets", "pwd", "/", session_key="user-2:m13-suid-secrets")
+    stateless = service.execute_command("m13-suid-secrets", "history", "/")
+
+    assert (listing.cwd, listing.output) == ("/etc", "shadow")
+    assert history.output == "cd /etc\nls\nhistory"
+    assert other_user.output == "/"
+    assert stateless.output == "history"
+
+
+def test_memory_backend_bounds_sessions_by_count_idle_ttl_and_history(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LAB_SESSION_MAX_SESSIONS", "2")
+    monkeypatch.setenv("LAB_SESSION_IDLE_TTL_SECONDS", "60")
+    monkeypatch.setenv("LAB_SESSION_HISTORY_LIMIT", "3")
+    get_settings.cache_clear()
+    clock = [1000.0]
+    monkeypatch.setattr(lab_session_store, "monotonic", lambda: clock[0])
+    store = LabSessionStore()
+
+    store.save("a", LabSessionState(cwd="/", history=["1", "2", "3", "4", "5"]))
+    store.save("b", LabSessionState(cwd="/tmp"))
+    assert store.load("a") is not None
+    store.save("c", LabSessionState(cwd="/etc"))
+
+    assert store.load("b") is None
+    assert store.load("a").history == ["3", "4", "5"]
+
+    clock[0] += 61
+    assert store.load("a") is None
+    assert store.load("c") is None
+
+
+def test_redis_backend_shares_sessions_across_stores(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake_client = _FakeRedisClient()
+    monkeypatch.setitem(
+        sys.modules,
+        "redis",
+        SimpleNamespace(Redis=SimpleNamespace(from_url=lambda *args, **kwargs: fake_client)),
+    )
+    monkeypatch.setenv("LAB_SESSION_BACKEND", "redis")
+    monkeypatch.setenv("LAB_SESSION_REDIS_KEY_PREFIX", "zerotrace:test:lab")
+    monkeypatch.setenv("LAB_SESSION_IDLE_TTL_SECONDS", "30")
+    get_settings.cache_clear()
+
+    LabSessionStore().save("user-1:m13", LabSessionState(cwd="/root", history=["cd /root"]))
+    resumed = LabSessionStore().load("user-1:m13")
+
+    assert resumed == LabSessionState(cwd="/root", history=["cd /root"])
+    assert fake_client.ttls == {"zerotrace:test:lab:user-1:m13": 30000}
+
+
+def test_batch_runs_in_order_on_one_session_and_stops_at_output_cap() -> None:
+    service = ChallengeLabService()
+
+    batch = service.execute_batch(
+        "m13-suid-secrets",
+        ["cd /etc", "cat shadow", "pwd"],
+        "/",
+        session_key="user-1:m13-suid-secrets",
+        max_output_bytes=1024,
+    )
+    capped = service.execute_batch(
+        "m13-suid-secrets",
+        ["pwd", "cat /etc/shadow", "history"],
+        "/",
+        session_key="user-1:m13-suid-secrets",
+        max_output_bytes=10,
+    )
+
+    assert [result.output for result in batch.results] == ["", "root:$6$xyz...:19000:0:99999:7:::", "/etc"]
+    assert (batch.cwd, batch.truncated) == ("/etc", False)
+    assert [result.output for result in capped.results] == ["/etc", "root:$"]
+    assert capped.truncated is True
+    resumed = service.execute_command("m13-suid-secrets", "history", "/", session_key="user-1:m13-suid-secrets")
+    assert resumed.output.splitlines() == ["cd /etc", "cat shadow", "pwd", "pwd", "cat /etc/shadow", "history"]
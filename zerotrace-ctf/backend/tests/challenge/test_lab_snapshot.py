@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import shutil
+
+import pytest
+
+from app.core.settings import get_settings
+from app.services.challenge_lab_service import ChallengeLabService
+from app.services.challenge_loader import ChallengeLoader
+from app.services.lab_filesystem import FileContent, MappedContent
+from app.services.lab_snapshot import CompiledChallengeLoader, build_challenge_loader, compile_lab_snapshot
+
+
+@pytest.fixture(autouse=True)
+def lab_snapshot_settings(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("LAB_PRIVATE_FLAGS_FILE", "")
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+@pytest.fixture
+def labs_copy(tmp_path: Path) -> tuple[type[ChallengeLoader], type[CompiledChallengeLoader], Path]:
+    labs_root = tmp_path / "labs"
+    shutil.copytree(ChallengeLoader._LABS_ROOT, labs_root)
+
+    class _JsonLoader(ChallengeLoader):
+        _LABS_ROOT = labs_root
+
+    class _CompiledLoader(CompiledChallengeLoader):
+        _LABS_ROOT = labs_root
+
+    return _JsonLoader, _CompiledLoader, labs_root
+
+
+def _decoded(files: dict[str, FileContent]) -> dict[str, str]:
+    return {path: content if isinstance(content, str) else content.decode() for path, content in files.items()}
+
+
+def test_compiled_loader_matches_json_sources_without_parsing_them(tmp_path: Path) -> None:
+    snapshot_path = tmp_path / "labs.bin"
+    summary = compile_lab_snapshot(snapshot_path)
+    json_loader = ChallengeLoader()
+    compiled_loader = CompiledChallengeLoader(snapshot_path)
+
+    assert compiled_loader.index_all() == json_loader.index_all()
+    assert summary.labs == len(json_loader.index_all())
+    compiled_base = compiled_loader.load_base_files()
+    assert all(isinstance(content, MappedContent) for content in compiled_base.values())
+    assert _decoded(dict(compiled_base)) == dict(json_loader.load_base_files())
+    for entry in json_loader.index_all():
+        expected = json_loader.materialize(entry)
+        actual = compiled_loader.materialize(entry)
+        assert (actual is None) == (expected is None)
+        if expected is not None and actual is not None:
+            assert _decoded(actual.files) == expected.files
+            assert (actual.flag_templates, actual.permissions) == (expected.flag_templates, expected.permissions)
+
+
+def test_service_on_snapshot_answers_like_json_sources(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    snapshot_path = tmp_path / "labs.bin"
+    compile_lab_snapshot(snapshot_path)
+    json_service = ChallengeLabService()
+    monkeypatch.setenv("LAB_SNAPSHOT_FILE", str(snapshot_path))
+    get_settings.cache_clear()
+    compiled_service = ChallengeLabService()
+
+    assert isinstance(compiled_service._loader, CompiledChallengeLoader)
+    for command in ("grep -R include /etc", "du -a /etc", "find / -name '*.conf'", "cat /etc/passwd", "ls -a /"):
+        assert compiled_service.execute_command("m11-hidden-in-etc", command, "/") == json_service.execute_command(
+            "m11-hidden-in-etc", command, "/"
+        )
+    assert compiled_service.lab_slugs() == json_service.lab_slugs()
+
+
+def test_sources_edited_after_compiling_are_read_from_json(labs_copy, tmp_path: Path) -> None:
+    json_loader_type, compiled_loader_type, labs_root = labs_copy
+    snapshot_path = tmp_path / "labs.bin"
+    compile_lab_snapshot(snapshot_path, json_loader_type())
+
+    overlay = labs_root / "m11" / "overlays" / "m11-01.json"
+    overlay.write_text(json.dumps({"/": {"home": {"player": {"notes.txt": "edited after compile\n"}}}}), encoding="utf-8")
+    challenge = labs_root / "m11" / "challenges" / "m11-02.json"
+    definition = json.loads(challenge.read_text(encoding="utf-8"))
+    challenge.write_text(json.dumps({**definition, "title": "Retitled"}), encoding="utf-8")
+
+    compiled_loader = compiled_loader_type(snapshot_path)
+    entries = {entry.slug: entry for entry in compiled_loader.index_all()}
+    definition = compiled_loader.materialize(entries["m11-hidden-in-etc"])
+
+    assert entries["m11-forgotten-config"].title == "Retitled"
+    assert definition is not None
+    assert definition.files["/home/player/notes.txt"] == "edited after compile\n"
+
+
+@pytest.mark.parametrize("payload", [b"", b"not a snapshot", b"ZTLABSNP" + b"\x00" * 32])
+def test_unreadable_snapshot_falls_back_to_json_sources(payload: bytes, tmp_path: Path) -> None:
+    snapshot_path = tmp_path / "labs.bin"
+    snapshot_path.write_bytes(payload)
+
+    loader = CompiledChallengeLoader(snapshot_path)
+
+    assert loader.index_all() == ChallengeLoader().index_all()
+    assert all(isinstance(content, str) for content in loader.load_base_files().values())
+
+
+def test_loader_choice_follows_snapshot_setting(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    assert type(build_challenge_loader()) is ChallengeLoader
+    monkeypatch.setenv("LAB_SNAPSHOT_FILE", str(tmp_path / "missing.bin"))
+    get_settings.cache_clear()
+
+    loader = build_challenge_loader()
+
+    assert isinstance(loader, CompiledChallengeLoader)
+    assert loader.index_all() == ChallengeLoader().index_all()
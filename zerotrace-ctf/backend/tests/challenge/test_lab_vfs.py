@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+from fnmatch import fnmatch
+import posixpath
+
+import pytest
+
+from app.core.settings import get_settings
+from app.services.challenge_lab_service import ChallengeLabService
+from app.services.lab_filesystem import FilesystemLayer, VirtualFilesystem
+
+
+# Names with "-", "." and " " sort before "/", which is what makes path order differ from a plain DFS.
+_FILES = {
+    "/etc/cron.d/backup": "0 * * * * root backup\n",
+    "/etc/cron/daily/logrotate": "rotate\n",
+    "/etc/cron-allow": "root\n",
+    "/etc/hosts": "127.0.0.1 localhost\n",
+    "/etc/.hidden": "secret\n",
+    "/var/log/auth.log": "Failed password\n",
+    "/var/log/auth.log.1": "Accepted password\n",
+    "/var/log-archive/old auth.log": "old\n",
+    "/home/user/notes.txt": "notes\n",
+}
+
+
+def _flat_walk(files: dict[str, str], path: str) -> list[str]:
+    """Reference semantics of the original flat-scan implementation."""
+    directories = {"/"}
+    for file_path in files:
+        parent = posixpath.dirname(file_path)
+        while parent != "/":
+            directories.add(parent)
+            parent = posixpath.dirname(parent)
+    if path in files:
+        return [path]
+    if path not in directories:
+        return []
+    prefix = "/" if path == "/" else f"{path}/"
+    return [
+        path,
+        *sorted(directory for directory in directories if directory != path and directory.startswith(prefix)),
+        *sorted(file_path for file_path in files if file_path.startswith(prefix)),
+    ]
+
+
+@pytest.mark.parametrize("path", ["/", "/etc", "/etc/cron", "/var", "/var/log", "/etc/hosts", "/missing"])
+def test_walk_and_recursive_iteration_match_flat_scan_order(path: str) -> None:
+    filesystem = VirtualFilesystem(_FILES)
+    expected = _flat_walk(_FILES, path)
+
+    assert list(filesystem.walk(path)) == expected
+    if filesystem.is_dir(path):
+        assert list(filesystem.iter_files_under(path, recursive=True)) == [p for p in expected if p in _FILES]
+
+
+@pytest.mark.parametrize("name_glob", ["*.log*", "cron*", "backup", "*", "nothing-matches"])
+@pytest.mark.parametrize("type_filter", [None, "f", "d"])
+@pytest.mark.parametrize("path", ["/", "/etc", "/var/log"])
+def test_find_matches_filtered_walk_on_both_lookup_paths(path: str, name_glob: str, type_filter: str | None) -> None:
+    filesystem = VirtualFilesystem(_FILES)
+    expected = [
+        candidate
+        for candidate in _flat_walk(_FILES, path)
+        if fnmatch(posixpath.basename(candidate), name_glob)
+        and (type_filter is None or (type_filter == "d") == (candidate not in _FILES))
+    ]
+
+    walked = list(filesystem.find(path, name_glob=name_glob, type_filter=type_filter))
+    # Once a glob's matching names are cached, find always takes the basename index.
+    filesystem.overlay.names_matching(name_glob)
+    indexed = list(filesystem.find(path, name_glob=name_glob, type_filter=type_filter))
+
+    assert walked == expected
+    assert indexed == expected
+
+
+def test_list_dir_uses_sorted_children_and_hides_dotfiles() -> None:
+    filesystem = VirtualFilesystem(_FILES, permissions={"/etc/hosts": "600", "/etc": "0o750"})
+
+    assert filesystem.list_dir("/etc", show_all=False) == ["cron", "cron-allow", "cron.d", "hosts"]
+    assert filesystem.list_dir("/etc", show_all=True) == [".", "..", ".hidden", "cron", "cron-allow", "cron.d", "hosts"]
+    assert filesystem.list_dir("/missing", show_all=True) == [".", ".."]
+    files = list(filesystem.iter_files_under("/etc", recursive=False))
+    assert files == ["/etc/.hidden", "/etc/cron-allow", "/etc/hosts"]
+    assert filesystem.permission_string("/etc/hosts") == "-rw-------"
+    assert filesystem.permission_string("/etc") == "drwxr-x---"
+    assert filesystem.permission_string("/missing") == "-rw-r--r--"
+
+
+def test_read_file_rejects_directories() -> None:
+    filesystem = VirtualFilesystem(_FILES)
+
+    assert filesystem.read_file("/etc/../etc/hosts") == "127.0.0.1 localhost\n"
+    with pytest.raises(KeyError):
+        filesystem.read_file("/etc")
+
+
+_BASE = {
+    "/etc/hosts": "127.0.0.1 base\n",
+    "/etc/passwd": "root:x:0:0:root:/root:/bin/bash\n",
+    "/opt/tools/scan": "#!/bin/sh\n",
+    "/opt/tools/lib/helper.sh": "helper\n",
+    "/var/log/syslog": "boot\n",
+}
+_OVERLAY = {
+    "/etc/hosts": "10.0.0.5 target\n",
+    "/opt/tools": "replaced by a file\n",
+    "/var/log/auth.log": "Failed password\n",
+}
+
+
+def _flat_merge(base: dict[str, str], overlay: dict[str, str]) -> dict[str, str]:
+    """Reference semantics: overlay paths win and an overlay file drops the base subtree below it."""
+    merged = {
+        path: content
+        for path, content in base.items()
+        if not any(path.startswith(f"{overlay_path}/") for overlay_path in overlay)
+    }
+    merged.update(overlay)
+    return merged
+
+
+@pytest.mark.parametrize("path", ["/", "/etc", "/opt", "/opt/tools", "/opt/tools/lib", "/var/log"])
+def test_overlay_on_shared_base_matches_flat_merge(path: str) -> None:
+    merged = _flat_merge(_BASE, _OVERLAY)
+    flat = VirtualFilesystem(merged)
+    layered = VirtualFilesystem(_OVERLAY, base=FilesystemLayer(_BASE))
+
+    assert list(layered.walk(path)) == list(flat.walk(path))
+    assert layered.list_dir(path, show_all=True) == flat.list_dir(path, show_all=True)
+    assert list(layered.iter_files_under(path, recursive=True)) == list(
+        flat.iter_files_under(path, recursive=True)
+    )
+    assert list(layered.find(path, name_glob="*", type_filter="f")) == list(flat.find(path, name_glob="*", type_filter="f"))
+
+
+@pytest.mark.parametrize(
+    "overlay",
+    [_OVERLAY, {"/var/log/syslog/today": "résumé\n", "/etc": "not a directory\n"}, {}],
+)
+def test_disk_usage_matches_summed_visible_files(overlay: dict[str, str]) -> None:
+    filesystem = VirtualFilesystem(overlay, base=FilesystemLayer(_BASE))
+
+    for path in filesystem.walk("/"):
+        files = filesystem.iter_files_under(path, recursive=True)
+        expected = sum(len(filesystem.read_file(file_path).encode("utf-8")) for file_path in files)
+        assert filesystem.disk_usage(path) == expected, path
+
+
+def test_overlay_shadows_base_and_labs_share_one_base_layer() -> None:
+    base = FilesystemLayer(_BASE)
+    first = VirtualFilesystem(_OVERLAY, base=base)
+    second = VirtualFilesystem({"/root/flag.txt": "flag\n"}, base=base)
+
+    assert first.read_file("/etc/hosts") == "10.0.0.5 target\n"
+    assert second.read_file("/etc/hosts") == "127.0.0.1 base\n"
+    assert first.is_file("/opt/tools") and not first.exists("/opt/tools/scan")
+    assert second.is_dir("/opt/tools") and second.exists("/opt/tools/lib/helper.sh")
+    assert first.base is second.base
+    assert len(second.overlay) < len(base)
+
+
+def test_structured_labs_share_the_base_layer_in_memory_report(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LAB_PRIVATE_FLAGS_FILE", "")
+    service = ChallengeLabService()
+    for slug in ("m11-hidden-in-etc", "m11-large-file", "m12-permission-denied"):
+        service.get_default_cwd(slug)
+
+    report = {usage.slug: usage for usage in service.memory_report()}
+    layered = [usage for usage in report.values() if usage.base_files]
+
+    assert len(layered) == 2
+    assert sum(1 for usage in layered if usage.shared_base_bytes) == 1
+    assert all(usage.overlay_files < usage.base_files for usage in layered)
+    assert report["m12-permission-denied"].base_files == 0
+
+
+def test_labs_are_indexed_lazily_and_evicted_least_recently_used(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LAB_PRIVATE_FLAGS_FILE", "")
+    monkeypatch.setenv("LAB_RESIDENT_CACHE_SIZE", "2")
+    get_settings.cache_clear()
+    service = ChallengeLabService()
+
+    assert service.memory_report() == []
+    assert service.has_lab("m11-hidden-in-etc") is True
+    assert service.has_lab("m13-suid-secrets") is True
+    assert service.has_lab("no-such-lab") is False
+    assert service.get_lab_hints("m11-hidden-in-etc")
+    assert service.memory_report() == []
+
+    service.execute_command("m11-hidden-in-etc", "pwd", "/")
+    service.execute_command("m13-suid-secrets", "pwd", "/")
+    service.execute_command("m11-hidden-in-etc", "pwd", "/")
+    service.execute_command("m12-permission-denied", "pwd", "/")
+
+    assert [usage.slug for usage in service.memory_report()] == ["m11-hidden-in-etc", "m12-permission-denied"]
+    # An evicted lab is rebuilt transparently on its next use.
+    assert service.execute_command("m13-suid-secrets", "ls /root", "/").output == "flag.txt"
+    get_settings.cache_clear()
+
+
+_GREP_BASE = {
+    **_BASE,
+    "/var/log/syslog": "boot ok\r\nFailed password twice: Failed password\r\nkernel\x0cFailed passwordless\n",
+    "/srv/notes.md": "Fail\ned password split across lines\nlast line without newline: Failed password",
+}
+
+
+def _reference_grep(filesystem: VirtualFilesystem, path: str, pattern: str) -> list[tuple[str, int, str]]:
+    return [
+        (file_path, line_no, line)
+        for file_path in filesystem.iter_files_under(path, recursive=True)
+        for line_no, line in enumerate(filesystem.read_file(file_path).splitlines(), start=1)
+        if pattern in line
+    ]
+
+
+@pytest.mark.parametrize("pattern", ["Failed password", "ai", "password\n", "\r", "zz-no-match", "log"])
+@pytest.mark.parametrize("path", ["/", "/var", "/var/log/syslog", "/opt/tools"])
+def test_indexed_grep_matches_line_scan(path: str, pattern: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    filesystem = VirtualFilesystem(_OVERLAY, base=FilesystemLayer(_GREP_BASE))
+    expected = _reference_grep(filesystem, path, pattern)
+
+    scanned = filesystem.grep(path, pattern, recursive=True)
+    monkeypatch.setattr(VirtualFilesystem, "_GREP_INDEX_MIN_SUBTREE", 0)
+    indexed = filesystem.grep(path, pattern, recursive=True)
+
+    assert scanned == expected
+    assert indexed == expected
+    assert filesystem.base.has_trigram_index is (filesystem.is_dir(path) and len(pattern) >= 3)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from uuid import UUID, uuid4
 
 import pytest
@@ -10,6 +10,7 @@ from app.models.challenge import Challenge, ChallengeDifficulty
 from app.models.challenge_solve import ChallengeSolve
 from app.models.track import Track
 from app.models.user import User
+from app.repositories import challenge_repository
 from app.services.leaderboard_service import LeaderboardEntry, LeaderboardService
 
 
@@ -285,3 +286,75 @@ def test_invalid_pagination_raises_value_error(limit: int, offset: int, session:
 
     with pytest.raises(ValueError):
         service.get_global_leaderboard(session, limit=limit, offset=offset)
+
+
+def test_iter_full_leaderboard_streams_every_entry_across_batches(session: Session) -> None:
+    service = LeaderboardService()
+    track = _create_track(session, "linux")
+
+    for i, points in enumerate([500, 400, 300, 200, 100], start=1):
+        challenge = _create_challenge(session, track, f"export-{i}")
+        user = _create_user(session, f"export-{i}-{uuid4()}@example.com")
+        _create_solve(session, user=user, challenge=challenge, points_awarded=points, created_at=_dt(i))
+
+    entries = list(service.iter_full_leaderboard(session, batch_size=2))
+
+    assert [entry.total_xp for entry in entries] == [500, 400, 300, 200, 100]
+    assert [entry.rank for entry in entries] == [1, 2, 3, 4, 5]
+    assert entries == service.get_global_leaderboard(session, limit=50, offset=0)
+
+
+def _award(session: Session, *, user: User, challenge: Challenge, points_awarded: int, created_at: datetime) -> None:
+    _create_solve(session, user=user, challenge=challenge, points_awarded=points_awarded, created_at=created_at)
+    challenge_repository.add_daily_xp(
+        session,
+        user_id=user.id,
+        track_id=challenge.track_id,
+        points_awarded=points_awarded,
+        awarded_at=created_at,
+    )
+    session.flush()
+
+
+def test_range_leaderboard_sums_only_buckets_inside_range(session: Session) -> None:
+    service = LeaderboardService()
+    linux_track = _create_track(session, "linux")
+    crypto_track = _create_track(session, "cryptography", name="Cryptography")
+    linux = [_create_challenge(session, linux_track, f"range-linux-{i}") for i in range(3)]
+    crypto = _create_challenge(session, crypto_track, "range-crypto")
+
+    veteran = _create_user(session, f"veteran-{uuid4()}@example.com")
+    newcomer = _create_user(session, f"newcomer-{uuid4()}@example.com")
+
+    _award(session, user=veteran, challenge=linux[0], points_awarded=500, created_at=_dt(1))
+    _award(session, user=veteran, challenge=linux[1], points_awarded=50, created_at=_dt(8, 9))
+    _award(session, user=newcomer, challenge=linux[1], points_awarded=100, created_at=_dt(8, 10))
+    _award(session, user=newcomer, challenge=crypto, points_awarded=30, created_at=_dt(9))
+    _award(session, user=veteran, challenge=linux[2], points_awarded=80, created_at=_dt(10))
+
+    week = service.get_global_range_leaderboard(
+        session, start_day=date(2026, 1, 8), end_day=date(2026, 1, 14), limit=50, offset=0
+    )
+    linux_day = service.get_track_range_leaderboard(
+        session, linux_track.id, start_day=date(2026, 1, 8), end_day=date(2026, 1, 8), limit=50, offset=0
+    )
+
+    assert [(entry.user_id, entry.total_xp) for entry in week] == [(veteran.id, 130), (newcomer.id, 130)]
+    assert [_as_utc(entry.first_solve_at) for entry in week] == [_dt(8, 9), _dt(8, 10)]
+    assert [entry.rank for entry in week] == [1, 2]
+    assert [(entry.user_id, entry.total_xp) for entry in linux_day] == [(newcomer.id, 100), (veteran.id, 50)]
+
+
+@pytest.mark.parametrize(
+    ("start_day", "end_day"),
+    [
+        (date(2026, 1, 9), date(2026, 1, 8)),
+        (date(2024, 1, 1), date(2026, 1, 1)),
+        (None, date(2026, 1, 1)),
+    ],
+)
+def test_invalid_day_range_raises_value_error(session: Session, start_day, end_day) -> None:
+    service = LeaderboardService()
+
+    with pytest.raises(ValueError):
+        service.get_global_range_leaderboard(session, start_day=start_day, end_day=end_day, limit=10, offset=0)
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.challenge import Challenge, ChallengeDifficulty
+from app.models.challenge_solve import ChallengeSolve
+from app.models.leaderboard_latest_position import LeaderboardLatestPosition
+from app.models.leaderboard_user_position import LeaderboardUserPosition
+from app.models.track import Track
+from app.models.user import User
+from app.services.leaderboard_snapshot_service import LeaderboardSnapshotService
+
+
+def _dt(day: int, hour: int = 0) -> datetime:
+    return datetime(2026, 2, day, hour, tzinfo=timezone.utc)
+
+
+def _seed_board(session: Session, challenge_count: int = 3) -> tuple[Track, list[Challenge], list[User]]:
+    track = Track(name="Linux", slug="linux", description="linux track", is_active=True)
+    session.add(track)
+    session.flush()
+    challenges = []
+    for index in range(challenge_count):
+        challenge = Challenge(
+            track_id=track.id,
+            title=f"Snapshot {index}",
+            slug=f"snapshot-{index}",
+            description="Snapshot test challenge",
+            difficulty=ChallengeDifficulty.EASY,
+            points=100,
+            is_published=True,
+        )
+        session.add(challenge)
+        challenges.append(challenge)
+    users = [
+        User(email=f"snap-{index}-{uuid4()}@example.com", password_hash="placeholder-hash", is_active=True)
+        for index in range(2)
+    ]
+    session.add_all(users)
+    session.flush()
+    return track, challenges, users
+
+
+def _solve(session: Session, user: User, challenge: Challenge, points: int, created_at: datetime) -> None:
+    session.add(
+        ChallengeSolve(
+            user_id=user.id,
+            challenge_id=challenge.id,
+            points_awarded=points,
+            is_first_blood=False,
+            created_at=created_at,
+        )
+    )
+    session.flush()
+
+
+def test_capture_records_ranked_board_and_skips_unchanged(session: Session) -> None:
+    service = LeaderboardSnapshotService()
+    _, challenges, (alice, bob) = _seed_board(session)
+    _solve(session, alice, challenges[0], 100, _dt(1))
+    _solve(session, bob, challenges[1], 150, _dt(1, 1))
+
+    first = service.capture_snapshot(session, now=_dt(2))
+    repeat = service.capture_snapshot(session, now=_dt(3))
+
+    assert first is not None
+    assert first.top_user_ids == [str(bob.id), str(alice.id)]
+    assert first.top_total_xp == [150, 100]
+    assert first.entry_count == 2
+    assert repeat is None
+
+
+def test_snapshot_at_returns_latest_point_before_timestamp(session: Session) -> None:
+    service = LeaderboardSnapshotService()
+    _, challenges, (alice, bob) = _seed_board(session)
+    _solve(session, alice, challenges[0], 100, _dt(1))
+    service.capture_snapshot(session, now=_dt(2))
+    _solve(session, bob, challenges[1], 150, _dt(3))
+    service.capture_snapshot(session, now=_dt(4))
+
+    before = service.get_snapshot_at(session, at=_dt(1), top=10)
+    early = service.get_snapshot_at(session, at=_dt(3), top=10)
+    late = service.get_snapshot_at(session, at=_dt(5), top=10, user_id=alice.id)
+
+    assert before is None
+    assert early is not None
+    assert [(entry.user_id, entry.total_xp, entry.rank) for entry in early.entries] == [(alice.id, 100, 1)]
+    assert late is not None
+    assert [(entry.user_id, entry.rank) for entry in late.entries] == [(alice.id, 2)]
+
+
+def test_history_downsamples_but_keeps_range_endpoints(session: Session) -> None:
+    service = LeaderboardSnapshotService()
+    _, challenges, (alice, _) = _seed_board(session, challenge_count=7)
+    for day in range(1, 8):
+        _solve(session, alice, challenges[day - 1], 10, _dt(day))
+        service.capture_snapshot(session, now=_dt(day, 12))
+
+    points = service.get_history(session, start=None, end=None, top=5, max_points=3)
+    bounded = service.get_history(session, start=_dt(3), end=_dt(5, 23), top=5, max_points=100)
+
+    assert [point.captured_at.day for point in points] == [1, 4, 7]
+    assert [point.entries[0].total_xp for point in points] == [10, 40, 70]
+    assert [point.captured_at.day for point in bounded] == [3, 4, 5]
+
+
+def test_capture_keeps_bounded_top_and_only_changed_user_positions(
+    session: Session,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(LeaderboardSnapshotService, "MAX_TOP", 1)
+    service = LeaderboardSnapshotService()
+    _, challenges, (alice, bob) = _seed_board(session)
+    _solve(session, alice, challenges[0], 100, _dt(1))
+    _solve(session, bob, challenges[0], 50, _dt(1))
+    service.capture_snapshot(session, now=_dt(2))
+    _solve(session, bob, challenges[1], 20, _dt(3))
+    third = service.capture_snapshot(session, now=_dt(4))
+    _solve(session, bob, challenges[2], 100, _dt(5))
+    service.capture_snapshot(session, now=_dt(6))
+
+    positions = session.execute(
+        select(LeaderboardUserPosition.user_id, LeaderboardUserPosition.total_xp, LeaderboardUserPosition.rank)
+        .order_by(LeaderboardUserPosition.captured_at, LeaderboardUserPosition.rank)
+    ).all()
+    alice_history = service.get_history(session, start=None, end=None, top=1, max_points=10, user_id=alice.id)
+
+    assert third is not None and third.top_user_ids == [str(alice.id)] and third.entry_count == 2
+    assert [(row.user_id, row.total_xp, row.rank) for row in positions] == [
+        (alice.id, 100, 1),
+        (bob.id, 50, 2),
+        (bob.id, 70, 2),
+        (bob.id, 170, 1),
+        (alice.id, 100, 2),
+    ]
+    assert [[(entry.total_xp, entry.rank) for entry in point.entries] for point in alice_history] == [
+        [(100, 1)],
+        [(100, 1)],
+        [(100, 2)],
+    ]
+
+
+def test_capture_compares_against_the_latest_position_table(session: Session) -> None:
+    service = LeaderboardSnapshotService()
+    _, challenges, (alice, bob) = _seed_board(session)
+    _solve(session, alice, challenges[0], 100, _dt(1))
+    _solve(session, bob, challenges[0], 50, _dt(1))
+    service.capture_snapshot(session, now=_dt(2))
+    _solve(session, bob, challenges[1], 100, _dt(3))
+    service.capture_snapshot(session, now=_dt(4))
+    service.capture_snapshot(session, now=_dt(6))
+
+    latest = session.execute(
+        select(
+            LeaderboardLatestPosition.user_id,
+            LeaderboardLatestPosition.total_xp,
+            LeaderboardLatestPosition.rank,
+            LeaderboardLatestPosition.captured_at,
+        ).order_by(LeaderboardLatestPosition.rank)
+    ).all()
+    position_count = len(session.execute(select(LeaderboardUserPosition.id)).all())
+
+    assert [(row.user_id, row.total_xp, row.rank, row.captured_at.day) for row in latest] == [
+        (bob.id, 150, 1, 4),
+        (alice.id, 100, 2, 4),
+    ]
+    assert position_count == 4
+
+
+def test_capture_respects_min_interval(session: Session) -> None:
+    service = LeaderboardSnapshotService()
+    _, challenges, (alice, _) = _seed_board(session)
+    _solve(session, alice, challenges[0], 100, _dt(1))
+    service.capture_snapshot(session, now=_dt(2))
+    _solve(session, alice, challenges[1], 100, _dt(2, 1))
+
+    assert service.capture_snapshot(session, now=_dt(2, 1), min_interval_seconds=7200) is None
+    assert service.capture_snapshot(session, now=_dt(2, 3), min_interval_seconds=7200) is not None
+
+
+@pytest.mark.parametrize(
+    ("top", "max_points", "start", "end"),
+    [
+        (0, 10, None, None),
+        (101, 10, None, None),
+        (10, 0, None, None),
+        (10, 501, None, None),
+        (10, 10, _dt(5), _dt(1)),
+    ],
+)
+def test_invalid_history_parameters_raise_value_error(
+    session: Session,
+    top: int,
+    max_points: int,
+    start: datetime | None,
+    end: datetime | None,
+) -> None:
+    service = LeaderboardSnapshotService()
+
+    with pytest.raises(ValueError):
+        service.get_history(session, start=start, end=end, top=top, max_points=max_points)
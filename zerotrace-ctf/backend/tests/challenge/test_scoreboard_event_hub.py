@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Generator
+import json
+from queue import Queue
+from threading import Event
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.models import Base
+from app.models.challenge import Challenge
+from app.models.track import Track
+from app.models.user import User
+from app.services.challenge_service import ChallengeService
+from app.services.scoreboard_event_hub import RedisScoreboardEventBridge, ScoreboardEventHub, scoreboard_event_hub
+
+
+def _decode(frame: bytes) -> tuple[str, dict]:
+    event_line, data_line = frame.decode("utf-8").strip().split("\n")
+    return event_line.removeprefix("event: "), json.loads(data_line.removeprefix("data: "))
+
+
+def test_hub_fans_out_one_serialized_frame_to_every_subscriber() -> None:
+    async def scenario() -> list[list[bytes]]:
+        hub = ScoreboardEventHub()
+        first = hub.subscribe(max_queue_size=4)
+        second = hub.subscribe(max_queue_size=4)
+
+        hub.publish("solve", {"user_id": "u-1", "rank": 1})
+        await asyncio.sleep(0)
+
+        received: list[list[bytes]] = []
+        for subscription in (first, second):
+            frames = []
+            async for frame in subscription.frames(heartbeat_seconds=0.01):
+                frames.append(frame)
+                break
+            received.append(frames)
+        return received
+
+    received = asyncio.run(scenario())
+
+    assert received[0][0] is received[1][0]
+    assert _decode(received[0][0]) == ("solve", {"rank": 1, "user_id": "u-1"})
+
+
+def test_hub_drops_slow_consumers_when_queue_is_full() -> None:
+    async def scenario() -> tuple[ScoreboardEventHub, bool, list[bytes]]:
+        hub = ScoreboardEventHub()
+        slow = hub.subscribe(max_queue_size=2)
+
+        for index in range(3):
+            hub.publish("solve", {"index": index})
+        await asyncio.sleep(0)
+
+        frames = [frame async for frame in slow.frames(heartbeat_seconds=0.01)]
+        return hub, slow.dropped, frames
+
+    hub, dropped, frames = asyncio.run(scenario())
+
+    assert dropped is True
+    assert frames == []
+    assert hub.subscriber_count == 0
+
+
+class _FlakyPubSub:
+    def __init__(self, messages: list[object]) -> None:
+        self._messages = messages
+        self.closed = Event()
+
+    def subscribe(self, channel: str) -> None:
+        pass
+
+    def listen(self):
+        for message in self._messages:
+            if isinstance(message, Exception):
+                raise message
+            yield message
+        self.closed.wait()
+
+    def close(self) -> None:
+        self.closed.set()
+
+
+class _FlakyRedis:
+    def __init__(self) -> None:
+        # The first subscription drops on a connection error; the second one carries a frame.
+        self.subscriptions = [
+            _FlakyPubSub([ConnectionError("connection reset")]),
+            _FlakyPubSub([{"data": b"event: solve\ndata: {}\n\n"}]),
+        ]
+
+    def pubsub(self, ignore_subscribe_messages: bool = False) -> _FlakyPubSub:
+        return self.subscriptions.pop(0)
+
+
+def test_redis_bridge_resubscribes_after_a_dropped_connection(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(RedisScoreboardEventBridge, "_RECONNECT_MIN_SECONDS", 0.01)
+    redis_client = _FlakyRedis()
+    bridge = RedisScoreboardEventBridge(redis_client=redis_client, channel="scoreboard")
+    delivered: Queue[bytes] = Queue()
+
+    bridge.start(delivered.put)
+    try:
+        frame = delivered.get(timeout=5)
+    finally:
+        bridge.stop()
+
+    assert frame == b"event: solve\ndata: {}\n\n"
+    assert redis_client.subscriptions == []
+
+
+def test_hub_emits_keepalive_when_idle() -> None:
+    async def scenario() -> bytes:
+        hub = ScoreboardEventHub()
+        subscription = hub.subscribe(max_queue_size=2)
+        async for frame in subscription.frames(heartbeat_seconds=0.01):
+            return frame
+        raise AssertionError("no frame")
+
+    assert asyncio.run(scenario()) == b": keepalive\n\n"
+
+
+@pytest.fixture
+def isolated_session() -> Generator[Session, None, None]:
+    # Commits must be real here, so use a private database instead of the shared savepoint session.
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    db_session = Session(bind=engine, expire_on_commit=False, autoflush=False)
+    try:
+        yield db_session
+    finally:
+        db_session.close()
+        engine.dispose()
+
+
+def _seed_published_challenge(session: Session, service: ChallengeService) -> tuple[User, Challenge]:
+    track = Track(name="Linux", slug="linux", description="Linux track", is_active=True)
+    user = User(email=f"user-{uuid4()}@example.com", password_hash="placeholder-hash", is_active=True)
+    session.add_all([track, user])
+    session.flush()
+    challenge = service.create_challenge(
+        session=session,
+        track_id=track.id,
+        title="Scoreboard Event",
+        slug="scoreboard-event",
+        description="Publishes scoreboard events.",
+        difficulty="easy",
+        points=100,
+    )
+    session.flush()
+    service.set_flag(session, challenge, "ZTCTF{scoreboard}")
+    service.publish_challenge(session, challenge)
+    session.commit()
+    return user, challenge
+
+
+def test_correct_submission_publishes_events_only_after_commit(
+    isolated_session: Session,
+    monkeypatch,
+) -> None:
+    service = ChallengeService()
+    user, challenge = _seed_published_challenge(isolated_session, service)
+    published: list[tuple[str, dict]] = []
+    monkeypatch.setattr(
+        scoreboard_event_hub,
+        "publish",
+        lambda event_type, payload: published.append((event_type, payload)),
+    )
+
+    result = service.submit_flag(
+        session=isolated_session,
+        user=user,
+        challenge_slug=challenge.slug,
+        submitted_flag="ZTCTF{scoreboard}",
+    )
+
+    assert result["first_blood"] is True
+    assert published == []
+
+    isolated_session.commit()
+
+    assert [event_type for event_type, _ in published] == ["solve", "first_blood"]
+    solve_payload = published[0][1]
+    assert solve_payload["user_id"] == str(user.id)
+    assert solve_payload["xp_awarded"] == result["xp_awarded"]
+    assert solve_payload["total_xp"] == result["xp_awarded"]
+    assert "rank" not in solve_payload
+    assert published[1][1]["challenge_slug"] == challenge.slug
+
+
+def test_rolled_back_submission_publishes_nothing(
+    isolated_session: Session,
+    monkeypatch,
+) -> None:
+    service = ChallengeService()
+    user, challenge = _seed_published_challenge(isolated_session, service)
+    published: list[tuple[str, dict]] = []
+    monkeypatch.setattr(
+        scoreboard_event_hub,
+        "publish",
+        lambda event_type, payload: published.append((event_type, payload)),
+    )
+
+    service.submit_flag(
+        session=isolated_session,
+        user=user,
+        challenge_slug=challenge.slug,
+        submitted_flag="ZTCTF{scoreboard}",
+    )
+    isolated_session.rollback()
+    isolated_session.commit()
+
+    assert published == []
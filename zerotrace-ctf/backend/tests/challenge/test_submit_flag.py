@@ -15,6 +15,7 @@ from app.models.challenge_solve import ChallengeSolve
 from app.models.submission_rate_limit import SubmissionRateLimit
 from app.models.track import Track
 from app.models.user import User
+from app.models.user_daily_xp import UserDailyXp
 from app.repositories.challenge_repository import REDACTED_SUBMITTED_FLAG
 from app.services.challenge_exceptions import (
     ChallengeAttemptLimitReachedError,
@@ -335,6 +336,39 @@ def test_same_user_double_submit_returns_zero_xp_and_records_attempt(
     assert solves[0].points_awarded == 120
 
 
+def test_awarded_solves_accumulate_in_daily_xp_bucket(
+    session: OrmSession,
+    seed_user: User,
+    challenge_service: ChallengeService,
+    create_basic_challenge,
+) -> None:
+    first = create_basic_challenge(slug="bucket-one", published=True, flag_value="ZTCTF{bucket-one}")
+    second = create_basic_challenge(
+        slug="bucket-two",
+        published=True,
+        flag_value="ZTCTF{bucket-two}",
+        points=150,
+    )
+
+    for challenge, flag in ((first, "ZTCTF{bucket-one}"), (second, "ZTCTF{bucket-two}"), (first, "ZTCTF{bucket-one}")):
+        challenge_service.submit_flag(
+            session=session,
+            user=seed_user,
+            challenge_slug=challenge.slug,
+            submitted_flag=flag,
+        )
+    session.flush()
+
+    buckets = list(
+        session.execute(select(UserDailyXp).where(UserDailyXp.user_id == seed_user.id)).scalars()
+    )
+    solves = [*_solves_for_challenge(session, first.id), *_solves_for_challenge(session, second.id)]
+    assert len(buckets) == 1
+    assert buckets[0].track_id == first.track_id
+    assert buckets[0].xp == sum(solve.points_awarded for solve in solves)
+    assert buckets[0].solve_count == 2
+
+
 def test_first_blood_disabled_grants_base_only(
     monkeypatch: pytest.MonkeyPatch,
     session: OrmSession,
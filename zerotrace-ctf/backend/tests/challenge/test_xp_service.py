@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.settings import get_settings
+from app.models.challenge import Challenge, ChallengeDifficulty
+from app.models.challenge_solve import ChallengeSolve
+from app.models.track import Track
+from app.models.user import User
+from app.services.challenge_service import ChallengeService
+from app.services.xp_service import UserXPAggregate, UserXPCache, XPService
+
+
+def _dt(day: int, hour: int = 0) -> datetime:
+    return datetime(2026, 3, day, hour, tzinfo=timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _challenge(session: Session, track: Track, slug: str) -> Challenge:
+    challenge = Challenge(
+        track_id=track.id,
+        title=f"XP {slug}",
+        slug=slug,
+        description="XP timeline test challenge",
+        difficulty=ChallengeDifficulty.EASY,
+        points=100,
+        is_published=True,
+    )
+    session.add(challenge)
+    session.flush()
+    return challenge
+
+
+def _solve(session: Session, user: User, challenge: Challenge, points: int, created_at: datetime) -> None:
+    session.add(
+        ChallengeSolve(
+            user_id=user.id,
+            challenge_id=challenge.id,
+            points_awarded=points,
+            is_first_blood=False,
+            created_at=created_at,
+        )
+    )
+    session.flush()
+
+
+def test_timeline_reports_cumulative_xp_per_solve_and_per_day(
+    session: Session,
+    seed_user: User,
+    seed_track: Track,
+) -> None:
+    service = XPService(UserXPCache(max_entries=10, ttl_seconds=60))
+    challenges = [_challenge(session, seed_track, f"xp-{index}") for index in range(3)]
+    _solve(session, seed_user, challenges[1], 50, _dt(2, 9))
+    _solve(session, seed_user, challenges[0], 100, _dt(1, 8))
+    _solve(session, seed_user, challenges[2], 25, _dt(2, 18))
+
+    per_solve = service.get_timeline_for_user(session, seed_user.id, granularity="solve")
+    per_day = service.get_timeline_for_user(session, seed_user.id, granularity="day")
+
+    assert per_solve.total_xp == 175
+    assert [point.challenge_id for point in per_solve.points] == [challenges[0].id, challenges[1].id, challenges[2].id]
+    assert [point.cumulative_xp for point in per_solve.points] == [100, 150, 175]
+    assert [_as_utc(point.timestamp) for point in per_day.points] == [_dt(1), _dt(2)]
+    assert [(point.xp_awarded, point.cumulative_xp) for point in per_day.points] == [(100, 100), (75, 175)]
+    assert service.get_total_xp_for_user(session, seed_user.id) == 175
+
+
+def test_cached_total_is_reused_until_the_users_next_solve(
+    session: Session,
+    seed_user: User,
+    challenge_service: ChallengeService,
+    create_basic_challenge,
+) -> None:
+    service = XPService()
+    first = create_basic_challenge(slug="xp-cache-one", published=True, flag_value="ZTCTF{xp-one}")
+    second = create_basic_challenge(slug="xp-cache-two", published=True, flag_value="ZTCTF{xp-two}")
+    challenge_service.submit_flag(session, seed_user, first.slug, "ZTCTF{xp-one}")
+    session.flush()
+
+    total_before = service.get_total_xp_for_user(session, seed_user.id)
+    # A raw insert bypasses the solve path, so the cached aggregate must still be served.
+    _solve(session, seed_user, _challenge(session, first.track, "xp-cache-raw"), 10, _dt(1))
+    cached_total = service.get_total_xp_for_user(session, seed_user.id)
+
+    challenge_service.submit_flag(session, seed_user, second.slug, "ZTCTF{xp-two}")
+    session.flush()
+    total_after = service.get_total_xp_for_user(session, seed_user.id)
+
+    assert total_before == 120
+    assert cached_total == 120
+    assert total_after == 120 + 10 + 120
+
+
+def test_cache_evicts_least_recently_used_users() -> None:
+    cache = UserXPCache(max_entries=2, ttl_seconds=60)
+    first, second, third = uuid4(), uuid4(), uuid4()
+    empty = UserXPAggregate(total_xp=0, points=())
+    cache.put(first, empty)
+    cache.put(second, empty)
+    assert cache.get(first) is empty
+    cache.put(third, empty)
+
+    assert cache.get(first) is empty
+    assert cache.get(second) is None
+    assert cache.get(third) is empty
+
+
+def test_default_cache_reads_limits_from_current_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("XP_CACHE_MAX_USERS", "0")
+    get_settings.cache_clear()
+    cache = UserXPCache()
+    user_id = uuid4()
+    cache.put(user_id, UserXPAggregate(total_xp=0, points=()))
+
+    assert cache.get(user_id) is None
+
+
+def test_invalid_granularity_raises_value_error(session: Session, seed_user: User) -> None:
+    service = XPService(UserXPCache(max_entries=10, ttl_seconds=60))
+
+    with pytest.raises(ValueError):
+        service.get_timeline_for_user(session, seed_user.id, granularity="week")
@@ -4,8 +4,12 @@ from datetime import timedelta
 from uuid import uuid4
 
 from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
 
 from app.core.settings import get_settings
+from app.models.user import User
 from app.security.jwt import create_access_token
 
 
@@ -64,6 +68,30 @@ def test_login_success(client: TestClient, seed_roles: dict[str, object]) -> Non
     assert body["token_type"] == "bearer"
 
 
+def test_login_persists_upgraded_password_hash(
+    client: TestClient,
+    seed_roles: dict[str, object],
+    test_session: Session,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _ = seed_roles
+    email = "login-rehash@example.com"
+    password = "StrongPassword!123"
+    monkeypatch.setenv("PASSWORD_HASH_ROUNDS", "4")
+    get_settings.cache_clear()
+    _register(client, email, password)
+
+    monkeypatch.setenv("PASSWORD_HASH_ROUNDS", "5")
+    get_settings.cache_clear()
+    _login(client, email, password)
+    test_session.expire_all()
+    stored_hash = test_session.scalar(select(User.password_hash).where(User.email == email))
+
+    assert stored_hash is not None
+    assert stored_hash.startswith("$2b$05$")
+    _login(client, email, password)
+
+
 def test_login_invalid_password(client: TestClient, seed_roles: dict[str, object]) -> None:
     _ = seed_roles
     email = "bad-password@example.com"
@@ -744,3 +744,158 @@ def test_lab_execute_rate_limited_per_user_and_challenge(
     assert second.json() == {"detail": "Too many lab commands. Try again later."}
     assert second.headers.get("retry-after") == "5"
     get_settings.cache_clear()
+
+
+def test_lab_batch_consumes_one_permit_per_command(
+    client: TestClient,
+    test_session: Session,
+    seed_roles: dict[str, object],
+    monkeypatch,
+) -> None:
+    monkeypatch.setenv("LAB_COMMAND_RATE_LIMIT_ENABLED", "true")
+    monkeypatch.setenv("LAB_COMMAND_RATE_LIMIT_MAX_ATTEMPTS", "4")
+    monkeypatch.setenv("LAB_COMMAND_RATE_LIMIT_WINDOW_SECONDS", "60")
+    monkeypatch.setenv("LAB_COMMAND_RATE_LIMIT_LOCK_SECONDS", "5")
+    get_settings.cache_clear()
+
+    track = _seed_track(test_session)
+    auth_data = _create_admin_and_player_tokens(client, test_session, seed_roles)
+    created = _create_challenge(
+        client,
+        auth_data["admin_token"],
+        str(track.id),
+        slug="m13-suid-secrets",
+        title="SUID Secrets",
+    )
+    _set_flag(client, auth_data["admin_token"], created["id"], "ZTCTF{runtime-m13}")
+    _publish_challenge(client, auth_data["admin_token"], created["id"])
+
+    batch = client.post(
+        "/challenges/m13-suid-secrets/lab/batch",
+        json={"commands": ["cd /etc", "ls", "pwd"], "cwd": "/"},
+        headers=auth_headers(auth_data["player_token"]),
+    )
+    over_limit = client.post(
+        "/challenges/m13-suid-secrets/lab/batch",
+        json={"commands": ["pwd", "pwd"]},
+        headers=auth_headers(auth_data["player_token"]),
+    )
+    last_permit = client.post(
+        "/challenges/m13-suid-secrets/lab/batch",
+        json={"commands": ["pwd"]},
+        headers=auth_headers(auth_data["player_token"]),
+    )
+    oversized = client.post(
+        "/challenges/m13-suid-secrets/lab/batch",
+        json={"commands": ["pwd"] * 5},
+        headers=auth_headers(auth_data["player_token"]),
+    )
+
+    assert batch.status_code == 200
+    body = batch.json()
+    assert [result["output"] for result in body["results"]] == ["", "shadow", "/etc"]
+    assert body["cwd"] == "/etc"
+    assert body["truncated"] is False
+    assert over_limit.status_code == 429
+    assert int(over_limit.headers["retry-after"]) > 5
+    assert last_permit.status_code == 200
+    assert oversized.status_code == 400
+    get_settings.cache_clear()
+
+
+
+def test_lab_terminal_websocket_streams_output_on_one_session(
+    client: TestClient,
+    test_session: Session,
+    seed_roles: dict[str, object],
+    monkeypatch,
+) -> None:
+    from starlette.websockets import WebSocketDisconnect
+
+    from app.controllers import challenge_controller
+
+    monkeypatch.setattr(challenge_controller, "_LAB_TERMINAL_CHUNK_LINES", 2)
+    track = _seed_track(test_session)
+    auth_data = _create_admin_and_player_tokens(client, test_session, seed_roles)
+    created = _create_challenge(
+        client,
+        auth_data["admin_token"],
+        str(track.id),
+        slug="m16-reverse-shell-drop",
+        title="Reverse Shell Drop",
+    )
+    _set_flag(client, auth_data["admin_token"], created["id"], "ZTCTF{runtime-m16}")
+    _publish_challenge(client, auth_data["admin_token"], created["id"])
+
+    with client.websocket_connect("/challenges/m16-reverse-shell-drop/lab/ws") as websocket:
+        websocket.send_json({"type": "auth", "token": auth_data["player_token"]})
+        ready = websocket.receive_json()
+        websocket.send_json({"type": "command", "command": "find /"})
+        frames = []
+        while not frames or frames[-1]["type"] != "exit":
+            frames.append(websocket.receive_json())
+        websocket.send_json({"type": "command", "command": "cd /home"})
+        after_cd = websocket.receive_json()
+        websocket.send_json({"type": "command", "command": "pwd"})
+        pwd_frames = [websocket.receive_json(), websocket.receive_json()]
+
+    with client.websocket_connect("/challenges/m16-reverse-shell-drop/lab/ws") as websocket:
+        websocket.send_json({"type": "auth", "token": "not-a-token"})
+        try:
+            websocket.receive_json()
+        except WebSocketDisconnect as exc:
+            rejected_code = exc.code
+
+    assert ready == {"type": "ready", "cwd": "/"}
+    output_frames = [frame["data"] for frame in frames if frame["type"] == "output"]
+    assert len(output_frames) > 1
+    assert all(chunk.count("\n") <= 2 for chunk in output_frames)
+    assert "".join(output_frames).splitlines()[0] == "/"
+    assert frames[-1] == {"type": "exit", "cwd": "/", "exit_code": 0}
+    assert after_cd == {"type": "exit", "cwd": "/home", "exit_code": 0}
+    assert pwd_frames == [{"type": "output", "data": "/home"}, {"type": "exit", "cwd": "/home", "exit_code": 0}]
+    assert rejected_code == 4401
+
+
+def test_lab_output_cursor_continues_truncated_command(
+    client: TestClient,
+    test_session: Session,
+    seed_roles: dict[str, object],
+    monkeypatch,
+) -> None:
+    monkeypatch.setenv("LAB_OUTPUT_PAGE_MAX_LINES", "1")
+    get_settings.cache_clear()
+
+    track = _seed_track(test_session)
+    auth_data = _create_admin_and_player_tokens(client, test_session, seed_roles)
+    created = _create_challenge(
+        client,
+        auth_data["admin_token"],
+        str(track.id),
+        slug="m17-bash-injection",
+        title="Bash Injection",
+    )
+    _set_flag(client, auth_data["admin_token"], created["id"], "ZTCTF{runtime-m17}")
+    _publish_challenge(client, auth_data["admin_token"], created["id"])
+    headers = auth_headers(auth_data["player_token"])
+
+    first = client.post("/challenges/m17-bash-injection/lab/execute", json={"command": "find /"}, headers=headers)
+    second = client.post(
+        "/challenges/m17-bash-injection/lab/output",
+        json={"cursor": first.json()["next_cursor"]},
+        headers=headers,
+    )
+    replayed = client.post(
+        "/challenges/m17-bash-injection/lab/output",
+        json={"cursor": first.json()["next_cursor"]},
+        headers=headers,
+    )
+
+    assert first.status_code == 200
+    assert first.json()["output"] == "/\n"
+    assert first.json()["truncated"] is True
+    assert second.status_code == 200
+    assert second.json()["output"] == "/var\n"
+    assert second.json()["next_cursor"] not in (None, first.json()["next_cursor"])
+    assert replayed.status_code == 404
+    get_settings.cache_clear()
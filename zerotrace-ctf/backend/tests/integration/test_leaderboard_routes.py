@@ -1,15 +1,17 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+import json
 from uuid import uuid4
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import delete
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 
 from app.models.challenge import Challenge, ChallengeDifficulty
 from app.models.challenge_solve import ChallengeSolve
+from app.models.role import Role
 from app.models.track import Track
 from app.models.user import User
 
@@ -318,3 +320,97 @@ def test_leaderboard_requires_authentication(client: TestClient) -> None:
 
     assert response.status_code == 401
     assert response.json() == {"detail": "Authentication required."}
+
+
+def test_leaderboard_stream_requires_authentication(client: TestClient) -> None:
+    response = client.get("/leaderboard/stream")
+
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Authentication required."}
+
+
+def _admin_requester_token(client: TestClient, test_session: Session) -> str:
+    email = f"leaderboard.admin+{uuid4().hex}@example.com"
+    password = "StrongPassword!123"
+    register_user(client, email, password)
+    user = test_session.execute(select(User).where(User.email == email)).scalar_one()
+    user.roles.append(test_session.execute(select(Role).where(Role.name == "admin")).scalar_one())
+    test_session.flush()
+    return login_user(client, email, password)
+
+
+def test_leaderboard_export_streams_full_board_as_ndjson_and_csv(
+    client: TestClient,
+    test_session: Session,
+    seed_roles: dict[str, object],
+) -> None:
+    _ = seed_roles
+    token = _admin_requester_token(client, test_session)
+    track = _create_track(test_session, slug=f"linux-{uuid4().hex[:8]}")
+    challenge = _create_challenge(test_session, track=track, slug=f"export-{uuid4().hex[:8]}")
+    users = [_create_user(test_session) for _ in range(3)]
+    for index, user in enumerate(users):
+        _create_solve(
+            test_session,
+            user=user,
+            challenge=challenge,
+            points_awarded=300 - index * 100,
+            created_at=_dt(1, index),
+        )
+
+    ndjson_response = client.get("/admin/leaderboard/export", headers=auth_headers(token))
+    csv_response = client.get(
+        f"/admin/leaderboard/export?format=csv&track_id={track.id}",
+        headers=auth_headers(token),
+    )
+
+    assert ndjson_response.status_code == 200
+    assert ndjson_response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in ndjson_response.text.splitlines()]
+    assert [row["user_id"] for row in rows] == [str(user.id) for user in users]
+    assert [row["rank"] for row in rows] == [1, 2, 3]
+    assert [row["total_xp"] for row in rows] == [300, 200, 100]
+
+    assert csv_response.status_code == 200
+    assert csv_response.headers["content-type"].startswith("text/csv")
+    csv_lines = csv_response.text.splitlines()
+    assert csv_lines[0] == "rank,user_id,total_xp,first_solve_at"
+    assert [line.split(",")[1] for line in csv_lines[1:]] == [str(user.id) for user in users]
+
+
+def test_leaderboard_export_requires_admin_and_known_format(
+    client: TestClient,
+    test_session: Session,
+    seed_roles: dict[str, object],
+) -> None:
+    player_token = _auth_requester_token(client, seed_roles)
+    admin_token = _admin_requester_token(client, test_session)
+
+    forbidden = client.get("/admin/leaderboard/export", headers=auth_headers(player_token))
+    bad_format = client.get("/admin/leaderboard/export?format=xml", headers=auth_headers(admin_token))
+    unknown_track = client.get(
+        f"/admin/leaderboard/export?track_id={uuid4()}",
+        headers=auth_headers(admin_token),
+    )
+
+    assert forbidden.status_code == 403
+    assert bad_format.status_code == 400
+    assert unknown_track.status_code == 404
+
+
+def test_range_leaderboard_rejects_half_open_range(
+    client: TestClient,
+    seed_roles: dict[str, object],
+) -> None:
+    token = _auth_requester_token(client, seed_roles)
+
+    empty = client.get(
+        "/leaderboard?start_day=2026-01-01&end_day=2026-01-07",
+        headers=auth_headers(token),
+    )
+    half_open = client.get("/leaderboard?start_day=2026-01-01", headers=auth_headers(token))
+
+    assert empty.status_code == 200
+    assert empty.json() == {"results": [], "limit": 50, "offset": 0}
+    assert half_open.status_code == 400
+    assert half_open.json() == {"detail": "Invalid leaderboard range parameters."}
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from fastapi.testclient import TestClient
-from sqlalchemy import select
+from sqlalchemy import event, select
 from sqlalchemy.orm import Session
 
 from app.models.role import Role
@@ -76,3 +76,65 @@ def test_admin_route_requires_token(client: TestClient) -> None:
 
     assert response.status_code == 401
     assert response.json() == {"detail": "Authentication required."}
+
+
+def test_cached_principal_is_invalidated_on_role_change_and_deactivation(
+    client: TestClient,
+    test_session: Session,
+    seed_roles: dict[str, object],
+) -> None:
+    _ = seed_roles
+    email = "promoted-user@example.com"
+    password = "StrongPassword!123"
+    _register(client, email, password)
+    token = _login(client, email, password)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    before_promotion = client.get("/admin/ping", headers=headers)
+    _promote_to_admin(test_session, email)
+    after_promotion = client.get("/admin/ping", headers=headers)
+
+    user = user_repository.get_by_email(test_session, email)
+    assert user is not None
+    user.is_active = False
+    test_session.flush()
+    after_deactivation = client.get("/admin/ping", headers=headers)
+
+    assert before_promotion.status_code == 403
+    assert after_promotion.status_code == 200
+    assert after_deactivation.status_code == 403
+    assert after_deactivation.json() == {"detail": "Access denied."}
+
+
+def test_admin_route_trusts_current_role_claims_without_querying(
+    client: TestClient,
+    test_session: Session,
+    test_engine,
+    seed_roles: dict[str, object],
+) -> None:
+    _ = seed_roles
+    email = "claims-admin@example.com"
+    password = "StrongPassword!123"
+    _register(client, email, password)
+    _promote_to_admin(test_session, email)
+    headers = {"Authorization": f"Bearer {_login(client, email, password)}"}
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    event.listen(test_engine, "before_cursor_execute", _record)
+    try:
+        fast_path = client.get("/admin/ping", headers=headers)
+    finally:
+        event.remove(test_engine, "before_cursor_execute", _record)
+
+    user = user_repository.get_by_email(test_session, email)
+    assert user is not None
+    user.roles = [role for role in user.roles if role.name != "admin"]
+    test_session.flush()
+    after_demotion = client.get("/admin/ping", headers=headers)
+
+    assert fast_path.status_code == 200
+    assert statements == []
+    assert after_demotion.status_code == 403
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.settings import get_settings
+from app.models.role import Role
+from app.models.user import User
+
+
+def _register_and_login(client: TestClient, email: str | None = None) -> str:
+    email = email or f"xp.viewer+{uuid4().hex}@example.com"
+    password = "StrongPassword!123"
+    assert client.post("/auth/register", json={"email": email, "password": password}).status_code == 201
+    response = client.post("/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200
+    return response.json()["access_token"]
+
+
+def _register_and_login_existing(client: TestClient, email: str) -> str:
+    response = client.post("/auth/login", json={"email": email, "password": "StrongPassword!123"})
+    assert response.status_code == 200
+    return response.json()["access_token"]
+
+
+def test_xp_timeline_requires_authentication(client: TestClient) -> None:
+    response = client.get("/users/me/xp/timeline")
+
+    assert response.status_code == 401
+
+
+def test_xp_timeline_for_new_user_is_empty_and_matches_total(
+    client: TestClient,
+    seed_roles: dict[str, object],
+) -> None:
+    _ = seed_roles
+    headers = {"Authorization": f"Bearer {_register_and_login(client)}"}
+
+    timeline = client.get("/users/me/xp/timeline?granularity=day", headers=headers)
+    total = client.get("/users/me/xp", headers=headers)
+    invalid = client.get("/users/me/xp/timeline?granularity=week", headers=headers)
+
+    assert timeline.status_code == 200
+    assert timeline.json() == {"granularity": "day", "total_xp": 0, "points": []}
+    assert total.json() == {"total_xp": 0}
+    assert invalid.status_code == 400
+
+
+def test_admin_bulk_import_creates_users_who_can_log_in(
+    client: TestClient,
+    test_session: Session,
+    seed_roles: dict[str, object],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _ = seed_roles
+    monkeypatch.setenv("PASSWORD_HASH_ROUNDS", "4")
+    monkeypatch.setenv("USER_IMPORT_HASH_WORKERS", "1")
+    get_settings.cache_clear()
+    player_token = _register_and_login(client)
+    admin_email = f"import.admin+{uuid4().hex}@example.com"
+    _register_and_login(client, admin_email)
+    admin = test_session.execute(select(User).where(User.email == admin_email)).scalar_one()
+    admin.roles.append(test_session.execute(select(Role).where(Role.name == "admin")).scalar_one())
+    test_session.flush()
+    admin_token = _register_and_login_existing(client, admin_email)
+    payload = (
+        b'{"email": "cohort.one@example.com", "password": "CohortPassword!1"}\n'
+        b'{"email": "cohort.one@example.com", "password": "CohortPassword!1"}\n'
+        b'{"email": "", "password": "CohortPassword!1"}\n'
+    )
+    upload = {"file": ("cohort.ndjson", payload, "application/x-ndjson")}
+
+    forbidden = client.post("/admin/users/import", files=upload, headers={"Authorization": f"Bearer {player_token}"})
+    response = client.post("/admin/users/import", files=upload, headers={"Authorization": f"Bearer {admin_token}"})
+    bad_format = client.post(
+        "/admin/users/import?format=xml",
+        files=upload,
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    login = client.post("/auth/login", json={"email": "cohort.one@example.com", "password": "CohortPassword!1"})
+
+    assert forbidden.status_code == 403
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["skipped"], body["failed"], body["truncated"]) == (1, 1, 1, False)
+    assert [row["status"] for row in body["rows"]] == ["created", "skipped", "failed"]
+    assert bad_format.status_code == 400
+    assert login.status_code == 200